@@ -0,0 +1,162 @@
+"""phase27 product search shadow columns and fts index
+
+Revision ID: 0028_phase27
+Revises: 0027_phase26
+Create Date: 2026-10-18
+"""
+
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0028_phase27"
+down_revision = "0027_phase26"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+TEXT_COLUMNS = {
+    "search_name": ("name", 200),
+    "search_author": ("author", 160),
+    "search_publisher": ("publisher", 160),
+    "search_category": ("category", 100),
+    "search_tags": ("tags", 500),
+}
+CODE_COLUMNS = {
+    "search_sku": ("sku", 50),
+    "search_isbn": ("isbn", 32),
+    "search_barcode": ("barcode", 80),
+    "search_shelf_location": ("shelf_location", 80),
+}
+FTS_COLUMNS = (*TEXT_COLUMNS, *CODE_COLUMNS)
+FTS_COLUMN_LIST = ", ".join(FTS_COLUMNS)
+FTS_NEW_VALUES = ", ".join(f"new.{name}" for name in FTS_COLUMNS)
+FTS_OLD_VALUES = ", ".join(f"old.{name}" for name in FTS_COLUMNS)
+
+
+def _normalize(value: str | None) -> str:
+    normalized = unicodedata.normalize("NFD", (value or "").lower().strip())
+    without_accents = "".join(ch for ch in normalized if unicodedata.category(ch) != "Mn")
+    return " ".join(without_accents.split())
+
+
+def _compact(value: str | None) -> str:
+    return "".join(ch for ch in _normalize(value) if ch.isalnum())
+
+
+def _tables() -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return set(inspector.get_table_names())
+
+
+def _columns_for(table_name: str) -> set[str]:
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(sa.text(f"PRAGMA table_info({table_name})")).fetchall()
+        return {row[1] for row in rows}
+    rows = conn.execute(
+        sa.text("SELECT column_name FROM information_schema.columns WHERE table_name = :table_name"),
+        {"table_name": table_name},
+    )
+    return {row[0] for row in rows}
+
+
+def _backfill_search_columns() -> None:
+    conn = op.get_bind()
+    source_columns = [source for source, _ in (*TEXT_COLUMNS.values(), *CODE_COLUMNS.values())]
+    assignments = ", ".join(f"{name} = :{name}" for name in FTS_COLUMNS)
+    update = sa.text(f"UPDATE products SET {assignments} WHERE id = :id")
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                f"SELECT id, {', '.join(source_columns)} FROM products "
+                "WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE},
+        ).mappings().all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            values = {"id": row["id"]}
+            for target, (source, _) in TEXT_COLUMNS.items():
+                values[target] = _normalize(row[source])
+            for target, (source, _) in CODE_COLUMNS.items():
+                values[target] = _compact(row[source])
+            params.append(values)
+        conn.execute(update, params)
+        last_id = rows[-1]["id"]
+
+
+def _create_fts_index() -> None:
+    conn = op.get_bind()
+    try:
+        conn.execute(
+            sa.text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5({FTS_COLUMN_LIST}, "
+                "content='products', content_rowid='id', tokenize='trigram')"
+            )
+        )
+    except sa.exc.OperationalError:
+        # SQLite sin FTS5/trigram: la búsqueda usa LIKE sobre las columnas espejo.
+        return
+    op.execute(
+        sa.text(
+            "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+            f"INSERT INTO products_fts(rowid, {FTS_COLUMN_LIST}) VALUES (new.id, {FTS_NEW_VALUES}); END"
+        )
+    )
+    op.execute(
+        sa.text(
+            "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+            f"INSERT INTO products_fts(products_fts, rowid, {FTS_COLUMN_LIST}) "
+            f"VALUES ('delete', old.id, {FTS_OLD_VALUES}); END"
+        )
+    )
+    op.execute(
+        sa.text(
+            f"CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF {FTS_COLUMN_LIST} ON products BEGIN "
+            f"INSERT INTO products_fts(products_fts, rowid, {FTS_COLUMN_LIST}) "
+            f"VALUES ('delete', old.id, {FTS_OLD_VALUES}); "
+            f"INSERT INTO products_fts(rowid, {FTS_COLUMN_LIST}) VALUES (new.id, {FTS_NEW_VALUES}); END"
+        )
+    )
+    op.execute(sa.text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+
+
+def upgrade() -> None:
+    if "products" not in _tables():
+        return
+
+    columns = _columns_for("products")
+    with op.batch_alter_table("products") as batch_op:
+        for name, (_, length) in (*TEXT_COLUMNS.items(), *CODE_COLUMNS.items()):
+            if name not in columns:
+                batch_op.add_column(
+                    sa.Column(name, sa.String(length=length), nullable=False, server_default="")
+                )
+
+    _backfill_search_columns()
+
+    if op.get_bind().dialect.name == "sqlite":
+        _create_fts_index()
+
+
+def downgrade() -> None:
+    if "products" not in _tables():
+        return
+
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(sa.text("DROP TRIGGER IF EXISTS products_fts_au"))
+        op.execute(sa.text("DROP TRIGGER IF EXISTS products_fts_ad"))
+        op.execute(sa.text("DROP TRIGGER IF EXISTS products_fts_ai"))
+        op.execute(sa.text("DROP TABLE IF EXISTS products_fts"))
+
+    columns = _columns_for("products")
+    with op.batch_alter_table("products") as batch_op:
+        for name in reversed(FTS_COLUMNS):
+            if name in columns:
+                batch_op.drop_column(name)
@@ -0,0 +1,48 @@
+"""phase28 compact product code indexes
+
+Revision ID: 0029_phase28
+Revises: 0028_phase27
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0029_phase28"
+down_revision = "0028_phase27"
+branch_labels = None
+depends_on = None
+
+CODE_INDEXES = {
+    "ix_products_search_sku": "search_sku",
+    "ix_products_search_isbn": "search_isbn",
+    "ix_products_search_barcode": "search_barcode",
+}
+
+
+def _tables() -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return set(inspector.get_table_names())
+
+
+def _indexes_for(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {idx["name"] for idx in inspector.get_indexes(table_name) if idx.get("name")}
+
+
+def upgrade() -> None:
+    if "products" not in _tables():
+        return
+    indexes = _indexes_for("products")
+    for index_name, column_name in CODE_INDEXES.items():
+        if index_name not in indexes:
+            op.create_index(index_name, "products", [column_name])
+
+
+def downgrade() -> None:
+    if "products" not in _tables():
+        return
+    indexes = _indexes_for("products")
+    for index_name in CODE_INDEXES:
+        if index_name in indexes:
+            op.drop_index(index_name, table_name="products")
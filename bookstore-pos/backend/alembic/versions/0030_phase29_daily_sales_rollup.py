@@ -0,0 +1,130 @@
+"""phase29 daily sales rollup tables
+
+Revision ID: 0030_phase29
+Revises: 0029_phase28
+Create Date: 2026-10-18
+"""
+
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0030_phase29"
+down_revision = "0029_phase28"
+branch_labels = None
+depends_on = None
+
+
+def _tables() -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return set(inspector.get_table_names())
+
+
+def _indexes_for(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {idx["name"] for idx in inspector.get_indexes(table_name) if idx.get("name")}
+
+
+def _backfill(warehouse_id: int) -> None:
+    # Mismo cálculo que app.core.sales_rollup.rebuild_sales_rollup: un día
+    # comercial (BUSINESS_TIMEZONE) por vez, con límites UTC sobre created_at.
+    from app.core.dates import business_day, business_day_bounds
+
+    conn = op.get_bind()
+    first, last = conn.execute(
+        sa.text("SELECT MIN(created_at), MAX(created_at) FROM sales WHERE status != 'VOID'")
+    ).one()
+    if first is None:
+        return
+    if isinstance(first, str):
+        first, last = (datetime.fromisoformat(value) for value in (first, last))
+
+    bounds = (
+        sa.bindparam("start", type_=sa.DateTime()),
+        sa.bindparam("end", type_=sa.DateTime()),
+        sa.bindparam("day", type_=sa.Date()),
+    )
+    product_rows = sa.text(
+        """
+        INSERT INTO daily_product_sales
+            (day, product_id, warehouse_id, qty_sold, sales_total, estimated_cost_total)
+        SELECT :day, si.product_id, :warehouse_id, SUM(si.qty),
+               COALESCE(SUM(si.final_total), 0),
+               COALESCE(SUM(si.qty * COALESCE(si.unit_cost_snapshot, p.unit_cost, p.cost, 0)), 0)
+        FROM sale_items si
+        JOIN sales s ON s.id = si.sale_id
+        LEFT JOIN products p ON p.id = si.product_id
+        WHERE s.status != 'VOID' AND s.created_at >= :start AND s.created_at < :end
+        GROUP BY si.product_id
+        """
+    ).bindparams(*bounds)
+    totals_rows = sa.text(
+        """
+        INSERT INTO daily_sales_totals (day, warehouse_id, sales_count, sales_total)
+        SELECT :day, :warehouse_id, COUNT(id), COALESCE(SUM(total), 0)
+        FROM sales
+        WHERE status != 'VOID' AND created_at >= :start AND created_at < :end
+        HAVING COUNT(id) > 0
+        """
+    ).bindparams(*bounds)
+
+    day = business_day(first)
+    last_day = business_day(last)
+    while day <= last_day:
+        start, end = business_day_bounds(day, day)
+        params = {
+            "day": day,
+            "warehouse_id": warehouse_id,
+            "start": start.replace(tzinfo=None),
+            "end": end.replace(tzinfo=None),
+        }
+        conn.execute(product_rows, params)
+        conn.execute(totals_rows, params)
+        day += timedelta(days=1)
+
+
+def upgrade() -> None:
+    tables = _tables()
+    if "daily_product_sales" not in tables:
+        op.create_table(
+            "daily_product_sales",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), primary_key=True),
+            sa.Column("warehouse_id", sa.Integer(), sa.ForeignKey("warehouses.id"), primary_key=True),
+            sa.Column("qty_sold", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("sales_total", sa.Numeric(14, 4), nullable=False, server_default="0"),
+            sa.Column("estimated_cost_total", sa.Numeric(14, 4), nullable=False, server_default="0"),
+        )
+    if "ix_daily_product_sales_product_day" not in _indexes_for("daily_product_sales"):
+        op.create_index(
+            "ix_daily_product_sales_product_day", "daily_product_sales", ["product_id", "day"]
+        )
+    if "daily_sales_totals" not in tables:
+        op.create_table(
+            "daily_sales_totals",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("warehouse_id", sa.Integer(), sa.ForeignKey("warehouses.id"), primary_key=True),
+            sa.Column("sales_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("sales_total", sa.Numeric(14, 4), nullable=False, server_default="0"),
+        )
+
+    if "daily_product_sales" in tables or "system_settings" not in tables:
+        return
+    warehouse_id = op.get_bind().execute(
+        sa.text("SELECT default_warehouse_id FROM system_settings ORDER BY id LIMIT 1")
+    ).scalar()
+    # Sin almacén por defecto no hay a quién imputar el histórico: se deja para
+    # scripts/rebuild_sales_rollup.py una vez configurado.
+    if warehouse_id:
+        _backfill(int(warehouse_id))
+
+
+def downgrade() -> None:
+    tables = _tables()
+    if "daily_sales_totals" in tables:
+        op.drop_table("daily_sales_totals")
+    if "daily_product_sales" in tables:
+        if "ix_daily_product_sales_product_day" in _indexes_for("daily_product_sales"):
+            op.drop_index("ix_daily_product_sales_product_day", table_name="daily_product_sales")
+        op.drop_table("daily_product_sales")
@@ -0,0 +1,59 @@
+"""phase30 document batch jobs
+
+Revision ID: 0031_phase30
+Revises: 0030_phase29
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0031_phase30"
+down_revision = "0030_phase29"
+branch_labels = None
+depends_on = None
+
+
+def _tables() -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return set(inspector.get_table_names())
+
+
+def upgrade() -> None:
+    if "document_batch_jobs" in _tables():
+        return
+    op.create_table(
+        "document_batch_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "created_by",
+            sa.Integer(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="pending"),
+        sa.Column("output_format", sa.String(length=10), nullable=False, server_default="zip"),
+        sa.Column("date_from", sa.Date(), nullable=True),
+        sa.Column("date_to", sa.Date(), nullable=True),
+        sa.Column("cash_session_id", sa.Integer(), sa.ForeignKey("cash_sessions.id"), nullable=True),
+        sa.Column("request_id", sa.String(length=64), nullable=True),
+        sa.Column("total_documents", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("processed_documents", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error_documents", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("file_path", sa.String(length=500), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_document_batch_jobs_created_by", "document_batch_jobs", ["created_by"])
+    op.create_index("ix_document_batch_jobs_status", "document_batch_jobs", ["status"])
+
+
+def downgrade() -> None:
+    if "document_batch_jobs" not in _tables():
+        return
+    op.drop_index("ix_document_batch_jobs_status", table_name="document_batch_jobs")
+    op.drop_index("ix_document_batch_jobs_created_by", table_name="document_batch_jobs")
+    op.drop_table("document_batch_jobs")
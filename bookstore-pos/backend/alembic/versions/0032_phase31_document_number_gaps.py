@@ -0,0 +1,51 @@
+"""phase31 document number gaps
+
+Revision ID: 0032_phase31
+Revises: 0031_phase30
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0032_phase31"
+down_revision = "0031_phase30"
+branch_labels = None
+depends_on = None
+
+
+def _tables() -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return set(inspector.get_table_names())
+
+
+def upgrade() -> None:
+    if "document_number_gaps" in _tables():
+        return
+    op.create_table(
+        "document_number_gaps",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "sequence_id",
+            sa.Integer(),
+            sa.ForeignKey("document_sequences.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("document_type", sa.String(length=20), nullable=False),
+        sa.Column("series", sa.String(length=20), nullable=False),
+        sa.Column("number", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(length=30), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_document_number_gaps_sequence_number",
+        "document_number_gaps",
+        ["sequence_id", "number"],
+    )
+
+
+def downgrade() -> None:
+    if "document_number_gaps" not in _tables():
+        return
+    op.drop_index("ix_document_number_gaps_sequence_number", table_name="document_number_gaps")
+    op.drop_table("document_number_gaps")
@@ -0,0 +1,80 @@
+"""phase32 kardex running balance and movement index
+
+Revision ID: 0033_phase32
+Revises: 0032_phase31
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0033_phase32"
+down_revision = "0032_phase31"
+branch_labels = None
+depends_on = None
+
+
+def _columns(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def _indexes_for(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {idx["name"] for idx in inspector.get_indexes(table_name) if idx.get("name")}
+
+
+def _backfill() -> None:
+    # Mismo cálculo que app.core.kardex.rebuild_movement_balances: el último
+    # movimiento de cada producto queda con products.stock y los anteriores con
+    # ese saldo menos los cambios posteriores.
+    conn = op.get_bind()
+    conn.execute(sa.text("CREATE TEMPORARY TABLE kardex_balances (id INTEGER PRIMARY KEY, balance_after INTEGER)"))
+    conn.execute(
+        sa.text(
+            """
+            INSERT INTO kardex_balances (id, balance_after)
+            SELECT m.id,
+                   COALESCE(p.stock, 0) - COALESCE(SUM(
+                       CASE m.type WHEN 'OUT' THEN -m.qty WHEN 'IN' THEN m.qty WHEN 'ADJ' THEN m.qty ELSE 0 END
+                   ) OVER (
+                       PARTITION BY m.product_id
+                       ORDER BY m.created_at DESC, m.id DESC
+                       ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                   ), 0)
+            FROM stock_movements m
+            LEFT JOIN products p ON p.id = m.product_id
+            """
+        )
+    )
+    conn.execute(
+        sa.text(
+            """
+            UPDATE stock_movements
+            SET balance_after = (
+                SELECT b.balance_after FROM kardex_balances b WHERE b.id = stock_movements.id
+            )
+            """
+        )
+    )
+    conn.execute(sa.text("DROP TABLE kardex_balances"))
+
+
+def upgrade() -> None:
+    if "balance_after" not in _columns("stock_movements"):
+        op.add_column("stock_movements", sa.Column("balance_after", sa.Integer(), nullable=True))
+        _backfill()
+    if "ix_stock_movements_product_created_id" not in _indexes_for("stock_movements"):
+        op.create_index(
+            "ix_stock_movements_product_created_id",
+            "stock_movements",
+            ["product_id", "created_at", "id"],
+        )
+
+
+def downgrade() -> None:
+    if "ix_stock_movements_product_created_id" in _indexes_for("stock_movements"):
+        op.drop_index("ix_stock_movements_product_created_id", table_name="stock_movements")
+    if "balance_after" in _columns("stock_movements"):
+        with op.batch_alter_table("stock_movements") as batch_op:
+            batch_op.drop_column("balance_after")
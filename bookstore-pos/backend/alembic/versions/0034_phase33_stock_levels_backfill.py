@@ -0,0 +1,97 @@
+"""phase33 stock levels backfill and unique product/warehouse index
+
+Revision ID: 0034_phase33
+Revises: 0033_phase32
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0034_phase33"
+down_revision = "0033_phase32"
+branch_labels = None
+depends_on = None
+
+
+def _indexes_for(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {idx["name"] for idx in inspector.get_indexes(table_name) if idx.get("name")}
+
+
+def _merge_duplicate_levels(conn) -> None:
+    # Una fila por producto/almacén: las duplicadas se suman en la de menor id.
+    conn.execute(
+        sa.text(
+            """
+            UPDATE stock_levels
+            SET qty = (
+                SELECT SUM(d.qty) FROM stock_levels d
+                WHERE d.product_id = stock_levels.product_id
+                  AND d.warehouse_id = stock_levels.warehouse_id
+            )
+            WHERE id IN (
+                SELECT MIN(id) FROM stock_levels
+                GROUP BY product_id, warehouse_id
+                HAVING COUNT(*) > 1
+            )
+            """
+        )
+    )
+    conn.execute(
+        sa.text(
+            """
+            DELETE FROM stock_levels
+            WHERE id NOT IN (
+                SELECT MIN(id) FROM stock_levels GROUP BY product_id, warehouse_id
+            )
+            """
+        )
+    )
+
+
+def _backfill_legacy_levels(conn) -> None:
+    # Productos con stock agregado en products.stock y sin ninguna fila en
+    # stock_levels: el stock pasa al almacén por defecto (antes se hacía en
+    # cada lectura desde get_stock_level / load_stock_snapshot).
+    warehouse_id = conn.execute(
+        sa.text(
+            "SELECT default_warehouse_id FROM system_settings "
+            "WHERE default_warehouse_id IS NOT NULL ORDER BY id LIMIT 1"
+        )
+    ).scalar()
+    if warehouse_id is None:
+        warehouse_id = conn.execute(sa.text("SELECT MIN(id) FROM warehouses")).scalar()
+    if warehouse_id is None:
+        return
+    conn.execute(
+        sa.text(
+            """
+            INSERT INTO stock_levels (product_id, warehouse_id, qty)
+            SELECT p.id, :warehouse_id, p.stock
+            FROM products p
+            WHERE p.stock > 0
+              AND NOT EXISTS (SELECT 1 FROM stock_levels l WHERE l.product_id = p.id)
+            """
+        ),
+        {"warehouse_id": warehouse_id},
+    )
+
+
+def upgrade() -> None:
+    if "uq_stock_levels_product_warehouse" in _indexes_for("stock_levels"):
+        return
+    conn = op.get_bind()
+    _merge_duplicate_levels(conn)
+    _backfill_legacy_levels(conn)
+    op.create_index(
+        "uq_stock_levels_product_warehouse",
+        "stock_levels",
+        ["product_id", "warehouse_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    if "uq_stock_levels_product_warehouse" in _indexes_for("stock_levels"):
+        op.drop_index("uq_stock_levels_product_warehouse", table_name="stock_levels")
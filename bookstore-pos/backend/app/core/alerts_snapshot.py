@@ -0,0 +1,151 @@
+"""
+Snapshot en memoria de las alertas operativas del tablero.
+
+Una tarea de fondo (iniciada en el lifespan) recalcula las alertas con los
+parámetros por defecto cada ALERTS_SNAPSHOT_REFRESH_SECONDS y, además, poco
+después de cada commit que toque productos, niveles de stock o lotes (ventas,
+devoluciones, movimientos, recepciones de compra); los cambios de stock hechos
+con UPDATE directos se registran con mark_alerts_changed. Las lecturas
+devuelven un prefijo de la lista ya calculada; si el snapshot supera
+ALERTS_SNAPSHOT_MAX_AGE_SECONDS, el endpoint vuelve a calcular en línea.
+
+Los demás workers se enteran de los cambios por el bus de invalidación.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from time import monotonic
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.models.product import Product
+from app.models.warehouse import StockBatch, StockLevel
+
+logger = logging.getLogger("bookstore")
+
+ALERTS_TOPIC = "operational_alerts"
+# Alertas guardadas: el máximo que acepta el endpoint (ver ReportsService._safe_limit).
+SNAPSHOT_LIMIT = 500
+# Espera tras un cambio para agrupar ráfagas de ventas en un solo recálculo.
+DEBOUNCE_SECONDS = 1.0
+_CHANGED_KEY = "alerts_snapshot_changed"
+_WATCHED_MODELS = (Product, StockLevel, StockBatch)
+
+AlertsLoader = Callable[[int], Awaitable[list[Any]]]
+
+
+class AlertsSnapshot:
+    def __init__(self) -> None:
+        self._alerts: list[Any] = []
+        self._generated_at: datetime | None = None
+        self._generated_monotonic = 0.0
+        self._changed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def generated_at(self) -> datetime | None:
+        return self._generated_at
+
+    @property
+    def has_pending_changes(self) -> bool:
+        return self._changed.is_set()
+
+    def get(self, limit: int) -> list[Any] | None:
+        """Primeras `limit` alertas del snapshot, o None si no hay uno vigente."""
+        if self._generated_at is None:
+            return None
+        max_age = float(settings.alerts_snapshot_max_age_seconds)
+        if max_age > 0 and monotonic() - self._generated_monotonic > max_age:
+            return None
+        return self._alerts[:limit]
+
+    def store(self, alerts: list[Any]) -> None:
+        self._alerts = list(alerts)
+        self._generated_at = datetime.now(timezone.utc)
+        self._generated_monotonic = monotonic()
+
+    def mark_changed(self) -> None:
+        self._changed.set()
+
+    def clear(self) -> None:
+        self._alerts = []
+        self._generated_at = None
+        self._changed = asyncio.Event()
+
+    async def refresh(self, loader: AlertsLoader) -> None:
+        self._changed.clear()
+        self.store(await loader(SNAPSHOT_LIMIT))
+
+    def start(self, loader: AlertsLoader) -> None:
+        if self._task is not None or settings.alerts_snapshot_refresh_seconds <= 0:
+            return
+        self._changed = asyncio.Event()
+        self._task = asyncio.create_task(self._run(loader))
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self, loader: AlertsLoader) -> None:
+        interval = float(settings.alerts_snapshot_refresh_seconds)
+        while True:
+            try:
+                await self.refresh(loader)
+            except Exception:
+                logger.exception("Operational alerts snapshot refresh failed")
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=interval)
+                await asyncio.sleep(DEBOUNCE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+alerts_snapshot = AlertsSnapshot()
+
+
+def mark_alerts_changed(db: AsyncSession) -> None:
+    """Registra un cambio hecho con UPDATE directo (fuera del flush del ORM)."""
+    db.sync_session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "before_flush")
+def _track_changes(session: Session, _flush_context, _instances) -> None:
+    if _CHANGED_KEY in session.info:
+        return
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, _WATCHED_MODELS):
+            session.info[_CHANGED_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_after_commit(session: Session) -> None:
+    if session.info.pop(_CHANGED_KEY, None) is None:
+        return
+    alerts_snapshot.mark_changed()
+    invalidation_bus.publish_nowait(ALERTS_TOPIC, {})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+
+
+def _on_remote_invalidation(_payload: dict[str, Any] | None) -> None:
+    alerts_snapshot.mark_changed()
+
+
+invalidation_bus.subscribe(ALERTS_TOPIC, _on_remote_invalidation)
@@ -0,0 +1,240 @@
+"""
+Caché en memoria del catálogo de productos para búsquedas del POS.
+
+Indexa los datos de catálogo por id, SKU, código de barras e ISBN. El stock no
+forma parte de la caché: cambia con cada venta y se lee siempre de la base.
+Las escrituras de catálogo marcan la sesión con mark_catalog_changed() y la
+invalidación ocurre al confirmar la transacción, incrementando la versión.
+"""
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, fields
+from typing import Any
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.metrics import (
+    catalog_cache_evictions_total,
+    catalog_cache_hits_total,
+    catalog_cache_misses_total,
+)
+from app.models.product import Product
+
+CATALOG_TOPIC = "catalog"
+# Mismo orden de prioridad que la búsqueda exacta de /products/lookup.
+CODE_FIELDS = ("barcode", "isbn", "sku")
+_PENDING_KEY = "catalog_cache_pending"
+_ALL = "*"
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Datos de catálogo de un producto (sin stock)."""
+
+    id: int
+    sku: str
+    name: str
+    author: str
+    publisher: str
+    isbn: str
+    barcode: str
+    shelf_location: str
+    category: str
+    tags: str
+    price: float
+    cost: float
+    sale_price: float
+    cost_total: float
+    cost_qty: int
+    direct_costs_breakdown: str
+    direct_costs_total: float
+    desired_margin: float
+    unit_cost: float
+    stock_min: int
+    tax_rate: float
+    tax_included: bool
+
+
+_ENTRY_FIELDS = tuple(item.name for item in fields(CatalogEntry))
+_ENTRY_COLUMNS = tuple(getattr(Product, name) for name in _ENTRY_FIELDS)
+
+
+def _entry_from_row(row: Any) -> CatalogEntry:
+    return CatalogEntry(**dict(zip(_ENTRY_FIELDS, row)))
+
+
+class CatalogCache:
+    def __init__(self, max_entries: int) -> None:
+        self._entries: OrderedDict[int, CatalogEntry] = OrderedDict()
+        self._codes: dict[tuple[str, str], int] = {}
+        self._max_entries = max(1, max_entries)
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, entry: CatalogEntry) -> None:
+        self._drop(entry.id)
+        self._entries[entry.id] = entry
+        for field_name in CODE_FIELDS:
+            value = getattr(entry, field_name)
+            if value:
+                self._codes[(field_name, value)] = entry.id
+        while len(self._entries) > self._max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._drop_codes(evicted)
+            catalog_cache_evictions_total.inc()
+
+    def _drop_codes(self, entry: CatalogEntry) -> None:
+        for field_name in CODE_FIELDS:
+            value = getattr(entry, field_name)
+            if value and self._codes.get((field_name, value)) == entry.id:
+                del self._codes[(field_name, value)]
+
+    def _drop(self, product_id: int) -> None:
+        entry = self._entries.pop(product_id, None)
+        if entry is not None:
+            self._drop_codes(entry)
+
+    def get(self, product_id: int) -> CatalogEntry | None:
+        entry = self._entries.get(product_id)
+        if entry is None:
+            catalog_cache_misses_total.labels("id").inc()
+            return None
+        self._entries.move_to_end(product_id)
+        catalog_cache_hits_total.labels("id").inc()
+        return entry
+
+    def get_by_code(self, code: str) -> CatalogEntry | None:
+        """Busca por SKU, código de barras o ISBN exactos."""
+        value = (code or "").strip()
+        if value:
+            for field_name in CODE_FIELDS:
+                product_id = self._codes.get((field_name, value))
+                if product_id is not None and product_id in self._entries:
+                    self._entries.move_to_end(product_id)
+                    catalog_cache_hits_total.labels("code").inc()
+                    return self._entries[product_id]
+        catalog_cache_misses_total.labels("code").inc()
+        return None
+
+    def put(self, entry: CatalogEntry, *, version: int) -> None:
+        """Guarda una entrada leída cuando la caché estaba en ``version``.
+
+        Si hubo una invalidación mientras se leía de la base, la lectura puede
+        ser anterior al commit y se descarta.
+        """
+        if version == self._version:
+            self._store(entry)
+
+    async def get_many(
+        self, db: AsyncSession, product_ids: Iterable[int]
+    ) -> dict[int, CatalogEntry]:
+        """Resuelve varios productos; los faltantes se cargan en una sola consulta."""
+        found: dict[int, CatalogEntry] = {}
+        missing: set[int] = set(product_ids)
+        if not settings.catalog_cache_enabled:
+            result = await db.execute(
+                select(*_ENTRY_COLUMNS).where(Product.id.in_(missing))
+            )
+            return {row.id: _entry_from_row(row) for row in result.all()}
+        for product_id in list(missing):
+            entry = self.get(product_id)
+            if entry is not None:
+                found[product_id] = entry
+                missing.discard(product_id)
+        if missing:
+            version = self._version
+            result = await db.execute(
+                select(*_ENTRY_COLUMNS).where(Product.id.in_(missing))
+            )
+            for row in result.all():
+                entry = _entry_from_row(row)
+                found[entry.id] = entry
+                self.put(entry, version=version)
+        return found
+
+    async def warm(self, db: AsyncSession) -> int:
+        """Carga el catálogo (hasta el tamaño máximo) al iniciar la API."""
+        self.clear()
+        version = self._version
+        result = await db.execute(
+            select(*_ENTRY_COLUMNS)
+            .order_by(Product.id.desc())
+            .limit(self._max_entries)
+        )
+        for row in reversed(result.all()):
+            self.put(_entry_from_row(row), version=version)
+        return len(self._entries)
+
+    def invalidate(self, product_ids: Iterable[int] | None = None) -> None:
+        """Descarta entradas e incrementa la versión. None descarta todo."""
+        self._version += 1
+        if product_ids is None:
+            self._entries.clear()
+            self._codes.clear()
+            return
+        for product_id in product_ids:
+            self._drop(int(product_id))
+
+    def clear(self) -> None:
+        self.invalidate(None)
+
+
+catalog_cache = CatalogCache(settings.catalog_cache_max_entries)
+
+
+def mark_catalog_changed(
+    db: AsyncSession, product_ids: Iterable[int] | None = None
+) -> None:
+    """Registra productos modificados; la caché se invalida al hacer commit.
+
+    Args:
+        db: Sesión donde se realiza la escritura.
+        product_ids: Productos afectados, o None si cambió todo el catálogo.
+    """
+    info = db.sync_session.info
+    pending = info.get(_PENDING_KEY)
+    if pending == _ALL:
+        return
+    if product_ids is None:
+        info[_PENDING_KEY] = _ALL
+        return
+    if pending is None:
+        pending = info[_PENDING_KEY] = set()
+    pending.update(int(product_id) for product_id in product_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending is None:
+        return
+    if pending == _ALL:
+        catalog_cache.invalidate(None)
+        invalidation_bus.publish_nowait(CATALOG_TOPIC, {"product_ids": None})
+        return
+    catalog_cache.invalidate(pending)
+    invalidation_bus.publish_nowait(CATALOG_TOPIC, {"product_ids": sorted(pending)})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _on_remote_invalidation(payload: dict[str, Any] | None) -> None:
+    product_ids = payload.get("product_ids") if payload else None
+    catalog_cache.invalidate(product_ids)
+
+
+invalidation_bus.subscribe(CATALOG_TOPIC, _on_remote_invalidation)
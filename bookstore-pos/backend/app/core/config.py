@@ -4,6 +4,7 @@ Carga variables de entorno y define settings de la app.
 """
 
 from pathlib import Path
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict, field_validator
@@ -97,11 +98,98 @@ class Settings(BaseSettings):
     account_lock_threshold: int = 5
     # ACCOUNT_LOCK_MINUTES: Minutos de bloqueo tras intentos fallidos
     account_lock_minutes: int = 15
+    # READ_DATABASE_URL: Réplica de solo lectura para reportes y listados (PostgreSQL).
+    # Vacío = misma base con un pool propio; en SQLite las conexiones usan query_only.
+    read_database_url: str = ""
+    # DB_READ_POOL_SIZE: Conexiones persistentes del pool de lectura
+    db_read_pool_size: int = 5
+    # DB_POOL_SIZE: Conexiones persistentes del pool de base de datos
+    db_pool_size: int = 5
+    # DB_MAX_OVERFLOW: Conexiones adicionales permitidas sobre DB_POOL_SIZE en picos
+    db_max_overflow: int = 10
+    # DB_POOL_TIMEOUT_SECONDS: Espera máxima por una conexión libre del pool
+    db_pool_timeout_seconds: int = 30
+    # SQLITE_JOURNAL_MODE: Modo de journal (WAL permite lecturas concurrentes a una escritura)
+    sqlite_journal_mode: str = "WAL"
+    # SQLITE_SYNCHRONOUS: Nivel de sincronización a disco (NORMAL es seguro con WAL)
+    sqlite_synchronous: str = "NORMAL"
+    # SQLITE_BUSY_TIMEOUT_MS: Espera ante bloqueos antes de fallar con "database is locked"
+    sqlite_busy_timeout_ms: int = 5000
+    # SQLITE_CACHE_SIZE_KB: Caché de páginas por conexión en KiB
+    sqlite_cache_size_kb: int = 65536
+    # SQLITE_MMAP_SIZE_MB: Tamaño de lectura vía mmap en MiB (0 = desactivado)
+    sqlite_mmap_size_mb: int = 256
+    # SQLITE_TEMP_STORE: Ubicación de tablas temporales (DEFAULT, FILE, MEMORY)
+    sqlite_temp_store: str = "MEMORY"
+    # CATALOG_CACHE_ENABLED: Si true, las ventas resuelven productos desde la caché de catálogo
+    catalog_cache_enabled: bool = True
+    # CATALOG_CACHE_MAX_ENTRIES: Máximo de productos en la caché de catálogo por worker
+    catalog_cache_max_entries: int = 50000
+    # PRINCIPAL_CACHE_TTL_SECONDS: Segundos que se reutiliza usuario+sesión por token (0 = desactivado)
+    principal_cache_ttl_seconds: int = 30
+    # PRINCIPAL_CACHE_MAX_ENTRIES: Máximo de tokens en la caché de principales por worker
+    principal_cache_max_entries: int = 10000
+    # PERMISSIONS_MAX_AGE_SECONDS: Segundos antes de releer role_permissions sin aviso de cambio (0 = solo avisos)
+    permissions_max_age_seconds: int = 60
+    # SETTINGS_SNAPSHOT_MAX_AGE_SECONDS: Segundos antes de releer system_settings sin aviso de cambio (0 = solo avisos)
+    settings_snapshot_max_age_seconds: int = 60
+    # RECEIPT_CACHE_MAX_BYTES: Bytes máximos de documentos renderizados en memoria por worker (0 = desactivado)
+    receipt_cache_max_bytes: int = 32 * 1024 * 1024
+    # RECEIPT_CACHE_DIR: Directorio de la caché en disco de documentos renderizados (vacío = solo memoria)
+    receipt_cache_dir: str = ""
+    # RENDER_POOL_WORKERS: Procesos para generar PDFs fuera del event loop (0 = un hilo)
+    render_pool_workers: int = 2
+    # RENDER_POOL_MAX_PENDING: PDFs en curso o en cola por worker antes de responder 503
+    render_pool_max_pending: int = 16
+    # RENDER_TIMEOUT_SECONDS: Tiempo máximo de generación de un PDF antes de responder 504
+    render_timeout_seconds: float = 30.0
+    # DOCUMENT_BATCH_DIR: Carpeta de PDFs/ZIP de impresión masiva (vacío = temporal del sistema)
+    document_batch_dir: str = ""
+    # DOCUMENT_BATCH_MAX_DOCUMENTS: Máximo de documentos por job de impresión masiva
+    document_batch_max_documents: int = 5000
+    # DOCUMENT_NUMBER_BLOCK_SIZE: Números de documento reservados por bloque y worker (0 = uno a uno en la venta, sin huecos)
+    document_number_block_size: int = 0
+    # ALERTS_SNAPSHOT_REFRESH_SECONDS: Intervalo de recálculo de las alertas operativas en segundo plano (0 = sin snapshot)
+    alerts_snapshot_refresh_seconds: float = 60.0
+    # ALERTS_SNAPSHOT_MAX_AGE_SECONDS: Antigüedad máxima del snapshot de alertas antes de calcularlas en línea
+    alerts_snapshot_max_age_seconds: float = 180.0
+    # BUSINESS_TIMEZONE: Zona horaria del negocio para filtros y agregados por día (ej: America/Lima)
+    business_timezone: str = "UTC"
 
     model_config = ConfigDict(
         env_file=ENV_FILES, env_file_encoding="utf-8", extra="ignore"
     )
 
+    @field_validator("sqlite_journal_mode", "sqlite_synchronous", "sqlite_temp_store")
+    @classmethod
+    def validate_sqlite_pragma(cls, v: str, info) -> str:
+        allowed = {
+            "sqlite_journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+            "sqlite_synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+            "sqlite_temp_store": {"DEFAULT", "FILE", "MEMORY"},
+        }[info.field_name]
+        value = (v or "").strip().upper()
+        if value not in allowed:
+            raise ValueError(
+                f"{info.field_name.upper()} inválido: {v!r}. Valores permitidos: {', '.join(sorted(allowed))}"
+            )
+        return value
+
+    @field_validator("business_timezone")
+    @classmethod
+    def validate_business_timezone(cls, v: str) -> str:
+        value = (v or "").strip() or "UTC"
+        if value.upper() == "UTC":
+            return "UTC"
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError) as exc:
+            raise ValueError(
+                f"BUSINESS_TIMEZONE inválida: {v!r}. Use un nombre IANA (ej: America/Lima); "
+                "en Windows requiere el paquete tzdata."
+            ) from exc
+        return value
+
     @field_validator("jwt_secret")
     @classmethod
     def validate_jwt_secret(cls, v: str) -> str:
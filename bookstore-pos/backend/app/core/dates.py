@@ -0,0 +1,91 @@
+"""
+Rangos de fechas por día comercial.
+
+Las fechas de filtro (YYYY-MM-DD) se interpretan en la zona horaria del
+negocio (BUSINESS_TIMEZONE) y se convierten a límites UTC semiabiertos
+(created_at >= inicio AND created_at < fin). A diferencia de
+func.date(created_at), la comparación directa contra la columna permite a la
+base usar el índice de created_at.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException
+from sqlalchemy import and_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=8)
+def _zone(name: str) -> tzinfo:
+    # "UTC" no depende de la base tz del sistema (en Windows requiere tzdata).
+    if name.upper() == "UTC":
+        return timezone.utc
+    return ZoneInfo(name)
+
+
+def business_timezone() -> tzinfo:
+    """Zona horaria configurada para los días comerciales."""
+    return _zone(settings.business_timezone)
+
+
+def business_day(moment: datetime | None = None) -> date:
+    """Día comercial de un instante (naive = UTC, como se guarda en SQLite)."""
+    if moment is None:
+        moment = datetime.now(timezone.utc)
+    elif moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(business_timezone()).date()
+
+
+def business_today() -> date:
+    """Día comercial actual."""
+    return business_day()
+
+
+def parse_day(value: str, field_name: str = "fecha") -> date:
+    """Convierte YYYY-MM-DD en date o responde 400."""
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Filtro '{field_name}' invalido. Formato esperado YYYY-MM-DD",
+        ) from exc
+
+
+def day_start_utc(day: date) -> datetime:
+    """Inicio del día comercial expresado en UTC."""
+    return datetime.combine(day, time.min, tzinfo=business_timezone()).astimezone(timezone.utc)
+
+
+def business_day_bounds(
+    from_day: date | None, to_day: date | None
+) -> tuple[datetime | None, datetime | None]:
+    """Límites UTC [inicio, fin) para un rango de días comerciales inclusivo."""
+    start = day_start_utc(from_day) if from_day is not None else None
+    end = day_start_utc(to_day + timedelta(days=1)) if to_day is not None else None
+    return start, end
+
+
+def day_range_filter(
+    column, from_day: date | None, to_day: date | None
+) -> ColumnElement[bool] | None:
+    """Filtro sargable column >= inicio AND column < fin (None si no hay límites)."""
+    start, end = business_day_bounds(from_day, to_day)
+    clauses = []
+    if start is not None:
+        clauses.append(column >= start)
+    if end is not None:
+        clauses.append(column < end)
+    if not clauses:
+        return None
+    return and_(*clauses)
+
+
+def business_day_filter(column, day: date) -> ColumnElement[bool]:
+    """Filtro sargable de un único día comercial (nunca None)."""
+    return and_(column >= day_start_utc(day), column < day_start_utc(day + timedelta(days=1)))
@@ -3,25 +3,28 @@ Dependencias FastAPI para autenticación y autorización.
 
 Proporciona:
 - get_db: Proveedor de sesión de base de datos
-- get_current_user: Extrae usuario del token JWT
+- get_read_db: Proveedor de sesión de solo lectura (reportes y listados)
+- get_current_user: Extrae usuario del token JWT (con caché de principales)
 - require_role: Verifica rol de usuario
 - require_permission: Verifica permisos específicos
 """
 
-from collections.abc import AsyncGenerator, Callable
+from collections.abc import AsyncGenerator, Callable, MutableMapping
 from datetime import datetime, timezone
+from time import monotonic
+from typing import Any
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import decode_token
+from app.core.security import decode_request_token
 from app.core.config import settings
-from app.db.session import AsyncSessionLocal
+from app.core.permission_registry import permission_registry
+from app.core.principal_cache import Principal, detached_user_copy, principal_cache
+from app.db.session import AsyncSessionLocal, ReadSessionLocal
 from app.models.user import User
-from app.models.permission import RolePermission
 from app.models.session import UserSession
-from app.seed import default_permissions_for
 
 # Esquema de seguridad HTTP Bearer
 security = HTTPBearer(auto_error=False)
@@ -40,19 +43,25 @@ def _normalize_role(role: str | None) -> str:
     return (role or "").strip().lower()
 
 
-async def _resolve_user_from_token(db: AsyncSession, token: str) -> User | None:
+async def _resolve_principal(
+    db: AsyncSession, token: str, scope: MutableMapping[str, Any]
+) -> Principal | None:
     """
-    Resuelve el usuario a partir de un token JWT válido.
+    Resuelve el principal (usuario y sesión) de un token JWT válido.
+
+    Usa la caché de principales por jti; en un fallo consulta usuario y
+    sesión y guarda el resultado.
 
     Args:
         db: Sesión de base de datos.
         token: Token JWT de acceso.
+        scope: Scope ASGI del request; reutiliza el token decodificado por el middleware.
 
     Returns:
-        Usuario si el token es válido y la sesión no ha expirado, None en caso contrario.
+        Principal si el token es válido y la sesión no ha expirado, None en caso contrario.
     """
     try:
-        payload = decode_token(token)
+        payload = decode_request_token(scope, token)
         username = payload.get("sub")
         jti = payload.get("jti")
         token_type = payload.get("typ")
@@ -64,6 +73,13 @@ async def _resolve_user_from_token(db: AsyncSession, token: str) -> User | None:
     if token_type and token_type != "access":
         return None
 
+    use_cache = settings.principal_cache_ttl_seconds > 0
+    if use_cache:
+        cached = principal_cache.get(jti)
+        if cached is not None and cached.username == username:
+            return cached
+    version = principal_cache.version
+
     result = await db.execute(select(User).where(User.username == username))
     user = result.scalar_one_or_none()
     if not user or not user.is_active:
@@ -81,7 +97,21 @@ async def _resolve_user_from_token(db: AsyncSession, token: str) -> User | None:
         return None
     if session.user_id != user.id:
         return None
-    return user
+
+    principal = Principal(
+        jti=jti,
+        family_id=session.family_id,
+        user_id=user.id,
+        username=user.username,
+        role=_normalize_role(user.role),
+        is_active=bool(user.is_active),
+        session_expires_at=expires_at,
+        cached_until=monotonic() + settings.principal_cache_ttl_seconds,
+        user=detached_user_copy(user),
+    )
+    if use_cache:
+        principal_cache.put(principal, version=version)
+    return principal
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -95,6 +125,20 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Proveedor de sesión de solo lectura.
+
+    Usa un pool separado (o la réplica de READ_DATABASE_URL) para que las
+    consultas pesadas no bloqueen el flujo de ventas. Las escrituras fallan.
+
+    Yields:
+        Sesión de base de datos de solo lectura.
+    """
+    async with ReadSessionLocal() as session:
+        yield session
+
+
 async def get_current_user(
     request: Request,
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
@@ -131,9 +175,10 @@ async def get_current_user(
         )
 
     for token in token_candidates:
-        user = await _resolve_user_from_token(db, token)
-        if user is not None:
-            return user
+        principal = await _resolve_principal(db, token, request.scope)
+        if principal is not None:
+            request.state.principal = principal
+            return await db.merge(principal.user, load=False)
 
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED, detail="Token invalido"
@@ -187,29 +232,14 @@ def require_permission(*permissions: str) -> Callable:
         if normalized_role == "admin":
             return current_user
 
-        result = await db.execute(
-            select(RolePermission.permission).where(
-                func.lower(func.trim(RolePermission.role)) == normalized_role
-            )
-        )
-        allowed = {str(row[0]).strip() for row in result.all() if row[0]}
+        # Solo consulta la base si la matriz no se cargó o otro worker la cambió.
+        if permission_registry.needs_refresh:
+            await permission_registry.refresh(db)
 
-        if not allowed and normalized_role in {"cashier", "stock"}:
-            allowed = set(default_permissions_for(normalized_role))
-
-        if not allowed:
+        if not permission_registry.has_permissions(normalized_role, required_permissions):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Sin permisos"
             )
-
-        if "*" in allowed:
-            return current_user
-
-        for perm in required_permissions:
-            if perm not in allowed:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN, detail="Sin permisos"
-                )
         return current_user
 
     return _checker
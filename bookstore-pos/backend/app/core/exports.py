@@ -0,0 +1,107 @@
+"""
+Exportaciones de reportes en streaming (CSV / XLSX).
+
+Los servicios entregan las filas como generadores asíncronos (la primera fila
+es el encabezado) y aquí se escriben por bloques en una StreamingResponse. La
+consulta usa una sesión de lectura propia abierta dentro del generador: las
+dependencias con yield de FastAPI cierran su sesión antes de que termine de
+enviarse el cuerpo.
+
+El XLSX usa el modo write-only de openpyxl, que vuelca cada fila a un archivo
+temporal en lugar de mantener la hoja en memoria.
+"""
+
+import csv
+import tempfile
+from collections.abc import AsyncIterator, Callable, Sequence
+from io import StringIO
+from typing import Any
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+import app.db.session as db_session
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "xlsx": XLSX_MEDIA_TYPE}
+# Filas acumuladas antes de enviar un bloque CSV.
+CSV_FLUSH_ROWS = 500
+# Tamaño de bloque al enviar el XLSX y umbral del archivo temporal en memoria.
+XLSX_CHUNK_BYTES = 64 * 1024
+XLSX_SPOOL_MAX_BYTES = 256 * 1024
+
+ExportRows = AsyncIterator[Sequence[Any]]
+
+
+def parse_export_format(value: str | None) -> str:
+    """Normaliza el formato pedido (csv por defecto) o responde 400."""
+    export_format = (value or "csv").strip().lower()
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Formato invalido. Use csv o xlsx")
+    if export_format == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail="Instale openpyxl para XLSX") from exc
+    return export_format
+
+
+async def iter_csv(rows: ExportRows) -> AsyncIterator[bytes]:
+    """Escribe las filas como CSV UTF-8 en bloques de CSV_FLUSH_ROWS."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    pending = 0
+    async for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= CSV_FLUSH_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    if pending:
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def iter_xlsx(rows: ExportRows, sheet_title: str = "Reporte") -> AsyncIterator[bytes]:
+    """Escribe las filas en un libro write-only y lo envía por bloques."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title=sheet_title[:31])
+    async for row in rows:
+        worksheet.append(list(row))
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES) as spool:
+        await run_in_threadpool(workbook.save, spool)
+        spool.seek(0)
+        while chunk := spool.read(XLSX_CHUNK_BYTES):
+            yield chunk
+
+
+def streaming_export(
+    rows_factory: Callable[[AsyncSession], ExportRows],
+    *,
+    filename: str,
+    export_format: str | None = "csv",
+) -> StreamingResponse:
+    """Respuesta en streaming para un reporte.
+
+    rows_factory recibe la sesión de lectura abierta para la exportación. Las
+    validaciones que deban responder 400 tienen que ejecutarse antes de
+    llamar a esta función: una vez iniciado el cuerpo ya no hay status.
+    """
+    safe_format = parse_export_format(export_format)
+
+    async def _rows() -> ExportRows:
+        async with db_session.ReadSessionLocal() as session:
+            async for row in rows_factory(session):
+                yield row
+
+    body = iter_xlsx(_rows(), filename) if safe_format == "xlsx" else iter_csv(_rows())
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[safe_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}.{safe_format}"},
+    )
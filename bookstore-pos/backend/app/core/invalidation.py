@@ -0,0 +1,124 @@
+"""
+Bus de invalidación de cachés en memoria entre workers.
+Publica y recibe eventos por Redis pub/sub cuando REDIS_URL está configurado.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable
+from uuid import uuid4
+
+from app.core.config import settings
+
+try:
+    from redis.asyncio import Redis
+except Exception:  # pragma: no cover
+    Redis = None  # type: ignore[misc,assignment]
+
+logger = logging.getLogger("bookstore")
+
+INVALIDATION_CHANNEL = "bookstore:invalidate"
+RECONNECT_DELAY_SECONDS = 2.0
+
+# Un handler recibe el payload publicado, o None cuando el worker pudo
+# haber perdido mensajes (reconexión) y debe descartar todo su estado.
+InvalidationHandler = Callable[[dict[str, Any] | None], None]
+
+
+class InvalidationBus:
+    def __init__(self) -> None:
+        self._handlers: dict[str, list[InvalidationHandler]] = {}
+        self._origin = uuid4().hex
+        self._redis: Redis | None = None
+        self._listener: asyncio.Task | None = None
+        self._publishing: set[asyncio.Task] = set()
+
+    def subscribe(self, topic: str, handler: InvalidationHandler) -> None:
+        """Registra un handler local para los eventos de un tópico."""
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def _dispatch(self, topic: str | None, payload: dict[str, Any] | None) -> None:
+        topics = [topic] if topic is not None else list(self._handlers)
+        for name in topics:
+            for handler in self._handlers.get(name, []):
+                try:
+                    handler(payload)
+                except Exception:
+                    logger.exception("Invalidation handler failed topic=%s", name)
+
+    async def publish(self, topic: str, payload: dict[str, Any]) -> None:
+        """Envía un evento a los demás workers. No reenvía al worker local."""
+        if self._redis is None:
+            return
+        message = json.dumps(
+            {"origin": self._origin, "topic": topic, "payload": payload}
+        )
+        try:
+            await self._redis.publish(INVALIDATION_CHANNEL, message)
+        except Exception:
+            logger.warning("Invalidation publish failed topic=%s", topic)
+
+    def publish_nowait(self, topic: str, payload: dict[str, Any]) -> None:
+        """Programa publish() desde código síncrono (p. ej. eventos de sesión)."""
+        if self._redis is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.publish(topic, payload))
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+
+    async def start(self) -> None:
+        if self._listener is not None or not settings.redis_url or Redis is None:
+            return
+        self._redis = Redis.from_url(settings.redis_url, decode_responses=True)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        assert self._redis is not None
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Mensajes perdidos mientras no había suscripción: invalidar todo.
+                self._dispatch(None, None)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        data = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        continue
+                    if data.get("origin") == self._origin:
+                        continue
+                    self._dispatch(str(data.get("topic") or ""), data.get("payload") or {})
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Invalidation listener disconnected, retrying")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._listener = None
+        if self._publishing:
+            await asyncio.gather(*self._publishing, return_exceptions=True)
+        if self._redis is not None:
+            await self._redis.aclose()
+        self._redis = None
+
+
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,152 @@
+"""
+Saldo corrido del kardex.
+
+Cada movimiento guarda en balance_after el stock total del producto después
+de aplicarlo. Quien registra el movimiento lo toma del total que devuelve
+apply_stock_delta (o de los totales del snapshot en apply_stock_deltas), de
+modo que el kardex de cualquier ventana se arma con el índice
+(product_id, created_at, id): saldo inicial = balance_after del último
+movimiento anterior a la ventana, saldo final = el del último dentro de ella.
+
+rebuild_movement_balances recalcula los saldos hacia atrás desde
+products.stock (scripts/rebuild_kardex_balances.py).
+"""
+
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.inventory import StockMovement
+from app.models.product import Product
+
+# Productos por lote al reconstruir saldos.
+REBUILD_BATCH_SIZE = 1000
+
+
+def movement_delta(movement_type: str, qty: int) -> int:
+    """Cambio de stock de un movimiento: IN suma, OUT resta, ADJ ya viene con signo."""
+    qty = int(qty or 0)
+    if movement_type == "OUT":
+        return -qty
+    if movement_type in {"IN", "ADJ"}:
+        return qty
+    return 0
+
+
+def stamp_balances(movements: list[dict], closing: dict[int, int]) -> list[dict]:
+    """Completa balance_after en movimientos ya aplicados, en orden de inserción.
+
+    Args:
+        movements: Filas para insert(StockMovement) con product_id, type y qty.
+        closing: Stock total de cada producto después de todos los movimientos.
+    """
+    balances = dict(closing)
+    for movement in reversed(movements):
+        product_id = movement["product_id"]
+        balance = balances.get(product_id, 0)
+        movement["balance_after"] = balance
+        balances[product_id] = balance - movement_delta(movement["type"], movement["qty"])
+    return movements
+
+
+async def rebuild_movement_balances(
+    db: AsyncSession, product_ids: Iterable[int] | None = None
+) -> int:
+    """Recalcula balance_after de los movimientos a partir del stock actual.
+
+    Recorre cada producto del movimiento más reciente al más antiguo: el último
+    queda con products.stock y cada anterior con el saldo menos el cambio del
+    siguiente. No hace commit. Devuelve la cantidad de movimientos actualizados.
+    """
+    stock_stmt = select(Product.id, Product.stock).order_by(Product.id)
+    if product_ids is not None:
+        stock_stmt = stock_stmt.where(Product.id.in_(list(product_ids)))
+    stock_by_product = {
+        product_id: int(stock or 0) for product_id, stock in (await db.execute(stock_stmt)).all()
+    }
+
+    updated = 0
+    ids = list(stock_by_product)
+    for offset in range(0, len(ids), REBUILD_BATCH_SIZE):
+        chunk = ids[offset : offset + REBUILD_BATCH_SIZE]
+        # Recorrido inverso completo del índice (product_id, created_at, id).
+        movements = await db.execute(
+            select(
+                StockMovement.id,
+                StockMovement.product_id,
+                StockMovement.type,
+                StockMovement.qty,
+                StockMovement.balance_after,
+            )
+            .where(StockMovement.product_id.in_(chunk))
+            .order_by(
+                StockMovement.product_id.desc(),
+                StockMovement.created_at.desc(),
+                StockMovement.id.desc(),
+            )
+        )
+        balances = {product_id: stock_by_product[product_id] for product_id in chunk}
+        pending: list[dict] = []
+        for movement_id, product_id, movement_type, qty, current in movements.all():
+            balance = balances[product_id]
+            if current != balance:
+                pending.append({"id": movement_id, "balance_after": balance})
+            balances[product_id] = balance - movement_delta(movement_type, qty)
+        if pending:
+            await db.execute(update(StockMovement), pending)
+            updated += len(pending)
+    return updated
+
+
+async def _edge_movement(
+    db: AsyncSession,
+    product_id: int,
+    *,
+    before: datetime | None = None,
+    since: datetime | None = None,
+    first: bool = False,
+):
+    """Último movimiento antes de `before`, o el primero desde `since` si first=True."""
+    stmt = select(
+        StockMovement.id, StockMovement.type, StockMovement.qty, StockMovement.balance_after
+    ).where(StockMovement.product_id == product_id)
+    if before is not None:
+        stmt = stmt.where(StockMovement.created_at < before)
+    if since is not None:
+        stmt = stmt.where(StockMovement.created_at >= since)
+    if first:
+        stmt = stmt.order_by(StockMovement.created_at.asc(), StockMovement.id.asc())
+    else:
+        stmt = stmt.order_by(StockMovement.created_at.desc(), StockMovement.id.desc())
+    return (await db.execute(stmt.limit(1))).first()
+
+
+async def window_balances(
+    db: AsyncSession, product_id: int, start: datetime | None, end: datetime | None
+) -> tuple[int | None, int | None]:
+    """Saldo inicial y final del producto en la ventana [start, end).
+
+    Son búsquedas puntuales sobre el índice (product_id, created_at, id).
+    None si los movimientos aún no tienen saldo (ver rebuild_movement_balances).
+    """
+    previous = await _edge_movement(db, product_id, before=start) if start is not None else None
+    if previous is not None:
+        opening = previous.balance_after
+    else:
+        first = await _edge_movement(db, product_id, since=start, first=True)
+        if first is None:
+            stock = await db.execute(select(Product.stock).where(Product.id == product_id))
+            return (int(stock.scalar_one_or_none() or 0),) * 2
+        opening = (
+            None
+            if first.balance_after is None
+            else first.balance_after - movement_delta(first.type, first.qty)
+        )
+
+    last = await _edge_movement(db, product_id, before=end)
+    if last is None or (previous is not None and last.id == previous.id):
+        # Sin movimientos dentro de la ventana.
+        return opening, opening
+    return opening, last.balance_after
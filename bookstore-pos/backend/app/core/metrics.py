@@ -44,6 +44,13 @@ rate_limit_blocked_total = Counter(
     ["scope"],
 )
 
+rate_limit_check_duration_seconds = Histogram(
+    "bookstore_rate_limit_check_duration_seconds",
+    "Rate limiter check latency in seconds grouped by backend",
+    ["backend"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
 inventory_import_jobs_total = Counter(
     "bookstore_inventory_import_jobs_total",
     "Total inventory import jobs by final status",
@@ -62,6 +69,70 @@ inventory_import_job_duration_seconds = Histogram(
     buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0),
 )
 
+document_batch_jobs_total = Counter(
+    "bookstore_document_batch_jobs_total",
+    "Total document batch jobs by final status",
+    ["status"],
+)
+
+document_batch_job_duration_seconds = Histogram(
+    "bookstore_document_batch_job_duration_seconds",
+    "Document batch job processing duration in seconds",
+    buckets=(0.5, 1.0, 2.5, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 900.0),
+)
+
+catalog_cache_hits_total = Counter(
+    "bookstore_catalog_cache_hits_total",
+    "Catalog cache hits grouped by lookup type",
+    ["lookup"],
+)
+
+catalog_cache_misses_total = Counter(
+    "bookstore_catalog_cache_misses_total",
+    "Catalog cache misses grouped by lookup type",
+    ["lookup"],
+)
+
+catalog_cache_evictions_total = Counter(
+    "bookstore_catalog_cache_evictions_total",
+    "Catalog cache entries evicted by size limit",
+)
+
+principal_cache_hits_total = Counter(
+    "bookstore_principal_cache_hits_total",
+    "Authenticated requests resolved from the principal cache",
+)
+
+principal_cache_misses_total = Counter(
+    "bookstore_principal_cache_misses_total",
+    "Authenticated requests that loaded user and session from the database",
+)
+
+
+render_cache_hits_total = Counter(
+    "bookstore_render_cache_hits_total",
+    "Rendered document cache hits grouped by tier",
+    ["tier"],
+)
+
+render_cache_misses_total = Counter(
+    "bookstore_render_cache_misses_total",
+    "Rendered documents that had to be rendered again",
+)
+
+
+pdf_render_duration_seconds = Histogram(
+    "bookstore_pdf_render_duration_seconds",
+    "PDF render time in the render pool, including queue wait",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+pdf_render_rejected_total = Counter(
+    "bookstore_pdf_render_rejected_total",
+    "PDF renders rejected by the render pool grouped by reason",
+    ["reason"],
+)
+
 
 def render_metrics() -> bytes:
     """Genera el texto de métricas para Prometheus."""
@@ -77,8 +148,20 @@ __all__ = [
     "purchases_total",
     "purchases_amount_total",
     "rate_limit_blocked_total",
+    "rate_limit_check_duration_seconds",
     "inventory_import_jobs_total",
     "inventory_import_rows_total",
     "inventory_import_job_duration_seconds",
+    "document_batch_jobs_total",
+    "document_batch_job_duration_seconds",
+    "catalog_cache_hits_total",
+    "catalog_cache_misses_total",
+    "catalog_cache_evictions_total",
+    "principal_cache_hits_total",
+    "principal_cache_misses_total",
+    "render_cache_hits_total",
+    "render_cache_misses_total",
+    "pdf_render_duration_seconds",
+    "pdf_render_rejected_total",
     "render_metrics",
 ]
@@ -0,0 +1,194 @@
+"""
+Middleware HTTP de la API como un único pipeline ASGI puro.
+
+Sustituye la cadena de BaseHTTPMiddleware (contexto del request, cabeceras de
+seguridad, rate limit, health guard y CSRF). Cada capa de esa cadena abría
+una tarea propia y copiaba el stream de la respuesta; aquí las etapas se
+ejecutan en orden dentro de una sola llamada:
+
+1. Contexto: request id, métricas y log de acceso.
+2. Cabeceras de seguridad: bloque precalculado al construir el middleware.
+3. Rate limit global, con el JWT decodificado una vez por request
+   (decode_request_token lo comparte con get_current_user vía scope["state"]).
+4. Health guard para /health* y /metrics en producción.
+5. CSRF para métodos con efecto cuando la sesión viaja en cookies.
+
+Las respuestas de rechazo (429, 404, 403) pasan igualmente por las etapas 1 y
+2, como ocurría con la cadena anterior.
+"""
+
+import logging
+from time import perf_counter
+from uuid import uuid4
+
+from starlette.requests import HTTPConnection
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_total,
+    rate_limit_blocked_total,
+)
+from app.core.rate_limit import rate_limiter
+from app.core.security import decode_request_token
+from app.core.security_validation import build_csp
+
+logger = logging.getLogger("bookstore")
+
+HEALTH_PATHS = frozenset({"/health", "/healthz", "/health/ready"})
+LOCAL_HOSTS = frozenset({"127.0.0.1", "::1", "localhost"})
+CSRF_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+def _is_production() -> bool:
+    return settings.environment.lower() in {"prod", "production"}
+
+
+def security_header_block() -> list[tuple[bytes, bytes]]:
+    """
+    Cabeceras de seguridad ya codificadas para ASGI.
+
+    Returns:
+        Lista de pares (nombre, valor) en bytes, con nombres en minúsculas.
+    """
+    headers = [
+        ("X-Content-Type-Options", "nosniff"),
+        ("X-Frame-Options", "DENY"),
+        ("Referrer-Policy", "same-origin"),
+        ("Permissions-Policy", "geolocation=(), microphone=(), camera=()"),
+        ("Cross-Origin-Opener-Policy", "same-origin"),
+        ("Cross-Origin-Resource-Policy", "same-origin"),
+        ("Content-Security-Policy", build_csp()),
+    ]
+    if _is_production() and settings.cookie_secure:
+        headers.append(("Strict-Transport-Security", "max-age=31536000; includeSubDomains"))
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+
+class HttpPipelineMiddleware:
+    """Pipeline ASGI con las etapas transversales de todos los requests HTTP."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.request_id_header = settings.request_id_header_name.lower().encode("latin-1")
+        self.security_headers = security_header_block()
+        # Cabeceras que el pipeline fija: si la respuesta ya las trae, se reemplazan.
+        self.owned_headers = frozenset(name for name, _ in self.security_headers) | {
+            self.request_id_header
+        }
+        production = _is_production()
+        self.guard_health = production and settings.health_allow_local_only
+        self.guard_metrics = production and settings.metrics_allow_local_only
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        conn = HTTPConnection(scope)
+        incoming_id = conn.headers.get(settings.request_id_header_name)
+        request_id = incoming_id.strip() if incoming_id else uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+        response_headers = [
+            *self.security_headers,
+            (self.request_id_header, request_id.encode("latin-1")),
+        ]
+        status_code = 500
+        start = perf_counter()
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [
+                    header
+                    for header in message.get("headers", ())
+                    if header[0].lower() not in self.owned_headers
+                ]
+                headers.extend(response_headers)
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            rejection = await self._rejection(conn, scope)
+            if rejection is not None:
+                await rejection(scope, receive, send_with_headers)
+            else:
+                await self.app(scope, receive, send_with_headers)
+        finally:
+            self._record(scope, request_id, status_code, perf_counter() - start)
+
+    async def _rejection(self, conn: HTTPConnection, scope: Scope) -> Response | None:
+        """Respuesta de rechazo de rate limit, health guard o CSRF; None si pasa."""
+        limited = await rate_limiter.is_limited(
+            key=self._rate_limit_key(conn, scope),
+            limit=settings.rate_limit_per_minute,
+            window_seconds=settings.rate_limit_window_seconds,
+        )
+        if limited:
+            rate_limit_blocked_total.labels("global").inc()
+            return Response(content="Rate limit exceeded", status_code=429)
+
+        path = scope["path"]
+        if (self.guard_health and path in HEALTH_PATHS) or (
+            self.guard_metrics and path == "/metrics"
+        ):
+            ip = conn.client.host if conn.client else ""
+            if ip not in LOCAL_HOSTS:
+                return Response(status_code=404)
+
+        if self._csrf_rejected(conn, scope):
+            return Response(content="CSRF token missing or invalid", status_code=403)
+        return None
+
+    @staticmethod
+    def _rate_limit_key(conn: HTTPConnection, scope: Scope) -> str:
+        auth_header = conn.headers.get("authorization") or ""
+        token = None
+        if auth_header.lower().startswith("bearer "):
+            token = auth_header.split(" ", 1)[1]
+        if not token:
+            token = conn.cookies.get(settings.auth_cookie_name)
+        if token:
+            try:
+                sub = decode_request_token(scope, token).get("sub")
+            except ValueError:
+                sub = None
+            if sub:
+                return f"user:{sub}"
+        ip = conn.client.host if conn.client else "unknown"
+        return f"ip:{ip}"
+
+    @staticmethod
+    def _csrf_rejected(conn: HTTPConnection, scope: Scope) -> bool:
+        if scope["method"] not in CSRF_METHODS or scope["path"] == "/auth/login":
+            return False
+        if conn.headers.get("authorization"):
+            return False
+        cookies = conn.cookies
+        if not (
+            cookies.get(settings.auth_cookie_name) or cookies.get(settings.refresh_cookie_name)
+        ):
+            return False
+        csrf_cookie = cookies.get(settings.csrf_cookie_name)
+        csrf_header = conn.headers.get(settings.csrf_header_name)
+        return not csrf_cookie or not csrf_header or csrf_cookie != csrf_header
+
+    @staticmethod
+    def _record(scope: Scope, request_id: str, status_code: int, elapsed_seconds: float) -> None:
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or scope["path"]
+        method = scope["method"]
+        status = str(status_code)
+        http_requests_total.labels(method, route_path, status).inc()
+        http_request_duration_seconds.labels(method, route_path).observe(elapsed_seconds)
+        logger.info(
+            "request_id=%s method=%s path=%s status=%s duration_ms=%.2f",
+            request_id,
+            method,
+            route_path,
+            status,
+            elapsed_seconds * 1000,
+        )
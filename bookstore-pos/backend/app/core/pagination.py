@@ -0,0 +1,153 @@
+"""
+Paginación por clave (keyset) con cursores opacos.
+
+En lugar de OFFSET, cada página continúa desde los valores de orden de la
+última fila entregada: (k1, k2, ..., id) > (v1, v2, ..., vid) respetando la
+dirección de cada clave. El costo de una página no crece con su posición y
+las inserciones concurrentes no duplican ni saltan filas ya recorridas.
+
+Las claves deben ser NOT NULL y la última debe ser única (normalmente el id)
+para que el orden sea total y estable.
+"""
+
+import base64
+import json
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """Clave de orden: nombre en la fila, expresión SQL y dirección."""
+
+    name: str
+    expression: Any
+    descending: bool = False
+    # Tipo Python del valor en el cursor; por defecto se toma del tipo SQL.
+    value_type: type | None = None
+
+    def python_type(self) -> type:
+        if self.value_type is not None:
+            return self.value_type
+        try:
+            return self.expression.type.python_type
+        except (AttributeError, NotImplementedError):
+            return str
+
+    def ordering(self):
+        return self.expression.desc() if self.descending else self.expression.asc()
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _load_value(value: Any, value_type: type) -> Any:
+    if value_type is datetime:
+        return datetime.fromisoformat(value)
+    if value_type is date:
+        return date.fromisoformat(value)
+    if value_type is Decimal:
+        return Decimal(value)
+    if value_type is int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError("entero esperado")
+        return value
+    if value_type is float:
+        return float(value)
+    if value_type is str:
+        if not isinstance(value, str):
+            raise ValueError("texto esperado")
+        return value
+    return value_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Cursor opaco (base64 url-safe de una lista JSON)."""
+    payload = json.dumps([_dump_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> list[Any]:
+    """Valores de un cursor para las claves dadas o 400 si no corresponde."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if not isinstance(raw, list) or len(raw) != len(keys):
+            raise ValueError("cursor con otra forma")
+        return [_load_value(value, key.python_type()) for value, key in zip(raw, keys)]
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail="Cursor invalido") from exc
+
+
+def keyset_clause(keys: Sequence[SortKey], values: Sequence[Any]) -> ColumnElement[bool]:
+    """Filas estrictamente posteriores a values en el orden de keys."""
+    branches = []
+    for index, key in enumerate(keys):
+        equal_prefix = [
+            previous.expression == values[position]
+            for position, previous in enumerate(keys[:index])
+        ]
+        after = key.expression < values[index] if key.descending else key.expression > values[index]
+        branches.append(and_(*equal_prefix, after))
+    return or_(*branches)
+
+
+def apply_keyset(
+    stmt: Select, keys: Sequence[SortKey], *, limit: int, cursor: str | None = None
+) -> Select:
+    """Ordena por keys, continúa desde cursor y pide limit + 1 filas."""
+    if cursor:
+        stmt = stmt.where(keyset_clause(keys, decode_cursor(cursor, keys)))
+    return stmt.order_by(*[key.ordering() for key in keys]).limit(limit + 1)
+
+
+def _row_value(row: Any, name: str) -> Any:
+    if isinstance(row, Mapping):
+        return row[name]
+    return getattr(row, name)
+
+
+@dataclass
+class KeysetPage:
+    items: list[Any]
+    has_more: bool
+    next_cursor: str | None
+
+
+def build_page(
+    rows: Sequence[Any],
+    keys: Sequence[SortKey],
+    *,
+    limit: int,
+    key_values: Callable[[Any], Sequence[Any]] | None = None,
+) -> KeysetPage:
+    """Recorta la fila extra de apply_keyset y arma el cursor siguiente.
+
+    key_values extrae los valores de orden de una fila; por defecto se leen
+    por el nombre de cada clave (atributo o clave de mapping).
+    """
+    has_more = len(rows) > limit
+    items = list(rows[:limit])
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        values = (
+            key_values(last)
+            if key_values is not None
+            else [_row_value(last, key.name) for key in keys]
+        )
+        next_cursor = encode_cursor(values)
+    return KeysetPage(items=items, has_more=has_more, next_cursor=next_cursor)
@@ -0,0 +1,149 @@
+"""
+Matriz rol -> permisos en memoria.
+
+Se carga una vez al iniciar la API desde role_permissions con los roles
+normalizados (minúsculas, sin espacios), de modo que require_permission
+resuelve cada chequeo con una búsqueda en un set.
+
+La versión es una huella del contenido: dos workers con la misma matriz
+tienen la misma versión. Cuando PermissionsService modifica un rol llama a
+stage_permissions_refresh(), que relee la matriz dentro de la transacción;
+al confirmar, este worker la publica en memoria y anuncia su nueva versión
+por el bus de invalidación (REDIS_URL). Los demás workers comparan versiones
+y, si difieren, recargan la matriz desde la base en el siguiente chequeo. Sin
+Redis, cada worker vuelve a leer la matriz tras PERMISSIONS_MAX_AGE_SECONDS.
+"""
+
+import zlib
+from collections.abc import Iterable
+from time import monotonic
+from typing import Any
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.models.permission import RolePermission
+from app.seed import default_permissions_for
+
+PERMISSIONS_TOPIC = "permissions"
+_PENDING_KEY = "permission_registry_pending"
+# Roles que usan los permisos por defecto mientras no tengan filas propias.
+DEFAULT_ROLES = ("cashier", "stock")
+
+
+def normalize_role(role: str | None) -> str:
+    """Rol normalizado a minúsculas sin espacios."""
+    return (role or "").strip().lower()
+
+
+def _normalize_permissions(permissions: Iterable[str | None]) -> frozenset[str]:
+    return frozenset(str(perm).strip() for perm in permissions if perm and str(perm).strip())
+
+
+async def _load_roles(db: AsyncSession) -> dict[str, frozenset[str]]:
+    """Lee role_permissions en una sola consulta, agrupada por rol normalizado."""
+    result = await db.execute(select(RolePermission.role, RolePermission.permission))
+    grouped: dict[str, set[str]] = {}
+    for role, permission in result.all():
+        grouped.setdefault(normalize_role(role), set()).update(_normalize_permissions([permission]))
+    return {role: frozenset(perms) for role, perms in grouped.items() if perms}
+
+
+class PermissionRegistry:
+    def __init__(self) -> None:
+        self._roles: dict[str, frozenset[str]] = {}
+        self._version = 0
+        self._loaded_at: float | None = None
+        self._stale = False
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def needs_refresh(self) -> bool:
+        """True si nunca se cargó, si otro worker anunció otra versión o si venció."""
+        if self._loaded_at is None or self._stale:
+            return True
+        max_age = float(settings.permissions_max_age_seconds)
+        return max_age > 0 and monotonic() - self._loaded_at > max_age
+
+    def _fingerprint(self) -> int:
+        canonical = "\n".join(
+            f"{role}:{','.join(sorted(perms))}" for role, perms in sorted(self._roles.items())
+        )
+        return zlib.crc32(canonical.encode("utf-8"))
+
+    def _set_roles(self, roles: dict[str, frozenset[str]]) -> None:
+        self._roles = roles
+        self._version = self._fingerprint()
+        self._loaded_at = monotonic()
+        self._stale = False
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """Recarga la matriz completa desde role_permissions."""
+        self._set_roles(await _load_roles(db))
+        return self._version
+
+    def permissions_for(self, role: str | None) -> frozenset[str]:
+        """Permisos del rol; vacío si no tiene ninguno."""
+        normalized = normalize_role(role)
+        permissions = self._roles.get(normalized)
+        if permissions:
+            return permissions
+        if normalized in DEFAULT_ROLES:
+            return _normalize_permissions(default_permissions_for(normalized))
+        return frozenset()
+
+    def has_permissions(self, role: str | None, required: Iterable[str]) -> bool:
+        allowed = self.permissions_for(role)
+        if not allowed:
+            return False
+        if "*" in allowed:
+            return True
+        return all(perm in allowed for perm in required)
+
+    def mark_stale(self, version: int | None = None) -> None:
+        """Anuncio de otro worker: recargar si su versión no coincide con la local."""
+        if version is None or version != self._version:
+            self._stale = True
+
+
+permission_registry = PermissionRegistry()
+
+
+async def stage_permissions_refresh(db: AsyncSession) -> None:
+    """Relee la matriz con los cambios de la transacción; se publica al hacer commit.
+
+    Debe llamarse después de escribir role_permissions y antes del commit.
+    Si la transacción se revierte, la matriz en memoria no cambia.
+
+    Args:
+        db: Sesión donde se realizó la escritura.
+    """
+    await db.flush()
+    db.sync_session.info[_PENDING_KEY] = await _load_roles(db)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session) -> None:
+    roles = session.info.pop(_PENDING_KEY, None)
+    if roles is None:
+        return
+    permission_registry._set_roles(roles)
+    invalidation_bus.publish_nowait(PERMISSIONS_TOPIC, {"version": permission_registry.version})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _on_remote_invalidation(payload: dict[str, Any] | None) -> None:
+    permission_registry.mark_stale(payload.get("version") if payload else None)
+
+
+invalidation_bus.subscribe(PERMISSIONS_TOPIC, _on_remote_invalidation)
@@ -0,0 +1,182 @@
+"""
+Caché en memoria de principales autenticados.
+
+Sin caché, cada request resuelve el usuario y la sesión por jti: dos
+consultas antes de la lógica del endpoint (los permisos del rol se resuelven
+en memoria con app.core.permission_registry). Aquí se guarda ese resultado por jti durante
+PRINCIPAL_CACHE_TTL_SECONDS, nunca más allá de la expiración de la sesión.
+
+Las revocaciones (logout, logout-all, refresh) y los cambios de usuarios
+marcan la sesión con mark_principals_changed(); al
+confirmar la transacción se invalida en este worker y, con REDIS_URL, en los
+demás mediante el bus de invalidación.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from time import monotonic
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.metrics import principal_cache_hits_total, principal_cache_misses_total
+from app.models.user import User
+
+PRINCIPAL_TOPIC = "principals"
+_PENDING_KEY = "principal_cache_pending"
+_USER_COLUMNS = tuple(column.key for column in User.__table__.columns)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Usuario autenticado con su sesión resuelta."""
+
+    jti: str
+    family_id: str
+    user_id: int
+    username: str
+    role: str
+    is_active: bool
+    session_expires_at: datetime
+    cached_until: float
+    # Copia desacoplada de la fila users: cada request la une a su sesión con
+    # AsyncSession.merge(load=False), sin consultar y sin compartir instancia.
+    user: User
+
+    def is_valid(self) -> bool:
+        return (
+            self.is_active
+            and monotonic() < self.cached_until
+            and datetime.now(timezone.utc) < self.session_expires_at
+        )
+
+
+def detached_user_copy(user: User) -> User:
+    """Copia de un User en estado detached, apta para merge(load=False)."""
+    copy = User(**{name: getattr(user, name) for name in _USER_COLUMNS})
+    make_transient_to_detached(copy)
+    return copy
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int) -> None:
+        self._entries: OrderedDict[str, Principal] = OrderedDict()
+        self._max_entries = max(1, max_entries)
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, jti: str) -> Principal | None:
+        principal = self._entries.get(jti)
+        if principal is None or not principal.is_valid():
+            if principal is not None:
+                del self._entries[jti]
+            principal_cache_misses_total.inc()
+            return None
+        self._entries.move_to_end(jti)
+        principal_cache_hits_total.inc()
+        return principal
+
+    def put(self, principal: Principal, *, version: int) -> None:
+        """Guarda un principal leído cuando la caché estaba en ``version``.
+
+        Si hubo una invalidación mientras se leía de la base, la lectura puede
+        ser anterior a la revocación y se descarta.
+        """
+        if version != self._version:
+            return
+        self._entries[principal.jti] = principal
+        self._entries.move_to_end(principal.jti)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(
+        self,
+        *,
+        jti: str | None = None,
+        family_id: str | None = None,
+        user_id: int | None = None,
+    ) -> None:
+        """Descarta los principales que coincidan con algún criterio.
+
+        Sin criterios descarta todo. Siempre incrementa la versión.
+        """
+        self._version += 1
+        if jti is None and family_id is None and user_id is None:
+            self._entries.clear()
+            return
+        stale = [
+            key
+            for key, principal in self._entries.items()
+            if key == jti
+            or (family_id is not None and principal.family_id == family_id)
+            or (user_id is not None and principal.user_id == user_id)
+        ]
+        for key in stale:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self.invalidate()
+
+
+principal_cache = PrincipalCache(settings.principal_cache_max_entries)
+
+
+def mark_principals_changed(
+    db: AsyncSession,
+    *,
+    family_id: str | None = None,
+    user_id: int | None = None,
+) -> None:
+    """Registra principales afectados; se invalidan al hacer commit.
+
+    Invalidar después del commit evita que una lectura concurrente vuelva a
+    guardar el estado anterior: las lecturas iniciadas antes se descartan por
+    la versión de la caché.
+
+    Args:
+        db: Sesión donde se realiza la escritura.
+        family_id: Familia de tokens revocada.
+        user_id: Usuario modificado o con sesiones revocadas.
+    """
+    criteria = {
+        key: value
+        for key, value in (("family_id", family_id), ("user_id", user_id))
+        if value is not None
+    }
+    db.sync_session.info.setdefault(_PENDING_KEY, []).append(criteria)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for criteria in session.info.pop(_PENDING_KEY, None) or []:
+        principal_cache.invalidate(**criteria)
+        invalidation_bus.publish_nowait(PRINCIPAL_TOPIC, criteria)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _on_remote_invalidation(payload: dict[str, Any] | None) -> None:
+    if not payload:
+        principal_cache.clear()
+        return
+    principal_cache.invalidate(
+        family_id=payload.get("family_id"),
+        user_id=payload.get("user_id"),
+    )
+
+
+invalidation_bus.subscribe(PRINCIPAL_TOPIC, _on_remote_invalidation)
@@ -1,93 +1,214 @@
 """
 Sistema de rate limiting para proteger endpoints.
-Soporta rate limiting en memoria y con Redis.
+
+Ventana deslizante aproximada (contador de la ventana actual más el de la
+anterior ponderado por el tiempo que aún se solapa): O(1) por clave y sin
+ráfagas dobles en el borde de la ventana fija.
+
+- Con REDIS_URL, cada chequeo es un único script Lua atómico (una ida y
+  vuelta). Si Redis falla se usa la memoria local y se reintenta la conexión
+  cada REDIS_RETRY_SECONDS.
+- En memoria, el estado se reparte en shards con su propio lock y un heap por
+  expiración, de modo que las claves vencidas se eliminan de a poco en cada
+  chequeo en lugar de recorrer todo el diccionario.
+
+Las peticiones rechazadas no consumen cupo.
 """
 
-import asyncio
+import heapq
+import logging
+import threading
+from dataclasses import dataclass, field
 from functools import wraps
-from time import time
+from time import monotonic, perf_counter
 from typing import Callable
+from zlib import crc32
 
 from fastapi import HTTPException, Request, status
 
 from app.core.config import settings
+from app.core.metrics import rate_limit_check_duration_seconds
 
 try:
     from redis.asyncio import Redis
 except Exception:  # pragma: no cover
     Redis = None  # type: ignore[assignment]
 
+logger = logging.getLogger("bookstore")
+
+MEMORY_SHARDS = 16
+REDIS_RETRY_SECONDS = 5.0
+# Claves vencidas que se liberan como máximo en cada chequeo de un shard.
+EXPIRE_BATCH = 32
+
+# KEYS[1]: hash de la clave. ARGV: ventana en ms, límite.
+# Devuelve 1 si la petición excede el límite (y no la cuenta), 0 si pasa.
+SLIDING_WINDOW_SCRIPT = """
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local current_start = now - (now % window)
+local data = redis.call('HMGET', KEYS[1], 'start', 'current', 'previous')
+local start = tonumber(data[1])
+local current = tonumber(data[2]) or 0
+local previous = tonumber(data[3]) or 0
+if start ~= current_start then
+  if start ~= nil and current_start - start == window then
+    previous = current
+  else
+    previous = 0
+  end
+  current = 0
+end
+local weight = (window - (now - current_start)) / window
+local limited = previous * weight + current + 1 > limit
+if not limited then
+  current = current + 1
+end
+redis.call('HSET', KEYS[1], 'start', current_start, 'current', current, 'previous', previous)
+redis.call('PEXPIRE', KEYS[1], window * 2)
+if limited then
+  return 1
+end
+return 0
+"""
+
+
+@dataclass
+class _Window:
+    # Número de ventana fija actual (int(now // window_seconds)).
+    index: int
+    current: int = 0
+    previous: int = 0
+    expires_at: float = 0.0
+
+
+@dataclass
+class _Shard:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    windows: dict[str, _Window] = field(default_factory=dict)
+    # (expires_at, clave): una entrada por ventana iniciada; las que ya no
+    # coinciden con la expiración vigente de la clave se ignoran al salir.
+    expiry: list[tuple[float, str]] = field(default_factory=list)
+
+    def expire(self, now: float) -> None:
+        for _ in range(EXPIRE_BATCH):
+            if not self.expiry or self.expiry[0][0] > now:
+                return
+            expires_at, key = heapq.heappop(self.expiry)
+            window = self.windows.get(key)
+            if window is not None and window.expires_at == expires_at:
+                del self.windows[key]
+
+    def hit(self, key: str, limit: int, window_seconds: float, now: float) -> bool:
+        with self.lock:
+            self.expire(now)
+            index = int(now // window_seconds)
+            window = self.windows.get(key)
+            if window is None:
+                window = self.windows[key] = _Window(index=index)
+            elif window.index != index:
+                window.previous = window.current if index - window.index == 1 else 0
+                window.current = 0
+                window.index = index
+            # Sin actividad, la clave deja de influir al terminar la ventana siguiente.
+            expires_at = (index + 2) * window_seconds
+            if window.expires_at != expires_at:
+                window.expires_at = expires_at
+                heapq.heappush(self.expiry, (expires_at, key))
+            elapsed = now - index * window_seconds
+            weight = max(0.0, (window_seconds - elapsed) / window_seconds)
+            if window.previous * weight + window.current + 1 > limit:
+                return True
+            window.current += 1
+            return False
+
 
 class RateLimiter:
-    def __init__(self) -> None:
-        self._state: dict[str, tuple[int, float]] = {}
-        self._lock = asyncio.Lock()
-        self._hits = 0
+    def __init__(self, shards: int = MEMORY_SHARDS) -> None:
+        self._shards = [_Shard() for _ in range(max(1, shards))]
         self._redis: Redis | None = None
-        self._redis_checked = False
+        self._script = None
+        self._redis_retry_at = 0.0
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[crc32(key.encode("utf-8")) % len(self._shards)]
 
     async def _redis_client(self) -> Redis | None:
-        if self._redis_checked:
+        if self._redis is not None:
             return self._redis
-        self._redis_checked = True
-        if not settings.redis_url or Redis is None:
+        if not settings.redis_url or Redis is None or monotonic() < self._redis_retry_at:
             return None
+        client = Redis.from_url(settings.redis_url, decode_responses=True)
         try:
-            client = Redis.from_url(settings.redis_url, decode_responses=True)
             await client.ping()
-            self._redis = client
         except Exception:
-            self._redis = None
-        return self._redis
+            self._redis_retry_at = monotonic() + REDIS_RETRY_SECONDS
+            logger.warning("Rate limiter: Redis no disponible, usando memoria local")
+            await self._close_client(client)
+            return None
+        self._redis = client
+        self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+        return client
+
+    @staticmethod
+    async def _close_client(client: Redis) -> None:
+        try:
+            await client.aclose()
+        except Exception:
+            pass
 
-    async def _hit_redis(self, key: str, limit: int, window_seconds: int) -> bool:
+    async def _hit_redis(self, key: str, limit: int, window_seconds: int) -> bool | None:
+        """Resultado del script en Redis; None si no hay Redis disponible."""
         client = await self._redis_client()
-        if client is None:
-            return False
-        bucket = f"rl:{key}"
+        if client is None or self._script is None:
+            return None
         try:
-            count = await client.incr(bucket)
-            if count == 1:
-                await client.expire(bucket, window_seconds)
-            return count > limit
+            result = await self._script(
+                keys=[f"rl:{key}"], args=[int(window_seconds * 1000), limit], client=client
+            )
         except Exception:
-            return False
+            # Conexión perdida: memoria local hasta el próximo reintento.
+            self._redis = None
+            self._script = None
+            self._redis_retry_at = monotonic() + REDIS_RETRY_SECONDS
+            logger.warning("Rate limiter: error en Redis, usando memoria local")
+            await self._close_client(client)
+            return None
+        return bool(int(result))
 
-    async def _hit_memory(self, key: str, limit: int, window_seconds: int) -> bool:
-        now = time()
-        async with self._lock:
-            count, start = self._state.get(key, (0, now))
-            if now - start >= window_seconds:
-                count, start = 0, now
-            count += 1
-            self._state[key] = (count, start)
-            self._hits += 1
-            # Opportunistic cleanup to keep memory bounded.
-            if self._hits % 1000 == 0:
-                cutoff = now - window_seconds
-                self._state = {
-                    k: v for k, v in self._state.items() if v[0] > 0 and v[1] >= cutoff
-                }
-            return count > limit
+    def _hit_memory(self, key: str, limit: int, window_seconds: int) -> bool:
+        return self._shard(key).hit(key, limit, float(window_seconds), monotonic())
 
     async def is_limited(self, key: str, limit: int, window_seconds: int = 60) -> bool:
         if limit <= 0:
             return False
+        window_seconds = max(1, window_seconds)
+        started = perf_counter()
         limited = await self._hit_redis(key, limit, window_seconds)
-        if limited:
-            return True
-        return await self._hit_memory(key, limit, window_seconds)
+        backend = "redis"
+        if limited is None:
+            limited = self._hit_memory(key, limit, window_seconds)
+            backend = "memory"
+        rate_limit_check_duration_seconds.labels(backend).observe(perf_counter() - started)
+        return limited
+
+    def __len__(self) -> int:
+        return sum(len(shard.windows) for shard in self._shards)
 
     async def close(self) -> None:
         if self._redis is not None:
-            await self._redis.aclose()
+            await self._close_client(self._redis)
         self._redis = None
-        self._redis_checked = False
+        self._script = None
+        self._redis_retry_at = 0.0
 
     async def reset_for_tests(self) -> None:
-        async with self._lock:
-            self._state.clear()
-            self._hits = 0
+        for shard in self._shards:
+            with shard.lock:
+                shard.windows.clear()
+                shard.expiry.clear()
 
 
 rate_limiter = RateLimiter()
@@ -0,0 +1,154 @@
+"""
+Caché de documentos renderizados (tickets, HTML, texto, PDF y ESC/POS).
+
+Una venta pagada no cambia, así que el resultado de renderizarla depende solo
+de sus entradas: contexto de la venta, datos de la tienda, plantilla y versión
+de plantilla. Las claves son la huella SHA-256 de esas entradas
+(render_fingerprint) más el tipo de artefacto, por lo que nunca hace falta
+invalidar: si cambia una entrada, cambia la clave.
+
+Dos niveles:
+- Memoria: LRU por worker acotado en bytes (RECEIPT_CACHE_MAX_BYTES).
+- Disco: un archivo por clave en RECEIPT_CACHE_DIR, compartido entre workers
+  y reinicios. Vacío desactiva el nivel de disco.
+
+La misma clave sirve como ETag, de modo que una reimpresión con
+If-None-Match responde 304 sin renderizar ni transferir el documento.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import render_cache_hits_total, render_cache_misses_total
+
+logger = logging.getLogger("bookstore")
+
+
+def render_fingerprint(*parts: Any) -> str:
+    """Huella estable de las entradas de un render."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def etag_for(key: str) -> str:
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """True si la cabecera If-None-Match incluye el ETag (o es "*")."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+class RenderCache:
+    def __init__(self, max_bytes: int, directory: str | None) -> None:
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._max_bytes = max(0, max_bytes)
+        self._directory = Path(directory) if directory else None
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _path(self, key: str) -> Path | None:
+        if self._directory is None:
+            return None
+        return self._directory / key[:2] / key
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self._max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def get(self, key: str) -> bytes | None:
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            render_cache_hits_total.labels("memory").inc()
+            return data
+        path = self._path(key)
+        if path is not None:
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                data = None
+            except OSError:
+                logger.warning("Render cache: no se pudo leer %s", path)
+                data = None
+            if data is not None:
+                self._remember(key, data)
+                render_cache_hits_total.labels("disk").inc()
+                return data
+        render_cache_misses_total.inc()
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        self._remember(key, data)
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Escritura atómica: otro worker nunca lee un archivo a medias.
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(data)
+                os.replace(tmp_name, path)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except OSError:
+            logger.warning("Render cache: no se pudo escribir %s", path)
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def get_or_render_text(self, key: str, render: Callable[[], str]) -> str:
+        return self.get_or_render(key, lambda: render().encode("utf-8")).decode("utf-8")
+
+    def clear(self, *, disk: bool = False) -> None:
+        """Vacía el nivel de memoria (y opcionalmente el de disco)."""
+        self._entries.clear()
+        self._size = 0
+        if disk and self._directory is not None and self._directory.exists():
+            for path in self._directory.glob("*/*"):
+                path.unlink(missing_ok=True)
+
+    def configure(self, *, max_bytes: int, directory: str | None) -> None:
+        self.clear()
+        self._max_bytes = max(0, max_bytes)
+        self._directory = Path(directory) if directory else None
+
+
+render_cache = RenderCache(settings.receipt_cache_max_bytes, settings.receipt_cache_dir)
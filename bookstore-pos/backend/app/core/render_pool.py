@@ -0,0 +1,164 @@
+"""
+Pool de procesos para renderizar PDFs fuera del event loop.
+
+ReportLab es CPU puro: dibujar una FACTURA dentro de un handler async
+bloquea a todas las cajas atendidas por el worker. Aquí el trabajo se envía a
+un ProcessPoolExecutor acotado (RENDER_POOL_WORKERS) con funciones puras que
+reciben contextos serializables (ver app.services.printing_templates.pdf_render).
+
+- Contrapresión: como máximo RENDER_POOL_MAX_PENDING trabajos en curso o en
+  cola por worker de la API; por encima se responde 503 con Retry-After en
+  vez de acumular memoria y latencia.
+- Timeout: si un PDF tarda más de RENDER_TIMEOUT_SECONDS se responde 504. El
+  cupo se libera cuando el proceso termina realmente, no al vencer el plazo.
+- RENDER_POOL_WORKERS=0 renderiza en un hilo (útil en tests y en equipos con
+  un solo núcleo); sigue sin bloquear el event loop.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import pdf_render_duration_seconds, pdf_render_rejected_total
+
+logger = logging.getLogger("bookstore")
+
+
+@dataclass(frozen=True)
+class _RenderFailure:
+    """HTTPException levantada en el proceso hijo, en forma serializable."""
+
+    status_code: int
+    detail: Any
+
+
+def _run_job(func: Callable[..., bytes], args: tuple) -> bytes | _RenderFailure:
+    try:
+        return func(*args)
+    except HTTPException as exc:
+        return _RenderFailure(exc.status_code, exc.detail)
+
+
+class RenderPool:
+    def __init__(self, workers: int, max_pending: int, timeout_seconds: float) -> None:
+        self._workers = max(0, workers)
+        self._max_pending = max(1, max_pending)
+        self._timeout_seconds = timeout_seconds
+        self._executor: Executor | None = None
+        self._pending = 0
+        # Los callbacks de fin de trabajo corren en hilos del executor.
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._workers == 0:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+            else:
+                # spawn: igual en Linux y Windows, y sin heredar el event loop ni
+                # conexiones abiertas del proceso padre.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        return self._executor
+
+    def _release(self, _future: Any) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(
+        self, func: Callable[..., bytes], *args: Any, timeout_seconds: float | None = None
+    ) -> bytes:
+        """
+        Ejecuta ``func(*args)`` en el pool y devuelve sus bytes.
+
+        Args:
+            func: Función de módulo (serializable por referencia) que devuelve bytes.
+            *args: Argumentos serializables.
+            timeout_seconds: Plazo propio (p. ej. PDFs combinados); por defecto
+                RENDER_TIMEOUT_SECONDS.
+
+        Raises:
+            HTTPException 503: Si el pool está lleno o dejó de funcionar.
+            HTTPException 504: Si el render supera el timeout.
+        """
+        with self._lock:
+            if self._pending >= self._max_pending:
+                pdf_render_rejected_total.labels("busy").inc()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Generador de documentos ocupado, reintente en unos segundos",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            try:
+                future = self._get_executor().submit(_run_job, func, args)
+            except BrokenProcessPool:
+                self._reset()
+                future = self._get_executor().submit(_run_job, func, args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        started = perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                timeout_seconds if timeout_seconds is not None else self._timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            # Si aún no empezó, se descarta; si ya corre, termina y libera su cupo.
+            future.cancel()
+            pdf_render_rejected_total.labels("timeout").inc()
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="La generación del documento excedió el tiempo límite",
+            )
+        except BrokenProcessPool:
+            logger.exception("Render pool roto, se recreará en el siguiente uso")
+            self._reset()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Generador de documentos no disponible, reintente",
+            )
+        pdf_render_duration_seconds.observe(perf_counter() - started)
+        if isinstance(result, _RenderFailure):
+            raise HTTPException(status_code=result.status_code, detail=result.detail)
+        return result
+
+    def _reset(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def configure(self, *, workers: int, max_pending: int, timeout_seconds: float) -> None:
+        self.shutdown()
+        self._workers = max(0, workers)
+        self._max_pending = max(1, max_pending)
+        self._timeout_seconds = timeout_seconds
+
+    def shutdown(self) -> None:
+        self._reset()
+
+
+render_pool = RenderPool(
+    settings.render_pool_workers,
+    settings.render_pool_max_pending,
+    settings.render_timeout_seconds,
+)
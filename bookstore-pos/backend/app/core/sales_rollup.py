@@ -0,0 +1,220 @@
+"""
+Mantenimiento de los agregados diarios de ventas (daily_product_sales).
+
+Las ventas suman y las devoluciones (que anulan la venta completa) restan sobre
+el día comercial (BUSINESS_TIMEZONE) de la venta original, dentro de la misma
+transacción que las origina. rebuild_sales_rollup() recalcula los agregados
+desde sales/sale_items para el backfill inicial o para corregir desvíos.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dates import business_day, business_day_filter, day_range_filter
+from app.models.product import Product
+from app.models.sale import Sale, SaleItem
+from app.models.sales_rollup import DailyProductSales, DailySalesTotals
+
+
+@dataclass(frozen=True)
+class RollupLine:
+    """Línea de venta reducida a lo que necesita el agregado."""
+
+    product_id: int
+    qty: int
+    sales_total: float
+    estimated_cost_total: float
+
+
+def rollup_day(created_at: datetime | None) -> date:
+    """Día comercial al que se imputa una venta."""
+    return business_day(created_at)
+
+
+def estimated_unit_cost(item: SaleItem, product: Product | None) -> float:
+    """Costo unitario de una línea con el mismo criterio que rebuild_sales_rollup.
+
+    unit_cost_snapshot y, para ventas antiguas sin snapshot, el costo actual
+    del producto (unit_cost, luego cost).
+    """
+    candidates: list[float | None] = [item.unit_cost_snapshot]
+    if product is not None:
+        candidates.extend((product.unit_cost, product.cost))
+    for value in candidates:
+        if value is not None:
+            return float(value)
+    return 0.0
+
+
+def _upsert(db: AsyncSession, model):
+    dialect = db.bind.dialect.name if db.bind else ""
+    if dialect == "postgresql":
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+
+async def record_sale_rollup(
+    db: AsyncSession,
+    *,
+    day: date,
+    warehouse_id: int,
+    lines: Iterable[RollupLine],
+    sale_total: float,
+    sign: int = 1,
+) -> None:
+    """Suma (sign=1) o resta (sign=-1) una venta en los agregados del día."""
+    by_product: dict[int, list[float]] = {}
+    for line in lines:
+        acc = by_product.setdefault(line.product_id, [0, 0.0, 0.0])
+        acc[0] += line.qty
+        acc[1] += line.sales_total
+        acc[2] += line.estimated_cost_total
+
+    if by_product:
+        stmt = _upsert(db, DailyProductSales)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["day", "product_id", "warehouse_id"],
+            set_={
+                "qty_sold": DailyProductSales.qty_sold + stmt.excluded.qty_sold,
+                "sales_total": DailyProductSales.sales_total + stmt.excluded.sales_total,
+                "estimated_cost_total": DailyProductSales.estimated_cost_total
+                + stmt.excluded.estimated_cost_total,
+            },
+        )
+        await db.execute(
+            stmt,
+            [
+                {
+                    "day": day,
+                    "product_id": product_id,
+                    "warehouse_id": warehouse_id,
+                    "qty_sold": sign * int(qty),
+                    "sales_total": sign * float(total),
+                    "estimated_cost_total": sign * float(cost),
+                }
+                for product_id, (qty, total, cost) in by_product.items()
+            ],
+        )
+
+    totals_stmt = _upsert(db, DailySalesTotals)
+    totals_stmt = totals_stmt.on_conflict_do_update(
+        index_elements=["day", "warehouse_id"],
+        set_={
+            "sales_count": DailySalesTotals.sales_count + totals_stmt.excluded.sales_count,
+            "sales_total": DailySalesTotals.sales_total + totals_stmt.excluded.sales_total,
+        },
+    )
+    await db.execute(
+        totals_stmt,
+        {
+            "day": day,
+            "warehouse_id": warehouse_id,
+            "sales_count": sign,
+            "sales_total": sign * float(sale_total),
+        },
+    )
+
+    if sign < 0:
+        # Una venta anulada deja filas en cero: se eliminan para que los
+        # reportes no listen productos sin ventas netas.
+        await db.execute(
+            delete(DailyProductSales).where(
+                DailyProductSales.day == day,
+                DailyProductSales.warehouse_id == warehouse_id,
+                DailyProductSales.product_id.in_(list(by_product)),
+                DailyProductSales.qty_sold <= 0,
+            )
+        )
+        await db.execute(
+            delete(DailySalesTotals).where(
+                DailySalesTotals.day == day,
+                DailySalesTotals.warehouse_id == warehouse_id,
+                DailySalesTotals.sales_count <= 0,
+            )
+        )
+
+
+async def rebuild_sales_rollup(
+    db: AsyncSession,
+    warehouse_id: int,
+    from_day: date | None = None,
+    to_day: date | None = None,
+) -> int:
+    """Recalcula los agregados desde las ventas no anuladas.
+
+    Las ventas no guardan almacén: todo el histórico se imputa a warehouse_id
+    (el almacén por defecto). Se procesa un día comercial por vez con límites
+    UTC sobre el índice de created_at. Devuelve la cantidad de filas por
+    producto generadas. No confirma la transacción.
+    """
+    product_filters = []
+    totals_filters = []
+    if from_day is not None:
+        product_filters.append(DailyProductSales.day >= from_day)
+        totals_filters.append(DailySalesTotals.day >= from_day)
+    if to_day is not None:
+        product_filters.append(DailyProductSales.day <= to_day)
+        totals_filters.append(DailySalesTotals.day <= to_day)
+    await db.execute(delete(DailyProductSales).where(*product_filters))
+    await db.execute(delete(DailySalesTotals).where(*totals_filters))
+
+    range_filter = day_range_filter(Sale.created_at, from_day, to_day)
+    bounds_stmt = select(func.min(Sale.created_at), func.max(Sale.created_at)).where(
+        Sale.status != "VOID"
+    )
+    if range_filter is not None:
+        bounds_stmt = bounds_stmt.where(range_filter)
+    first, last = (await db.execute(bounds_stmt)).one()
+    if first is None:
+        return 0
+
+    unit_cost_expr = func.coalesce(SaleItem.unit_cost_snapshot, Product.unit_cost, Product.cost, 0.0)
+    inserted = 0
+    day = business_day(first)
+    last_day = business_day(last)
+    while day <= last_day:
+        day_filter = and_(Sale.status != "VOID", business_day_filter(Sale.created_at, day))
+        product_rows = (
+            select(
+                literal(day, DailyProductSales.day.type),
+                SaleItem.product_id,
+                literal(warehouse_id),
+                func.sum(SaleItem.qty),
+                func.coalesce(func.sum(SaleItem.final_total), 0),
+                func.coalesce(func.sum(SaleItem.qty * unit_cost_expr), 0),
+            )
+            .join(Sale, Sale.id == SaleItem.sale_id)
+            .outerjoin(Product, Product.id == SaleItem.product_id)
+            .where(day_filter)
+            .group_by(SaleItem.product_id)
+        )
+        result = await db.execute(
+            insert(DailyProductSales).from_select(
+                ["day", "product_id", "warehouse_id", "qty_sold", "sales_total", "estimated_cost_total"],
+                product_rows,
+            )
+        )
+        inserted += int(result.rowcount or 0)
+        totals_rows = (
+            select(
+                literal(day, DailySalesTotals.day.type),
+                literal(warehouse_id),
+                func.count(Sale.id),
+                func.coalesce(func.sum(Sale.total), 0),
+            )
+            .where(day_filter)
+            .having(func.count(Sale.id) > 0)
+        )
+        await db.execute(
+            insert(DailySalesTotals).from_select(
+                ["day", "warehouse_id", "sales_count", "sales_total"], totals_rows
+            )
+        )
+        day += timedelta(days=1)
+    return inserted
@@ -22,6 +22,20 @@ def compact_search_text(value: str) -> str:
     return "".join(ch for ch in normalize_search_text(value) if ch.isalnum())
 
 
+# Caracteres separadores admitidos en códigos escaneados o tipeados (978-612-..., AB.01)
+CODE_SEPARATORS = frozenset("-./_:")
+
+
+def looks_like_code(value: str) -> bool:
+    """Indica si el texto parece un código (SKU, ISBN, código de barras)."""
+    candidate = (value or "").strip()
+    if len(candidate) < 4 or any(ch.isspace() for ch in candidate):
+        return False
+    if not any(ch.isdigit() for ch in candidate):
+        return False
+    return all(ch.isalnum() or ch in CODE_SEPARATORS for ch in candidate)
+
+
 def singularize_token(token: str) -> str:
     """Convierte palabra plural a singular."""
     if len(token) <= 3:
@@ -43,6 +57,15 @@ def split_search_terms(value: str) -> list[str]:
     return [singularize_token(token) for token in normalized.split() if token]
 
 
+# Longitud mínima de un término para el tokenizador trigram de FTS5
+FTS_TRIGRAM_MIN_LENGTH = 3
+
+
+def fts_phrase(value: str) -> str:
+    """Escapa un valor como frase literal de FTS5."""
+    return '"' + value.replace('"', '""') + '"'
+
+
 def normalized_column(column):
     """Normaliza una columna SQL quitando acentos."""
     value = func.lower(func.coalesce(column, ""))
@@ -8,6 +8,7 @@ Proporciona funciones para:
 - Validación de contraseñas
 """
 
+from collections.abc import MutableMapping
 from datetime import datetime, timedelta, timezone
 from hashlib import sha256
 from hmac import compare_digest
@@ -167,6 +168,42 @@ def decode_token(token: str) -> dict[str, Any]:
         raise ValueError("Invalid token") from exc
 
 
+# Clave en scope["state"] donde se guarda el token ya decodificado del request.
+_REQUEST_TOKEN_KEY = "decoded_token"
+
+
+def decode_request_token(scope: MutableMapping[str, Any], token: str) -> dict[str, Any]:
+    """
+    Decodifica un token una sola vez por request.
+
+    El middleware HTTP y get_current_user comparten el resultado (válido o
+    inválido) a través de scope["state"].
+
+    Args:
+        scope: Scope ASGI del request.
+        token: Token JWT a decodificar.
+
+    Returns:
+        Payload del token decodificado.
+
+    Raises:
+        ValueError: Si el token es inválido o expirado.
+    """
+    state = scope.setdefault("state", {})
+    cached = state.get(_REQUEST_TOKEN_KEY)
+    if cached is not None and cached[0] == token:
+        payload = cached[1]
+    else:
+        try:
+            payload = decode_token(token)
+        except ValueError:
+            payload = None
+        state[_REQUEST_TOKEN_KEY] = (token, payload)
+    if payload is None:
+        raise ValueError("Invalid token")
+    return payload
+
+
 def token_fingerprint(token: str) -> str:
     """
     Genera una huella digital (hash) del token para almacenamiento seguro.
@@ -0,0 +1,125 @@
+"""
+Configuración del sistema (system_settings) en memoria.
+
+La fila única de system_settings se carga al iniciar la API y cada lectura
+(ventas, almacén por defecto, tickets, documentos) recibe una copia desacoplada
+sin consultar la base.
+
+La versión es una huella del contenido, como en permission_registry. Cuando
+SettingsService guarda cambios llama a stage_settings_refresh(), que relee la
+fila dentro de la transacción; al confirmar, este worker la publica en memoria
+y anuncia la nueva versión por el bus de invalidación (REDIS_URL). Los demás
+workers comparan versiones y recargan en la siguiente lectura. Sin Redis, cada
+worker vuelve a leer la fila tras SETTINGS_SNAPSHOT_MAX_AGE_SECONDS.
+"""
+
+import zlib
+from time import monotonic
+from typing import Any
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.models.settings import SystemSettings
+
+SETTINGS_TOPIC = "system_settings"
+_PENDING_KEY = "settings_snapshot_pending"
+_COLUMNS = tuple(column.key for column in SystemSettings.__table__.columns)
+
+
+async def _load_values(db: AsyncSession) -> dict[str, Any] | None:
+    result = await db.execute(select(SystemSettings).limit(1))
+    row = result.scalar_one_or_none()
+    if row is None:
+        return None
+    return {name: getattr(row, name) for name in _COLUMNS}
+
+
+class SettingsSnapshot:
+    def __init__(self) -> None:
+        self._values: dict[str, Any] | None = None
+        self._version = 0
+        self._loaded_at: float | None = None
+        self._stale = False
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def needs_refresh(self) -> bool:
+        """True si nunca se cargó, si otro worker anunció otra versión o si venció."""
+        if self._loaded_at is None or self._stale:
+            return True
+        max_age = float(settings.settings_snapshot_max_age_seconds)
+        return max_age > 0 and monotonic() - self._loaded_at > max_age
+
+    def _set_values(self, values: dict[str, Any] | None) -> None:
+        self._values = values
+        canonical = repr(sorted(values.items())) if values is not None else ""
+        self._version = zlib.crc32(canonical.encode("utf-8"))
+        self._loaded_at = monotonic()
+        self._stale = False
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """Recarga la fila de system_settings."""
+        self._set_values(await _load_values(db))
+        return self._version
+
+    async def get(self, db: AsyncSession) -> SystemSettings | None:
+        """Copia desacoplada de la configuración; None si aún no existe la fila.
+
+        La copia es de solo lectura en la práctica: modificarla no se persiste.
+        Para escribir, SettingsService lee la fila en su propia transacción.
+        """
+        if self.needs_refresh:
+            await self.refresh(db)
+        if self._values is None:
+            return None
+        copy = SystemSettings(**self._values)
+        make_transient_to_detached(copy)
+        return copy
+
+    def mark_stale(self, version: int | None = None) -> None:
+        """Anuncio de otro worker: recargar si su versión no coincide con la local."""
+        if version is None or version != self._version:
+            self._stale = True
+
+
+settings_snapshot = SettingsSnapshot()
+
+
+async def stage_settings_refresh(db: AsyncSession) -> None:
+    """Relee system_settings con los cambios de la transacción; se publica al hacer commit.
+
+    Debe llamarse después de escribir system_settings y antes del commit.
+    Si la transacción se revierte, la configuración en memoria no cambia.
+
+    Args:
+        db: Sesión donde se realizó la escritura.
+    """
+    await db.flush()
+    db.sync_session.info[_PENDING_KEY] = await _load_values(db)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session) -> None:
+    if _PENDING_KEY not in session.info:
+        return
+    settings_snapshot._set_values(session.info.pop(_PENDING_KEY))
+    invalidation_bus.publish_nowait(SETTINGS_TOPIC, {"version": settings_snapshot.version})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _on_remote_invalidation(payload: dict[str, Any] | None) -> None:
+    settings_snapshot.mark_stale(payload.get("version") if payload else None)
+
+
+invalidation_bus.subscribe(SETTINGS_TOPIC, _on_remote_invalidation)
@@ -1,20 +1,47 @@
 """
 Utilidades de gestión de stock.
 Funciones para obtener y modificar niveles de inventario.
+
+Los cambios de stock son incrementos atómicos en la base de datos:
+UPDATE ... SET qty = qty + :delta WHERE qty + :delta >= 0 RETURNING sobre
+stock_levels y products.stock, sin volver a sumar los niveles ni releer el
+producto. Una fila que no cumple la condición significa stock insuficiente.
+products.stock se mantiene igual a SUM(stock_levels.qty); los desvíos se
+detectan con find_stock_mismatches (scripts/check_stock_consistency.py).
 """
 
-from sqlalchemy import func, select
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.alerts_snapshot import mark_alerts_changed
+from app.core.settings_snapshot import settings_snapshot
 from app.models.product import Product
-from app.models.settings import SystemSettings
 from app.models.warehouse import StockLevel
 
+INSUFFICIENT_STOCK = "Stock insuficiente en almacen"
+
+
+@dataclass
+class StockSnapshot:
+    """Niveles de stock de varios productos cargados en bloque."""
+
+    warehouse_id: int
+    levels: dict[int, int] = field(default_factory=dict)
+    totals: dict[int, int] = field(default_factory=dict)
+
+    def available(self, product_id: int) -> int:
+        return self.levels.get(product_id, 0)
+
 
 async def get_default_warehouse_id(db: AsyncSession) -> int | None:
     """Obtiene el ID del almacén por defecto del sistema."""
-    result = await db.execute(select(SystemSettings).limit(1))
-    settings = result.scalar_one_or_none()
+    settings = await settings_snapshot.get(db)
     return settings.default_warehouse_id if settings else None
 
 
@@ -26,18 +53,83 @@ async def require_default_warehouse_id(db: AsyncSession) -> int:
     return warehouse_id
 
 
-async def sync_product_stock_from_levels(db: AsyncSession, product_id: int) -> None:
-    """Sincroniza el stock total del producto desde los niveles por almacén."""
-    res = await db.execute(
-        select(func.coalesce(func.sum(StockLevel.qty), 0)).where(
-            StockLevel.product_id == product_id
+def _upsert(db: AsyncSession, model):
+    dialect = db.bind.dialect.name if db.bind else ""
+    if dialect == "postgresql":
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+
+def _refresh_loaded(db: AsyncSession, model, pk: int, attr: str, value: int) -> None:
+    """Actualiza una instancia ya cargada en la sesión sin marcarla como modificada."""
+    session = db.sync_session
+    instance = session.identity_map.get(session.identity_key(model, pk))
+    if instance is not None:
+        set_committed_value(instance, attr, value)
+
+
+async def _increment_levels(
+    db: AsyncSession, warehouse_id: int, deltas: dict[int, int]
+) -> dict[int, int]:
+    """Suma los deltas a stock_levels del almacén y devuelve la cantidad resultante."""
+    levels: dict[int, int] = {}
+    decrements = {pid: delta for pid, delta in deltas.items() if delta < 0}
+    increments = {pid: delta for pid, delta in deltas.items() if delta >= 0}
+    rows = []
+    if decrements:
+        change = case(decrements, value=StockLevel.product_id)
+        result = await db.execute(
+            update(StockLevel)
+            .where(
+                StockLevel.warehouse_id == warehouse_id,
+                StockLevel.product_id.in_(list(decrements)),
+                StockLevel.qty + change >= 0,
+            )
+            .values(qty=StockLevel.qty + change)
+            .returning(StockLevel.id, StockLevel.product_id, StockLevel.qty)
+            .execution_options(synchronize_session=False)
+        )
+        rows.extend(result.all())
+        if len(rows) < len(decrements):
+            raise ValueError(INSUFFICIENT_STOCK)
+    if increments:
+        # Un producto sin fila en el almacén la recibe aquí (uq_stock_levels_product_warehouse).
+        stmt = _upsert(db, StockLevel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["product_id", "warehouse_id"],
+            set_={"qty": StockLevel.qty + stmt.excluded.qty},
+        ).returning(StockLevel.id, StockLevel.product_id, StockLevel.qty)
+        result = await db.execute(
+            stmt,
+            [
+                {"product_id": pid, "warehouse_id": warehouse_id, "qty": delta}
+                for pid, delta in increments.items()
+            ],
         )
+        rows.extend(result.all())
+    for level_id, product_id, qty in rows:
+        levels[product_id] = int(qty)
+        _refresh_loaded(db, StockLevel, level_id, "qty", int(qty))
+    return levels
+
+
+async def _increment_products(db: AsyncSession, deltas: dict[int, int]) -> dict[int, int]:
+    """Suma los deltas a products.stock y devuelve el total resultante."""
+    change = case(deltas, value=Product.id)
+    current = func.coalesce(Product.stock, 0)
+    result = await db.execute(
+        update(Product)
+        .where(Product.id.in_(list(deltas)), current + change >= 0)
+        .values(stock=current + change)
+        .returning(Product.id, Product.stock)
+        .execution_options(synchronize_session=False)
     )
-    total = int(res.scalar_one() or 0)
-    prod_res = await db.execute(select(Product).where(Product.id == product_id))
-    product = prod_res.scalar_one_or_none()
-    if product:
-        product.stock = total
+    totals = {int(product_id): int(stock) for product_id, stock in result.all()}
+    if len(totals) < len(deltas):
+        raise ValueError(INSUFFICIENT_STOCK)
+    for product_id, stock in totals.items():
+        _refresh_loaded(db, Product, product_id, "stock", stock)
+    return totals
 
 
 async def apply_stock_delta(
@@ -45,60 +137,112 @@ async def apply_stock_delta(
     product_id: int,
     delta: int,
     warehouse_id: int,
-) -> None:
-    """Aplica un cambio (positivo o negativo) al stock de un producto."""
-    res = await db.execute(
-        select(StockLevel).where(
-            StockLevel.product_id == product_id,
-            StockLevel.warehouse_id == warehouse_id,
-        )
-    )
-    level = res.scalar_one_or_none()
-    if not level:
-        level = StockLevel(product_id=product_id, warehouse_id=warehouse_id, qty=0)
-        db.add(level)
-    next_qty = level.qty + delta
-    if next_qty < 0:
-        raise ValueError("Stock insuficiente en almacen")
-    level.qty = next_qty
-    await sync_product_stock_from_levels(db, product_id)
-
-
-async def get_stock_level(db: AsyncSession, product_id: int, warehouse_id: int) -> int:
-    """Obtiene el nivel de stock de un producto en un almacén."""
+) -> int:
+    """Aplica un cambio (positivo o negativo) al stock de un producto.
+
+    Devuelve el stock total resultante (balance_after del movimiento de kardex).
+    Lanza ValueError si el almacén no tiene stock suficiente.
+    """
+    await _increment_levels(db, warehouse_id, {product_id: delta})
+    mark_alerts_changed(db)
+    if not delta:
+        res = await db.execute(select(Product.stock).where(Product.id == product_id))
+        return int(res.scalar_one_or_none() or 0)
+    totals = await _increment_products(db, {product_id: delta})
+    return totals[product_id]
+
+
+async def load_stock_snapshot(
+    db: AsyncSession,
+    product_ids: Iterable[int],
+    warehouse_id: int,
+) -> StockSnapshot:
+    """Carga en una sola consulta los niveles de stock de varios productos."""
+    product_ids = set(product_ids)
+    snapshot = StockSnapshot(warehouse_id=warehouse_id)
+    if not product_ids:
+        return snapshot
+
     res = await db.execute(
-        select(StockLevel).where(
-            StockLevel.product_id == product_id,
-            StockLevel.warehouse_id == warehouse_id,
+        select(StockLevel.product_id, StockLevel.warehouse_id, StockLevel.qty).where(
+            StockLevel.product_id.in_(product_ids)
         )
     )
-    level = res.scalar_one_or_none()
-    if level is not None:
-        return int(level.qty or 0)
-
-    # Backfill legacy products that still have aggregate stock in products.stock
-    # but never got a stock_levels row in the default warehouse.
-    prod_res = await db.execute(select(Product).where(Product.id == product_id))
-    product = prod_res.scalar_one_or_none()
-    if not product:
-        return 0
+    for product_id, level_warehouse_id, qty in res.all():
+        qty = int(qty or 0)
+        snapshot.totals[product_id] = snapshot.totals.get(product_id, 0) + qty
+        if level_warehouse_id == warehouse_id:
+            snapshot.levels[product_id] = qty
+    return snapshot
 
-    legacy_stock = int(product.stock or 0)
-    if legacy_stock <= 0:
-        return 0
 
-    total_levels_res = await db.execute(
-        select(func.coalesce(func.sum(StockLevel.qty), 0)).where(
-            StockLevel.product_id == product_id
+async def apply_stock_deltas(
+    db: AsyncSession,
+    snapshot: StockSnapshot,
+    deltas: dict[int, int],
+) -> None:
+    """Aplica varios cambios de stock con un UPDATE por tabla.
+
+    La validación contra el snapshot evita el viaje a la base en el caso común;
+    la condición qty + delta >= 0 del UPDATE es la que decide ante ventas
+    concurrentes. El snapshot queda con las cantidades y totales devueltos.
+    """
+    for product_id, delta in deltas.items():
+        if snapshot.available(product_id) + delta < 0:
+            raise ValueError(INSUFFICIENT_STOCK)
+
+    changes = {product_id: delta for product_id, delta in deltas.items() if delta}
+    if not changes:
+        return
+    snapshot.levels.update(await _increment_levels(db, snapshot.warehouse_id, changes))
+    snapshot.totals.update(await _increment_products(db, changes))
+    mark_alerts_changed(db)
+
+
+async def find_stock_mismatches(
+    db: AsyncSession, product_ids: Iterable[int] | None = None
+) -> list[tuple[int, int, int]]:
+    """Productos cuyo products.stock no coincide con SUM(stock_levels.qty).
+
+    Una sola consulta agregada sobre todo el catálogo (o los productos
+    indicados). Devuelve (product_id, products.stock, suma de niveles).
+    """
+    level_totals = (
+        select(
+            StockLevel.product_id.label("product_id"),
+            func.sum(StockLevel.qty).label("qty"),
         )
+        .group_by(StockLevel.product_id)
+        .subquery()
     )
-    total_levels = int(total_levels_res.scalar_one() or 0)
-    if total_levels > 0:
-        return 0
+    levels_qty = func.coalesce(level_totals.c.qty, 0)
+    stmt = (
+        select(Product.id, func.coalesce(Product.stock, 0), levels_qty)
+        .outerjoin(level_totals, level_totals.c.product_id == Product.id)
+        .where(func.coalesce(Product.stock, 0) != levels_qty)
+        .order_by(Product.id)
+    )
+    if product_ids is not None:
+        stmt = stmt.where(Product.id.in_(list(product_ids)))
+    result = await db.execute(stmt)
+    return [(int(pid), int(stock), int(levels)) for pid, stock, levels in result.all()]
 
-    level = StockLevel(
-        product_id=product_id, warehouse_id=warehouse_id, qty=legacy_stock
+
+async def resync_product_stock(db: AsyncSession, product_ids: Iterable[int]) -> int:
+    """Reescribe products.stock con la suma de stock_levels. No hace commit."""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return 0
+    levels_qty = (
+        select(func.coalesce(func.sum(StockLevel.qty), 0))
+        .where(StockLevel.product_id == Product.id)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Product)
+        .where(Product.id.in_(product_ids))
+        .values(stock=levels_qty)
+        .execution_options(synchronize_session="fetch")
     )
-    db.add(level)
-    await db.flush()
-    return legacy_stock
+    mark_alerts_changed(db)
+    return len(product_ids)
@@ -15,9 +15,10 @@ from app.models.inventory import (
 )  # noqa: F401
 from app.models.purchase import Purchase, PurchaseItem  # noqa: F401
 from app.models.settings import SystemSettings  # noqa: F401
-from app.models.document_sequence import DocumentSequence  # noqa: F401
+from app.models.document_sequence import DocumentNumberGap, DocumentSequence  # noqa: F401
 from app.models.print_template import PrintTemplate, PrintTemplateVersion  # noqa: F401
 from app.models.sale_document_snapshot import SaleDocumentSnapshot  # noqa: F401
+from app.models.document_batch_job import DocumentBatchJob  # noqa: F401
 from app.models.permission import RolePermission  # noqa: F401
 from app.models.audit import AuditLog  # noqa: F401
 from app.models.warehouse import (
@@ -34,3 +35,4 @@ from app.models.promotion_rule import PromotionRule  # noqa: F401
 from app.models.sale_return import SaleReturn, SaleReturnItem  # noqa: F401
 from app.models.purchasing import PurchaseOrder, PurchaseOrderItem, SupplierPayment  # noqa: F401
 from app.models.session import UserSession  # noqa: F401
+from app.models.sales_rollup import DailyProductSales, DailySalesTotals  # noqa: F401
@@ -3,19 +3,103 @@ Configuración de sesión de base de datos.
 Crea el engine y sessionmaker asíncronos.
 """
 
+from typing import Any
+
 from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.database_url, echo=False, future=True)
+# PRAGMAs reportados por /health/ready (nombre -> valor leído)
+SQLITE_REPORTED_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "foreign_keys",
+)
+
+
+def sqlite_pragma_statements() -> list[str]:
+    """PRAGMAs del perfil SQLite configurado en Settings."""
+    return [
+        "PRAGMA foreign_keys=ON",
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        # Valor negativo = tamaño en KiB en lugar de páginas.
+        f"PRAGMA cache_size={-abs(int(settings.sqlite_cache_size_kb))}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_mb) * 1024 * 1024}",
+        f"PRAGMA temp_store={settings.sqlite_temp_store}",
+    ]
+
+
+def apply_sqlite_pragmas(dbapi_connection) -> None:
+    """Aplica el perfil SQLite a una conexión recién abierta."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for statement in sqlite_pragma_statements():
+            cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+def apply_sqlite_read_only_pragmas(dbapi_connection) -> None:
+    """Aplica el perfil SQLite y bloquea escrituras en la conexión."""
+    apply_sqlite_pragmas(dbapi_connection)
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def engine_options(database_url: str, pool_size: int | None = None) -> dict[str, Any]:
+    """Opciones de pool para create_async_engine según la URL.
+
+    aiosqlite usa NullPool por defecto con archivos: cada sesión abría una
+    conexión (y un hilo) nueva y volvía a ejecutar los PRAGMAs. Con un pool
+    explícito las conexiones se reutilizan.
+    """
+    if ":memory:" in database_url or database_url.endswith("://"):
+        return {}
+    return {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": pool_size if pool_size is not None else settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+    }
+
+
+engine = create_async_engine(
+    settings.database_url, echo=False, future=True, **engine_options(settings.database_url)
+)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
+# Engine de lectura: pool separado para que reportes y listados no compitan
+# con las ventas por conexiones.
+read_database_url = settings.read_database_url or settings.database_url
+read_engine = create_async_engine(
+    read_database_url,
+    echo=False,
+    future=True,
+    **engine_options(read_database_url, settings.db_read_pool_size),
+)
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False)
+
 
 if settings.database_url.startswith("sqlite"):
 
     @event.listens_for(engine.sync_engine, "connect")
     def _set_sqlite_pragma(dbapi_connection, _connection_record) -> None:
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
+        apply_sqlite_pragmas(dbapi_connection)
+
+
+if read_database_url.startswith("sqlite"):
+
+    @event.listens_for(read_engine.sync_engine, "connect")
+    def _set_sqlite_read_pragma(dbapi_connection, _connection_record) -> None:
+        apply_sqlite_read_only_pragmas(dbapi_connection)
@@ -7,26 +7,25 @@ Configura la aplicación, middlewares, rutas y manejo de errores.
 
 from contextlib import asynccontextmanager
 import logging
-from time import perf_counter
-from uuid import uuid4
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse, Response
 
+from app.core.alerts_snapshot import alerts_snapshot
+from app.core.catalog_cache import catalog_cache
 from app.core.config import settings
-from app.core.metrics import (
-    CONTENT_TYPE_LATEST,
-    http_request_duration_seconds,
-    http_requests_total,
-    rate_limit_blocked_total,
-    render_metrics,
-)
+from app.core.invalidation import invalidation_bus
+from app.core.permission_registry import permission_registry
+from app.core.settings_snapshot import settings_snapshot
+from app.core.metrics import CONTENT_TYPE_LATEST, render_metrics
+from app.core.middleware import HttpPipelineMiddleware
 from app.core.rate_limit import rate_limiter
-from app.core.security import decode_token
-from app.core.security_validation import build_csp, validate_security_settings
+from app.core.render_pool import render_pool
+from app.core.security_validation import validate_security_settings
+from app.services.printing_templates.document_sequence_service import document_number_blocks
+from app.services.reports.reports_service import ReportsService
 from app.routers.auth import router as auth_router
 from app.routers.admin import admin as admin_router
 from app.routers.admin import permissions as permissions_router
@@ -51,7 +50,7 @@ from app.routers.pos import display_ws as display_ws_router
 from app.routers.pos import printing as printing_router
 from app.routers.reports import reports as reports_router
 from app.seed import seed_admin
-from app.db.session import AsyncSessionLocal
+from app.db.session import SQLITE_REPORTED_PRAGMAS, AsyncSessionLocal
 import re
 
 
@@ -107,6 +106,15 @@ async def verify_schema_compatibility() -> None:
                 "direct_costs_total",
                 "desired_margin",
                 "unit_cost",
+                "search_name",
+                "search_author",
+                "search_publisher",
+                "search_category",
+                "search_tags",
+                "search_sku",
+                "search_isbn",
+                "search_barcode",
+                "search_shelf_location",
             },
             "purchases": {"subtotal", "direct_costs_breakdown", "direct_costs_total"},
             "purchase_items": {"base_unit_cost", "direct_cost_allocated"},
@@ -150,9 +158,14 @@ async def verify_schema_compatibility() -> None:
             },
             "inventory_import_job_errors": {"job_id", "row_number", "detail"},
             "document_sequences": {"document_type", "series", "next_number"},
+            "document_number_gaps": {"sequence_id", "number", "reason"},
+            "stock_movements": {"balance_after"},
             "print_templates": {"name", "document_type"},
             "print_template_versions": {"template_id", "schema_json"},
             "sale_document_snapshots": {"sale_id", "document_number"},
+            "document_batch_jobs": {"status", "output_format", "processed_documents", "file_path"},
+            "daily_product_sales": {"day", "product_id", "warehouse_id", "qty_sold"},
+            "daily_sales_totals": {"day", "warehouse_id", "sales_count"},
         }
 
         for table_name, required in required_columns.items():
@@ -171,10 +184,20 @@ async def lifespan(app: FastAPI):
     await verify_schema_compatibility()
     async with AsyncSessionLocal() as session:
         await seed_admin(session)
+        await permission_registry.refresh(session)
+        await settings_snapshot.refresh(session)
+        if settings.catalog_cache_enabled:
+            await catalog_cache.warm(session)
+    await invalidation_bus.start()
+    alerts_snapshot.start(ReportsService.load_default_alerts)
     try:
         yield
     finally:
+        await alerts_snapshot.stop()
+        await invalidation_bus.stop()
         await rate_limiter.close()
+        render_pool.shutdown()
+        await document_number_blocks.release()
 
 
 app = FastAPI(title="Bookstore POS API", lifespan=lifespan)
@@ -183,133 +206,8 @@ logger = logging.getLogger("bookstore")
 validate_security_settings()
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        ip = request.client.host if request.client else "unknown"
-        key = f"ip:{ip}"
-        auth_header = request.headers.get("authorization") or ""
-        token = None
-        if auth_header.lower().startswith("bearer "):
-            token = auth_header.split(" ", 1)[1]
-        if not token:
-            token = request.cookies.get(settings.auth_cookie_name)
-        if token:
-            try:
-                payload = decode_token(token)
-                sub = payload.get("sub")
-                if sub:
-                    key = f"user:{sub}"
-            except ValueError:
-                pass
-        limited = await rate_limiter.is_limited(
-            key=key,
-            limit=settings.rate_limit_per_minute,
-            window_seconds=settings.rate_limit_window_seconds,
-        )
-        if limited:
-            rate_limit_blocked_total.labels("global").inc()
-            return Response(content="Rate limit exceeded", status_code=429)
-        return await call_next(request)
-
-
-class RequestContextMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        header_name = settings.request_id_header_name
-        incoming_id = request.headers.get(header_name)
-        request_id = incoming_id.strip() if incoming_id else uuid4().hex
-        request.state.request_id = request_id
-        route_path = request.url.path
-        start = perf_counter()
-        response = await call_next(request)
-        route = request.scope.get("route")
-        if route is not None and hasattr(route, "path"):
-            route_path = getattr(route, "path") or route_path
-        elapsed_seconds = perf_counter() - start
-        elapsed_ms = elapsed_seconds * 1000
-        status = str(response.status_code)
-        http_requests_total.labels(request.method, route_path, status).inc()
-        http_request_duration_seconds.labels(request.method, route_path).observe(
-            elapsed_seconds
-        )
-        response.headers[header_name] = request_id
-        logger.info(
-            "request_id=%s method=%s path=%s status=%s duration_ms=%.2f",
-            request_id,
-            request.method,
-            route_path,
-            status,
-            elapsed_ms,
-        )
-        return response
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Referrer-Policy"] = "same-origin"
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), microphone=(), camera=()"
-        )
-        response.headers["Cross-Origin-Opener-Policy"] = "same-origin"
-        response.headers["Cross-Origin-Resource-Policy"] = "same-origin"
-        response.headers["Content-Security-Policy"] = build_csp()
-        if (
-            settings.environment.lower() in {"prod", "production"}
-            and settings.cookie_secure
-        ):
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=31536000; includeSubDomains"
-            )
-        return response
-
-
-class HealthGuardMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if request.url.path in {"/health", "/healthz", "/health/ready"}:
-            env = settings.environment.lower()
-            if env in {"prod", "production"} and settings.health_allow_local_only:
-                ip = request.client.host if request.client else ""
-                if ip not in {"127.0.0.1", "::1", "localhost"}:
-                    return Response(status_code=404)
-        if request.url.path == "/metrics":
-            env = settings.environment.lower()
-            if env in {"prod", "production"} and settings.metrics_allow_local_only:
-                ip = request.client.host if request.client else ""
-                if ip not in {"127.0.0.1", "::1", "localhost"}:
-                    return Response(status_code=404)
-        return await call_next(request)
-
-
-class CsrfMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if request.method == "OPTIONS":
-            return await call_next(request)
-        if request.url.path == "/auth/login":
-            return await call_next(request)
-        if request.method in {"POST", "PUT", "PATCH", "DELETE"}:
-            has_auth_header = bool(request.headers.get("authorization"))
-            has_session_cookie = bool(
-                request.cookies.get(settings.auth_cookie_name)
-                or request.cookies.get(settings.refresh_cookie_name)
-            )
-            if not has_auth_header and has_session_cookie:
-                csrf_cookie = request.cookies.get(settings.csrf_cookie_name)
-                csrf_header = request.headers.get(settings.csrf_header_name)
-                if not csrf_cookie or not csrf_header or csrf_cookie != csrf_header:
-                    return Response(
-                        content="CSRF token missing or invalid", status_code=403
-                    )
-        return await call_next(request)
-
-
 origins = [o.strip() for o in settings.cors_origins.split(",") if o.strip()]
-app.add_middleware(CsrfMiddleware)
-app.add_middleware(HealthGuardMiddleware)
-app.add_middleware(RateLimitMiddleware)
-app.add_middleware(RequestContextMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(HttpPipelineMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -343,7 +241,9 @@ app.include_router(purchasing_router.router)
 app.include_router(printing_router.router)
 
 
-def _error_response(request: Request, status_code: int, code: str, detail):
+def _error_response(
+    request: Request, status_code: int, code: str, detail, headers: dict[str, str] | None = None
+):
     request_id = getattr(request.state, "request_id", "-")
     payload = {
         "error": {
@@ -353,14 +253,14 @@ def _error_response(request: Request, status_code: int, code: str, detail):
         },
         "detail": detail,
     }
-    return JSONResponse(status_code=status_code, content=payload)
+    return JSONResponse(status_code=status_code, content=payload, headers=headers)
 
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     code = f"http_{exc.status_code}"
     detail = exc.detail if exc.detail is not None else "Request failed"
-    return _error_response(request, exc.status_code, code, detail)
+    return _error_response(request, exc.status_code, code, detail, exc.headers)
 
 
 @app.exception_handler(RequestValidationError)
@@ -398,7 +298,19 @@ async def health_ready():
     try:
         async with AsyncSessionLocal() as session:
             await session.execute(text("SELECT 1"))
-        return {"status": "ok", "checks": {"database": "ok"}}
+            payload: dict = {
+                "status": "ok",
+                "checks": {"database": "ok"},
+                "permissions_version": permission_registry.version,
+                "settings_version": settings_snapshot.version,
+            }
+            if session.bind is not None and session.bind.dialect.name == "sqlite":
+                pragmas = {}
+                for name in SQLITE_REPORTED_PRAGMAS:
+                    result = await session.execute(text(f"PRAGMA {name}"))
+                    pragmas[name] = result.scalar()
+                payload["sqlite"] = pragmas
+        return payload
     except Exception:
         return JSONResponse(
             status_code=503,
@@ -1,11 +1,12 @@
 """
 Modelo de secuencias de documentos.
-Contiene la numeración de facturas, boletas, etc.
+Contiene la numeración de facturas, boletas, etc. y los huecos registrados
+para auditoría.
 """
 
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, Integer, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -32,3 +33,21 @@ class DocumentSequence(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+
+
+class DocumentNumberGap(Base):
+    """Número de una secuencia que se reservó pero nunca se emitió."""
+
+    __tablename__ = "document_number_gaps"
+    __table_args__ = (Index("ix_document_number_gaps_sequence_number", "sequence_id", "number"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    sequence_id: Mapped[int] = mapped_column(ForeignKey("document_sequences.id", ondelete="CASCADE"))
+    document_type: Mapped[str] = mapped_column(String(20))
+    series: Mapped[str] = mapped_column(String(20))
+    number: Mapped[int] = mapped_column(Integer)
+    # unused_block: sobrante de un bloque al apagar el worker; audit: detectado por la auditoría.
+    reason: Mapped[str] = mapped_column(String(30))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
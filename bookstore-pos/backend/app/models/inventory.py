@@ -5,7 +5,7 @@ Contiene clases para gestionar movimientos de inventario y jobs de importación.
 
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -15,12 +15,17 @@ class StockMovement(Base):
     """Registro de movimiento de inventario (entrada, salida, ajuste)."""
 
     __tablename__ = "stock_movements"
+    __table_args__ = (
+        Index("ix_stock_movements_product_created_id", "product_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
     type: Mapped[str] = mapped_column(String(10))
     qty: Mapped[int] = mapped_column(Integer)
     ref: Mapped[str] = mapped_column(String(100))
+    # Stock total del producto después del movimiento (ver app.core.kardex).
+    balance_after: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
@@ -5,11 +5,31 @@ Representa los productos vendidos en la librería con información
 de precios, stock, costos y metadatos para búsqueda.
 """
 
-from sqlalchemy import Boolean, Index, Integer, Numeric, String, Text
+from collections.abc import Mapping
+from typing import Any
+
+from sqlalchemy import DDL, Boolean, Index, Integer, Numeric, String, Text, event
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.core.search import compact_search_text, normalize_search_text
 from app.db.base import Base
 
+# Columnas espejo para búsqueda: texto normalizado (sin acentos, minúsculas)
+# para campos descriptivos y forma compacta (solo alfanuméricos) para códigos.
+SEARCH_TEXT_COLUMNS = {
+    "search_name": "name",
+    "search_author": "author",
+    "search_publisher": "publisher",
+    "search_category": "category",
+    "search_tags": "tags",
+}
+SEARCH_CODE_COLUMNS = {
+    "search_sku": "sku",
+    "search_isbn": "isbn",
+    "search_barcode": "barcode",
+    "search_shelf_location": "shelf_location",
+}
+
 
 class Product(Base):
     """
@@ -39,6 +59,8 @@ class Product(Base):
         stock_min: Stock mínimo para alertas
         tax_rate: Tasa de impuesto aplicable
         tax_included: Si el precio incluye impuesto
+        search_*: Columnas espejo normalizadas para búsqueda (se
+            mantienen automáticamente al guardar)
     """
 
     __tablename__ = "products"
@@ -66,6 +88,15 @@ class Product(Base):
     stock_min: Mapped[int] = mapped_column(Integer, default=0)
     tax_rate: Mapped[float] = mapped_column(Numeric(8, 6), default=0.0)
     tax_included: Mapped[bool] = mapped_column(Boolean, default=False)
+    search_name: Mapped[str] = mapped_column(String(200), default="")
+    search_author: Mapped[str] = mapped_column(String(160), default="")
+    search_publisher: Mapped[str] = mapped_column(String(160), default="")
+    search_category: Mapped[str] = mapped_column(String(100), default="")
+    search_tags: Mapped[str] = mapped_column(String(500), default="")
+    search_sku: Mapped[str] = mapped_column(String(50), default="", index=True)
+    search_isbn: Mapped[str] = mapped_column(String(32), default="", index=True)
+    search_barcode: Mapped[str] = mapped_column(String(80), default="", index=True)
+    search_shelf_location: Mapped[str] = mapped_column(String(80), default="")
 
     __table_args__ = (
         Index("ix_products_category_stock", "category", "stock"),
@@ -79,3 +110,70 @@ class Product(Base):
             },
         ),
     )
+
+
+def fill_search_columns(product: Product) -> None:
+    """Recalcula las columnas espejo de búsqueda a partir de los campos visibles."""
+    for target, source in SEARCH_TEXT_COLUMNS.items():
+        setattr(product, target, normalize_search_text(getattr(product, source) or ""))
+    for target, source in SEARCH_CODE_COLUMNS.items():
+        setattr(product, target, compact_search_text(getattr(product, source) or ""))
+
+
+def search_column_values(values: Mapping[str, Any]) -> dict[str, str]:
+    """Columnas espejo para los campos presentes en values.
+
+    Las escrituras en bloque (insert/update con listas de dicts) no disparan
+    los eventos before_insert/before_update, así que deben incluirlas.
+    """
+    mirrored = {
+        target: normalize_search_text(values[source] or "")
+        for target, source in SEARCH_TEXT_COLUMNS.items()
+        if source in values
+    }
+    mirrored.update(
+        {
+            target: compact_search_text(values[source] or "")
+            for target, source in SEARCH_CODE_COLUMNS.items()
+            if source in values
+        }
+    )
+    return mirrored
+
+
+@event.listens_for(Product, "before_insert")
+@event.listens_for(Product, "before_update")
+def _sync_search_columns(_mapper, _connection, target: Product) -> None:
+    fill_search_columns(target)
+
+
+# Índice FTS5 (SQLite) sobre las columnas espejo. Usa el tokenizador trigram
+# para conservar la semántica de subcadena de LIKE '%term%'; los triggers lo
+# mantienen al día solo cuando cambian columnas de búsqueda.
+PRODUCT_FTS_TABLE = "products_fts"
+_FTS_COLUMNS = (*SEARCH_TEXT_COLUMNS, *SEARCH_CODE_COLUMNS)
+_FTS_COLUMN_LIST = ", ".join(_FTS_COLUMNS)
+_FTS_NEW_VALUES = ", ".join(f"new.{name}" for name in _FTS_COLUMNS)
+_FTS_OLD_VALUES = ", ".join(f"old.{name}" for name in _FTS_COLUMNS)
+
+PRODUCT_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {PRODUCT_FTS_TABLE} USING fts5("
+    f"{_FTS_COLUMN_LIST}, content='products', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+    f"INSERT INTO {PRODUCT_FTS_TABLE}(rowid, {_FTS_COLUMN_LIST}) "
+    f"VALUES (new.id, {_FTS_NEW_VALUES}); END",
+    f"CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+    f"INSERT INTO {PRODUCT_FTS_TABLE}({PRODUCT_FTS_TABLE}, rowid, {_FTS_COLUMN_LIST}) "
+    f"VALUES ('delete', old.id, {_FTS_OLD_VALUES}); END",
+    f"CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF {_FTS_COLUMN_LIST} "
+    f"ON products BEGIN "
+    f"INSERT INTO {PRODUCT_FTS_TABLE}({PRODUCT_FTS_TABLE}, rowid, {_FTS_COLUMN_LIST}) "
+    f"VALUES ('delete', old.id, {_FTS_OLD_VALUES}); "
+    f"INSERT INTO {PRODUCT_FTS_TABLE}(rowid, {_FTS_COLUMN_LIST}) "
+    f"VALUES (new.id, {_FTS_NEW_VALUES}); END",
+)
+
+for _statement in PRODUCT_FTS_DDL:
+    event.listen(
+        Product.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
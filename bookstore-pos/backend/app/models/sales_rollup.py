@@ -0,0 +1,37 @@
+"""
+Modelos de agregados diarios de ventas.
+Tablas de hechos mantenidas incrementalmente para que los reportes no
+recorran sales/sale_items completos en cada consulta.
+"""
+
+from datetime import date
+from sqlalchemy import Date, ForeignKey, Index, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DailyProductSales(Base):
+    """Ventas netas por producto, día comercial (BUSINESS_TIMEZONE) y almacén."""
+
+    __tablename__ = "daily_product_sales"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), primary_key=True)
+    warehouse_id: Mapped[int] = mapped_column(ForeignKey("warehouses.id"), primary_key=True)
+    qty_sold: Mapped[int] = mapped_column(Integer, default=0)
+    sales_total: Mapped[float] = mapped_column(Numeric(14, 4), default=0)
+    estimated_cost_total: Mapped[float] = mapped_column(Numeric(14, 4), default=0)
+
+    __table_args__ = (Index("ix_daily_product_sales_product_day", "product_id", "day"),)
+
+
+class DailySalesTotals(Base):
+    """Cantidad y total de ventas por día comercial (BUSINESS_TIMEZONE) y almacén."""
+
+    __tablename__ = "daily_sales_totals"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    warehouse_id: Mapped[int] = mapped_column(ForeignKey("warehouses.id"), primary_key=True)
+    sales_count: Mapped[int] = mapped_column(Integer, default=0)
+    sales_total: Mapped[float] = mapped_column(Numeric(14, 4), default=0)
@@ -4,7 +4,7 @@ Contiene clases para almacenes, niveles, lotes, transferencias e inventarios.
 """
 
 from datetime import datetime, timezone
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -24,6 +24,9 @@ class StockLevel(Base):
     """Nivel de stock de un producto en un almacén."""
 
     __tablename__ = "stock_levels"
+    __table_args__ = (
+        Index("uq_stock_levels_product_warehouse", "product_id", "warehouse_id", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
@@ -1,15 +1,16 @@
 """
 Router de clientes.
-Endpoints: GET/POST /customers, PUT/DELETE /customers/{id}
+Endpoints: GET/POST /customers, GET /customers/page, PUT/DELETE /customers/{id}
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, require_permission, require_role
+from app.core.deps import get_db, get_read_db, require_permission, require_role
+from app.core.pagination import SortKey, apply_keyset, build_page
 from app.models.customer import Customer
-from app.schemas.customer import CustomerCreate, CustomerOut, CustomerUpdate
+from app.schemas.customer import CustomerCreate, CustomerOut, CustomerPageOut, CustomerUpdate
 from app.services.catalog.customers_service import CustomersService
 
 router = APIRouter(
@@ -18,6 +19,12 @@ router = APIRouter(
     dependencies=[Depends(require_role("admin", "cashier"))],
 )
 
+# Orden alfabético estable; usa ix_customers_name (el rowid desempata).
+CUSTOMER_SORT_KEYS = (
+    SortKey("name", Customer.name),
+    SortKey("id", Customer.id),
+)
+
 
 @router.get(
     "",
@@ -27,7 +34,7 @@ router = APIRouter(
 async def list_customers(
     limit: int = 200,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Lista todos los clientes."""
     stmt = (
@@ -40,6 +47,28 @@ async def list_customers(
     return result.scalars().all()
 
 
+@router.get(
+    "/page",
+    response_model=CustomerPageOut,
+    dependencies=[Depends(require_permission("customers.read"))],
+)
+async def list_customers_page(
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Lista clientes por nombre con paginación por cursor."""
+    stmt = apply_keyset(select(Customer), CUSTOMER_SORT_KEYS, limit=limit, cursor=cursor)
+    result = await db.execute(stmt)
+    page = build_page(list(result.scalars().all()), CUSTOMER_SORT_KEYS, limit=limit)
+    return CustomerPageOut(
+        items=[CustomerOut.model_validate(row) for row in page.items],
+        limit=limit,
+        has_more=page.has_more,
+        next_cursor=page.next_cursor,
+    )
+
+
 @router.post(
     "",
     response_model=CustomerOut,
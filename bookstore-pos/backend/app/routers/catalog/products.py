@@ -3,6 +3,7 @@ Router de productos del catálogo.
 
 Endpoints para:
 - Listar productos con búsqueda inteligente
+- Listar productos por páginas con cursor (keyset)
 - Listar categorías
 - Obtener producto individual
 - Crear, actualizar y eliminar productos
@@ -10,28 +11,43 @@ Endpoints para:
 La búsqueda inteligente incluye:
 - Búsqueda por nombre, autor, editorial, categoría, tags
 - Búsqueda por código SKU, ISBN, código de barras
+- Lectura exacta de códigos (escáner) por índice, con respaldo difuso
 - Expansión automática de términos relacionados
 - Ranking de relevancia
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import and_, case, or_, select
+from weakref import WeakKeyDictionary
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Integer, and_, case, or_, select, text
+from sqlalchemy import column as sql_column
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_current_user, get_db, require_permission
+from app.core.catalog_cache import catalog_cache
+from app.core.config import settings
+from app.core.deps import get_current_user, get_db, get_read_db, require_permission
+from app.core.pagination import SortKey, apply_keyset, build_page
 from app.core.search import (
-    compact_column,
+    FTS_TRIGRAM_MIN_LENGTH,
     compact_search_text,
+    fts_phrase,
+    looks_like_code,
     normalize_search_text,
-    normalized_column,
     split_search_terms,
 )
-from app.models.product import Product
-from app.schemas.product import ProductCreate, ProductOut, ProductUpdate
+from app.models.product import PRODUCT_FTS_TABLE, Product
+from app.schemas.product import ProductCreate, ProductOut, ProductPageOut, ProductUpdate
 from app.services.catalog.products_service import ProductsService
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+# Orden del listado paginado sin búsqueda; usa ix_products_name (el rowid desempata).
+PRODUCT_NAME_SORT_KEYS = (
+    SortKey("name", Product.name),
+    SortKey("id", Product.id),
+)
+
 # Grupos de términos relacionados para búsqueda expandida
 # Si el usuario busca "cuaderno", también encontrará "libreta", "notebook", etc.
 TERM_GROUPS: list[list[str]] = [
@@ -116,22 +132,41 @@ PRODUCT_STOP_WORDS = {
     "y",
 }
 
-# Campos de texto para búsqueda (nombre campo, columna, peso)
+# Campos de texto para búsqueda (nombre campo, columna normalizada, peso)
 PRODUCT_TEXT_FIELDS = (
-    ("name", Product.name, 90),
-    ("author", Product.author, 60),
-    ("publisher", Product.publisher, 46),
-    ("category", Product.category, 42),
-    ("tags", Product.tags, 48),
+    ("name", Product.search_name, 90),
+    ("author", Product.search_author, 60),
+    ("publisher", Product.search_publisher, 46),
+    ("category", Product.search_category, 42),
+    ("tags", Product.search_tags, 48),
 )
 
-# Campos de código para búsqueda (nombre campo, columna, peso)
+# Campos de código para búsqueda (nombre campo, columna compacta, peso)
 PRODUCT_CODE_FIELDS = (
-    ("sku", Product.sku, 95),
-    ("isbn", Product.isbn, 108),
-    ("barcode", Product.barcode, 105),
-    ("shelf_location", Product.shelf_location, 28),
+    ("sku", Product.search_sku, 95),
+    ("isbn", Product.search_isbn, 108),
+    ("barcode", Product.search_barcode, 105),
+    ("shelf_location", Product.search_shelf_location, 28),
+)
+
+# Filtros de columnas FTS5 para términos de texto y de código
+_FTS_TEXT_FILTER = "{" + " ".join(col.key for _, col, _ in PRODUCT_TEXT_FIELDS) + "}"
+_FTS_CODE_FILTER = "{" + " ".join(col.key for _, col, _ in PRODUCT_CODE_FIELDS) + "}"
+
+# Columnas compactas indexadas para lectura exacta de códigos, por prioridad
+PRODUCT_EXACT_CODE_FIELDS = (
+    ("barcode", Product.search_barcode),
+    ("isbn", Product.search_isbn),
+    ("sku", Product.search_sku),
 )
+# Máximo de candidatos con la misma forma compacta (ej: "AB-1" y "AB1")
+CODE_LOOKUP_CANDIDATES = 5
+# Puntaje extra del producto cuyo código coincide exactamente con la búsqueda:
+# encabeza el ranking sin ocultar las demás coincidencias.
+EXACT_CODE_SCORE = 100_000
+
+# Motores donde existe la tabla FTS de productos (se consulta una vez por engine)
+_fts_available: WeakKeyDictionary[Engine, bool] = WeakKeyDictionary()
 
 
 def _prepare_tokens(search: str) -> list[str]:
@@ -179,26 +214,171 @@ def _build_search_clause(term: str):
         term: Término a buscar.
 
     Returns:
-        Cláusula SQL con LIKE para todos los campos.
+        Cláusula SQL con LIKE sobre las columnas espejo normalizadas.
     """
     normalized_term = normalize_search_text(term)
     compact_term = compact_search_text(term)
     normalized_pattern = f"%{normalized_term}%"
     clauses = [
-        normalized_column(column).like(normalized_pattern)
-        for _, column, _ in (*PRODUCT_TEXT_FIELDS, *PRODUCT_CODE_FIELDS)
+        column.like(normalized_pattern) for _, column, _ in PRODUCT_TEXT_FIELDS
     ]
     if compact_term:
         compact_pattern = f"%{compact_term}%"
         clauses.extend(
-            compact_column(column).like(compact_pattern)
-            for _, column, _ in PRODUCT_CODE_FIELDS
+            column.like(compact_pattern) for _, column, _ in PRODUCT_CODE_FIELDS
         )
     return or_(*clauses)
 
 
+def _build_fts_term(term: str) -> str | None:
+    """
+    Traduce un término a una expresión MATCH de FTS5.
+
+    El tokenizador trigram no indexa subcadenas de menos de tres caracteres;
+    en ese caso devuelve None y la búsqueda usa LIKE.
+
+    Args:
+        term: Término a buscar.
+
+    Returns:
+        Expresión MATCH o None si el término es demasiado corto.
+    """
+    normalized_term = normalize_search_text(term)
+    compact_term = compact_search_text(term)
+    if len(normalized_term) < FTS_TRIGRAM_MIN_LENGTH:
+        return None
+    if compact_term and len(compact_term) < FTS_TRIGRAM_MIN_LENGTH:
+        return None
+    expression = f"{_FTS_TEXT_FILTER} : {fts_phrase(normalized_term)}"
+    if compact_term:
+        expression += f" OR {_FTS_CODE_FILTER} : {fts_phrase(compact_term)}"
+    return f"({expression})"
+
+
+def _build_fts_query(tokens: list[str], related_tokens: list[str]) -> str | None:
+    """
+    Construye la consulta FTS5 equivalente a la búsqueda por LIKE.
+
+    Args:
+        tokens: Tokens que deben coincidir todos.
+        related_tokens: Tokens expandidos que bastan por sí solos.
+
+    Returns:
+        Consulta MATCH o None si algún término no puede usar el índice.
+    """
+    strict_terms = [_build_fts_term(token) for token in tokens]
+    related_terms = [_build_fts_term(token) for token in related_tokens]
+    terms = [*strict_terms, *related_terms]
+    if not strict_terms or any(term is None for term in terms):
+        return None
+    query = " AND ".join(term for term in strict_terms if term)
+    if related_terms:
+        query = " OR ".join([f"({query})", *[term for term in related_terms if term]])
+    return query
+
+
+def _build_match_clause(tokens: list[str], related_tokens: list[str], use_fts: bool):
+    """
+    Construye el filtro de candidatos de la búsqueda.
+
+    Con FTS5 disponible el filtro es una consulta al índice; si no, recurre a
+    LIKE sobre las columnas espejo.
+
+    Args:
+        tokens: Tokens que deben coincidir todos.
+        related_tokens: Tokens expandidos (búsqueda inteligente).
+        use_fts: Si la base tiene índice FTS5 de productos.
+
+    Returns:
+        Cláusula SQL para el WHERE.
+    """
+    fts_query = _build_fts_query(tokens, related_tokens) if use_fts else None
+    if fts_query is not None:
+        candidates = (
+            text(
+                f"SELECT rowid FROM {PRODUCT_FTS_TABLE} "
+                f"WHERE {PRODUCT_FTS_TABLE} MATCH :fts_query"
+            )
+            .bindparams(fts_query=fts_query)
+            .columns(sql_column("rowid", Integer))
+        )
+        return Product.id.in_(candidates)
+
+    strict_match = and_(*[_build_search_clause(token) for token in tokens])
+    if not related_tokens:
+        return strict_match
+    return or_(
+        strict_match,
+        *[_build_search_clause(token) for token in related_tokens],
+    )
+
+
+async def _product_fts_available(db: AsyncSession) -> bool:
+    """Indica si la base tiene el índice FTS5 de productos (solo SQLite)."""
+    bind = db.get_bind()
+    if bind.dialect.name != "sqlite":
+        return False
+    engine = bind.engine
+    available = _fts_available.get(engine)
+    if available is None:
+        result = await db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": PRODUCT_FTS_TABLE},
+        )
+        available = result.scalar_one_or_none() is not None
+        _fts_available[engine] = available
+    return available
+
+
+async def _find_by_code(db: AsyncSession, code: str) -> Product | None:
+    """
+    Busca un producto por código exacto (código de barras, ISBN o SKU).
+
+    Un código guardado tal cual se resuelve primero en la caché de catálogo
+    y solo se lee la fila por id (el stock no está en la caché). Si no,
+    compara la forma compacta del código contra columnas indexadas en una
+    sola consulta, así "978-612-0000001" encuentra el ISBN guardado sin
+    guiones. Si varios productos comparten la forma compacta, gana el que
+    coincide literalmente y luego el campo de mayor prioridad.
+
+    Args:
+        db: Sesión de base de datos.
+        code: Código leído o tipeado.
+
+    Returns:
+        Producto encontrado o None.
+    """
+    raw_code = (code or "").strip()
+    compact_code = compact_search_text(raw_code)
+    if not compact_code:
+        return None
+    if settings.catalog_cache_enabled:
+        entry = catalog_cache.get_by_code(raw_code)
+        if entry is not None:
+            product = await db.get(Product, entry.id)
+            if product is not None:
+                return product
+    result = await db.execute(
+        select(Product)
+        .where(or_(*[column == compact_code for _, column in PRODUCT_EXACT_CODE_FIELDS]))
+        .limit(CODE_LOOKUP_CANDIDATES)
+    )
+    candidates = result.scalars().all()
+    if not candidates:
+        return None
+
+    def _rank(product: Product) -> tuple[int, int]:
+        for priority, (field_name, code_column) in enumerate(PRODUCT_EXACT_CODE_FIELDS):
+            if getattr(product, code_column.key) == compact_code:
+                literal = (getattr(product, field_name) or "").lower() == raw_code.lower()
+                return (0 if literal else 1, priority)
+        return (2, len(PRODUCT_EXACT_CODE_FIELDS))
+
+    return min(candidates, key=_rank)
+
+
 def _build_score_expression(
-    search: str, raw_tokens: list[str], expanded_tokens: list[str]
+    search: str, raw_tokens: list[str], expanded_tokens: list[str], stock_bonus: bool = True
 ):
     """
     Construye expresión de puntuación para ordenar resultados por relevancia.
@@ -214,6 +394,7 @@ def _build_score_expression(
         search: Texto de búsqueda original.
         raw_tokens: Tokens originales.
         expanded_tokens: Tokens expandidos.
+        stock_bonus: Sumar el bonus por stock (no se usa en el orden por cursor).
 
     Returns:
         Expresión SQL para calcular score de relevancia.
@@ -226,27 +407,27 @@ def _build_score_expression(
     for _, column, weight in PRODUCT_CODE_FIELDS:
         if compact_query:
             score += case(
-                (compact_column(column) == compact_query, weight * 6), else_=0
+                (column == compact_query, weight * 6), else_=0
             )
             score += case(
-                (compact_column(column).like(f"{compact_query}%"), weight * 5), else_=0
+                (column.like(f"{compact_query}%"), weight * 5), else_=0
             )
             score += case(
-                (compact_column(column).like(f"%{compact_query}%"), weight * 4), else_=0
+                (column.like(f"%{compact_query}%"), weight * 4), else_=0
             )
 
     # Puntuación para campos de texto
     for _, column, weight in PRODUCT_TEXT_FIELDS:
         if normalized_query:
             score += case(
-                (normalized_column(column) == normalized_query, weight * 5), else_=0
+                (column == normalized_query, weight * 5), else_=0
             )
             score += case(
-                (normalized_column(column).like(f"{normalized_query}%"), weight * 4),
+                (column.like(f"{normalized_query}%"), weight * 4),
                 else_=0,
             )
             score += case(
-                (normalized_column(column).like(f"%{normalized_query}%"), weight * 3),
+                (column.like(f"%{normalized_query}%"), weight * 3),
                 else_=0,
             )
 
@@ -257,24 +438,24 @@ def _build_score_expression(
         for _, column, weight in PRODUCT_CODE_FIELDS:
             if compact_token:
                 score += case(
-                    (compact_column(column) == compact_token, weight * 6), else_=0
+                    (column == compact_token, weight * 6), else_=0
                 )
                 score += case(
-                    (compact_column(column).like(f"{compact_token}%"), weight * 5),
+                    (column.like(f"{compact_token}%"), weight * 5),
                     else_=0,
                 )
                 score += case(
-                    (compact_column(column).like(f"%{compact_token}%"), weight * 4),
+                    (column.like(f"%{compact_token}%"), weight * 4),
                     else_=0,
                 )
 
         for _, column, weight in PRODUCT_TEXT_FIELDS:
-            score += case((normalized_column(column) == token, weight * 5), else_=0)
+            score += case((column == token, weight * 5), else_=0)
             score += case(
-                (normalized_column(column).like(f"{token}%"), weight * 4), else_=0
+                (column.like(f"{token}%"), weight * 4), else_=0
             )
             score += case(
-                (normalized_column(column).like(f"%{token}%"), weight * 3), else_=0
+                (column.like(f"%{token}%"), weight * 3), else_=0
             )
 
     # Puntuación para tokens expandidos (menor peso)
@@ -288,7 +469,7 @@ def _build_score_expression(
                 else max(int(weight * 0.7), 1)
             )
             score += case(
-                (normalized_column(column).like(f"%{token}%"), related_weight), else_=0
+                (column.like(f"%{token}%"), related_weight), else_=0
             )
 
     # Bonus por coincidencia de todos los tokens
@@ -297,16 +478,67 @@ def _build_score_expression(
         score += case((and_(*raw_token_clauses), 64 + (len(raw_tokens) * 16)), else_=0)
 
     # Bonus por productos en stock
-    score += case((Product.stock > 0, 4), else_=0)
+    if stock_bonus:
+        score += case((Product.stock > 0, 4), else_=0)
     return score
 
 
+async def _filtered_products_statement(
+    db: AsyncSession,
+    search: str | None,
+    category: str | None,
+    in_stock: bool | None,
+    smart: bool,
+    exact_id: int | None = None,
+    stock_bonus: bool = True,
+):
+    """
+    Consulta de productos con filtros y coincidencia de búsqueda, sin orden.
+
+    exact_id es el producto que _find_by_code resolvió para la búsqueda: se
+    incluye aunque la búsqueda difusa no lo encuentre y queda primero.
+
+    Returns:
+        Tupla (consulta, expresión de score). El score es None cuando no hay
+        términos de búsqueda y el orden lo decide quien llama.
+    """
+    stmt = select(Product)
+
+    if category:
+        stmt = stmt.where(Product.category == category)
+    if in_stock:
+        stmt = stmt.where(Product.stock > 0)
+
+    if not search:
+        return stmt, None
+    tokens = _prepare_tokens(search)
+    if not tokens:
+        return stmt, None
+    expanded_tokens = _expand_tokens(tokens) if smart else tokens
+    related_tokens = [token for token in expanded_tokens if token not in tokens]
+    use_fts = await _product_fts_available(db)
+    match = _build_match_clause(tokens, related_tokens, use_fts)
+    score = _build_score_expression(search, tokens, expanded_tokens, stock_bonus)
+    if exact_id is not None:
+        match = or_(match, Product.id == exact_id)
+        score = score + case((Product.id == exact_id, EXACT_CODE_SCORE), else_=0)
+    return stmt.where(match), score
+
+
+async def _exact_code_id(db: AsyncSession, search: str | None) -> int | None:
+    """ID del producto con ese código exacto si la búsqueda parece un código."""
+    if not search or not looks_like_code(search):
+        return None
+    product = await _find_by_code(db, search)
+    return product.id if product is not None else None
+
+
 @router.get(
     "/categories",
     response_model=list[str],
     dependencies=[Depends(require_permission("products.read"))],
 )
-async def list_product_categories(db: AsyncSession = Depends(get_db)):
+async def list_product_categories(db: AsyncSession = Depends(get_read_db)):
     """
     Lista todas las categorías de productos disponibles.
 
@@ -323,12 +555,99 @@ async def list_product_categories(db: AsyncSession = Depends(get_db)):
     return [row[0] for row in result.fetchall()]
 
 
+@router.get(
+    "/lookup",
+    response_model=ProductOut,
+    dependencies=[Depends(require_permission("products.read"))],
+)
+async def lookup_product_by_code(code: str, db: AsyncSession = Depends(get_read_db)):
+    """
+    Resuelve un código escaneado (código de barras, ISBN o SKU) a un producto.
+
+    Usa solo índices exactos; el cliente debe recurrir a la búsqueda
+    difusa de /products si responde 404.
+
+    Args:
+        code: Código leído por el escáner.
+        db: Sesión de base de datos.
+
+    Returns:
+        Datos del producto.
+
+    Raises:
+        HTTPException 404: Si ningún producto tiene ese código.
+    """
+    product = await _find_by_code(db, code)
+    if not product:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    return product
+
+
+@router.get(
+    "/page",
+    response_model=ProductPageOut,
+    dependencies=[Depends(require_permission("products.read"))],
+)
+async def list_products_page(
+    search: str | None = None,
+    category: str | None = None,
+    in_stock: bool | None = None,
+    smart: bool = False,
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Lista productos con paginación por cursor.
+
+    Sin búsqueda el orden es (nombre, id); con búsqueda, (relevancia desc,
+    id desc). La relevancia aquí no suma el bonus por stock del listado
+    clásico: el stock cambia con cada venta y una fila que cambiara de
+    posición entre páginas se saltaría o repetiría. next_cursor continúa
+    desde la última fila entregada, por lo que las altas concurrentes no
+    duplican ni saltan productos entre páginas.
+    Un producto con el código exacto buscado encabeza la primera página.
+    """
+    exact_id = await _exact_code_id(db, search)
+    stmt, score = await _filtered_products_statement(
+        db, search, category, in_stock, smart, exact_id=exact_id, stock_bonus=False
+    )
+    if score is None:
+        stmt = apply_keyset(stmt, PRODUCT_NAME_SORT_KEYS, limit=limit, cursor=cursor)
+        result = await db.execute(stmt)
+        page = build_page(list(result.scalars().all()), PRODUCT_NAME_SORT_KEYS, limit=limit)
+        products = page.items
+    else:
+        keys = (
+            SortKey("score", score, descending=True, value_type=int),
+            SortKey("id", Product.id, descending=True),
+        )
+        stmt = apply_keyset(
+            stmt.add_columns(score.label("score")), keys, limit=limit, cursor=cursor
+        )
+        result = await db.execute(stmt)
+        page = build_page(
+            result.all(),
+            keys,
+            limit=limit,
+            key_values=lambda row: (row.score, row.Product.id),
+        )
+        products = [row.Product for row in page.items]
+
+    return ProductPageOut(
+        items=[ProductOut.model_validate(product) for product in products],
+        limit=limit,
+        has_more=page.has_more,
+        next_cursor=page.next_cursor,
+    )
+
+
 @router.get(
     "/{product_id}",
     response_model=ProductOut,
     dependencies=[Depends(require_permission("products.read"))],
 )
-async def get_product(product_id: int, db: AsyncSession = Depends(get_db)):
+async def get_product(product_id: int, db: AsyncSession = Depends(get_read_db)):
     """
     Obtiene un producto por su ID.
 
@@ -361,7 +680,7 @@ async def list_products(
     smart: bool = False,
     limit: int = 200,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Lista productos con filtros opcionales y búsqueda inteligente.
@@ -373,6 +692,10 @@ async def list_products(
     - smart: Búsqueda expandida con términos relacionados.
     - limit/offset: Paginación.
 
+    Si search parece un código (ej: lectura de escáner) se resuelve además la
+    coincidencia exacta por índice y ese producto encabeza los resultados de
+    la búsqueda difusa, que se devuelven igual (respetando limit).
+
     La búsqueda inteligente:
     - Elimina palabras comunes (stop words)
     - Normaliza texto (acentos, mayúsculas)
@@ -391,37 +714,12 @@ async def list_products(
     Returns:
         Lista de productos.
     """
-    stmt = select(Product)
-
-    if category:
-        stmt = stmt.where(Product.category == category)
-    if in_stock:
-        stmt = stmt.where(Product.stock > 0)
-
-    if search:
-        tokens = _prepare_tokens(search)
-        if tokens:
-            strict_match = and_(*[_build_search_clause(token) for token in tokens])
-            expanded_tokens = _expand_tokens(tokens) if smart else tokens
-            related_tokens = [token for token in expanded_tokens if token not in tokens]
-
-            if smart and related_tokens:
-                stmt = stmt.where(
-                    or_(
-                        strict_match,
-                        *[_build_search_clause(token) for token in related_tokens],
-                    )
-                )
-            else:
-                stmt = stmt.where(strict_match)
-
-            stmt = stmt.order_by(
-                _build_score_expression(search, tokens, expanded_tokens).desc(),
-                Product.stock.desc(),
-                Product.id.desc(),
-            )
-        else:
-            stmt = stmt.order_by(Product.id.desc())
+    exact_id = await _exact_code_id(db, search)
+    stmt, score = await _filtered_products_statement(
+        db, search, category, in_stock, smart, exact_id=exact_id
+    )
+    if score is not None:
+        stmt = stmt.order_by(score.desc(), Product.stock.desc(), Product.id.desc())
     else:
         stmt = stmt.order_by(Product.id.desc())
 
@@ -3,11 +3,9 @@ Router de inventario.
 Endpoints: POST /inventory/movement, /upload, /import-jobs, GET /inventory/kardex/{id}
 """
 
-import base64
 import csv
 import os
 import tempfile
-from datetime import datetime
 from io import BytesIO, StringIO
 
 from fastapi import (
@@ -21,11 +19,14 @@ from fastapi import (
     UploadFile,
 )
 from fastapi.responses import PlainTextResponse, StreamingResponse
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.deps import get_current_user, get_db, require_permission, require_role
+from app.core.dates import business_day_bounds, parse_day
+from app.core.deps import get_current_user, get_db, get_read_db, require_permission, require_role
+from app.core.kardex import window_balances
+from app.core.pagination import SortKey, apply_keyset, build_page
 from app.models.inventory import InventoryImportJob, StockMovement
 from app.schemas.inventory import (
     InventoryImportJobErrorOut,
@@ -49,6 +50,10 @@ router = APIRouter(
 
 REQUIRED_COLUMNS = {"sku", "name", "category", "price", "cost", "stock", "stock_min"}
 SUPPORTED_FILE_TYPES = {"csv", "xlsx"}
+KARDEX_SORT_KEYS = (
+    SortKey("created_at", StockMovement.created_at, descending=True),
+    SortKey("id", StockMovement.id, descending=True),
+)
 
 
 def _detect_file_type(filename: str | None) -> str:
@@ -62,33 +67,6 @@ def _detect_file_type(filename: str | None) -> str:
     raise HTTPException(status_code=400, detail="Formato no soportado. Use CSV o XLSX")
 
 
-def _encode_cursor(item: StockMovementOut) -> str:
-    payload = f"{item.created_at.isoformat()}|{item.id}"
-    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("utf-8")
-
-
-def _decode_cursor(cursor: str) -> tuple[datetime, int]:
-    try:
-        decoded = base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8")
-        timestamp, raw_id = decoded.rsplit("|", 1)
-        return datetime.fromisoformat(timestamp), int(raw_id)
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail="Cursor invalido") from exc
-
-
-def _validate_date(value: str | None, field_name: str) -> str | None:
-    if value is None:
-        return None
-    try:
-        datetime.strptime(value, "%Y-%m-%d")
-    except ValueError as exc:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Filtro '{field_name}' invalido. Formato esperado YYYY-MM-DD",
-        ) from exc
-    return value
-
-
 async def _read_upload_rows(file: UploadFile) -> list[dict]:
     filename = file.filename or ""
     file_type = _detect_file_type(filename)
@@ -326,43 +304,31 @@ async def get_kardex(
     from_date: str | None = Query(default=None, alias="from"),
     to_date: str | None = Query(default=None, alias="to"),
     movement_type: str | None = Query(default=None, alias="type"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    safe_from = _validate_date(from_date, "from")
-    safe_to = _validate_date(to_date, "to")
+    from_day = parse_day(from_date, "from") if from_date is not None else None
+    to_day = parse_day(to_date, "to") if to_date is not None else None
+    start, end = business_day_bounds(from_day, to_day)
 
+    # Rango semiabierto sobre ix_stock_movements_product_created_id.
     stmt = select(StockMovement).where(StockMovement.product_id == product_id)
-    if safe_from:
-        stmt = stmt.where(func.date(StockMovement.created_at) >= safe_from)
-    if safe_to:
-        stmt = stmt.where(func.date(StockMovement.created_at) <= safe_to)
+    if start is not None:
+        stmt = stmt.where(StockMovement.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(StockMovement.created_at < end)
     if movement_type:
         normalized = movement_type.strip().upper()
         if normalized not in {"IN", "OUT", "ADJ", "TRF"}:
             raise HTTPException(status_code=400, detail="Filtro 'type' invalido")
         stmt = stmt.where(StockMovement.type == normalized)
-    if cursor:
-        cursor_created_at, cursor_id = _decode_cursor(cursor)
-        stmt = stmt.where(
-            or_(
-                StockMovement.created_at < cursor_created_at,
-                and_(
-                    StockMovement.created_at == cursor_created_at,
-                    StockMovement.id < cursor_id,
-                ),
-            )
-        )
-
-    result = await db.execute(
-        stmt.order_by(StockMovement.created_at.desc(), StockMovement.id.desc()).limit(
-            limit + 1
-        )
-    )
-    rows = list(result.scalars().all())
-    has_more = len(rows) > limit
-    visible = rows[:limit]
-    items = [StockMovementOut.model_validate(row) for row in visible]
-    next_cursor = _encode_cursor(items[-1]) if has_more and items else None
+    result = await db.execute(apply_keyset(stmt, KARDEX_SORT_KEYS, limit=limit, cursor=cursor))
+    page = build_page(list(result.scalars().all()), KARDEX_SORT_KEYS, limit=limit)
+    opening_balance, closing_balance = await window_balances(db, product_id, start, end)
     return KardexPageOut(
-        items=items, limit=limit, has_more=has_more, next_cursor=next_cursor
+        items=[StockMovementOut.model_validate(row) for row in page.items],
+        limit=limit,
+        has_more=page.has_more,
+        next_cursor=page.next_cursor,
+        opening_balance=opening_balance,
+        closing_balance=closing_balance,
     )
@@ -1,24 +1,40 @@
 """
 Router de impresión de documentos.
-Endpoints: GET /printing/receipt-text/{id}, /escpos/{id}, /document/{id}/html, /document/{id}/pdf
+Endpoints: GET /printing/receipt-text/{id}, /escpos/{id}, /document/{id}/html, /document/{id}/pdf,
+POST /printing/batch-jobs, GET /printing/batch-jobs/{id}, /batch-jobs/{id}/download
 """
 
-from datetime import datetime
+import inspect
+import os
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from html import escape
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, require_permission, require_role
+from app.core.deps import get_current_user, get_db, require_permission, require_role
+from app.core.render_cache import etag_for, etag_matches, render_cache, render_fingerprint
+from app.core.render_pool import render_pool
+from app.models.document_batch_job import DocumentBatchJob
 from app.models.sale import SaleItem
+from app.schemas.document_batch import DocumentBatchJobCreate, DocumentBatchJobOut
 from app.services.pos.printing_service import PrintingService
 from app.services.printing_templates import (
+    DocumentBatchJobService,
     DocumentRenderService,
     DocumentSnapshotService,
     TemplateService,
 )
+from app.services.printing_templates import pdf_render
+from app.services.printing_templates.document_batch_service import (
+    NO_DOCUMENTS_MESSAGE,
+    legal_document_fingerprint,
+    run_document_batch_job,
+)
+from app.services.printing_templates.pdf_render import RENDER_VERSION, fmt_issue_date, fmt_money
 
 router = APIRouter(
     prefix="/printing",
@@ -27,7 +43,6 @@ router = APIRouter(
 )
 logger = logging.getLogger("bookstore")
 
-
 def _line_width(paper_width_mm: int) -> int:
     return 32 if paper_width_mm <= 58 else 48
 
@@ -125,29 +140,9 @@ def _to_escpos(lines: list[str]) -> bytes:
     return bytes(payload)
 
 
-def _fmt_money(value: float | int | str | None) -> str:
-    if value is None:
-        return "0.00"
-    try:
-        return f"{float(value):.2f}"
-    except (TypeError, ValueError):
-        return "0.00"
-
-
-def _fmt_issue_date(value: object) -> str:
-    raw = str(value or "").strip()
-    if not raw:
-        return ""
-    try:
-        parsed = datetime.fromisoformat(raw.replace("Z", "+00:00"))
-        return parsed.strftime("%Y-%m-%d %H:%M")
-    except ValueError:
-        return raw
-
-
 def _legal_document_text(context: dict, document_type: str) -> str:
     company_name = str(context.get("company_name") or "Libreria Belen")
-    issue_date = _fmt_issue_date(context.get("issue_date"))
+    issue_date = fmt_issue_date(context.get("issue_date"))
     number = str(context.get("document_number") or "")
     customer_name = str(context.get("customer_name") or "PUBLICO GENERAL")
     customer_tax_id = str(context.get("customer_tax_id") or "-")
@@ -168,17 +163,17 @@ def _legal_document_text(context: dict, document_type: str) -> str:
     for item in items:
         name = str(item.get("name") or "Producto")
         qty = int(item.get("qty") or 0)
-        unit_price = _fmt_money(item.get("unit_price"))
-        line_total = _fmt_money(item.get("line_total"))
+        unit_price = fmt_money(item.get("unit_price"))
+        line_total = fmt_money(item.get("line_total"))
         lines.append(f"{name} | {qty} x {unit_price} = {line_total}")
 
     lines.extend(
         [
             "",
-            f"Subtotal: {_fmt_money(context.get('subtotal'))}",
-            f"Impuesto: {_fmt_money(context.get('tax'))}",
-            f"Descuento: {_fmt_money(context.get('discount'))}",
-            f"Total: {_fmt_money(context.get('total'))}",
+            f"Subtotal: {fmt_money(context.get('subtotal'))}",
+            f"Impuesto: {fmt_money(context.get('tax'))}",
+            f"Descuento: {fmt_money(context.get('discount'))}",
+            f"Total: {fmt_money(context.get('total'))}",
         ]
     )
     return "\n".join(lines)
@@ -192,7 +187,7 @@ def _build_legal_document_html(
     company_address = escape(str(context.get("company_address") or "Jr. Conchucos 120"))
     company_phone = escape(str(context.get("company_phone") or "Telefono: 947 872 207"))
     company_tax_id = escape(str(context.get("company_tax_id") or ""))
-    issue_date = escape(_fmt_issue_date(context.get("issue_date")))
+    issue_date = escape(fmt_issue_date(context.get("issue_date")))
     document_number = escape(str(context.get("document_number") or ""))
     customer_code = escape(str(context.get("customer_tax_id") or "-"))
     customer_name = escape(str(context.get("customer_name") or "PUBLICO GENERAL"))
@@ -213,8 +208,8 @@ def _build_legal_document_html(
     for item in items:
         name = escape(str(item.get("name") or "Producto"))
         qty = int(item.get("qty") or 0)
-        unit_price = _fmt_money(item.get("unit_price"))
-        line_total = _fmt_money(item.get("line_total"))
+        unit_price = fmt_money(item.get("unit_price"))
+        line_total = fmt_money(item.get("line_total"))
         item_rows.append(
             "<tr>"
             f"<td>{name}</td>"
@@ -227,11 +222,11 @@ def _build_legal_document_html(
     if not item_rows:
         item_rows.append("<tr><td colspan='4' class='empty'>Sin productos</td></tr>")
 
-    subtotal = _fmt_money(context.get("subtotal"))
-    tax = _fmt_money(context.get("tax"))
-    discount = _fmt_money(context.get("discount"))
-    total = _fmt_money(context.get("total"))
-    tax_rate_str = _fmt_money(tax_rate)
+    subtotal = fmt_money(context.get("subtotal"))
+    tax = fmt_money(context.get("tax"))
+    discount = fmt_money(context.get("discount"))
+    total = fmt_money(context.get("total"))
+    tax_rate_str = fmt_money(tax_rate)
 
     return f"""
 <div class="doc-shell">
@@ -490,329 +485,23 @@ def _build_legal_document_html(
 """.strip()
 
 
-def _build_legal_document_pdf(
-    context: dict, document_type: str, tax_rate: float
-) -> bytes:
-    try:
-        from io import BytesIO
-
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib.units import mm
-        from reportlab.pdfgen import canvas
-    except Exception as exc:  # pragma: no cover
-        raise HTTPException(
-            status_code=500, detail=f"No se pudo generar PDF legal: {exc}"
-        ) from exc
-
-    def _safe_int(value: float | int | str | None, default: int = 0) -> int:
-        if value is None:
-            return default
-        try:
-            return int(value)
-        except (TypeError, ValueError):
-            return default
-
-    def _draw_text(
-        pdf: canvas.Canvas,
-        x: float,
-        y: float,
-        text: str,
-        *,
-        size: float = 10,
-        bold: bool = False,
-    ) -> None:
-        pdf.setFont("Helvetica-Bold" if bold else "Helvetica", size)
-        pdf.drawString(x, y, (text or "")[:220])
-
-    company_name = str(context.get("company_name") or "Libreria Belen")
-    header = str(context.get("receipt_header") or "Precios bajos siempre")
-    company_address = str(context.get("company_address") or "Jr. Conchucos 120")
-    company_phone = str(context.get("company_phone") or "Telefono: 947 872 207")
-    company_tax_id = str(context.get("company_tax_id") or "")
-    issue_date = _fmt_issue_date(context.get("issue_date"))
-    document_number = str(context.get("document_number") or "")
-    customer_code = str(context.get("customer_tax_id") or "-")
-    customer_name = str(context.get("customer_name") or "PUBLICO GENERAL")
-    customer_address = str(context.get("customer_address") or "-")
-    customer_email = str(context.get("customer_email") or "-")
-    comments = str(
-        context.get("receipt_footer")
-        or "Si usted tiene preguntas sobre esta factura, pongase en contacto con"
-    )
-    contact_line = str(context.get("company_phone") or "[Nombre, Telefono, E-mail]")
-
-    subtotal = _fmt_money(context.get("subtotal"))
-    tax = _fmt_money(context.get("tax"))
-    discount = _fmt_money(context.get("discount"))
-    total = _fmt_money(context.get("total"))
-    tax_rate_str = _fmt_money(tax_rate)
-
-    items = list(context.get("items") or [])
-
-    buffer = BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=A4)
-    page_w, page_h = A4
-
-    margin_x = 11 * mm
-    cursor_y = page_h - (11 * mm)
-    content_w = page_w - (2 * margin_x)
-
-    border = colors.HexColor("#D6D9DF")
-    subtle = colors.HexColor("#ECEFF4")
-    ink = colors.HexColor("#111827")
-    muted = colors.HexColor("#4B5563")
-    shade = colors.HexColor("#F3F4F6")
-
-    def _box(
-        x: float,
-        y_top: float,
-        w: float,
-        h: float,
-        *,
-        fill: bool = False,
-        fill_color=colors.white,
-        stroke=border,
-    ) -> None:
-        pdf.setStrokeColor(stroke)
-        pdf.setLineWidth(1)
-        if fill:
-            pdf.setFillColor(fill_color)
-            pdf.rect(x, y_top - h, w, h, stroke=1, fill=1)
-            pdf.setFillColor(colors.black)
-        else:
-            pdf.rect(x, y_top - h, w, h, stroke=1, fill=0)
-
-    # Header card
-    header_h = 56 * mm
-    _box(margin_x, cursor_y, content_w, header_h, fill=True, fill_color=colors.white)
-
-    type_w = 58 * mm
-    type_h = 34 * mm
-    type_x = margin_x + content_w - type_w - (5 * mm)
-    type_y = cursor_y - (5 * mm)
-    _box(type_x, type_y, type_w, type_h, fill=True, fill_color=shade, stroke=ink)
-    _draw_text(
-        pdf,
-        type_x + 10 * mm,
-        type_y - 19 * mm,
-        document_type.upper(),
-        size=22,
-        bold=True,
-    )
-
-    left_x = margin_x + 5 * mm
-    _draw_text(pdf, left_x, cursor_y - 10 * mm, company_name, size=16, bold=True)
-    pdf.setFillColor(muted)
-    _draw_text(pdf, left_x, cursor_y - 16.5 * mm, header, size=9)
-    _draw_text(pdf, left_x, cursor_y - 22 * mm, company_address, size=9)
-    _draw_text(pdf, left_x, cursor_y - 27.5 * mm, company_phone, size=9)
-    _draw_text(pdf, left_x, cursor_y - 33 * mm, company_tax_id, size=9)
-    pdf.setFillColor(ink)
-
-    meta_y = cursor_y - 39 * mm
-    meta_h = 11 * mm
-    meta_gap = 3 * mm
-    meta_w = (content_w - (10 * mm) - (2 * meta_gap)) / 3
-    meta_x0 = margin_x + 5 * mm
-
-    meta = [
-        ("Fecha", issue_date),
-        ("Nro de Factura", document_number),
-        ("Nro de Cliente", customer_code),
-    ]
-    for idx, (label, value) in enumerate(meta):
-        x = meta_x0 + idx * (meta_w + meta_gap)
-        _box(x, meta_y, meta_w, meta_h, fill=True, fill_color=colors.white)
-        pdf.setFillColor(muted)
-        _draw_text(
-            pdf, x + 2.2 * mm, meta_y - 3.6 * mm, label.upper(), size=7.2, bold=True
-        )
-        pdf.setFillColor(ink)
-        _draw_text(pdf, x + 2.2 * mm, meta_y - 8.2 * mm, value, size=8.8, bold=True)
-
-    cursor_y -= header_h + (4 * mm)
-
-    # Customer card
-    cust_h = 26 * mm
-    _box(margin_x, cursor_y, content_w, cust_h, fill=True, fill_color=colors.white)
-    _draw_text(
-        pdf, margin_x + 4 * mm, cursor_y - 5 * mm, "FACTURAR A", size=9, bold=True
-    )
-    _draw_text(
-        pdf, margin_x + 4 * mm, cursor_y - 11 * mm, customer_name, size=10, bold=True
-    )
-    pdf.setFillColor(muted)
-    _draw_text(pdf, margin_x + 4 * mm, cursor_y - 16.5 * mm, customer_address, size=9)
-    _draw_text(
-        pdf,
-        margin_x + 4 * mm,
-        cursor_y - 21.5 * mm,
-        f"Correo: {customer_email}",
-        size=9,
-    )
-    pdf.setFillColor(ink)
-
-    cursor_y -= cust_h + (4 * mm)
-
-    # Items card
-    items_h = 88 * mm
-    _box(margin_x, cursor_y, content_w, items_h, fill=True, fill_color=colors.white)
-
-    table_x = margin_x + 4 * mm
-    table_w = content_w - 8 * mm
-    header_row_h = 9 * mm
-    row_h = 7.2 * mm
-    visible_rows = 9
-
-    _box(
-        table_x,
-        cursor_y - 4 * mm,
-        table_w,
-        header_row_h,
-        fill=True,
-        fill_color=shade,
-        stroke=border,
-    )
-
-    col_desc = table_w * 0.56
-    col_qty = table_w * 0.14
-    col_unit = table_w * 0.15
-    x_desc = table_x
-    x_qty = x_desc + col_desc
-    x_unit = x_qty + col_qty
-    x_total = x_unit + col_unit
-
-    pdf.setStrokeColor(border)
-    pdf.line(
-        x_qty,
-        cursor_y - 4 * mm,
-        x_qty,
-        cursor_y - 4 * mm - (header_row_h + visible_rows * row_h),
-    )
-    pdf.line(
-        x_unit,
-        cursor_y - 4 * mm,
-        x_unit,
-        cursor_y - 4 * mm - (header_row_h + visible_rows * row_h),
-    )
-    pdf.line(
-        x_total,
-        cursor_y - 4 * mm,
-        x_total,
-        cursor_y - 4 * mm - (header_row_h + visible_rows * row_h),
-    )
-
-    _draw_text(
-        pdf, x_desc + 2 * mm, cursor_y - 9 * mm, "DESCRIPCION", size=8, bold=True
-    )
-    _draw_text(pdf, x_qty + 2 * mm, cursor_y - 9 * mm, "CANT.", size=8, bold=True)
-    _draw_text(pdf, x_unit + 2 * mm, cursor_y - 9 * mm, "P. UNIT", size=8, bold=True)
-    _draw_text(pdf, x_total + 2 * mm, cursor_y - 9 * mm, "TOTAL", size=8, bold=True)
-
-    y_row_top = cursor_y - 4 * mm - header_row_h
-    for idx in range(visible_rows):
-        y_line = y_row_top - idx * row_h
-        pdf.setStrokeColor(subtle)
-        pdf.line(table_x, y_line, table_x + table_w, y_line)
-
-    for idx, item in enumerate(items[:visible_rows]):
-        y_text = y_row_top - idx * row_h - 4.8
-        name = str(item.get("name") or "")
-        qty = _safe_int(item.get("qty"), 0)
-        unit_price = _fmt_money(item.get("unit_price"))
-        line_total = _fmt_money(item.get("line_total"))
-        _draw_text(pdf, x_desc + 2 * mm, y_text, name[:48], size=8.8)
-        _draw_text(pdf, x_qty + 2 * mm, y_text, str(qty), size=8.8)
-        _draw_text(pdf, x_unit + 2 * mm, y_text, unit_price, size=8.8)
-        _draw_text(pdf, x_total + 2 * mm, y_text, line_total, size=8.8)
-
-    cursor_y -= items_h + (4 * mm)
-
-    # Bottom card
-    bottom_h = 36 * mm
-    _box(margin_x, cursor_y, content_w, bottom_h, fill=True, fill_color=colors.white)
-
-    comments_w = content_w * 0.58
-    totals_w = content_w - comments_w - (4 * mm)
-    comments_x = margin_x + 4 * mm
-    totals_x = comments_x + comments_w + (4 * mm)
-
-    _box(
-        comments_x,
-        cursor_y - 4 * mm,
-        comments_w,
-        bottom_h - 8 * mm,
-        fill=True,
-        fill_color=colors.white,
-    )
-    _draw_text(
-        pdf, comments_x + 2.2 * mm, cursor_y - 9 * mm, "COMENTARIOS", size=8, bold=True
-    )
-    pdf.setFillColor(muted)
-    _draw_text(pdf, comments_x + 2.2 * mm, cursor_y - 15 * mm, comments[:80], size=8.5)
-    pdf.setFillColor(ink)
-
-    _box(
-        totals_x,
-        cursor_y - 4 * mm,
-        totals_w,
-        bottom_h - 8 * mm,
-        fill=True,
-        fill_color=colors.white,
-    )
-    totals_rows = [
-        ("Subtotal", subtotal),
-        ("Tasa de impuesto", tax_rate_str),
-        ("Impuesto", tax),
-        ("Descuento", discount),
-        ("Total", total),
-    ]
-    trow_h = (bottom_h - 8 * mm) / len(totals_rows)
-    for idx, (label, value) in enumerate(totals_rows):
-        y_top = cursor_y - 4 * mm - idx * trow_h
-        if idx > 0:
-            pdf.setStrokeColor(subtle)
-            pdf.line(totals_x, y_top, totals_x + totals_w, y_top)
-        _draw_text(
-            pdf,
-            totals_x + 2 * mm,
-            y_top - 5.2,
-            label,
-            size=8.8,
-            bold=(label == "Total"),
-        )
-        value_w = pdf.stringWidth(
-            value, "Helvetica-Bold" if label == "Total" else "Helvetica", 8.8
-        )
-        pdf.setFont("Helvetica-Bold" if label == "Total" else "Helvetica", 8.8)
-        pdf.drawString(totals_x + totals_w - value_w - 2 * mm, y_top - 5.2, value)
-
-    cursor_y -= bottom_h + (3 * mm)
-
-    pdf.setFillColor(muted)
-    _draw_text(pdf, margin_x + 2 * mm, cursor_y - 1.5 * mm, contact_line, size=8.5)
-    pdf.setFillColor(ink)
-    _draw_text(
-        pdf,
-        margin_x + (content_w / 2) - 23 * mm,
-        cursor_y - 7 * mm,
-        "Gracias por su compra",
-        size=10.2,
-        bold=True,
-    )
+@dataclass(frozen=True)
+class _PrintPayload:
+    html: str
+    text: str
+    document_type: str
+    document_number: str
+    # Huella de las entradas del render: base de las claves de caché y ETags.
+    fingerprint: str
+    legal_context: dict | None = None
+    tax_rate: float = 0.0
 
-    pdf.showPage()
-    pdf.save()
-    buffer.seek(0)
-    return buffer.getvalue()
+    def cache_key(self, artefact: str) -> str:
+        return f"{self.fingerprint}.{artefact}"
 
 
-async def _render_with_template(
-    db: AsyncSession, sale_id: int
-) -> tuple[str, str, str, str]:
+async def _render_with_template(db: AsyncSession, sale_id: int) -> _PrintPayload:
     render_service = DocumentRenderService(db)
-    snapshot_service = DocumentSnapshotService(db)
     context = await render_service.build_sale_context(sale_id)
     document_type = (context.get("document_type") or "TICKET").strip().upper()
     document_number = str(context.get("document_number") or "")
@@ -821,29 +510,42 @@ async def _render_with_template(
     template, schema_json = await template_service.get_active_template_with_schema(
         document_type=document_type
     )
-    html, text, warnings = render_service.render(schema_json, context)
     version = (
         await template_service.get_latest_version_model(template.id)
         if template
         else None
     )
-    await snapshot_service.upsert_snapshot(
-        sale_id=sale_id,
-        document_type=document_type,
-        document_number=document_number,
-        template_id=template.id if template else None,
-        template_version_id=version.id if version else None,
-        render_context=context,
-        render_result={"warnings": warnings},
-        rendered_html=html,
-        rendered_text=text,
+    fingerprint = render_fingerprint(
+        "template",
+        RENDER_VERSION,
+        template.id if template else None,
+        version.id if version else None,
+        schema_json,
+        context,
     )
-    return html, text, document_type, document_number
+    html_key, text_key = f"{fingerprint}.html", f"{fingerprint}.txt"
+    html_bytes, text_bytes = render_cache.get(html_key), render_cache.get(text_key)
+    if html_bytes is None or text_bytes is None:
+        html, text, warnings = render_service.render(schema_json, context)
+        render_cache.put(html_key, html.encode("utf-8"))
+        render_cache.put(text_key, text.encode("utf-8"))
+        await DocumentSnapshotService(db).upsert_snapshot(
+            sale_id=sale_id,
+            document_type=document_type,
+            document_number=document_number,
+            template_id=template.id if template else None,
+            template_version_id=version.id if version else None,
+            render_context=context,
+            render_result={"warnings": warnings},
+            rendered_html=html,
+            rendered_text=text,
+        )
+    else:
+        html, text = html_bytes.decode("utf-8"), text_bytes.decode("utf-8")
+    return _PrintPayload(html, text, document_type, document_number, fingerprint)
 
 
-async def _resolve_print_payload(
-    db: AsyncSession, sale_id: int
-) -> tuple[str, str, str, str]:
+async def _resolve_print_payload(db: AsyncSession, sale_id: int) -> _PrintPayload:
     service = PrintingService(db)
     sale, items, settings = await service.build_receipt(sale_id)
     if not sale:
@@ -855,11 +557,24 @@ async def _resolve_print_payload(
     if document_type in {"BOLETA", "FACTURA"}:
         try:
             context = await DocumentRenderService(db).build_sale_context(sale_id)
-            legal_html = _build_legal_document_html(
-                context, document_type, float(getattr(sale, "tax_rate", 0.0) or 0.0)
+            tax_rate = float(getattr(sale, "tax_rate", 0.0) or 0.0)
+            fingerprint = legal_document_fingerprint(context, document_type, tax_rate)
+            legal_html = render_cache.get_or_render_text(
+                f"{fingerprint}.html",
+                lambda: _build_legal_document_html(context, document_type, tax_rate),
+            )
+            legal_text = render_cache.get_or_render_text(
+                f"{fingerprint}.txt", lambda: _legal_document_text(context, document_type)
+            )
+            return _PrintPayload(
+                legal_html,
+                legal_text,
+                document_type,
+                sale.invoice_number or "",
+                fingerprint,
+                legal_context=context,
+                tax_rate=tax_rate,
             )
-            legal_text = _legal_document_text(context, document_type)
-            return legal_html, legal_text, document_type, sale.invoice_number or ""
         except Exception as exc:
             logger.exception(
                 "legal_document_render_failed sale_id=%s document_type=%s",
@@ -876,27 +591,54 @@ async def _resolve_print_payload(
             # fallback operativo: ante errores de plantilla seguimos con ticket clasico
             logger.exception("template_render_failed sale_id=%s", sale_id, exc_info=exc)
 
+    # El ticket clásico es barato de armar; su texto es la propia entrada de la huella.
     lines = _build_receipt_lines(sale, items or [], settings)
     text = "\n".join(lines)
     html = "<pre style='font-family:monospace;white-space:pre-wrap'>" + text + "</pre>"
     document_number = sale.invoice_number or ""
-    return html, text, document_type, document_number
+    fingerprint = render_fingerprint("ticket", RENDER_VERSION, document_type, document_number, text)
+    return _PrintPayload(html, text, document_type, document_number, fingerprint)
+
+
+async def _cached_response(
+    request: Request,
+    key: str,
+    media_type: str,
+    render: Callable[[], bytes | Awaitable[bytes]],
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Respuesta de un artefacto cacheado, con 304 si el cliente ya lo tiene."""
+    etag = etag_for(key)
+    response_headers = {"ETag": etag, "Cache-Control": "private, no-cache", **(headers or {})}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=response_headers)
+    content = render_cache.get(key)
+    if content is None:
+        rendered = render()
+        fresh: bytes = await rendered if inspect.isawaitable(rendered) else rendered
+        render_cache.put(key, fresh)
+        content = fresh
+    return Response(content=content, media_type=media_type, headers=response_headers)
 
 
 @router.get("/receipt-text/{sale_id}")
-async def receipt_text(sale_id: int, db: AsyncSession = Depends(get_db)):
-    _, text, _, _ = await _resolve_print_payload(db, sale_id)
-    return Response(content=text, media_type="text/plain")
+async def receipt_text(sale_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    payload = await _resolve_print_payload(db, sale_id)
+    return await _cached_response(
+        request, payload.cache_key("txt"), "text/plain", lambda: payload.text.encode("utf-8")
+    )
 
 
 @router.get("/escpos/{sale_id}")
-async def receipt_escpos(sale_id: int, db: AsyncSession = Depends(get_db)):
-    _, text, _, _ = await _resolve_print_payload(db, sale_id)
-    lines = text.splitlines()
-    data = _to_escpos(lines)
+async def receipt_escpos(sale_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    payload = await _resolve_print_payload(db, sale_id)
     headers = {"Content-Disposition": f'attachment; filename="ticket_{sale_id}.bin"'}
-    return Response(
-        content=data, media_type="application/octet-stream", headers=headers
+    return await _cached_response(
+        request,
+        payload.cache_key("escpos"),
+        "application/octet-stream",
+        lambda: _to_escpos(payload.text.splitlines()),
+        headers,
     )
 
 
@@ -904,56 +646,122 @@ async def receipt_escpos(sale_id: int, db: AsyncSession = Depends(get_db)):
     "/document/{sale_id}/html",
     dependencies=[Depends(require_permission("printing.documents.read"))],
 )
-async def document_html(sale_id: int, db: AsyncSession = Depends(get_db)):
-    html, _, _, _ = await _resolve_print_payload(db, sale_id)
+async def document_html(sale_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    payload = await _resolve_print_payload(db, sale_id)
     snapshot_service = DocumentSnapshotService(db)
     await snapshot_service.mark_printed(sale_id)
-    return Response(content=html, media_type="text/html")
+    return await _cached_response(
+        request, payload.cache_key("html"), "text/html", lambda: payload.html.encode("utf-8")
+    )
 
 
 @router.get(
     "/document/{sale_id}/text",
     dependencies=[Depends(require_permission("printing.documents.read"))],
 )
-async def document_text(sale_id: int, db: AsyncSession = Depends(get_db)):
-    _, text, _, _ = await _resolve_print_payload(db, sale_id)
+async def document_text(sale_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    payload = await _resolve_print_payload(db, sale_id)
     snapshot_service = DocumentSnapshotService(db)
     await snapshot_service.mark_printed(sale_id)
-    return Response(content=text, media_type="text/plain")
+    return await _cached_response(
+        request, payload.cache_key("txt"), "text/plain", lambda: payload.text.encode("utf-8")
+    )
 
 
 @router.get(
     "/document/{sale_id}/pdf",
     dependencies=[Depends(require_permission("printing.documents.read"))],
 )
-async def document_pdf(sale_id: int, db: AsyncSession = Depends(get_db)):
-    service = PrintingService(db)
-    sale, _, _ = await service.build_receipt(sale_id)
-    if not sale:
-        raise HTTPException(status_code=404, detail="Venta no encontrada")
-
-    document_type = (
-        (getattr(sale, "document_type", "TICKET") or "TICKET").strip().upper()
-    )
-    document_number = sale.invoice_number or ""
-
-    if document_type in {"BOLETA", "FACTURA"}:
-        context = await DocumentRenderService(db).build_sale_context(sale_id)
-        pdf = _build_legal_document_pdf(
-            context, document_type, float(getattr(sale, "tax_rate", 0.0) or 0.0)
-        )
-    else:
-        _, text, document_type, document_number = await _resolve_print_payload(
-            db, sale_id
-        )
-        render_service = DocumentRenderService(db)
-        pdf = render_service.render_pdf_from_text(
-            f"{document_type}_{document_number}", text
+async def document_pdf(sale_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    payload = await _resolve_print_payload(db, sale_id)
+
+    # ReportLab corre en el pool de procesos: el event loop sigue atendiendo cajas.
+    def render() -> Awaitable[bytes]:
+        if payload.legal_context is not None:
+            return render_pool.run(
+                pdf_render.build_legal_document_pdf,
+                payload.legal_context,
+                payload.document_type,
+                payload.tax_rate,
+            )
+        return render_pool.run(
+            pdf_render.render_text_pdf,
+            f"{payload.document_type}_{payload.document_number}",
+            payload.text,
         )
 
     snapshot_service = DocumentSnapshotService(db)
     await snapshot_service.mark_printed(sale_id)
     headers = {
-        "Content-Disposition": f'attachment; filename="{document_type.lower()}_{sale_id}.pdf"'
+        "Content-Disposition": f'attachment; filename="{payload.document_type.lower()}_{sale_id}.pdf"'
     }
-    return Response(content=pdf, media_type="application/pdf", headers=headers)
+    return await _cached_response(
+        request, payload.cache_key("pdf"), "application/pdf", render, headers
+    )
+
+
+def _assert_job_access(job: DocumentBatchJob, current_user) -> None:
+    if current_user.role == "admin":
+        return
+    if job.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Sin permisos")
+
+
+@router.post(
+    "/batch-jobs",
+    response_model=DocumentBatchJobOut,
+    status_code=201,
+    dependencies=[Depends(require_permission("printing.documents.read"))],
+)
+async def create_batch_job(
+    data: DocumentBatchJobCreate,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    request_id = getattr(request.state, "request_id", None)
+    service = DocumentBatchJobService(db, current_user, request_id=request_id)
+    job = await service.create_job(data)
+    background_tasks.add_task(run_document_batch_job, job.id)
+    return job
+
+
+@router.get(
+    "/batch-jobs/{job_id}",
+    response_model=DocumentBatchJobOut,
+    dependencies=[Depends(require_permission("printing.documents.read"))],
+)
+async def get_batch_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    job = await DocumentBatchJobService(db, current_user).get_job(job_id)
+    _assert_job_access(job, current_user)
+    return job
+
+
+@router.get(
+    "/batch-jobs/{job_id}/download",
+    dependencies=[Depends(require_permission("printing.documents.read"))],
+)
+async def download_batch_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    job = await DocumentBatchJobService(db, current_user).get_job(job_id)
+    _assert_job_access(job, current_user)
+    if job.status not in {"success", "partial"}:
+        raise HTTPException(status_code=409, detail="El job aun no termina")
+    if job.total_documents == 0:
+        raise HTTPException(status_code=404, detail=NO_DOCUMENTS_MESSAGE)
+    if not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=404, detail="Archivo no disponible")
+    media_type = "application/pdf" if job.output_format == "pdf" else "application/zip"
+    return FileResponse(
+        job.file_path,
+        media_type=media_type,
+        filename=f"documentos_{job.id}.{job.output_format}",
+    )
@@ -2,18 +2,20 @@
 Router de ventas del sistema POS.
 
 Endpoints para:
-- Listar ventas con filtros y búsqueda
+- Listar ventas con filtros y búsqueda (también por páginas con cursor)
 - Crear nuevas ventas
 - Obtener datos del recibo/ticket
 
 Requiere rol de admin o cashier.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import String, and_, case, func, or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import String, and_, case, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.dates import day_range_filter, parse_day
 from app.core.deps import get_current_user, get_db, require_permission, require_role
+from app.core.pagination import SortKey, apply_keyset, build_page
 from app.core.rate_limit import rate_limit
 from app.core.search import (
     compact_column,
@@ -22,12 +24,12 @@ from app.core.search import (
     normalized_column,
     split_search_terms,
 )
+from app.core.settings_snapshot import settings_snapshot
 from app.models.customer import Customer
 from app.models.product import Product
 from app.models.sale import Sale, SaleItem
-from app.models.settings import SystemSettings
 from app.models.user import User
-from app.schemas.sale import SaleCreate, SaleListOut, SaleOut
+from app.schemas.sale import SaleCreate, SaleListOut, SaleOut, SalePageOut
 from app.services.pos.sales_service import SalesService
 
 # Router con prefijo /sales, tag "sales", requiere rol admin o cashier
@@ -37,6 +39,12 @@ router = APIRouter(
     dependencies=[Depends(require_role("admin", "cashier"))],
 )
 
+# Orden del listado paginado; usa ix_sales_created_at_desc.
+SALE_SORT_KEYS = (
+    SortKey("created_at", Sale.created_at, descending=True),
+    SortKey("id", Sale.id, descending=True),
+)
+
 # Palabras stop para búsqueda de ventas
 SALES_STOP_WORDS = {
     "a",
@@ -199,6 +207,69 @@ def _build_sales_score_expression(search: str, tokens: list[str]):
     return score
 
 
+def _sales_list_statement(
+    search: str | None,
+    status: str | None,
+    from_date: str | None,
+    to_date: str | None,
+    customer_id: int | None,
+    user_id: int | None,
+):
+    """
+    Consulta del listado de ventas con filtros y búsqueda, sin orden.
+
+    Returns:
+        Tupla (consulta, expresión de score). El score es None cuando no hay
+        términos de búsqueda.
+    """
+    stmt = (
+        select(
+            Sale.id.label("id"),
+            Sale.user_id.label("user_id"),
+            Sale.customer_id.label("customer_id"),
+            User.username.label("user_name"),
+            Customer.name.label("customer_name"),
+            Customer.tax_id.label("customer_tax_id"),
+            Customer.phone.label("customer_phone"),
+            Sale.status.label("status"),
+            Sale.subtotal.label("subtotal"),
+            Sale.tax.label("tax"),
+            Sale.discount.label("discount"),
+            Sale.total.label("total"),
+            Sale.invoice_number.label("invoice_number"),
+            Sale.document_type.label("document_type"),
+            Sale.created_at.label("created_at"),
+        )
+        .select_from(Sale)
+        .outerjoin(User, User.id == Sale.user_id)
+        .outerjoin(Customer, Customer.id == Sale.customer_id)
+    )
+
+    # Aplicar filtros
+    if status:
+        stmt = stmt.where(Sale.status == status)
+    date_filter = day_range_filter(
+        Sale.created_at,
+        parse_day(from_date, "from_date") if from_date else None,
+        parse_day(to_date, "to_date") if to_date else None,
+    )
+    if date_filter is not None:
+        stmt = stmt.where(date_filter)
+    if customer_id:
+        stmt = stmt.where(Sale.customer_id == customer_id)
+    if user_id:
+        stmt = stmt.where(Sale.user_id == user_id)
+
+    # Búsqueda con ranking de relevancia
+    if not search:
+        return stmt, None
+    tokens = _prepare_sales_tokens(search)
+    if not tokens:
+        return stmt, None
+    stmt = stmt.where(and_(*[_build_sales_search_clause(token) for token in tokens]))
+    return stmt, _build_sales_score_expression(search, tokens)
+
+
 @router.get(
     "",
     response_model=list[SaleListOut],
@@ -237,55 +308,11 @@ async def list_sales(
     Returns:
         Lista de ventas con información resumida.
     """
-    stmt = (
-        select(
-            Sale.id.label("id"),
-            Sale.user_id.label("user_id"),
-            Sale.customer_id.label("customer_id"),
-            User.username.label("user_name"),
-            Customer.name.label("customer_name"),
-            Customer.tax_id.label("customer_tax_id"),
-            Customer.phone.label("customer_phone"),
-            Sale.status.label("status"),
-            Sale.subtotal.label("subtotal"),
-            Sale.tax.label("tax"),
-            Sale.discount.label("discount"),
-            Sale.total.label("total"),
-            Sale.invoice_number.label("invoice_number"),
-            Sale.document_type.label("document_type"),
-            Sale.created_at.label("created_at"),
-        )
-        .select_from(Sale)
-        .outerjoin(User, User.id == Sale.user_id)
-        .outerjoin(Customer, Customer.id == Sale.customer_id)
+    stmt, score = _sales_list_statement(
+        search, status, from_date, to_date, customer_id, user_id
     )
-
-    # Aplicar filtros
-    if status:
-        stmt = stmt.where(Sale.status == status)
-    if from_date:
-        stmt = stmt.where(func.date(Sale.created_at) >= from_date)
-    if to_date:
-        stmt = stmt.where(func.date(Sale.created_at) <= to_date)
-    if customer_id:
-        stmt = stmt.where(Sale.customer_id == customer_id)
-    if user_id:
-        stmt = stmt.where(Sale.user_id == user_id)
-
-    # Búsqueda con ranking de relevancia
-    if search:
-        tokens = _prepare_sales_tokens(search)
-        if tokens:
-            stmt = stmt.where(
-                and_(*[_build_sales_search_clause(token) for token in tokens])
-            )
-            stmt = stmt.order_by(
-                _build_sales_score_expression(search, tokens).desc(),
-                Sale.created_at.desc(),
-                Sale.id.desc(),
-            )
-        else:
-            stmt = stmt.order_by(Sale.created_at.desc(), Sale.id.desc())
+    if score is not None:
+        stmt = stmt.order_by(score.desc(), Sale.created_at.desc(), Sale.id.desc())
     else:
         stmt = stmt.order_by(Sale.created_at.desc(), Sale.id.desc())
 
@@ -294,6 +321,45 @@ async def list_sales(
     return result.mappings().all()
 
 
+@router.get(
+    "/page",
+    response_model=SalePageOut,
+    dependencies=[Depends(require_permission("sales.read"))],
+)
+async def list_sales_page(
+    search: str | None = None,
+    status: str | None = None,
+    from_date: str | None = None,
+    to_date: str | None = None,
+    customer_id: int | None = None,
+    user_id: int | None = None,
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Lista ventas con paginación por cursor.
+
+    Acepta los mismos filtros que GET /sales. El orden es (fecha desc, id
+    desc), o (relevancia desc, fecha desc, id desc) cuando hay búsqueda.
+    """
+    stmt, score = _sales_list_statement(
+        search, status, from_date, to_date, customer_id, user_id
+    )
+    keys: tuple[SortKey, ...] = SALE_SORT_KEYS
+    if score is not None:
+        keys = (SortKey("score", score, descending=True, value_type=int), *SALE_SORT_KEYS)
+        stmt = stmt.add_columns(score.label("score"))
+    result = await db.execute(apply_keyset(stmt, keys, limit=limit, cursor=cursor))
+    page = build_page(result.mappings().all(), keys, limit=limit)
+    return SalePageOut(
+        items=[SaleListOut.model_validate(row) for row in page.items],
+        limit=limit,
+        has_more=page.has_more,
+        next_cursor=page.next_cursor,
+    )
+
+
 @router.post(
     "",
     response_model=SaleOut,
@@ -365,8 +431,7 @@ async def get_receipt(sale_id: int, db: AsyncSession = Depends(get_db)):
     )
     items = items_res.all()
 
-    settings_res = await db.execute(select(SystemSettings).limit(1))
-    settings = settings_res.scalar_one_or_none()
+    settings = await settings_snapshot.get(db)
     customer = None
     if sale.customer_id:
         customer_res = await db.execute(
@@ -4,10 +4,11 @@ Endpoints: GET /reports/daily, /top-products, /low-stock, /profitability, /rotat
 """
 
 from fastapi import APIRouter, Depends
-from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, require_permission, require_role
+from app.core.dates import parse_day
+from app.core.deps import get_read_db, require_permission, require_role
+from app.core.exports import streaming_export
 from app.schemas.report import (
     DailyReport,
     LowStockItem,
@@ -30,7 +31,7 @@ router = APIRouter(
     response_model=DailyReport,
     dependencies=[Depends(require_permission("reports.read"))],
 )
-async def daily_report(date: str, db: AsyncSession = Depends(get_db)):
+async def daily_report(date: str, db: AsyncSession = Depends(get_read_db)):
     service = ReportsService(db)
     return await service.daily_report(date)
 
@@ -40,7 +41,7 @@ async def daily_report(date: str, db: AsyncSession = Depends(get_db)):
     response_model=list[TopProductReport],
     dependencies=[Depends(require_permission("reports.read"))],
 )
-async def top_products(from_date: str, to: str, db: AsyncSession = Depends(get_db)):
+async def top_products(from_date: str, to: str, db: AsyncSession = Depends(get_read_db)):
     service = ReportsService(db)
     return await service.top_products(from_date, to)
 
@@ -50,7 +51,7 @@ async def top_products(from_date: str, to: str, db: AsyncSession = Depends(get_d
     response_model=list[LowStockItem],
     dependencies=[Depends(require_permission("reports.read"))],
 )
-async def low_stock(db: AsyncSession = Depends(get_db)):
+async def low_stock(db: AsyncSession = Depends(get_read_db)):
     service = ReportsService(db)
     return await service.low_stock()
 
@@ -60,7 +61,7 @@ async def low_stock(db: AsyncSession = Depends(get_db)):
     response_model=ProfitabilitySummaryReport,
     dependencies=[Depends(require_permission("reports.read"))],
 )
-async def profitability(from_date: str, to: str, db: AsyncSession = Depends(get_db)):
+async def profitability(from_date: str, to: str, db: AsyncSession = Depends(get_read_db)):
     service = ReportsService(db)
     return await service.profitability_summary(from_date, to)
 
@@ -71,7 +72,7 @@ async def profitability(from_date: str, to: str, db: AsyncSession = Depends(get_
     dependencies=[Depends(require_permission("reports.read"))],
 )
 async def profitability_products(
-    from_date: str, to: str, limit: int = 100, db: AsyncSession = Depends(get_db)
+    from_date: str, to: str, limit: int = 100, db: AsyncSession = Depends(get_read_db)
 ):
     service = ReportsService(db)
     return await service.profitability_by_product(from_date, to, limit)
@@ -83,7 +84,7 @@ async def profitability_products(
     dependencies=[Depends(require_permission("reports.read"))],
 )
 async def stock_rotation(
-    from_date: str, to: str, limit: int = 100, db: AsyncSession = Depends(get_db)
+    from_date: str, to: str, limit: int = 100, db: AsyncSession = Depends(get_read_db)
 ):
     service = ReportsService(db)
     return await service.stock_rotation(from_date, to, limit)
@@ -99,7 +100,7 @@ async def replenishment(
     to: str,
     target_days: int = 21,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     service = ReportsService(db)
     return await service.replenishment_suggestions(from_date, to, target_days, limit)
@@ -116,7 +117,7 @@ async def operational_alerts(
     expiry_days: int = 14,
     stagnant_days: int = 30,
     limit: int = 200,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     service = ReportsService(db)
     return await service.operational_alerts(
@@ -125,43 +126,53 @@ async def operational_alerts(
         expiry_days=expiry_days,
         stagnant_days=stagnant_days,
         limit=limit,
+        use_snapshot=True,
     )
 
 
 @router.get("/daily/export", dependencies=[Depends(require_permission("reports.read"))])
-async def export_daily(date: str, db: AsyncSession = Depends(get_db)):
-    service = ReportsService(db)
-    content = await service.export_daily(date)
-    return PlainTextResponse(content, media_type="text/csv")
+async def export_daily(date: str, format: str = "csv"):
+    parse_day(date, "date")
+    return streaming_export(
+        lambda db: ReportsService(db).export_daily(date),
+        filename=f"daily_{date}",
+        export_format=format,
+    )
 
 
 @router.get(
     "/top-products/export", dependencies=[Depends(require_permission("reports.read"))]
 )
-async def export_top(from_date: str, to: str, db: AsyncSession = Depends(get_db)):
-    service = ReportsService(db)
-    content = await service.export_top(from_date, to)
-    return PlainTextResponse(content, media_type="text/csv")
+async def export_top(from_date: str, to: str, format: str = "csv"):
+    ReportsService.validate_export_range(from_date, to)
+    return streaming_export(
+        lambda db: ReportsService(db).export_top(from_date, to),
+        filename="top_products",
+        export_format=format,
+    )
 
 
 @router.get(
     "/low-stock/export", dependencies=[Depends(require_permission("reports.read"))]
 )
-async def export_low(db: AsyncSession = Depends(get_db)):
-    service = ReportsService(db)
-    content = await service.export_low()
-    return PlainTextResponse(content, media_type="text/csv")
+async def export_low(format: str = "csv"):
+    return streaming_export(
+        lambda db: ReportsService(db).export_low(),
+        filename="low_stock",
+        export_format=format,
+    )
 
 
 @router.get(
     "/profitability/export", dependencies=[Depends(require_permission("reports.read"))]
 )
-async def export_profitability(
-    from_date: str, to: str, db: AsyncSession = Depends(get_db)
-):
-    service = ReportsService(db)
-    content = await service.export_profitability(from_date, to)
-    return PlainTextResponse(content, media_type="text/csv")
+async def export_profitability(from_date: str, to: str, format: str = "csv"):
+    ReportsService.validate_export_range(from_date, to)
+    return streaming_export(
+        lambda db: ReportsService(db).export_profitability(from_date, to),
+        filename="profitability",
+        export_format=format,
+    )
 
 
 @router.get(
@@ -169,22 +180,28 @@ async def export_profitability(
     dependencies=[Depends(require_permission("reports.read"))],
 )
 async def export_profitability_products(
-    from_date: str, to: str, limit: int = 100, db: AsyncSession = Depends(get_db)
+    from_date: str, to: str, limit: int | None = None, format: str = "csv"
 ):
-    service = ReportsService(db)
-    content = await service.export_profitability_by_product(from_date, to, limit)
-    return PlainTextResponse(content, media_type="text/csv")
+    ReportsService.validate_export_range(from_date, to)
+    return streaming_export(
+        lambda db: ReportsService(db).export_profitability_by_product(from_date, to, limit),
+        filename="profitability_products",
+        export_format=format,
+    )
 
 
 @router.get(
     "/rotation/export", dependencies=[Depends(require_permission("reports.read"))]
 )
 async def export_rotation(
-    from_date: str, to: str, limit: int = 100, db: AsyncSession = Depends(get_db)
+    from_date: str, to: str, limit: int | None = None, format: str = "csv"
 ):
-    service = ReportsService(db)
-    content = await service.export_rotation(from_date, to, limit)
-    return PlainTextResponse(content, media_type="text/csv")
+    ReportsService.validate_export_range(from_date, to)
+    return streaming_export(
+        lambda db: ReportsService(db).export_rotation(from_date, to, limit),
+        filename="rotation",
+        export_format=format,
+    )
 
 
 @router.get(
@@ -194,9 +211,12 @@ async def export_replenishment(
     from_date: str,
     to: str,
     target_days: int = 21,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    limit: int | None = None,
+    format: str = "csv",
 ):
-    service = ReportsService(db)
-    content = await service.export_replenishment(from_date, to, target_days, limit)
-    return PlainTextResponse(content, media_type="text/csv")
+    ReportsService.validate_export_range(from_date, to)
+    return streaming_export(
+        lambda db: ReportsService(db).export_replenishment(from_date, to, target_days, limit),
+        filename="replenishment",
+        export_format=format,
+    )
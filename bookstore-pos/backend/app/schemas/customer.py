@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from app.schemas.pagination import CursorPage
+
 
 class CustomerBase(BaseModel):
     name: str
@@ -25,3 +27,7 @@ class CustomerOut(CustomerBase):
     loyalty_total_redeemed: int = 0
 
     model_config = {"from_attributes": True}
+
+
+class CustomerPageOut(CursorPage[CustomerOut]):
+    pass
@@ -0,0 +1,32 @@
+from datetime import date, datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class DocumentBatchJobCreate(BaseModel):
+    date_from: date | None = None
+    date_to: date | None = None
+    cash_session_id: int | None = None
+    output_format: Literal["pdf", "zip"] = "zip"
+
+
+class DocumentBatchJobOut(BaseModel):
+    id: int
+    created_by: int
+    status: str
+    output_format: str
+    date_from: date | None = None
+    date_to: date | None = None
+    cash_session_id: int | None = None
+    request_id: str | None = None
+    total_documents: int
+    processed_documents: int
+    error_documents: int
+    error_message: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -2,6 +2,8 @@ from datetime import datetime
 
 from pydantic import BaseModel
 
+from app.schemas.pagination import CursorPage
+
 
 class InventoryMovementCreate(BaseModel):
     product_id: int
@@ -16,16 +18,16 @@ class StockMovementOut(BaseModel):
     type: str
     qty: int
     ref: str
+    balance_after: int | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
 
 
-class KardexPageOut(BaseModel):
-    items: list[StockMovementOut]
-    limit: int
-    has_more: bool
-    next_cursor: str | None = None
+class KardexPageOut(CursorPage[StockMovementOut]):
+    # Stock del producto al inicio y al final de la ventana from/to (sin filtro de tipo).
+    opening_balance: int | None = None
+    closing_balance: int | None = None
 
 
 class InventoryImportJobOut(BaseModel):
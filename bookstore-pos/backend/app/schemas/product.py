@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from app.schemas.pagination import CursorPage
+
 
 class ProductBase(BaseModel):
     sku: str
@@ -38,3 +40,7 @@ class ProductOut(ProductBase):
     id: int
 
     model_config = {"from_attributes": True}
+
+
+class ProductPageOut(CursorPage[ProductOut]):
+    pass
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 
+from app.schemas.pagination import CursorPage
+
 
 class SaleItemCreate(BaseModel):
     product_id: int
@@ -63,3 +65,7 @@ class SaleListOut(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class SalePageOut(CursorPage[SaleListOut]):
+    pass
@@ -4,6 +4,7 @@ from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
+from app.core.permission_registry import stage_permissions_refresh
 from app.models.permission import RolePermission
 from app.schemas.permission import RolePermissionsOut
 
@@ -29,6 +30,7 @@ class PermissionsService:
             await self.db.execute(delete(RolePermission).where(RolePermission.role == role))
             for p in permissions:
                 self.db.add(RolePermission(role=role, permission=p))
+            await stage_permissions_refresh(self.db)
             if self.user is not None:
                 await log_event(
                     self.db, self.user.id, "role_permissions_update", "role", role, f"count={len(permissions)}"
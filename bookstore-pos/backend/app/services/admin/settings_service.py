@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
+from app.core.settings_snapshot import settings_snapshot, stage_settings_refresh
 from app.models.settings import SystemSettings
 from app.schemas.settings import SystemSettingsOut
 
@@ -21,8 +22,7 @@ class SettingsService:
             yield
 
     async def get_settings(self):
-        result = await self.db.execute(select(SystemSettings).limit(1))
-        settings = result.scalar_one_or_none()
+        settings = await settings_snapshot.get(self.db)
         if not settings:
             raise HTTPException(status_code=404, detail="Settings no encontrados")
         return settings
@@ -59,6 +59,7 @@ class SettingsService:
             if self.user is not None:
                 await log_event(self.db, self.user.id, "settings_update", "settings", str(settings.id), "")
             await self.db.refresh(settings)
+            await stage_settings_refresh(self.db)
             return self._to_out(settings)
 
     def _to_out(self, settings: SystemSettings) -> SystemSettingsOut:
@@ -6,6 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
+from app.core.principal_cache import mark_principals_changed
 from app.core.security import get_password_hash, validate_password, encrypt_2fa_secret, decrypt_2fa_secret
 from app.models.user import User
 
@@ -49,6 +50,7 @@ class UsersService:
             if exists.scalar_one_or_none():
                 raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username duplicado")
         async with self._transaction():
+            mark_principals_changed(self.db, user_id=user.id)
             user.username = data.username
             user.role = data.role
             user.is_active = data.is_active
@@ -63,6 +65,7 @@ class UsersService:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
         validate_password(data.password)
         async with self._transaction():
+            mark_principals_changed(self.db, user_id=user.id)
             user.password_hash = get_password_hash(data.password)
             await log_event(self.db, self.user.id, "user_password", "user", str(user.id), "")
         return {"ok": True}
@@ -73,6 +76,7 @@ class UsersService:
         if not user:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
         async with self._transaction():
+            mark_principals_changed(self.db, user_id=user.id)
             user.is_active = data.is_active
             await log_event(self.db, self.user.id, "user_status", "user", str(user.id), f"active={data.is_active}")
         return {"ok": True}
@@ -83,6 +87,7 @@ class UsersService:
         if not user:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
         async with self._transaction():
+            mark_principals_changed(self.db, user_id=user.id)
             user.failed_attempts = 0
             user.locked_until = None
             await log_event(self.db, self.user.id, "user_unlock", "user", str(user.id), "")
@@ -95,6 +100,7 @@ class UsersService:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
         secret = pyotp.random_base32()
         async with self._transaction():
+            mark_principals_changed(self.db, user_id=user.id)
             user.twofa_secret = encrypt_2fa_secret(secret)
             user.twofa_enabled = False
             uri = pyotp.totp.TOTP(secret).provisioning_uri(name=user.username, issuer_name="Bookstore POS")
@@ -113,6 +119,7 @@ class UsersService:
         if not totp.verify(data.code):
             raise HTTPException(status_code=400, detail="Codigo invalido")
         async with self._transaction():
+            mark_principals_changed(self.db, user_id=user.id)
             user.twofa_enabled = True
             await log_event(self.db, self.user.id, "user_2fa_confirm", "user", str(user.id), "")
         return {"ok": True}
@@ -123,6 +130,7 @@ class UsersService:
         if not user:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
         async with self._transaction():
+            mark_principals_changed(self.db, user_id=user.id)
             user.twofa_enabled = False
             user.twofa_secret = ""
             await log_event(self.db, self.user.id, "user_2fa_reset", "user", str(user.id), "")
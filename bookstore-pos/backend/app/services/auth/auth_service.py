@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
 from app.core.config import settings
+from app.core.principal_cache import mark_principals_changed
 from app.core.security import (
     create_access_token,
     create_refresh_token,
@@ -293,6 +294,8 @@ class AuthService:
             )
 
         now = self._now()
+        # Todas las ramas siguientes revocan los access tokens de la familia.
+        mark_principals_changed(self.db, family_id=current_token.family_id)
         token_expired = self._as_utc(current_token.expires_at) < now
         token_invalid = (
             current_token.family_id != family_id
@@ -343,6 +346,7 @@ class AuthService:
         secret = pyotp.random_base32()
         current_user.twofa_secret = encrypt_2fa_secret(secret)
         current_user.twofa_enabled = False
+        mark_principals_changed(self.db, user_id=current_user.id)
         await self.db.commit()
         uri = pyotp.totp.TOTP(secret).provisioning_uri(
             name=current_user.username, issuer_name="Bookstore POS"
@@ -356,6 +360,7 @@ class AuthService:
         if not self._verify_totp(secret, code):
             raise HTTPException(status_code=400, detail="Codigo invalido")
         current_user.twofa_enabled = True
+        mark_principals_changed(self.db, user_id=current_user.id)
         await self.db.commit()
         return {"ok": True}
 
@@ -395,6 +400,7 @@ class AuthService:
 
         revoked_any = False
         if family_id:
+            mark_principals_changed(self.db, family_id=family_id)
             await self._revoke_family_tokens(family_id, revoked_at=now)
             revoked_any = True
 
@@ -417,6 +423,7 @@ class AuthService:
         self, user: User, ip: str | None = None, user_agent: str | None = None
     ) -> None:
         now = self._now()
+        mark_principals_changed(self.db, user_id=user.id)
         await self.db.execute(
             update(UserSession)
             .where(UserSession.user_id == user.id, UserSession.revoked_at.is_(None))
@@ -11,6 +11,7 @@ from fastapi import HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.catalog_cache import mark_catalog_changed
 from app.models.product import Product
 from app.schemas.pricing import PricingBulkApplyIn, PricingPreviewIn
 
@@ -118,6 +119,7 @@ async def apply_pricing_to_product(
     product.cost = float(preview.unit_cost)
     product.sale_price = preview.sale_price_unit
     product.price = float(preview.sale_price_unit)
+    mark_catalog_changed(db, [product.id])
 
     await db.flush()
     await db.refresh(product)
@@ -216,6 +218,7 @@ async def apply_bulk_pricing(db: AsyncSession, payload: PricingBulkApplyIn):
             }
         )
 
+    mark_catalog_changed(db, [row["product_id"] for row in rows])
     await db.flush()
     return {
         "updated_count": len(rows),
@@ -11,6 +11,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
+from app.core.catalog_cache import mark_catalog_changed
 from app.core.stock import apply_stock_delta, require_default_warehouse_id
 from app.models.inventory import StockMovement
 from app.models.price_list import PriceListItem
@@ -126,7 +127,7 @@ class ProductsService:
 
             if initial_stock:
                 default_warehouse_id = await require_default_warehouse_id(self.db)
-                await apply_stock_delta(
+                balance = await apply_stock_delta(
                     self.db, product.id, initial_stock, default_warehouse_id
                 )
                 movement = StockMovement(
@@ -134,6 +135,7 @@ class ProductsService:
                     type="IN",
                     qty=initial_stock,
                     ref="PRODUCT_CREATE",
+                    balance_after=balance,
                 )
                 self.db.add(movement)
 
@@ -175,10 +177,11 @@ class ProductsService:
                 if key == "stock":
                     continue
                 setattr(product, key, value)
+            mark_catalog_changed(self.db, [product.id])
 
             if stock_delta:
                 default_warehouse_id = await require_default_warehouse_id(self.db)
-                await apply_stock_delta(
+                balance = await apply_stock_delta(
                     self.db, product.id, stock_delta, default_warehouse_id
                 )
                 self.db.add(
@@ -187,6 +190,7 @@ class ProductsService:
                         type="ADJ",
                         qty=stock_delta,
                         ref="PRODUCT_EDIT",
+                        balance_after=balance,
                     )
                 )
 
@@ -247,6 +251,7 @@ class ProductsService:
                     delete(StockMovement).where(StockMovement.product_id == product_id)
                 )
                 await self.db.delete(product)
+                mark_catalog_changed(self.db, [product_id])
                 await log_event(
                     self.db,
                     self.user.id,
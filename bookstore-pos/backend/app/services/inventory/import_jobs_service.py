@@ -8,7 +8,7 @@ from typing import Iterator
 from time import perf_counter
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
@@ -168,39 +168,77 @@ async def _mark_job_running(session: AsyncSession, job: InventoryImportJob) -> N
     await session.commit()
 
 
-async def _record_row_error(
+def _iter_chunks(
+    rows: Iterator[tuple[int, dict[str, object]]], size: int
+) -> Iterator[list[tuple[int, dict[str, object]]]]:
+    chunk: list[tuple[int, dict[str, object]]] = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _job_error(job: InventoryImportJob, row_number: int, row_data: dict[str, object], detail: str) -> dict:
+    return {
+        "job_id": job.id,
+        "row_number": row_number,
+        "sku": str(row_data.get("sku") or "").strip() or None,
+        "detail": detail,
+        "raw_data": json.dumps(row_data, ensure_ascii=False, default=str),
+        "created_at": _now(),
+    }
+
+
+async def _process_chunk(
     session: AsyncSession,
+    service: StockService,
     job: InventoryImportJob,
+    chunk: list[tuple[int, dict[str, object]]],
     *,
-    row_number: int,
-    row_data: dict[str, object],
-    error_detail: str,
+    default_warehouse_id: int,
 ) -> None:
-    job.error_rows += 1
-    job.processed_rows += 1
-    job.total_rows += 1
+    """Aplica un bloque de filas y registra avance y errores con un solo commit."""
+    # La primera escritura abre la transacción antes de los SAVEPOINT del
+    # servicio: pysqlite solo emite BEGIN al llegar la primera sentencia DML.
     job.updated_at = _now()
-    session.add(
-        InventoryImportJobError(
-            job_id=job.id,
-            row_number=row_number,
-            sku=str(row_data.get("sku") or "").strip() or None,
-            detail=error_detail,
-            raw_data=json.dumps(row_data, ensure_ascii=False, default=str),
-            created_at=_now(),
-        )
-    )
-    inventory_import_rows_total.labels("error").inc()
-    await session.commit()
-
+    await session.flush()
 
-async def _record_row_success(session: AsyncSession, job: InventoryImportJob) -> None:
-    job.success_rows += 1
-    job.processed_rows += 1
-    job.total_rows += 1
+    errors: list[dict] = []
+    raw_rows: dict[int, dict[str, object]] = {}
+    valid_rows: list[tuple[int, dict[str, str | int | float]]] = []
+    for row_number, row in chunk:
+        try:
+            parsed = service.parse_import_row(row_number, row)
+        except ValueError as exc:
+            errors.append(_job_error(job, row_number, row, str(exc)))
+            continue
+        if parsed is None:
+            continue
+        raw_rows[row_number] = row
+        valid_rows.append((row_number, parsed))
+
+    failed = await service.import_chunk(
+        valid_rows,
+        default_warehouse_id=default_warehouse_id,
+        ref=f"IMPORT_JOB:{job.id}",
+    )
+    errors.extend(_job_error(job, row_number, raw_rows[row_number], detail) for row_number, detail in failed.items())
+    errors.sort(key=lambda item: item["row_number"])
+    if errors:
+        await session.execute(insert(InventoryImportJobError), errors)
+
+    success_count = len(valid_rows) - len(failed)
+    job.success_rows += success_count
+    job.error_rows += len(errors)
+    job.processed_rows += success_count + len(errors)
+    job.total_rows += success_count + len(errors)
     job.updated_at = _now()
-    inventory_import_rows_total.labels("success").inc()
     await session.commit()
+    inventory_import_rows_total.labels("success").inc(success_count)
+    inventory_import_rows_total.labels("error").inc(len(errors))
 
 
 async def run_inventory_import_job(job_id: int, file_path: str) -> None:
@@ -218,25 +256,15 @@ async def run_inventory_import_job(job_id: int, file_path: str) -> None:
             service = StockService(session, SimpleNamespace(id=job.created_by))
             default_warehouse_id = await require_default_warehouse_id(session)
             try:
-                for row_number, row in iter_file_rows(file_path, job.file_type):
-                    try:
-                        parsed = service.parse_import_row(row_number, row)
-                    except ValueError as exc:
-                        await _record_row_error(session, job, row_number=row_number, row_data=row, error_detail=str(exc))
-                        continue
-                    if parsed is None:
-                        continue
-
-                    try:
-                        await service.upsert_import_row(
-                            parsed,
-                            default_warehouse_id=default_warehouse_id,
-                            ref=f"IMPORT_JOB:{job.id}",
-                        )
-                        await _record_row_success(session, job)
-                    except Exception as exc:
-                        await session.rollback()
-                        await _record_row_error(session, job, row_number=row_number, row_data=row, error_detail=str(exc))
+                batch_size = clamp_batch_size(job.batch_size)
+                for chunk in _iter_chunks(iter_file_rows(file_path, job.file_type), batch_size):
+                    await _process_chunk(
+                        session,
+                        service,
+                        job,
+                        chunk,
+                        default_warehouse_id=default_warehouse_id,
+                    )
 
                 job.finished_at = _now()
                 job.updated_at = _now()
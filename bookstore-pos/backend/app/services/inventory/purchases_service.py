@@ -7,6 +7,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
+from app.core.catalog_cache import mark_catalog_changed
 from app.core.metrics import purchases_amount_total, purchases_total
 from app.core.stock import apply_stock_delta, require_default_warehouse_id
 from app.models.inventory import StockMovement
@@ -83,7 +84,7 @@ class PurchasesService:
                 current_unit_cost = to_decimal(product.unit_cost or product.cost or 0, "product.unit_cost")
                 new_unit_cost = weighted_unit_cost(current_stock, current_unit_cost, qty, effective_unit_cost)
 
-                await apply_stock_delta(self.db, product.id, item.qty, default_warehouse_id)
+                balance = await apply_stock_delta(self.db, product.id, item.qty, default_warehouse_id)
                 p_item = PurchaseItem(
                     purchase_id=purchase.id,
                     product_id=product.id,
@@ -99,6 +100,7 @@ class PurchasesService:
                     type="IN",
                     qty=qty,
                     ref=f"PURCHASE:{purchase.id}",
+                    balance_after=balance,
                 )
                 self.db.add(movement)
                 self.db.add(
@@ -119,6 +121,7 @@ class PurchasesService:
                 product.cost = float(new_unit_cost)
                 product.cost_qty = next_stock
                 product.cost_total = quantize_money(new_unit_cost * Decimal(next_stock))
+                mark_catalog_changed(self.db, [product.id])
 
             purchases_total.inc()
             purchases_amount_total.inc(float(total))
@@ -7,6 +7,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
+from app.core.catalog_cache import mark_catalog_changed
 from app.core.stock import apply_stock_delta, require_default_warehouse_id
 from app.models.inventory import StockMovement
 from app.models.product import Product
@@ -146,9 +147,15 @@ class PurchasingService:
                 current_unit_cost = to_decimal(product.unit_cost or product.cost or 0, "product.unit_cost")
                 new_unit_cost = weighted_unit_cost(current_stock, current_unit_cost, qty, effective_unit_cost)
 
-                await apply_stock_delta(self.db, product.id, qty, default_warehouse_id)
+                balance = await apply_stock_delta(self.db, product.id, qty, default_warehouse_id)
                 self.db.add(
-                    StockMovement(product_id=product.id, type="IN", qty=qty, ref=f"PURCHASE:{purchase.id}")
+                    StockMovement(
+                        product_id=product.id,
+                        type="IN",
+                        qty=qty,
+                        ref=f"PURCHASE:{purchase.id}",
+                        balance_after=balance,
+                    )
                 )
 
                 self.db.add(
@@ -180,6 +187,7 @@ class PurchasingService:
                 product.cost = float(new_unit_cost)
                 product.cost_qty = next_stock
                 product.cost_total = quantize_money(new_unit_cost * Decimal(next_stock))
+                mark_catalog_changed(self.db, [product.id])
 
             if all(item.received_qty >= item.qty for item in order_items):
                 po.status = "CLOSED"
@@ -3,18 +3,40 @@ Servicio de stock e inventario.
 Gestiona movimientos de inventario e importaciones masivas.
 """
 
+import logging
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.alerts_snapshot import mark_alerts_changed
 from app.core.audit import log_event
-from app.core.stock import apply_stock_delta, require_default_warehouse_id
+from app.core.catalog_cache import mark_catalog_changed
+from app.core.stock import (
+    INSUFFICIENT_STOCK,
+    apply_stock_delta,
+    apply_stock_deltas,
+    load_stock_snapshot,
+    require_default_warehouse_id,
+)
 from app.models.inventory import StockMovement
-from app.models.product import Product
+from app.models.product import Product, search_column_values
 from app.services._transaction import service_transaction
 
+logger = logging.getLogger("bookstore.import")
+
+
+@dataclass
+class _ImportState:
+    """Estado de un SKU mientras se aplica un bloque de importación."""
+
+    product_id: int | None = None
+    stock: int = 0
+    delta: int = 0
+    values: dict[str, object] | None = None
+
 
 class StockService:
     def __init__(self, db: AsyncSession, current_user):
@@ -69,73 +91,194 @@ class StockService:
             "stock_min": self._parse_int(row_number, row, "stock_min"),
         }
 
+    @staticmethod
+    def _import_product_values(row: dict[str, str | int | float]) -> dict[str, object]:
+        price = float(row["price"])
+        cost = float(row["cost"])
+        return {
+            "name": str(row["name"]),
+            "category": str(row["category"]),
+            "price": price,
+            "sale_price": price,
+            "cost": cost,
+            "unit_cost": cost,
+            "cost_qty": 1,
+            "cost_total": cost,
+            "direct_costs_breakdown": "{}",
+            "direct_costs_total": 0,
+            "desired_margin": 0,
+            "stock_min": int(row["stock_min"]),
+        }
+
     async def upsert_import_row(
         self, row: dict[str, str | int | float], *, default_warehouse_id: int, ref: str
     ) -> None:
         sku = str(row["sku"])
-        name = str(row["name"])
-        category = str(row["category"])
-        price = float(row["price"])
-        cost = float(row["cost"])
         stock = int(row["stock"])
-        stock_min = int(row["stock_min"])
+        values = self._import_product_values(row)
 
         result = await self.db.execute(select(Product).where(Product.sku == sku))
         product = result.scalar_one_or_none()
         if product:
             diff = stock - int(product.stock or 0)
-            product.name = name
-            product.category = category
-            product.price = price
-            product.sale_price = price
-            product.cost = cost
-            product.unit_cost = cost
-            product.cost_qty = 1
-            product.cost_total = cost
-            product.direct_costs_breakdown = "{}"
-            product.direct_costs_total = 0
-            product.desired_margin = 0
-            product.stock_min = stock_min
+            for field_name, value in values.items():
+                setattr(product, field_name, value)
+            mark_catalog_changed(self.db, [product.id])
             if diff != 0:
-                await apply_stock_delta(self.db, product.id, diff, default_warehouse_id)
+                balance = await apply_stock_delta(self.db, product.id, diff, default_warehouse_id)
                 self.db.add(
                     StockMovement(
                         product_id=product.id,
                         type="ADJ",
                         qty=diff,
                         ref=ref,
+                        balance_after=balance,
                     )
                 )
             return
 
-        product = Product(
-            sku=sku,
-            name=name,
-            category=category,
-            price=price,
-            sale_price=price,
-            cost=cost,
-            unit_cost=cost,
-            cost_qty=1,
-            cost_total=cost,
-            direct_costs_breakdown="{}",
-            direct_costs_total=0,
-            desired_margin=0,
-            stock=0,
-            stock_min=stock_min,
-        )
+        product = Product(sku=sku, stock=0, **values)
         self.db.add(product)
         await self.db.flush()
         if stock != 0:
-            await apply_stock_delta(self.db, product.id, stock, default_warehouse_id)
+            balance = await apply_stock_delta(self.db, product.id, stock, default_warehouse_id)
             self.db.add(
                 StockMovement(
                     product_id=product.id,
                     type="IN",
                     qty=stock,
                     ref=ref,
+                    balance_after=balance,
+                )
+            )
+
+    async def import_chunk(
+        self,
+        rows: list[tuple[int, dict[str, str | int | float]]],
+        *,
+        default_warehouse_id: int,
+        ref: str,
+    ) -> dict[int, str]:
+        """Aplica un bloque de filas ya validadas dentro de la transacción actual.
+
+        Primero intenta la escritura en bloque; si falla, repite fila por fila
+        con un SAVEPOINT cada una para que una fila mala no descarte el resto.
+        No hace commit. Devuelve el detalle de error por número de fila.
+        """
+        if not rows:
+            return {}
+        try:
+            async with self.db.begin_nested():
+                return await self._bulk_upsert_import_rows(
+                    rows, default_warehouse_id=default_warehouse_id, ref=ref
+                )
+        except Exception:
+            logger.warning("Bloque de importacion con errores; se reintenta fila por fila", exc_info=True)
+
+        errors: dict[int, str] = {}
+        for row_number, parsed in rows:
+            try:
+                async with self.db.begin_nested():
+                    await self.upsert_import_row(
+                        parsed, default_warehouse_id=default_warehouse_id, ref=ref
+                    )
+            except Exception as exc:
+                errors[row_number] = str(exc)
+        return errors
+
+    async def _bulk_upsert_import_rows(
+        self,
+        rows: list[tuple[int, dict[str, str | int | float]]],
+        *,
+        default_warehouse_id: int,
+        ref: str,
+    ) -> dict[int, str]:
+        # Mismo resultado que upsert_import_row fila a fila, con una consulta de
+        # SKUs y una de niveles por bloque y escrituras en bloque al final. El
+        # stock se aplica como incremento atómico (apply_stock_deltas): una
+        # venta confirmada entre la lectura y la escritura conserva su descuento.
+        skus = {str(parsed["sku"]) for _, parsed in rows}
+        existing = await self.db.execute(
+            select(Product.id, Product.sku, Product.stock).where(Product.sku.in_(skus))
+        )
+        states: dict[str, _ImportState] = {
+            row.sku: _ImportState(product_id=row.id, stock=int(row.stock or 0))
+            for row in existing.all()
+        }
+        snapshot = await load_stock_snapshot(
+            self.db,
+            [state.product_id for state in states.values() if state.product_id is not None],
+            default_warehouse_id,
+        )
+
+        errors: dict[int, str] = {}
+        movements: list[tuple[str, str, int]] = []
+        for row_number, parsed in rows:
+            sku = str(parsed["sku"])
+            state = states.get(sku)
+            is_new = state is None
+            if state is None:
+                state = states[sku] = _ImportState()
+            available = snapshot.available(state.product_id) if state.product_id is not None else 0
+            diff = int(parsed["stock"]) - state.stock
+            if available + state.delta + diff < 0:
+                errors[row_number] = INSUFFICIENT_STOCK
+                continue
+            state.values = self._import_product_values(parsed)
+            if diff != 0:
+                state.stock += diff
+                state.delta += diff
+                movements.append((sku, "IN" if is_new else "ADJ", diff))
+
+        touched = {sku: state for sku, state in states.items() if state.values is not None}
+        if touched:
+            # Las escrituras van por Core: el snapshot de alertas no ve eventos ORM.
+            mark_alerts_changed(self.db)
+        new_rows: list[dict[str, object]] = []
+        updates: list[dict[str, object]] = []
+        updated_ids: list[int] = []
+        for sku, state in touched.items():
+            values = state.values
+            assert values is not None
+            if state.product_id is None:
+                new_rows.append(
+                    {"sku": sku, "stock": 0, **values, **search_column_values({"sku": sku, **values})}
                 )
+                continue
+            updates.append({"id": state.product_id, **values, **search_column_values(values)})
+            updated_ids.append(state.product_id)
+        if new_rows:
+            inserted = await self.db.execute(insert(Product).returning(Product.id, Product.sku), new_rows)
+            for row in inserted.all():
+                states[row.sku].product_id = row.id
+        if updates:
+            await self.db.execute(update(Product), updates)
+            mark_catalog_changed(self.db, updated_ids)
+
+        deltas = {
+            state.product_id: state.delta
+            for state in touched.values()
+            if state.product_id is not None and state.delta
+        }
+        if deltas:
+            await apply_stock_deltas(self.db, snapshot, deltas)
+        if not movements:
+            return errors
+        # balance_after sale de los totales devueltos por el UPDATE; con varias
+        # filas del mismo SKU se descuentan los cambios posteriores del bloque.
+        balances: dict[str, int] = {}
+        movement_rows: list[dict[str, object]] = []
+        for sku, kind, qty in reversed(movements):
+            product_id = states[sku].product_id
+            assert product_id is not None
+            balance = balances.get(sku, snapshot.totals.get(product_id, 0))
+            movement_rows.append(
+                {"product_id": product_id, "type": kind, "qty": qty, "ref": ref, "balance_after": balance}
             )
+            balances[sku] = balance - qty
+        movement_rows.reverse()
+        await self.db.execute(insert(StockMovement), movement_rows)
+        return errors
 
     async def create_movement(self, data):
         if data.qty == 0:
@@ -155,7 +298,7 @@ class StockService:
             default_warehouse_id = await require_default_warehouse_id(self.db)
             delta = data.qty if data.type in {"IN", "ADJ"} else -data.qty
             try:
-                await apply_stock_delta(
+                balance = await apply_stock_delta(
                     self.db, data.product_id, delta, default_warehouse_id
                 )
             except ValueError as exc:
@@ -167,6 +310,7 @@ class StockService:
                 type=data.type,
                 qty=data.qty,
                 ref=data.ref,
+                balance_after=balance,
             )
             self.db.add(movement)
             await self.db.flush()
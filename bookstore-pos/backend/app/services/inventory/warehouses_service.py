@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
 from app.core.stock import apply_stock_delta
+from app.models.inventory import StockMovement
 from app.models.warehouse import Warehouse, StockLevel, StockTransfer, StockTransferItem, InventoryCount, StockBatch
 
 from app.services._transaction import service_transaction
@@ -76,7 +77,17 @@ class WarehousesService:
             batch = StockBatch(**data.model_dump())
             self.db.add(batch)
             await self.db.flush()
-            await apply_stock_delta(self.db, data.product_id, data.qty, data.warehouse_id)
+            balance = await apply_stock_delta(self.db, data.product_id, data.qty, data.warehouse_id)
+            if data.qty:
+                self.db.add(
+                    StockMovement(
+                        product_id=data.product_id,
+                        type="IN" if data.qty > 0 else "ADJ",
+                        qty=data.qty,
+                        ref=f"BATCH:{batch.id}",
+                        balance_after=balance,
+                    )
+                )
             if self.user is not None:
                 await log_event(self.db, self.user.id, "warehouse_batch", "stock_batch", str(batch.id), "")
             return {"ok": True}
@@ -92,8 +103,20 @@ class WarehousesService:
         current_qty = level.qty if level else 0
         diff = data.counted_qty - current_qty
         async with self._transaction():
-            await apply_stock_delta(self.db, data.product_id, diff, data.warehouse_id)
-            self.db.add(InventoryCount(**data.model_dump()))
+            balance = await apply_stock_delta(self.db, data.product_id, diff, data.warehouse_id)
+            count = InventoryCount(**data.model_dump())
+            self.db.add(count)
+            await self.db.flush()
+            if diff:
+                self.db.add(
+                    StockMovement(
+                        product_id=data.product_id,
+                        type="ADJ",
+                        qty=diff,
+                        ref=f"COUNT:{count.id}",
+                        balance_after=balance,
+                    )
+                )
             if self.user is not None:
                 await log_event(self.db, self.user.id, "inventory_count", "inventory_count", "", f"diff={diff}")
             return {"ok": True, "diff": diff}
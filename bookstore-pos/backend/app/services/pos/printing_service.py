@@ -8,6 +8,7 @@ from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.settings_snapshot import settings_snapshot
 from app.models.sale import Sale, SaleItem
 from app.models.product import Product
 from app.models.settings import SystemSettings
@@ -36,6 +37,5 @@ class PrintingService:
         )
         items = [(row.SaleItem, row.name) for row in items_res.all()]
 
-        settings_res = await self.db.execute(select(SystemSettings).limit(1))
-        settings = settings_res.scalar_one_or_none()
+        settings = await settings_snapshot.get(self.db)
         return sale, items, settings
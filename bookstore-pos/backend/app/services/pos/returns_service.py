@@ -10,6 +10,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
+from app.core.sales_rollup import RollupLine, estimated_unit_cost, record_sale_rollup, rollup_day
 from app.core.stock import apply_stock_delta, require_default_warehouse_id
 from app.models.inventory import StockMovement
 from app.models.product import Product
@@ -51,13 +52,15 @@ class ReturnsService:
             self.db.add(ret)
             await self.db.flush()
 
+            unit_costs: dict[int, float] = {}
             for item in items:
                 prod_res = await self.db.execute(
                     select(Product).where(Product.id == item.product_id)
                 )
                 product = prod_res.scalar_one_or_none()
+                unit_costs[item.id] = estimated_unit_cost(item, product)
                 if product:
-                    await apply_stock_delta(
+                    balance = await apply_stock_delta(
                         self.db, product.id, item.qty, default_warehouse_id
                     )
                     self.db.add(
@@ -66,6 +69,7 @@ class ReturnsService:
                             type="IN",
                             qty=item.qty,
                             ref=f"RETURN:{ret.id}",
+                            balance_after=balance,
                         )
                     )
                 self.db.add(
@@ -74,6 +78,23 @@ class ReturnsService:
                     )
                 )
 
+            await record_sale_rollup(
+                self.db,
+                day=rollup_day(sale.created_at),
+                warehouse_id=default_warehouse_id,
+                lines=(
+                    RollupLine(
+                        product_id=item.product_id,
+                        qty=item.qty,
+                        sales_total=float(item.final_total or 0),
+                        estimated_cost_total=item.qty * unit_costs[item.id],
+                    )
+                    for item in items
+                ),
+                sale_total=float(sale.total or 0),
+                sign=-1,
+            )
+
             await log_event(
                 self.db, self.user.id, "return", "sale", str(sale_id), data.reason
             )
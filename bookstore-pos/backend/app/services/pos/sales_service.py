@@ -1,6 +1,7 @@
 """Sales service module for processing POS sales transactions."""
 
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
 import json
 import logging
@@ -8,26 +9,29 @@ from decimal import Decimal
 from typing import Any, cast
 
 from fastapi import HTTPException, status
-from sqlalchemy import or_, select
+from sqlalchemy import insert, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
+from app.core.catalog_cache import CatalogEntry, catalog_cache
 from app.core.config import settings
+from app.core.kardex import stamp_balances
 from app.core.metrics import sales_amount_total, sales_total
+from app.core.sales_rollup import RollupLine, record_sale_rollup, rollup_day
+from app.core.settings_snapshot import settings_snapshot
 from app.core.stock import (
-    apply_stock_delta,
-    get_stock_level,
+    StockSnapshot,
+    apply_stock_deltas,
+    load_stock_snapshot,
     require_default_warehouse_id,
 )
 from app.models.cash import CashSession
 from app.models.customer import Customer
 from app.models.inventory import StockMovement
 from app.models.price_list import PriceListItem
-from app.models.product import Product
 from app.models.promotion import Promotion
 from app.models.promotion_rule import PromotionRule
 from app.models.sale import Sale, SaleItem, Payment
-from app.models.settings import SystemSettings
 from app.schemas.sale import SaleCreate, SaleItemCreate, PaymentCreate
 from app.services.pos.pricing import (
     ProductRuleInput,
@@ -51,6 +55,16 @@ PAYMENT_EXACT_TOLERANCE = Decimal("0.01")
 MIN_PAYMENT_AMOUNT = 0.01
 
 
+@dataclass
+class ResolvedCart:
+    """Cart lookups loaded in bulk before pricing the sale lines."""
+
+    products: dict[int, CatalogEntry]
+    stock: StockSnapshot
+    list_prices: dict[int, float]
+    rules_by_product: dict[int, list[ProductRuleInput]]
+
+
 class SalesService:
     """Service for handling POS sales operations."""
 
@@ -202,60 +216,92 @@ class SalesService:
                 )
         return rules_by_product
 
-    async def _process_sale_item(
+    async def _resolve_cart(
         self,
-        item: SaleItemCreate,
+        items: list[SaleItemCreate],
         default_warehouse_id: int,
         price_list_id: int | None,
-        rules_by_product: dict[int, list[ProductRuleInput]],
-    ) -> dict[str, Any]:
-        """Process a single sale item with pricing and stock validation.
+    ) -> ResolvedCart:
+        """Load everything the cart needs with a fixed number of queries.
+
+        Products come from the in-process catalog cache (misses are loaded
+        with a single query); stock levels, price-list prices and promotion
+        rules are fetched with one ``IN (...)`` query each, regardless of
+        line count.
 
         Args:
-            item: Sale item data.
+            items: Sale items from the request.
             default_warehouse_id: Warehouse ID for stock operations.
             price_list_id: Price list ID for customer-specific pricing.
-            rules_by_product: Promotion rules loaded for products.
 
         Returns:
-            Dictionary with processed item data including pricing.
+            ResolvedCart with all lookups keyed by product ID.
 
         Raises:
             HTTPException: If quantity invalid, product not found, or insufficient stock.
         """
-        if item.qty <= 0:
+        if any(item.qty <= 0 for item in items):
             raise HTTPException(status_code=400, detail="Cantidad invalida")
-        prod_result = await self.db.execute(
-            select(Product).where(Product.id == item.product_id)
-        )
-        product = prod_result.scalar_one_or_none()
-        if not product:
-            raise HTTPException(
-                status_code=404, detail=f"Producto {item.product_id} no encontrado"
-            )
 
-        available = await get_stock_level(self.db, product.id, default_warehouse_id)
-        if available < item.qty:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT, detail="Stock insuficiente"
-            )
+        product_ids = {item.product_id for item in items}
+        products = await catalog_cache.get_many(self.db, product_ids)
+        for item in items:
+            if item.product_id not in products:
+                raise HTTPException(
+                    status_code=404, detail=f"Producto {item.product_id} no encontrado"
+                )
 
-        price = float(product.sale_price or product.price or 0)
-        unit_cost_snapshot = float(product.unit_cost or product.cost or 0)
+        stock = await load_stock_snapshot(self.db, product_ids, default_warehouse_id)
+        requested: dict[int, int] = {}
+        for item in items:
+            requested[item.product_id] = requested.get(item.product_id, 0) + item.qty
+        for product_id, qty in requested.items():
+            if stock.available(product_id) < qty:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT, detail="Stock insuficiente"
+                )
+
+        list_prices: dict[int, float] = {}
         if price_list_id:
             price_res = await self.db.execute(
-                select(PriceListItem).where(
+                select(PriceListItem.product_id, PriceListItem.price).where(
                     PriceListItem.price_list_id == price_list_id,
-                    PriceListItem.product_id == product.id,
+                    PriceListItem.product_id.in_(product_ids),
                 )
             )
-            price_item = price_res.scalar_one_or_none()
-            if price_item:
-                price = float(price_item.price)
+            list_prices = {
+                int(row.product_id): float(row.price) for row in price_res.all()
+            }
+
+        rules_by_product = await self._load_product_rules(product_ids)
+        return ResolvedCart(
+            products=products,
+            stock=stock,
+            list_prices=list_prices,
+            rules_by_product=rules_by_product,
+        )
+
+    def _process_sale_item(
+        self, item: SaleItemCreate, cart: ResolvedCart
+    ) -> dict[str, Any]:
+        """Price a single sale item from the already resolved cart.
+
+        Args:
+            item: Sale item data.
+            cart: Products, prices and rules loaded by ``_resolve_cart``.
+
+        Returns:
+            Dictionary with processed item data including pricing.
+        """
+        product = cart.products[item.product_id]
+        price = float(product.sale_price or product.price or 0)
+        unit_cost_snapshot = float(product.unit_cost or product.cost or 0)
+        if product.id in cart.list_prices:
+            price = cart.list_prices[product.id]
 
         line_total = price * item.qty
         rule_result = select_best_product_rule(
-            item.qty, price, rules_by_product.get(product.id, [])
+            item.qty, price, cart.rules_by_product.get(product.id, [])
         )
         item_pack_discount = max(0.0, min(line_total, float(rule_result.discount)))
         final_line_total = line_total - item_pack_discount
@@ -464,8 +510,7 @@ class SalesService:
                     status_code=status.HTTP_409_CONFLICT, detail="Caja no abierta"
                 )
 
-            settings_result = await self.db.execute(select(SystemSettings).limit(1))
-            system_settings = settings_result.scalar_one_or_none()
+            system_settings = await settings_snapshot.get(self.db)
             if system_settings:
                 tax_rate = system_settings.tax_rate
                 tax_included = system_settings.tax_included
@@ -479,20 +524,16 @@ class SalesService:
             self._validate_customer_for_document(document_type, customer)
             price_list_id = customer.price_list_id if customer else None
             promo = await self._resolve_promotion(data.promotion_id)
-            sequence_service = DocumentSequenceService(self.db)
-            invoice_number = await sequence_service.next_number(document_type)
-
-            product_ids = {item.product_id for item in data.items}
-            rules_by_product = await self._load_product_rules(product_ids)
+            cart = await self._resolve_cart(
+                data.items, default_warehouse_id, price_list_id
+            )
 
             items_payload: list[dict[str, Any]] = []
             base_total = 0.0
             pack_discount_total = 0.0
 
             for item in data.items:
-                item_payload = await self._process_sale_item(
-                    item, default_warehouse_id, price_list_id, rules_by_product
-                )
+                item_payload = self._process_sale_item(item, cart)
                 base_total += item_payload["final_line_total"]
                 pack_discount_total += item_payload["pack_discount"]
                 items_payload.append(item_payload)
@@ -516,6 +557,10 @@ class SalesService:
 
             normalized_payments = self._validate_payments(data.payments, total)
 
+            # Número al final de las validaciones: en modo sin bloques la
+            # reserva es la primera escritura y retiene la fila hasta el commit.
+            invoice_number = await DocumentSequenceService(self.db).next_number(document_type)
+
             sale = Sale(
                 user_id=self.user.id,
                 customer_id=data.customer_id,
@@ -551,45 +596,75 @@ class SalesService:
                     int(customer.loyalty_total_redeemed or 0) + redeem_points
                 )
 
+            stock_deltas: dict[int, int] = {}
             for item_payload in items_payload:
-                product = item_payload["product"]
-                qty = item_payload["qty"]
-                try:
-                    await apply_stock_delta(
-                        self.db, product.id, -qty, default_warehouse_id
-                    )
-                except ValueError as e:
-                    logger.error(
-                        "Stock delta failed: product_id=%s qty=%s warehouse=%s error=%s",
-                        product.id,
-                        qty,
-                        default_warehouse_id,
-                        str(e),
-                    )
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail=f"Stock insuficiente en almacen: {str(e)}",
-                    )
-                sale_item = SaleItem(
-                    sale_id=sale.id,
-                    product_id=product.id,
-                    qty=qty,
-                    unit_price=item_payload["unit_price"],
-                    unit_cost_snapshot=item_payload["unit_cost_snapshot"],
-                    line_total=item_payload["line_total"],
-                    discount=item_payload["pack_discount"],
-                    final_total=item_payload["final_line_total"],
-                    applied_rule_id=item_payload["applied_rule_id"],
-                    applied_rule_meta=item_payload["applied_rule_meta"],
+                product_id = item_payload["product"].id
+                stock_deltas[product_id] = (
+                    stock_deltas.get(product_id, 0) - item_payload["qty"]
+                )
+            try:
+                await apply_stock_deltas(self.db, cart.stock, stock_deltas)
+            except ValueError as e:
+                logger.error(
+                    "Stock delta failed: deltas=%s warehouse=%s error=%s",
+                    stock_deltas,
+                    default_warehouse_id,
+                    str(e),
                 )
-                self.db.add(sale_item)
-                movement = StockMovement(
-                    product_id=product.id,
-                    type="OUT",
-                    qty=qty,
-                    ref=f"SALE:{sale.id}",
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Stock insuficiente en almacen: {str(e)}",
                 )
-                self.db.add(movement)
+
+            await self.db.execute(
+                insert(SaleItem),
+                [
+                    {
+                        "sale_id": sale.id,
+                        "product_id": item_payload["product"].id,
+                        "qty": item_payload["qty"],
+                        "unit_price": item_payload["unit_price"],
+                        "unit_cost_snapshot": item_payload["unit_cost_snapshot"],
+                        "line_total": item_payload["line_total"],
+                        "discount": item_payload["pack_discount"],
+                        "final_total": item_payload["final_line_total"],
+                        "applied_rule_id": item_payload["applied_rule_id"],
+                        "applied_rule_meta": item_payload["applied_rule_meta"],
+                    }
+                    for item_payload in items_payload
+                ],
+            )
+            await self.db.execute(
+                insert(StockMovement),
+                stamp_balances(
+                    [
+                        {
+                            "product_id": item_payload["product"].id,
+                            "type": "OUT",
+                            "qty": item_payload["qty"],
+                            "ref": f"SALE:{sale.id}",
+                        }
+                        for item_payload in items_payload
+                    ],
+                    cart.stock.totals,
+                ),
+            )
+            await record_sale_rollup(
+                self.db,
+                day=rollup_day(sale.created_at),
+                warehouse_id=default_warehouse_id,
+                lines=(
+                    RollupLine(
+                        product_id=item_payload["product"].id,
+                        qty=item_payload["qty"],
+                        sales_total=item_payload["final_line_total"],
+                        estimated_cost_total=item_payload["qty"]
+                        * item_payload["unit_cost_snapshot"],
+                    )
+                    for item_payload in items_payload
+                ),
+                sale_total=total,
+            )
 
             for method, amount in normalized_payments:
                 payment = Payment(sale_id=sale.id, method=method, amount=amount)
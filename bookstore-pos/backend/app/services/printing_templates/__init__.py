@@ -1,3 +1,4 @@
+from app.services.printing_templates.document_batch_service import DocumentBatchJobService
 from app.services.printing_templates.document_render_service import DocumentRenderService
 from app.services.printing_templates.document_sequence_service import DocumentSequenceService
 from app.services.printing_templates.document_snapshot_service import DocumentSnapshotService
@@ -5,6 +6,7 @@ from app.services.printing_templates.template_service import TemplateService
 from app.services.printing_templates.template_version_service import TemplateVersionService
 
 __all__ = [
+    "DocumentBatchJobService",
     "DocumentRenderService",
     "DocumentSequenceService",
     "DocumentSnapshotService",
@@ -0,0 +1,259 @@
+"""
+Plantillas de impresión compiladas.
+
+compile_template convierte el schema_json de una versión de plantilla en una
+lista de operaciones listas para ejecutar: el JSON se parsea una sola vez, los
+textos quedan partidos en segmentos literales/placeholder con la ruta de cada
+clave ya separada, y el HTML fijo (raíz, cabeceras de tabla, líneas) queda
+armado de antemano. Renderizar es una pasada lineal sobre esas operaciones,
+sin json.loads ni expresiones regulares por venta.
+
+La salida es idéntica a la del intérprete anterior de DocumentRenderService.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Callable
+from html import escape
+from typing import Any
+
+from fastapi import HTTPException
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([a-zA-Z0-9_.-]+)\s*\}\}")
+
+# (context, html_parts, text_lines, warnings)
+_Op = Callable[[dict, list[str], list[str], list[str]], None]
+# Literal o ruta de clave: "total" o ("customer", "name").
+_Segment = str | tuple[str, ...]
+
+_TABLE_OPEN = "<table style='width:100%;border-collapse:collapse;font-size:12px;'>"
+_TABLE_HEADER = (
+    "<thead><tr>"
+    "<th style='text-align:left;border-bottom:1px solid #ccc;'>Producto</th>"
+    "<th style='text-align:right;border-bottom:1px solid #ccc;'>Cant</th>"
+    "<th style='text-align:right;border-bottom:1px solid #ccc;'>P.Unit</th>"
+    "<th style='text-align:right;border-bottom:1px solid #ccc;'>Total</th>"
+    "</tr></thead>"
+)
+
+
+def _lookup(context: dict, path: str | tuple[str, ...]):
+    if isinstance(path, str):
+        return context.get(path)
+    current: Any = context
+    for part in path:
+        if isinstance(current, dict):
+            current = current.get(part)
+        else:
+            return None
+    return current
+
+
+class _Text:
+    """Texto con placeholders partido en segmentos."""
+
+    __slots__ = ("static", "_segments")
+
+    def __init__(self, value: str) -> None:
+        parts = PLACEHOLDER_RE.split(value)
+        segments: list[_Segment] = []
+        for index, part in enumerate(parts):
+            if index % 2 == 0:
+                if part:
+                    segments.append(part)
+            else:
+                segments.append(tuple(part.split(".")) if "." in part else (part,))
+        self._segments = tuple(segments)
+        # Sin placeholders el resultado es constante.
+        self.static: str | None = value if all(isinstance(s, str) for s in segments) else None
+
+    def resolve(self, context: dict) -> str:
+        if self.static is not None:
+            return self.static
+        out: list[str] = []
+        for segment in self._segments:
+            if isinstance(segment, str):
+                out.append(segment)
+                continue
+            value = _lookup(context, segment[0] if len(segment) == 1 else segment)
+            if value is not None:
+                out.append(str(value))
+        return "".join(out)
+
+
+def _static(html: str | None, text_lines: tuple[str, ...] = (), warning: str | None = None) -> _Op:
+    def op(context: dict, html_parts: list[str], lines: list[str], warnings: list[str]) -> None:
+        if html is not None:
+            html_parts.append(html)
+        lines.extend(text_lines)
+        if warning is not None:
+            warnings.append(warning)
+
+    return op
+
+
+def _text_html(rendered: str) -> str:
+    return f"<div>{escape(rendered).replace(chr(10), '<br/>')}</div>"
+
+
+def _compile_text(content: str) -> _Op:
+    text = _Text(content)
+    if text.static is not None:
+        return _static(_text_html(text.static), tuple(text.static.splitlines() or [""]))
+
+    def op(context: dict, html_parts: list[str], lines: list[str], warnings: list[str]) -> None:
+        rendered = text.resolve(context)
+        html_parts.append(_text_html(rendered))
+        lines.extend(rendered.splitlines() or [""])
+
+    return op
+
+
+def _compile_items_table(config: dict) -> _Op:
+    opening = _TABLE_OPEN + "\n" + _TABLE_HEADER if bool(config.get("show_header", True)) else _TABLE_OPEN
+
+    def op(context: dict, html_parts: list[str], lines: list[str], warnings: list[str]) -> None:
+        html_parts.append(opening)
+        html_parts.append("<tbody>")
+        lines.append("Items:")
+        # Columnas fijas: cada fila es un único f-string sobre valores ya convertidos.
+        add_html, add_line = html_parts.append, lines.append
+        for item in context.get("items") or []:
+            get = item.get
+            name = get("name", "")
+            qty = int(get("qty", 0))
+            unit_price = float(get("unit_price", 0))
+            line_total = float(get("line_total", 0))
+            add_html(
+                f"<tr><td>{escape(str(name))}</td>"
+                f"<td style='text-align:right'>{qty}</td>"
+                f"<td style='text-align:right'>{unit_price:.2f}</td>"
+                f"<td style='text-align:right'>{line_total:.2f}</td></tr>"
+            )
+            add_line(f"{name} | {qty} x {unit_price:.2f} = {line_total:.2f}")
+        html_parts.append("</tbody></table>")
+
+    return op
+
+
+def _totals(context: dict, html_parts: list[str], lines: list[str], warnings: list[str]) -> None:
+    subtotal = float(context.get("subtotal", 0))
+    tax = float(context.get("tax", 0))
+    discount = float(context.get("discount", 0))
+    total = float(context.get("total", 0))
+    html_parts.append(
+        "<div style='margin-top:6px;text-align:right'>"
+        f"<div>Subtotal: {subtotal:.2f}</div>"
+        f"<div>Impuesto: {tax:.2f}</div>"
+        f"<div>Descuento: {discount:.2f}</div>"
+        f"<div style='font-weight:700'>Total: {total:.2f}</div>"
+        "</div>"
+    )
+    lines.extend(
+        [
+            f"Subtotal: {subtotal:.2f}",
+            f"Impuesto: {tax:.2f}",
+            f"Descuento: {discount:.2f}",
+            f"Total: {total:.2f}",
+        ]
+    )
+
+
+def _compile_code(content: str, label: str) -> _Op:
+    text = _Text(content)
+
+    def op(context: dict, html_parts: list[str], lines: list[str], warnings: list[str]) -> None:
+        rendered = text.resolve(context)
+        html_parts.append(f"<div style='margin-top:4px'>{label}: {escape(rendered)}</div>")
+        lines.append(f"{label}: {rendered}")
+
+    return op
+
+
+def _compile_image(content: str, element_id) -> _Op:
+    text = _Text(content)
+    missing = f"Elemento image ({element_id}) sin contenido"
+    if text.static == "":
+        return _static(None, warning=missing)
+
+    def op(context: dict, html_parts: list[str], lines: list[str], warnings: list[str]) -> None:
+        src = text.resolve(context)
+        if src:
+            html_parts.append(f"<img src='{escape(src)}' alt='image' style='max-width:100%;'/>")
+        else:
+            warnings.append(missing)
+
+    return op
+
+
+def _compile_conditional(content: str) -> _Op:
+    key = content.strip().replace("{{", "").replace("}}", "").strip()
+
+    def op(context: dict, html_parts: list[str], lines: list[str], warnings: list[str]) -> None:
+        value = str(context.get(key, "")).strip()
+        if value:
+            html_parts.append(f"<div>{escape(value)}</div>")
+            lines.append(value)
+
+    return op
+
+
+def _compile_element(element: dict) -> _Op | None:
+    if not element.get("visible", True):
+        return None
+    element_type = (element.get("type") or "").strip().lower()
+    content = str(element.get("content", ""))
+    if element_type == "text":
+        return _compile_text(content)
+    if element_type == "line":
+        return _static("<hr/>", ("-" * 32,))
+    if element_type == "items_table":
+        return _compile_items_table(element.get("config") or {})
+    if element_type == "totals_block":
+        return _totals
+    if element_type in {"qr", "barcode"}:
+        return _compile_code(content, "QR" if element_type == "qr" else "BAR")
+    if element_type == "image":
+        return _compile_image(content, element.get("id"))
+    if element_type == "conditional_block":
+        return _compile_conditional(content)
+    return _static(None, warning=f"Tipo de elemento no soportado: {element_type or 'vacio'}")
+
+
+class CompiledTemplate:
+    """Versión de plantilla lista para renderizar contextos de venta."""
+
+    __slots__ = ("_root", "_ops")
+
+    def __init__(self, root: str, ops: tuple[_Op, ...]) -> None:
+        self._root = root
+        self._ops = ops
+
+    def render(self, context: dict) -> tuple[str, str, list[str]]:
+        html_parts = [self._root]
+        text_lines: list[str] = []
+        warnings: list[str] = []
+        for op in self._ops:
+            op(context, html_parts, text_lines, warnings)
+        html_parts.append("</div>")
+        return "\n".join(html_parts), "\n".join(text_lines), warnings
+
+
+def compile_template(schema_json: str) -> CompiledTemplate:
+    try:
+        schema = json.loads(schema_json or "{}")
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=422, detail=f"Schema JSON invalido: {exc.msg}")
+
+    paper = schema.get("paper") or {}
+    width_mm = float(paper.get("width_mm") or 80)
+    margins = paper.get("margins_mm") or {"top": 2, "right": 2, "bottom": 2, "left": 2}
+    root = (
+        "<div class='receipt-root' style='font-family:Arial,sans-serif;"
+        f"width:{width_mm}mm;padding:{margins.get('top', 2)}mm {margins.get('right', 2)}mm "
+        f"{margins.get('bottom', 2)}mm {margins.get('left', 2)}mm;'>"
+    )
+    ops = (_compile_element(element) for element in schema.get("elements") or [])
+    return CompiledTemplate(root, tuple(op for op in ops if op is not None))
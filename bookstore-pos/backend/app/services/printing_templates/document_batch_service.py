@@ -0,0 +1,360 @@
+"""
+Impresión masiva de boletas y facturas (cierre del día).
+
+Un job toma un rango de días comerciales o una caja, arma los contextos de
+venta en bloques (DocumentRenderService.build_sale_contexts: cinco consultas
+por bloque en lugar de cinco por venta) y dibuja los PDFs en el pool de
+procesos. El resultado queda en disco como un ZIP (un PDF por documento) o un
+único PDF combinado, y se descarga con streaming cuando el job termina. El
+avance se consulta igual que en los jobs de importación de inventario.
+
+- ZIP: los documentos se dibujan en paralelo, como máximo tantos a la vez
+  como procesos tenga el pool, para dejar cupo a las reimpresiones de caja.
+- PDF combinado: un solo lienzo de ReportLab en un proceso del pool; el
+  avance salta al terminar porque no hay dependencia para unir PDFs parciales.
+- Sin documentos en el rango: el job termina sin archivo en ambos formatos,
+  con NO_DOCUMENTS_MESSAGE, y la descarga responde 404 con ese mensaje.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import re
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.audit import log_event
+from app.core.config import settings
+from app.core.dates import day_range_filter
+from app.core.metrics import document_batch_job_duration_seconds, document_batch_jobs_total
+from app.core.render_cache import render_cache, render_fingerprint
+from app.core.render_pool import render_pool
+import app.db.session as db_session
+from app.models.cash import CashSession
+from app.models.document_batch_job import DocumentBatchJob
+from app.models.sale import Sale
+from app.schemas.document_batch import DocumentBatchJobCreate
+from app.services.printing_templates import pdf_render
+from app.services.printing_templates.document_render_service import DocumentRenderService
+from app.services.printing_templates.pdf_render import RENDER_VERSION
+
+logger = logging.getLogger("bookstore.printing")
+
+LEGAL_DOCUMENT_TYPES = ("BOLETA", "FACTURA")
+ALLOWED_JOB_STATUSES = {"pending", "running", "success", "failed", "partial"}
+# Ventas por bloque de contextos (y por commit de avance).
+CONTEXT_CHUNK_SIZE = 200
+# Reintentos cuando el pool responde 503 por reimpresiones en curso.
+BUSY_RETRIES = 3
+# Job terminado sin documentos: no genera archivo (ni ZIP ni PDF).
+NO_DOCUMENTS_MESSAGE = "No hay boletas ni facturas en el rango"
+
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def legal_document_fingerprint(context: dict, document_type: str, tax_rate: float) -> str:
+    """Huella de una boleta/factura; compartida con el router de impresión."""
+    return render_fingerprint("legal", RENDER_VERSION, document_type, tax_rate, context)
+
+
+@dataclass(frozen=True)
+class _BatchDocument:
+    sale_id: int
+    document_type: str
+    tax_rate: float
+
+
+class DocumentBatchJobService:
+    def __init__(self, db: AsyncSession, current_user, request_id: str | None = None):
+        self.db = db
+        self.current_user = current_user
+        self.request_id = request_id
+
+    async def create_job(self, data: DocumentBatchJobCreate) -> DocumentBatchJob:
+        has_range = data.date_from is not None or data.date_to is not None
+        if has_range == (data.cash_session_id is not None):
+            raise HTTPException(
+                status_code=400,
+                detail="Indique un rango de fechas o una caja (cash_session_id), no ambos",
+            )
+        if data.date_from and data.date_to and data.date_to < data.date_from:
+            raise HTTPException(status_code=400, detail="date_to no puede ser menor que date_from")
+        if data.cash_session_id is not None:
+            result = await self.db.execute(
+                select(CashSession).where(CashSession.id == data.cash_session_id)
+            )
+            cash_session = result.scalar_one_or_none()
+            if not cash_session:
+                raise HTTPException(status_code=404, detail="Caja no encontrada")
+            if self.current_user.role != "admin" and cash_session.user_id != self.current_user.id:
+                raise HTTPException(status_code=403, detail="Sin permisos")
+        now = _now()
+        job = DocumentBatchJob(
+            created_by=self.current_user.id,
+            status="pending",
+            output_format=data.output_format,
+            date_from=data.date_from,
+            date_to=data.date_to,
+            cash_session_id=data.cash_session_id,
+            request_id=self.request_id,
+            total_documents=0,
+            processed_documents=0,
+            error_documents=0,
+            file_path=None,
+            error_message=None,
+            created_at=now,
+            started_at=None,
+            finished_at=None,
+            updated_at=now,
+        )
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        return job
+
+    async def get_job(self, job_id: int) -> DocumentBatchJob:
+        result = await self.db.execute(select(DocumentBatchJob).where(DocumentBatchJob.id == job_id))
+        job = result.scalar_one_or_none()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job no encontrado")
+        return job
+
+
+def _output_dir() -> Path:
+    directory = Path(settings.document_batch_dir or Path(tempfile.gettempdir()) / "bookstore-document-batches")
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def _entry_name(context: dict, document: _BatchDocument) -> str:
+    number = _UNSAFE_NAME_RE.sub("_", str(context.get("document_number") or "")).strip("_")
+    return f"{document.document_type.lower()}_{number or document.sale_id}.pdf"
+
+
+def _chunks(documents: list[_BatchDocument], size: int):
+    for start in range(0, len(documents), size):
+        yield documents[start : start + size]
+
+
+async def _select_documents(session: AsyncSession, job: DocumentBatchJob) -> list[_BatchDocument]:
+    stmt = select(Sale.id, Sale.document_type, Sale.tax_rate).where(
+        Sale.document_type.in_(LEGAL_DOCUMENT_TYPES),
+        Sale.status != "VOID",
+    )
+    if job.cash_session_id is not None:
+        # Las ventas no guardan la caja: se toman las del cajero mientras estuvo abierta.
+        result = await session.execute(select(CashSession).where(CashSession.id == job.cash_session_id))
+        cash_session = result.scalar_one()
+        stmt = stmt.where(
+            Sale.user_id == cash_session.user_id,
+            Sale.created_at >= cash_session.opened_at,
+            Sale.created_at <= (cash_session.closed_at or _now()),
+        )
+    else:
+        date_filter = day_range_filter(Sale.created_at, job.date_from, job.date_to)
+        if date_filter is not None:
+            stmt = stmt.where(date_filter)
+    rows = await session.execute(stmt.order_by(Sale.created_at.asc(), Sale.id.asc()))
+    return [
+        _BatchDocument(row.id, (row.document_type or "").strip().upper(), float(row.tax_rate or 0.0))
+        for row in rows.all()
+    ]
+
+
+async def _render_document(context: dict, document: _BatchDocument) -> bytes:
+    # Solo lectura de la caché: un cierre de miles de documentos no desplaza
+    # las reimpresiones recientes de la caja.
+    cached = render_cache.get(
+        f"{legal_document_fingerprint(context, document.document_type, document.tax_rate)}.pdf"
+    )
+    if cached is not None:
+        return cached
+    attempt = 0
+    while True:
+        try:
+            return await render_pool.run(
+                pdf_render.build_legal_document_pdf,
+                context,
+                document.document_type,
+                document.tax_rate,
+            )
+        except HTTPException as exc:
+            if exc.status_code != 503 or attempt >= BUSY_RETRIES:
+                raise
+            attempt += 1
+            await asyncio.sleep(1)
+
+
+async def _record_progress(session: AsyncSession, job: DocumentBatchJob, processed: int, errors: int) -> None:
+    job.processed_documents += processed
+    job.error_documents += errors
+    job.updated_at = _now()
+    await session.commit()
+
+
+async def _write_zip(
+    session: AsyncSession, job: DocumentBatchJob, documents: list[_BatchDocument], path: Path
+) -> None:
+    render_service = DocumentRenderService(session)
+    semaphore = asyncio.Semaphore(max(1, settings.render_pool_workers))
+    failures: list[str] = []
+
+    async def render_bounded(context: dict, document: _BatchDocument) -> bytes:
+        async with semaphore:
+            return await _render_document(context, document)
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for chunk in _chunks(documents, CONTEXT_CHUNK_SIZE):
+            contexts = await render_service.build_sale_contexts([document.sale_id for document in chunk])
+            present = [document for document in chunk if document.sale_id in contexts]
+            results = await asyncio.gather(
+                *(render_bounded(contexts[document.sale_id], document) for document in present),
+                return_exceptions=True,
+            )
+            chunk_errors = len(chunk) - len(present)
+            failures.extend(
+                f"venta {document.sale_id}: no encontrada"
+                for document in chunk
+                if document.sale_id not in contexts
+            )
+            for document, result in zip(present, results):
+                if isinstance(result, BaseException):
+                    if not isinstance(result, Exception):
+                        raise result
+                    chunk_errors += 1
+                    detail = result.detail if isinstance(result, HTTPException) else str(result)
+                    failures.append(f"venta {document.sale_id}: {detail}")
+                    continue
+                archive.writestr(_entry_name(contexts[document.sale_id], document), result)
+            await _record_progress(session, job, len(chunk), chunk_errors)
+        if failures:
+            archive.writestr("errores.txt", "\n".join(failures) + "\n")
+
+
+async def _write_merged_pdf(
+    session: AsyncSession, job: DocumentBatchJob, documents: list[_BatchDocument], path: Path
+) -> None:
+    render_service = DocumentRenderService(session)
+    pages: list[tuple[dict, str, float]] = []
+    missing = 0
+    for chunk in _chunks(documents, CONTEXT_CHUNK_SIZE):
+        contexts = await render_service.build_sale_contexts([document.sale_id for document in chunk])
+        for document in chunk:
+            context = contexts.get(document.sale_id)
+            if context is None:
+                missing += 1
+                continue
+            pages.append((context, document.document_type, document.tax_rate))
+    if pages:
+        chunks = math.ceil(len(pages) / CONTEXT_CHUNK_SIZE)
+        content = await render_pool.run(
+            pdf_render.build_legal_documents_pdf,
+            pages,
+            timeout_seconds=settings.render_timeout_seconds * chunks,
+        )
+        path.write_bytes(content)
+    await _record_progress(session, job, len(documents), missing)
+
+
+async def _mark_job_running(session: AsyncSession, job: DocumentBatchJob) -> None:
+    now = _now()
+    job.status = "running"
+    job.started_at = now
+    job.updated_at = now
+    job.error_message = None
+    await session.commit()
+
+
+async def run_document_batch_job(job_id: int) -> None:
+    started_perf = perf_counter()
+    final_status = "failed"
+    request_id = ""
+    try:
+        async with db_session.AsyncSessionLocal() as session:
+            job_result = await session.execute(select(DocumentBatchJob).where(DocumentBatchJob.id == job_id))
+            job = job_result.scalar_one_or_none()
+            if not job:
+                return
+            request_id = job.request_id or ""
+            await _mark_job_running(session, job)
+            path = _output_dir() / f"document_batch_{job.id}.{job.output_format}"
+            part_path = path.with_name(f".{path.name}.part")
+            try:
+                documents = await _select_documents(session, job)
+                if len(documents) > settings.document_batch_max_documents:
+                    raise ValueError(
+                        f"El rango tiene {len(documents)} documentos; "
+                        f"máximo {settings.document_batch_max_documents} por job"
+                    )
+                job.total_documents = len(documents)
+                job.updated_at = _now()
+                await session.commit()
+
+                if not documents:
+                    job.error_message = NO_DOCUMENTS_MESSAGE
+                elif job.output_format == "pdf":
+                    await _write_merged_pdf(session, job, documents, part_path)
+                else:
+                    await _write_zip(session, job, documents, part_path)
+                if part_path.exists():
+                    os.replace(part_path, path)
+                    job.file_path = str(path)
+
+                job.finished_at = _now()
+                job.updated_at = _now()
+                if job.total_documents > 0 and job.error_documents == job.total_documents:
+                    job.status = "failed"
+                elif job.error_documents > 0:
+                    job.status = "partial"
+                else:
+                    job.status = "success"
+                final_status = job.status if job.status in ALLOWED_JOB_STATUSES else "failed"
+                await log_event(
+                    session,
+                    job.created_by,
+                    "document_batch_job",
+                    "document_batch_job",
+                    str(job.id),
+                    f"status={job.status};documents={job.total_documents};errors={job.error_documents}",
+                )
+                await session.commit()
+            except Exception as exc:
+                await session.rollback()
+                part_path.unlink(missing_ok=True)
+                job.status = "failed"
+                job.error_message = exc.detail if isinstance(exc, HTTPException) else str(exc)
+                job.finished_at = _now()
+                job.updated_at = _now()
+                final_status = "failed"
+                await session.commit()
+                logger.exception(
+                    "Document batch job failed request_id=%s job_id=%s error=%s",
+                    request_id or "-",
+                    job.id,
+                    job.error_message,
+                )
+            else:
+                logger.info(
+                    "Document batch job completed request_id=%s job_id=%s status=%s documents=%s errors=%s",
+                    request_id or "-",
+                    job.id,
+                    job.status,
+                    job.total_documents,
+                    job.error_documents,
+                )
+    finally:
+        document_batch_job_duration_seconds.observe(perf_counter() - started_perf)
+        document_batch_jobs_total.labels(final_status).inc()
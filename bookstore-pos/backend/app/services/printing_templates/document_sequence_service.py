@@ -1,9 +1,37 @@
+"""
+Numeración de documentos (ticket, boleta, factura).
+
+Cada número se reserva con un único UPDATE ... RETURNING sobre la fila de la
+secuencia, sin leer y reescribir el contador desde el ORM.
+
+Con DOCUMENT_NUMBER_BLOCK_SIZE = 0 (por defecto) la reserva va dentro de la
+transacción de la venta: si la venta se revierte el contador también, y la
+serie queda sin huecos, pero la fila queda bloqueada hasta el commit.
+
+Con DOCUMENT_NUMBER_BLOCK_SIZE > 0 cada worker reserva bloques de N números
+por secuencia (las secuencias ya se separan por scope_type/scope_ref_id, p. ej.
+una por terminal) en una transacción corta propia, y las ventas toman números
+del bloque en memoria sin tocar la fila. Un número tomado por una venta que se
+revierte vuelve al bloque y se reutiliza. Lo que sobra de un bloque al apagar
+el worker se registra en document_number_gaps; si el proceso muere sin apagar,
+audit_sequence detecta esos números como faltantes.
+"""
+
 from __future__ import annotations
 
-from sqlalchemy import select
+import asyncio
+import heapq
+from collections import Counter
+from dataclasses import dataclass, field
+
+from sqlalchemy import event, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
 
-from app.models.document_sequence import DocumentSequence
+import app.db.session as db_session
+from app.core.config import settings
+from app.models.document_sequence import DocumentNumberGap, DocumentSequence
+from app.models.sale import Sale
 
 
 DEFAULT_SERIES_BY_TYPE = {
@@ -12,6 +40,103 @@ DEFAULT_SERIES_BY_TYPE = {
     "FACTURA": "F001",
 }
 
+_TAKEN_KEY = "document_numbers_taken"
+
+
+async def reserve_numbers(db: AsyncSession, sequence_id: int, count: int = 1) -> int:
+    """Avanza el contador count posiciones y devuelve el primer número reservado."""
+    result = await db.execute(
+        update(DocumentSequence)
+        .where(DocumentSequence.id == sequence_id)
+        .values(next_number=DocumentSequence.next_number + count)
+        .returning(DocumentSequence.next_number)
+        .execution_options(synchronize_session=False)
+    )
+    return int(result.scalar_one()) - count
+
+
+@dataclass
+class _Block:
+    document_type: str
+    series: str
+    free: list[int] = field(default_factory=list)  # heap: se entrega siempre el menor
+
+
+class DocumentNumberBlocks:
+    """Bloques de números reservados por este worker, uno por secuencia."""
+
+    def __init__(self) -> None:
+        self._blocks: dict[int, _Block] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    async def take(self, sequence: DocumentSequence, block_size: int) -> int:
+        block = self._blocks.get(sequence.id)
+        if block is None or not block.free:
+            lock = self._locks.setdefault(sequence.id, asyncio.Lock())
+            async with lock:
+                block = self._blocks.setdefault(sequence.id, _Block(sequence.document_type, sequence.series))
+                if not block.free:
+                    # Transacción propia: el bloque queda confirmado aunque la venta se revierta.
+                    async with db_session.AsyncSessionLocal() as session:
+                        first = await reserve_numbers(session, sequence.id, block_size)
+                        await session.commit()
+                    block.free.extend(range(first, first + block_size))
+        return heapq.heappop(block.free)
+
+    def give_back(self, sequence_id: int, number: int) -> None:
+        block = self._blocks.get(sequence_id)
+        if block is not None:
+            heapq.heappush(block.free, number)
+
+    def pending(self, sequence_id: int) -> list[int]:
+        block = self._blocks.get(sequence_id)
+        return sorted(block.free) if block else []
+
+    async def release(self) -> int:
+        """Registra como huecos los números sin usar y vacía los bloques."""
+        blocks, self._blocks, self._locks = self._blocks, {}, {}
+        gaps = [
+            DocumentNumberGap(
+                sequence_id=sequence_id,
+                document_type=block.document_type,
+                series=block.series,
+                number=number,
+                reason="unused_block",
+            )
+            for sequence_id, block in blocks.items()
+            for number in sorted(block.free)
+        ]
+        if gaps:
+            async with db_session.AsyncSessionLocal() as session:
+                session.add_all(gaps)
+                await session.commit()
+        return len(gaps)
+
+
+document_number_blocks = DocumentNumberBlocks()
+
+
+@event.listens_for(Session, "after_commit")
+def _keep_after_commit(session: Session) -> None:
+    session.info.pop(_TAKEN_KEY, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _give_back_after_rollback(session: Session, transaction: SessionTransaction) -> None:
+    # Tras un commit la lista ya no está; aquí solo llegan rollbacks o cierres sin commit.
+    if transaction.parent is not None:
+        return
+    for sequence_id, number in session.info.pop(_TAKEN_KEY, ()):
+        document_number_blocks.give_back(sequence_id, number)
+
+
+def _parse_number(invoice_number: str, series: str) -> int | None:
+    prefix = f"{series}-"
+    if not invoice_number.startswith(prefix):
+        return None
+    suffix = invoice_number[len(prefix):]
+    return int(suffix) if suffix.isdigit() else None
+
 
 class DocumentSequenceService:
     def __init__(self, db: AsyncSession):
@@ -19,19 +144,82 @@ class DocumentSequenceService:
 
     async def next_number(self, document_type: str, scope_type: str = "GLOBAL", scope_ref_id: int | None = None) -> str:
         normalized_type = (document_type or "TICKET").strip().upper()
-        sequence = await self._get_or_create_active_sequence(normalized_type, scope_type, scope_ref_id)
-        current = int(sequence.next_number or 1)
+        sequence, created = await self._get_or_create_active_sequence(normalized_type, scope_type, scope_ref_id)
+        block_size = int(settings.document_number_block_size or 0)
+        if block_size > 0 and not created:
+            current = await document_number_blocks.take(sequence, block_size)
+            self.db.sync_session.info.setdefault(_TAKEN_KEY, []).append((sequence.id, current))
+        else:
+            # Una secuencia recién creada aún no está confirmada: se reserva en esta transacción.
+            current = await reserve_numbers(self.db, sequence.id)
         series = (sequence.series or DEFAULT_SERIES_BY_TYPE.get(normalized_type, "T001")).strip()
         padding = max(1, int(sequence.number_padding or 6))
-        sequence.next_number = current + 1
         return f"{series}-{current:0{padding}d}"
 
+    async def audit_sequence(self, sequence: DocumentSequence) -> dict:
+        """Compara los números emitidos con el rango reservado de una secuencia.
+
+        Returns:
+            dict con emitidos, duplicados, huecos registrados y números faltantes
+            (reservados, sin venta y sin hueco registrado).
+        """
+        series = (sequence.series or "").strip()
+        issued_result = await self.db.execute(
+            select(Sale.invoice_number).where(Sale.invoice_number.like(f"{series}-%"))
+        )
+        issued: Counter[int] = Counter()
+        for (invoice_number,) in issued_result.all():
+            number = _parse_number(invoice_number or "", series)
+            if number is not None:
+                issued[number] += 1
+        gaps_result = await self.db.execute(
+            select(DocumentNumberGap.number).where(DocumentNumberGap.sequence_id == sequence.id)
+        )
+        gaps = set(gaps_result.scalars().all())
+        issued_set = set(issued)
+        duplicates = sorted(number for number, count in issued.items() if count > 1)
+
+        next_result = await self.db.execute(
+            select(DocumentSequence.next_number).where(DocumentSequence.id == sequence.id)
+        )
+        end = int(next_result.scalar_one() or 1)
+        start = min(issued_set | gaps, default=end)
+        pending = set(document_number_blocks.pending(sequence.id))
+        missing = [
+            number
+            for number in range(start, end)
+            if number not in issued_set and number not in gaps and number not in pending
+        ]
+        return {
+            "sequence_id": sequence.id,
+            "document_type": sequence.document_type,
+            "series": series,
+            "next_number": end,
+            "issued": len(issued_set),
+            "duplicates": duplicates,
+            "recorded_gaps": len(gaps),
+            "missing": missing,
+        }
+
+    async def record_gaps(self, sequence: DocumentSequence, numbers: list[int], reason: str = "audit") -> None:
+        self.db.add_all(
+            DocumentNumberGap(
+                sequence_id=sequence.id,
+                document_type=sequence.document_type,
+                series=sequence.series,
+                number=number,
+                reason=reason,
+            )
+            for number in numbers
+        )
+        await self.db.flush()
+
     async def _get_or_create_active_sequence(
         self,
         document_type: str,
         scope_type: str,
         scope_ref_id: int | None,
-    ) -> DocumentSequence:
+    ) -> tuple[DocumentSequence, bool]:
         result = await self.db.execute(
             (
                 select(DocumentSequence)
@@ -46,7 +234,7 @@ class DocumentSequenceService:
         )
         sequence = result.scalars().first()
         if sequence:
-            return sequence
+            return sequence, False
 
         fallback_result = await self.db.execute(
             select(DocumentSequence)
@@ -60,7 +248,7 @@ class DocumentSequenceService:
         )
         fallback = fallback_result.scalars().first()
         if fallback:
-            return fallback
+            return fallback, False
 
         sequence = DocumentSequence(
             document_type=document_type,
@@ -73,4 +261,4 @@ class DocumentSequenceService:
         )
         self.db.add(sequence)
         await self.db.flush()
-        return sequence
+        return sequence, True
@@ -0,0 +1,392 @@
+"""
+Renderizado de PDFs de documentos de venta.
+
+Funciones puras: reciben contextos serializables (dict, str, float) y
+devuelven bytes, sin sesión de base de datos ni estado de la aplicación, para
+poder ejecutarse en el pool de procesos de app.core.render_pool.
+"""
+
+from datetime import datetime
+
+from fastapi import HTTPException
+
+# Subir al cambiar cualquier renderer de documentos (este módulo o el router de
+# impresión): forma parte de las huellas e invalida la caché en disco.
+RENDER_VERSION = 1
+
+
+def fmt_money(value: float | int | str | None) -> str:
+    if value is None:
+        return "0.00"
+    try:
+        return f"{float(value):.2f}"
+    except (TypeError, ValueError):
+        return "0.00"
+
+
+def fmt_issue_date(value: object) -> str:
+    raw = str(value or "").strip()
+    if not raw:
+        return ""
+    try:
+        parsed = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+        return parsed.strftime("%Y-%m-%d %H:%M")
+    except ValueError:
+        return raw
+
+
+def build_legal_document_pdf(
+    context: dict, document_type: str, tax_rate: float
+) -> bytes:
+    return build_legal_documents_pdf([(context, document_type, tax_rate)])
+
+
+def build_legal_documents_pdf(documents: list[tuple[dict, str, float]]) -> bytes:
+    """Un solo PDF con una página por documento (context, document_type, tax_rate)."""
+    try:
+        from io import BytesIO
+
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+    except Exception as exc:  # pragma: no cover
+        raise HTTPException(
+            status_code=500, detail=f"No se pudo generar PDF legal: {exc}"
+        ) from exc
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    for context, document_type, tax_rate in documents:
+        _draw_legal_document(pdf, context, document_type, tax_rate)
+    pdf.save()
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def _draw_legal_document(pdf, context: dict, document_type: str, tax_rate: float) -> None:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+
+    def _safe_int(value: float | int | str | None, default: int = 0) -> int:
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    def _draw_text(
+        pdf,
+        x: float,
+        y: float,
+        text: str,
+        *,
+        size: float = 10,
+        bold: bool = False,
+    ) -> None:
+        pdf.setFont("Helvetica-Bold" if bold else "Helvetica", size)
+        pdf.drawString(x, y, (text or "")[:220])
+
+    company_name = str(context.get("company_name") or "Libreria Belen")
+    header = str(context.get("receipt_header") or "Precios bajos siempre")
+    company_address = str(context.get("company_address") or "Jr. Conchucos 120")
+    company_phone = str(context.get("company_phone") or "Telefono: 947 872 207")
+    company_tax_id = str(context.get("company_tax_id") or "")
+    issue_date = fmt_issue_date(context.get("issue_date"))
+    document_number = str(context.get("document_number") or "")
+    customer_code = str(context.get("customer_tax_id") or "-")
+    customer_name = str(context.get("customer_name") or "PUBLICO GENERAL")
+    customer_address = str(context.get("customer_address") or "-")
+    customer_email = str(context.get("customer_email") or "-")
+    comments = str(
+        context.get("receipt_footer")
+        or "Si usted tiene preguntas sobre esta factura, pongase en contacto con"
+    )
+    contact_line = str(context.get("company_phone") or "[Nombre, Telefono, E-mail]")
+
+    subtotal = fmt_money(context.get("subtotal"))
+    tax = fmt_money(context.get("tax"))
+    discount = fmt_money(context.get("discount"))
+    total = fmt_money(context.get("total"))
+    tax_rate_str = fmt_money(tax_rate)
+
+    items = list(context.get("items") or [])
+
+    page_w, page_h = A4
+
+    margin_x = 11 * mm
+    cursor_y = page_h - (11 * mm)
+    content_w = page_w - (2 * margin_x)
+
+    border = colors.HexColor("#D6D9DF")
+    subtle = colors.HexColor("#ECEFF4")
+    ink = colors.HexColor("#111827")
+    muted = colors.HexColor("#4B5563")
+    shade = colors.HexColor("#F3F4F6")
+
+    def _box(
+        x: float,
+        y_top: float,
+        w: float,
+        h: float,
+        *,
+        fill: bool = False,
+        fill_color=colors.white,
+        stroke=border,
+    ) -> None:
+        pdf.setStrokeColor(stroke)
+        pdf.setLineWidth(1)
+        if fill:
+            pdf.setFillColor(fill_color)
+            pdf.rect(x, y_top - h, w, h, stroke=1, fill=1)
+            pdf.setFillColor(colors.black)
+        else:
+            pdf.rect(x, y_top - h, w, h, stroke=1, fill=0)
+
+    # Header card
+    header_h = 56 * mm
+    _box(margin_x, cursor_y, content_w, header_h, fill=True, fill_color=colors.white)
+
+    type_w = 58 * mm
+    type_h = 34 * mm
+    type_x = margin_x + content_w - type_w - (5 * mm)
+    type_y = cursor_y - (5 * mm)
+    _box(type_x, type_y, type_w, type_h, fill=True, fill_color=shade, stroke=ink)
+    _draw_text(
+        pdf,
+        type_x + 10 * mm,
+        type_y - 19 * mm,
+        document_type.upper(),
+        size=22,
+        bold=True,
+    )
+
+    left_x = margin_x + 5 * mm
+    _draw_text(pdf, left_x, cursor_y - 10 * mm, company_name, size=16, bold=True)
+    pdf.setFillColor(muted)
+    _draw_text(pdf, left_x, cursor_y - 16.5 * mm, header, size=9)
+    _draw_text(pdf, left_x, cursor_y - 22 * mm, company_address, size=9)
+    _draw_text(pdf, left_x, cursor_y - 27.5 * mm, company_phone, size=9)
+    _draw_text(pdf, left_x, cursor_y - 33 * mm, company_tax_id, size=9)
+    pdf.setFillColor(ink)
+
+    meta_y = cursor_y - 39 * mm
+    meta_h = 11 * mm
+    meta_gap = 3 * mm
+    meta_w = (content_w - (10 * mm) - (2 * meta_gap)) / 3
+    meta_x0 = margin_x + 5 * mm
+
+    meta = [
+        ("Fecha", issue_date),
+        ("Nro de Factura", document_number),
+        ("Nro de Cliente", customer_code),
+    ]
+    for idx, (label, value) in enumerate(meta):
+        x = meta_x0 + idx * (meta_w + meta_gap)
+        _box(x, meta_y, meta_w, meta_h, fill=True, fill_color=colors.white)
+        pdf.setFillColor(muted)
+        _draw_text(
+            pdf, x + 2.2 * mm, meta_y - 3.6 * mm, label.upper(), size=7.2, bold=True
+        )
+        pdf.setFillColor(ink)
+        _draw_text(pdf, x + 2.2 * mm, meta_y - 8.2 * mm, value, size=8.8, bold=True)
+
+    cursor_y -= header_h + (4 * mm)
+
+    # Customer card
+    cust_h = 26 * mm
+    _box(margin_x, cursor_y, content_w, cust_h, fill=True, fill_color=colors.white)
+    _draw_text(
+        pdf, margin_x + 4 * mm, cursor_y - 5 * mm, "FACTURAR A", size=9, bold=True
+    )
+    _draw_text(
+        pdf, margin_x + 4 * mm, cursor_y - 11 * mm, customer_name, size=10, bold=True
+    )
+    pdf.setFillColor(muted)
+    _draw_text(pdf, margin_x + 4 * mm, cursor_y - 16.5 * mm, customer_address, size=9)
+    _draw_text(
+        pdf,
+        margin_x + 4 * mm,
+        cursor_y - 21.5 * mm,
+        f"Correo: {customer_email}",
+        size=9,
+    )
+    pdf.setFillColor(ink)
+
+    cursor_y -= cust_h + (4 * mm)
+
+    # Items card
+    items_h = 88 * mm
+    _box(margin_x, cursor_y, content_w, items_h, fill=True, fill_color=colors.white)
+
+    table_x = margin_x + 4 * mm
+    table_w = content_w - 8 * mm
+    header_row_h = 9 * mm
+    row_h = 7.2 * mm
+    visible_rows = 9
+
+    _box(
+        table_x,
+        cursor_y - 4 * mm,
+        table_w,
+        header_row_h,
+        fill=True,
+        fill_color=shade,
+        stroke=border,
+    )
+
+    col_desc = table_w * 0.56
+    col_qty = table_w * 0.14
+    col_unit = table_w * 0.15
+    x_desc = table_x
+    x_qty = x_desc + col_desc
+    x_unit = x_qty + col_qty
+    x_total = x_unit + col_unit
+
+    pdf.setStrokeColor(border)
+    pdf.line(
+        x_qty,
+        cursor_y - 4 * mm,
+        x_qty,
+        cursor_y - 4 * mm - (header_row_h + visible_rows * row_h),
+    )
+    pdf.line(
+        x_unit,
+        cursor_y - 4 * mm,
+        x_unit,
+        cursor_y - 4 * mm - (header_row_h + visible_rows * row_h),
+    )
+    pdf.line(
+        x_total,
+        cursor_y - 4 * mm,
+        x_total,
+        cursor_y - 4 * mm - (header_row_h + visible_rows * row_h),
+    )
+
+    _draw_text(
+        pdf, x_desc + 2 * mm, cursor_y - 9 * mm, "DESCRIPCION", size=8, bold=True
+    )
+    _draw_text(pdf, x_qty + 2 * mm, cursor_y - 9 * mm, "CANT.", size=8, bold=True)
+    _draw_text(pdf, x_unit + 2 * mm, cursor_y - 9 * mm, "P. UNIT", size=8, bold=True)
+    _draw_text(pdf, x_total + 2 * mm, cursor_y - 9 * mm, "TOTAL", size=8, bold=True)
+
+    y_row_top = cursor_y - 4 * mm - header_row_h
+    for idx in range(visible_rows):
+        y_line = y_row_top - idx * row_h
+        pdf.setStrokeColor(subtle)
+        pdf.line(table_x, y_line, table_x + table_w, y_line)
+
+    for idx, item in enumerate(items[:visible_rows]):
+        y_text = y_row_top - idx * row_h - 4.8
+        name = str(item.get("name") or "")
+        qty = _safe_int(item.get("qty"), 0)
+        unit_price = fmt_money(item.get("unit_price"))
+        line_total = fmt_money(item.get("line_total"))
+        _draw_text(pdf, x_desc + 2 * mm, y_text, name[:48], size=8.8)
+        _draw_text(pdf, x_qty + 2 * mm, y_text, str(qty), size=8.8)
+        _draw_text(pdf, x_unit + 2 * mm, y_text, unit_price, size=8.8)
+        _draw_text(pdf, x_total + 2 * mm, y_text, line_total, size=8.8)
+
+    cursor_y -= items_h + (4 * mm)
+
+    # Bottom card
+    bottom_h = 36 * mm
+    _box(margin_x, cursor_y, content_w, bottom_h, fill=True, fill_color=colors.white)
+
+    comments_w = content_w * 0.58
+    totals_w = content_w - comments_w - (4 * mm)
+    comments_x = margin_x + 4 * mm
+    totals_x = comments_x + comments_w + (4 * mm)
+
+    _box(
+        comments_x,
+        cursor_y - 4 * mm,
+        comments_w,
+        bottom_h - 8 * mm,
+        fill=True,
+        fill_color=colors.white,
+    )
+    _draw_text(
+        pdf, comments_x + 2.2 * mm, cursor_y - 9 * mm, "COMENTARIOS", size=8, bold=True
+    )
+    pdf.setFillColor(muted)
+    _draw_text(pdf, comments_x + 2.2 * mm, cursor_y - 15 * mm, comments[:80], size=8.5)
+    pdf.setFillColor(ink)
+
+    _box(
+        totals_x,
+        cursor_y - 4 * mm,
+        totals_w,
+        bottom_h - 8 * mm,
+        fill=True,
+        fill_color=colors.white,
+    )
+    totals_rows = [
+        ("Subtotal", subtotal),
+        ("Tasa de impuesto", tax_rate_str),
+        ("Impuesto", tax),
+        ("Descuento", discount),
+        ("Total", total),
+    ]
+    trow_h = (bottom_h - 8 * mm) / len(totals_rows)
+    for idx, (label, value) in enumerate(totals_rows):
+        y_top = cursor_y - 4 * mm - idx * trow_h
+        if idx > 0:
+            pdf.setStrokeColor(subtle)
+            pdf.line(totals_x, y_top, totals_x + totals_w, y_top)
+        _draw_text(
+            pdf,
+            totals_x + 2 * mm,
+            y_top - 5.2,
+            label,
+            size=8.8,
+            bold=(label == "Total"),
+        )
+        value_w = pdf.stringWidth(
+            value, "Helvetica-Bold" if label == "Total" else "Helvetica", 8.8
+        )
+        pdf.setFont("Helvetica-Bold" if label == "Total" else "Helvetica", 8.8)
+        pdf.drawString(totals_x + totals_w - value_w - 2 * mm, y_top - 5.2, value)
+
+    cursor_y -= bottom_h + (3 * mm)
+
+    pdf.setFillColor(muted)
+    _draw_text(pdf, margin_x + 2 * mm, cursor_y - 1.5 * mm, contact_line, size=8.5)
+    pdf.setFillColor(ink)
+    _draw_text(
+        pdf,
+        margin_x + (content_w / 2) - 23 * mm,
+        cursor_y - 7 * mm,
+        "Gracias por su compra",
+        size=10.2,
+        bold=True,
+    )
+
+    pdf.showPage()
+
+
+def render_text_pdf(title: str, text: str) -> bytes:
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+    except Exception as exc:  # pragma: no cover
+        raise HTTPException(
+            status_code=500,
+            detail=f"No se pudo generar PDF. Instala reportlab en backend. Error: {exc}",
+        )
+
+    import io
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.setTitle(title[:100] or "document")
+    y = 820
+    for line in (text or "").splitlines():
+        pdf.drawString(40, y, (line or "")[:120])
+        y -= 14
+        if y < 40:
+            pdf.showPage()
+            y = 820
+    pdf.save()
+    buffer.seek(0)
+    return buffer.getvalue()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from collections.abc import Sequence
 from typing import Any
@@ -10,12 +11,30 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.print_template import PrintTemplate, PrintTemplateVersion
 from app.schemas.document_template import PrintTemplateCreate, PrintTemplateOut, PrintTemplateUpdate
+from app.services.printing_templates.compiled_template import CompiledTemplate, compile_template
 from app.services.printing_templates.default_templates import default_template_schema
 from app.services.printing_templates.template_version_service import TemplateVersionService
 from app.services._transaction import service_transaction
 
 
 _ACTIVE_TEMPLATE_CACHE: dict[tuple[str, str, int | None], tuple[int, str]] = {}
+# Las versiones de plantilla son inmutables: su schema_json identifica la
+# versión, y la misma clave sirve para vistas previas de schemas sin guardar.
+_COMPILED_TEMPLATE_CACHE: OrderedDict[str, CompiledTemplate] = OrderedDict()
+COMPILED_TEMPLATE_CACHE_SIZE = 64
+
+
+def get_compiled_template(schema_json: str) -> CompiledTemplate:
+    """Plantilla compilada para un schema_json (compila una vez, LRU acotado)."""
+    compiled = _COMPILED_TEMPLATE_CACHE.get(schema_json)
+    if compiled is not None:
+        _COMPILED_TEMPLATE_CACHE.move_to_end(schema_json)
+        return compiled
+    compiled = compile_template(schema_json)
+    _COMPILED_TEMPLATE_CACHE[schema_json] = compiled
+    if len(_COMPILED_TEMPLATE_CACHE) > COMPILED_TEMPLATE_CACHE_SIZE:
+        _COMPILED_TEMPLATE_CACHE.popitem(last=False)
+    return compiled
 
 
 class TemplateService:
@@ -273,3 +292,4 @@ class TemplateService:
     @classmethod
     def clear_cache(cls) -> None:
         _ACTIVE_TEMPLATE_CACHE.clear()
+        _COMPILED_TEMPLATE_CACHE.clear()
@@ -1,14 +1,16 @@
-import csv
-import math
+from collections.abc import AsyncIterator
 from datetime import date as date_type, datetime, timedelta
-from io import StringIO
+from typing import Any
 
 from fastapi import HTTPException
-from sqlalchemy import and_, func, select
+from sqlalchemy import Select, and_, case, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+import app.db.session as db_session
+from app.core.alerts_snapshot import alerts_snapshot
+from app.core.dates import business_today, parse_day
 from app.models.product import Product
-from app.models.sale import Sale, SaleItem
+from app.models.sales_rollup import DailyProductSales, DailySalesTotals
 from app.models.warehouse import StockBatch
 from app.schemas.report import (
     DailyReport,
@@ -22,25 +24,30 @@ from app.schemas.report import (
 )
 
 
+# Filas por lote al recorrer resultados de exportación con cursor.
+EXPORT_YIELD_PER = 500
+# Parámetros de las alertas que sirve el snapshot de fondo.
+DEFAULT_ALERT_EXPIRY_DAYS = 14
+DEFAULT_ALERT_STAGNANT_DAYS = 30
+
+
 class ReportsService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
     @staticmethod
-    def _sales_date_filters(from_date: str, to: str):
-        return and_(
-            func.date(Sale.created_at) >= from_date,
-            func.date(Sale.created_at) <= to,
-            Sale.status != "VOID",
-        )
-
-    @staticmethod
-    def _period_days(from_date: str, to: str) -> int:
-        try:
-            start = date_type.fromisoformat(from_date)
-            end = date_type.fromisoformat(to)
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail="Rango de fechas invalido") from exc
+    def _parse_range(from_date: str, to: str) -> tuple[date_type, date_type]:
+        return parse_day(from_date, "from_date"), parse_day(to, "to")
+
+    @classmethod
+    def _rollup_date_filters(cls, from_date: str, to: str):
+        # Los agregados diarios ya excluyen ventas anuladas (ver app.core.sales_rollup).
+        start, end = cls._parse_range(from_date, to)
+        return and_(DailyProductSales.day >= start, DailyProductSales.day <= end)
+
+    @classmethod
+    def _period_days(cls, from_date: str, to: str) -> int:
+        start, end = cls._parse_range(from_date, to)
         if end < start:
             raise HTTPException(status_code=400, detail="'to' no puede ser menor que 'from_date'")
         return (end - start).days + 1
@@ -51,6 +58,13 @@ class ReportsService:
             return default
         return min(max(limit, 1), 500)
 
+    @staticmethod
+    def _export_limit(limit: int | None) -> int | None:
+        # Exportaciones: sin límite por defecto, las filas se envían en streaming.
+        if limit is None or limit <= 0:
+            return None
+        return limit
+
     @staticmethod
     def _safe_target_days(target_days: int, default: int = 21) -> int:
         if target_days is None:
@@ -81,92 +95,241 @@ class ReportsService:
             return "high"
         return "medium"
 
-    async def _sales_aggregate_map(self, from_date: str, to: str) -> dict[int, dict[str, float]]:
-        stmt = (
+    def _sales_subquery(self, from_date: str, to: str):
+        return (
             select(
-                SaleItem.product_id,
-                func.coalesce(func.sum(SaleItem.qty), 0).label("qty_sold"),
-                func.coalesce(func.sum(SaleItem.final_total), 0).label("sales_total"),
+                DailyProductSales.product_id,
+                func.sum(DailyProductSales.qty_sold).label("qty_sold"),
+                func.sum(DailyProductSales.sales_total).label("sales_total"),
             )
-            .join(Sale, Sale.id == SaleItem.sale_id)
-            .where(self._sales_date_filters(from_date, to))
-            .group_by(SaleItem.product_id)
+            .where(self._rollup_date_filters(from_date, to))
+            .group_by(DailyProductSales.product_id)
+            .subquery()
         )
-        result = await self.db.execute(stmt)
-        return {
-            int(row.product_id): {
-                "qty_sold": int(row.qty_sold or 0),
-                "sales_total": float(row.sales_total or 0),
-            }
-            for row in result.all()
-        }
-
-    async def _report_products(self) -> list[Product]:
-        result = await self.db.execute(select(Product).order_by(Product.name.asc(), Product.id.asc()))
-        return list(result.scalars().all())
 
-    async def daily_report(self, date: str) -> DailyReport:
-        stmt = select(func.count(Sale.id), func.coalesce(func.sum(Sale.total), 0)).where(
-            func.date(Sale.created_at) == date,
-            Sale.status != "VOID",
+    def _inventory_statement(self, from_date: str, to: str):
+        sales = self._sales_subquery(from_date, to)
+        stock = func.coalesce(Product.stock, 0)
+        stock_min = func.coalesce(Product.stock_min, 0)
+        qty_sold = func.coalesce(sales.c.qty_sold, 0)
+        stmt = select(
+            Product.id.label("product_id"),
+            Product.sku,
+            Product.name,
+            Product.author,
+            Product.publisher,
+            Product.isbn,
+            stock.label("stock"),
+            stock_min.label("stock_min"),
+            qty_sold.label("qty_sold"),
+            func.coalesce(sales.c.sales_total, 0).label("sales_total"),
+        ).outerjoin(sales, sales.c.product_id == Product.id)
+        return stmt, stock, stock_min, qty_sold
+
+    def _rotation_statement(self, from_date: str, to: str) -> Select:
+        period_days = self._period_days(from_date, to)
+        stmt, stock, stock_min, qty_sold = self._inventory_statement(from_date, to)
+        coverage = case((qty_sold > 0, stock * float(period_days) / qty_sold), else_=None)
+        return stmt.where(or_(qty_sold > 0, stock > 0, stock_min > 0)).order_by(
+            qty_sold.desc(),
+            coverage.is_(None),
+            coverage.asc(),
+            func.lower(Product.name),
+            Product.id,
         )
-        result = await self.db.execute(stmt)
-        count, total = result.one()
-        return DailyReport(date=date, sales_count=count, total=float(total or 0))
 
-    async def top_products(self, from_date: str, to: str) -> list[TopProductReport]:
-        stmt = (
+    def _replenishment_statement(self, from_date: str, to: str, target_days: int) -> Select:
+        period_days = self._period_days(from_date, to)
+        safe_target_days = self._safe_target_days(target_days)
+        stmt, stock, stock_min, qty_sold = self._inventory_statement(from_date, to)
+        # ceil(qty_sold / period_days * target_days) en aritmética entera.
+        demand = (qty_sold * safe_target_days + period_days - 1) // period_days
+        target_stock = case((stock_min > demand, stock_min), else_=demand)
+        suggested_qty = target_stock - stock
+        # cobertura <= N dias  <=>  stock * period_days <= N * qty_sold (qty_sold > 0)
+        urgency_rank = case(
+            (or_(stock <= 0, and_(qty_sold > 0, stock * period_days <= 3 * qty_sold)), 0),
+            (or_(stock < stock_min, and_(qty_sold > 0, stock * period_days <= 7 * qty_sold)), 1),
+            else_=2,
+        )
+        return (
+            stmt.add_columns(target_stock.label("target_stock"), suggested_qty.label("suggested_qty"))
+            .where(suggested_qty > 0)
+            .order_by(
+                urgency_rank,
+                suggested_qty.desc(),
+                qty_sold.desc(),
+                func.lower(Product.name),
+                Product.id,
+            )
+        )
+
+    def _top_products_statement(self, from_date: str, to: str) -> Select:
+        return (
             select(
-                SaleItem.product_id,
+                DailyProductSales.product_id,
                 Product.name,
-                func.sum(SaleItem.qty).label("qty_sold"),
-                func.sum(SaleItem.final_total).label("total_sold"),
+                func.sum(DailyProductSales.qty_sold).label("qty_sold"),
+                func.sum(DailyProductSales.sales_total).label("total_sold"),
             )
-            .join(Product, Product.id == SaleItem.product_id)
-            .join(Sale, Sale.id == SaleItem.sale_id)
-            .where(self._sales_date_filters(from_date, to))
-            .group_by(SaleItem.product_id, Product.name)
-            .order_by(func.sum(SaleItem.qty).desc())
+            .join(Product, Product.id == DailyProductSales.product_id)
+            .where(self._rollup_date_filters(from_date, to))
+            .group_by(DailyProductSales.product_id, Product.name)
+            .order_by(func.sum(DailyProductSales.qty_sold).desc())
             .limit(50)
         )
-        result = await self.db.execute(stmt)
-        rows = result.all()
-        return [
-            TopProductReport(
-                product_id=row.product_id,
-                name=row.name,
-                qty_sold=int(row.qty_sold or 0),
-                total_sold=float(row.total_sold or 0),
-            )
-            for row in rows
-        ]
 
-    async def low_stock(self) -> list[LowStockItem]:
-        stmt = select(Product).where(Product.stock <= Product.stock_min).order_by(Product.stock.asc())
-        result = await self.db.execute(stmt)
-        items = result.scalars().all()
-        return [
-            LowStockItem(
-                product_id=p.id,
-                sku=p.sku,
-                name=p.name,
-                stock=p.stock,
-                stock_min=p.stock_min,
+    def _profitability_by_product_statement(self, from_date: str, to: str) -> Select:
+        sales_total_expr = func.coalesce(func.sum(DailyProductSales.sales_total), 0)
+        estimated_cost_expr = func.coalesce(func.sum(DailyProductSales.estimated_cost_total), 0)
+        return (
+            select(
+                DailyProductSales.product_id,
+                Product.name,
+                func.sum(DailyProductSales.qty_sold).label("qty_sold"),
+                sales_total_expr.label("sales_total"),
+                estimated_cost_expr.label("estimated_cost_total"),
             )
-            for p in items
-        ]
+            .outerjoin(Product, Product.id == DailyProductSales.product_id)
+            .where(self._rollup_date_filters(from_date, to))
+            .group_by(DailyProductSales.product_id, Product.name)
+            .order_by((sales_total_expr - estimated_cost_expr).desc())
+        )
 
-    async def profitability_summary(self, from_date: str, to: str) -> ProfitabilitySummaryReport:
-        unit_cost_expr = func.coalesce(SaleItem.unit_cost_snapshot, Product.unit_cost, Product.cost, 0.0)
-        stmt = (
-            select(
-                func.coalesce(func.sum(SaleItem.final_total), 0).label("sales_total"),
-                func.coalesce(func.sum(SaleItem.qty * unit_cost_expr), 0).label("estimated_cost_total"),
+    def _stagnant_statement(self, from_date: str, to: str) -> Select:
+        # Subconsulta correlacionada por producto sobre ix_daily_product_sales_product_day;
+        # solo se evalúa para productos con stock por encima del mínimo.
+        qty_sold = (
+            select(func.coalesce(func.sum(DailyProductSales.qty_sold), 0))
+            .where(DailyProductSales.product_id == Product.id, self._rollup_date_filters(from_date, to))
+            .scalar_subquery()
+        )
+        return (
+            select(Product.id, Product.sku, Product.name)
+            .where(
+                func.coalesce(Product.stock, 0) > func.coalesce(Product.stock_min, 0),
+                qty_sold <= 0,
             )
-            .join(Sale, Sale.id == SaleItem.sale_id)
-            .outerjoin(Product, Product.id == SaleItem.product_id)
-            .where(self._sales_date_filters(from_date, to))
+            .order_by(Product.name.asc(), Product.id.asc())
+        )
+
+    @staticmethod
+    def _low_stock_statement() -> Select:
+        return select(Product).where(Product.stock <= Product.stock_min).order_by(Product.stock.asc())
+
+    async def _stream(self, stmt: Select) -> AsyncIterator[Any]:
+        """Recorre el resultado por lotes (yield_per) sin materializarlo completo."""
+        result = await self.db.stream(stmt.execution_options(yield_per=EXPORT_YIELD_PER))
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
+
+    @staticmethod
+    def _top_product_report(row) -> TopProductReport:
+        return TopProductReport(
+            product_id=row.product_id,
+            name=row.name,
+            qty_sold=int(row.qty_sold or 0),
+            total_sold=float(row.total_sold or 0),
+        )
+
+    @staticmethod
+    def _low_stock_item(product: Product) -> LowStockItem:
+        return LowStockItem(
+            product_id=product.id,
+            sku=product.sku,
+            name=product.name,
+            stock=product.stock,
+            stock_min=product.stock_min,
+        )
+
+    @staticmethod
+    def _profitability_product_report(row) -> ProfitabilityProductReport:
+        sales_total = float(row.sales_total or 0)
+        estimated_cost_total = float(row.estimated_cost_total or 0)
+        gross_profit = sales_total - estimated_cost_total
+        margin_percent = (gross_profit / sales_total * 100.0) if sales_total > 0 else 0.0
+        return ProfitabilityProductReport(
+            product_id=row.product_id,
+            name=row.name or f"Producto {row.product_id}",
+            qty_sold=int(row.qty_sold or 0),
+            sales_total=sales_total,
+            estimated_cost_total=estimated_cost_total,
+            gross_profit=gross_profit,
+            margin_percent=margin_percent,
+        )
+
+    def _rotation_report(self, row, period_days: int) -> StockRotationReport:
+        stock = int(row.stock or 0)
+        stock_min = int(row.stock_min or 0)
+        qty_sold = int(row.qty_sold or 0)
+        avg_daily_sales = qty_sold / period_days if period_days > 0 else 0.0
+        coverage_days = self._coverage_days(stock, avg_daily_sales)
+        return StockRotationReport(
+            product_id=row.product_id,
+            sku=row.sku,
+            name=row.name,
+            author=row.author or "",
+            publisher=row.publisher or "",
+            isbn=row.isbn or "",
+            stock=stock,
+            stock_min=stock_min,
+            qty_sold=qty_sold,
+            sales_total=float(row.sales_total or 0),
+            avg_daily_sales=avg_daily_sales,
+            stock_coverage_days=coverage_days,
+            stock_status=self._rotation_status(stock, stock_min, coverage_days, qty_sold),
         )
+
+    def _replenishment_report(self, row, period_days: int) -> ReplenishmentSuggestionReport:
+        stock = int(row.stock or 0)
+        stock_min = int(row.stock_min or 0)
+        qty_sold = int(row.qty_sold or 0)
+        avg_daily_sales = qty_sold / period_days if period_days > 0 else 0.0
+        coverage_days = self._coverage_days(stock, avg_daily_sales)
+        return ReplenishmentSuggestionReport(
+            product_id=row.product_id,
+            sku=row.sku,
+            name=row.name,
+            author=row.author or "",
+            publisher=row.publisher or "",
+            isbn=row.isbn or "",
+            stock=stock,
+            stock_min=stock_min,
+            qty_sold=qty_sold,
+            sales_total=float(row.sales_total or 0),
+            avg_daily_sales=avg_daily_sales,
+            stock_coverage_days=coverage_days,
+            target_stock=int(row.target_stock),
+            suggested_qty=int(row.suggested_qty),
+            urgency=self._replenishment_urgency(stock, stock_min, coverage_days),
+        )
+
+    async def daily_report(self, date: str) -> DailyReport:
+        day = parse_day(date, "date")
+        stmt = select(
+            func.coalesce(func.sum(DailySalesTotals.sales_count), 0),
+            func.coalesce(func.sum(DailySalesTotals.sales_total), 0),
+        ).where(DailySalesTotals.day == day)
+        result = await self.db.execute(stmt)
+        count, total = result.one()
+        return DailyReport(date=date, sales_count=count, total=float(total or 0))
+
+    async def top_products(self, from_date: str, to: str) -> list[TopProductReport]:
+        result = await self.db.execute(self._top_products_statement(from_date, to))
+        return [self._top_product_report(row) for row in result.all()]
+
+    async def low_stock(self) -> list[LowStockItem]:
+        result = await self.db.execute(self._low_stock_statement())
+        return [self._low_stock_item(p) for p in result.scalars().all()]
+
+    async def profitability_summary(self, from_date: str, to: str) -> ProfitabilitySummaryReport:
+        stmt = select(
+            func.coalesce(func.sum(DailyProductSales.sales_total), 0).label("sales_total"),
+            func.coalesce(func.sum(DailyProductSales.estimated_cost_total), 0).label("estimated_cost_total"),
+        ).where(self._rollup_date_filters(from_date, to))
         result = await self.db.execute(stmt)
         row = result.one()
         sales_total = float(row.sales_total or 0)
@@ -183,90 +346,15 @@ class ReportsService:
         )
 
     async def profitability_by_product(self, from_date: str, to: str, limit: int = 100) -> list[ProfitabilityProductReport]:
-        safe_limit = self._safe_limit(limit)
-        unit_cost_expr = func.coalesce(SaleItem.unit_cost_snapshot, Product.unit_cost, Product.cost, 0.0)
-        sales_total_expr = func.coalesce(func.sum(SaleItem.final_total), 0)
-        estimated_cost_expr = func.coalesce(func.sum(SaleItem.qty * unit_cost_expr), 0)
-        stmt = (
-            select(
-                SaleItem.product_id,
-                Product.name,
-                func.sum(SaleItem.qty).label("qty_sold"),
-                sales_total_expr.label("sales_total"),
-                estimated_cost_expr.label("estimated_cost_total"),
-            )
-            .join(Sale, Sale.id == SaleItem.sale_id)
-            .outerjoin(Product, Product.id == SaleItem.product_id)
-            .where(self._sales_date_filters(from_date, to))
-            .group_by(SaleItem.product_id, Product.name)
-            .order_by((sales_total_expr - estimated_cost_expr).desc())
-            .limit(safe_limit)
-        )
+        stmt = self._profitability_by_product_statement(from_date, to).limit(self._safe_limit(limit))
         result = await self.db.execute(stmt)
-        rows = result.all()
-        reports: list[ProfitabilityProductReport] = []
-        for row in rows:
-            sales_total = float(row.sales_total or 0)
-            estimated_cost_total = float(row.estimated_cost_total or 0)
-            gross_profit = sales_total - estimated_cost_total
-            margin_percent = (gross_profit / sales_total * 100.0) if sales_total > 0 else 0.0
-            reports.append(
-                ProfitabilityProductReport(
-                    product_id=row.product_id,
-                    name=row.name or f"Producto {row.product_id}",
-                    qty_sold=int(row.qty_sold or 0),
-                    sales_total=sales_total,
-                    estimated_cost_total=estimated_cost_total,
-                    gross_profit=gross_profit,
-                    margin_percent=margin_percent,
-                )
-            )
-        return reports
+        return [self._profitability_product_report(row) for row in result.all()]
 
     async def stock_rotation(self, from_date: str, to: str, limit: int = 100) -> list[StockRotationReport]:
-        safe_limit = self._safe_limit(limit)
         period_days = self._period_days(from_date, to)
-        sales_map = await self._sales_aggregate_map(from_date, to)
-        products = await self._report_products()
-
-        rows: list[StockRotationReport] = []
-        for product in products:
-            stock = int(product.stock or 0)
-            stock_min = int(product.stock_min or 0)
-            sales = sales_map.get(product.id, {"qty_sold": 0, "sales_total": 0.0})
-            qty_sold = int(sales["qty_sold"])
-            sales_total = float(sales["sales_total"])
-            if qty_sold <= 0 and stock <= 0 and stock_min <= 0:
-                continue
-
-            avg_daily_sales = qty_sold / period_days if period_days > 0 else 0.0
-            coverage_days = self._coverage_days(stock, avg_daily_sales)
-            rows.append(
-                StockRotationReport(
-                    product_id=product.id,
-                    sku=product.sku,
-                    name=product.name,
-                    author=product.author or "",
-                    publisher=product.publisher or "",
-                    isbn=product.isbn or "",
-                    stock=stock,
-                    stock_min=stock_min,
-                    qty_sold=qty_sold,
-                    sales_total=sales_total,
-                    avg_daily_sales=avg_daily_sales,
-                    stock_coverage_days=coverage_days,
-                    stock_status=self._rotation_status(stock, stock_min, coverage_days, qty_sold),
-                )
-            )
-
-        rows.sort(
-            key=lambda row: (
-                -row.qty_sold,
-                row.stock_coverage_days if row.stock_coverage_days is not None else float("inf"),
-                row.name.lower(),
-            )
-        )
-        return rows[:safe_limit]
+        stmt = self._rotation_statement(from_date, to).limit(self._safe_limit(limit))
+        result = await self.db.execute(stmt)
+        return [self._rotation_report(row, period_days) for row in result.all()]
 
     async def replenishment_suggestions(
         self,
@@ -275,103 +363,70 @@ class ReportsService:
         target_days: int = 21,
         limit: int = 100,
     ) -> list[ReplenishmentSuggestionReport]:
-        safe_limit = self._safe_limit(limit)
-        safe_target_days = self._safe_target_days(target_days)
         period_days = self._period_days(from_date, to)
-        sales_map = await self._sales_aggregate_map(from_date, to)
-        products = await self._report_products()
-
-        rows: list[ReplenishmentSuggestionReport] = []
-        urgency_rank = {"urgent": 0, "high": 1, "medium": 2}
-
-        for product in products:
-            stock = int(product.stock or 0)
-            stock_min = int(product.stock_min or 0)
-            sales = sales_map.get(product.id, {"qty_sold": 0, "sales_total": 0.0})
-            qty_sold = int(sales["qty_sold"])
-            sales_total = float(sales["sales_total"])
-            avg_daily_sales = qty_sold / period_days if period_days > 0 else 0.0
-            coverage_days = self._coverage_days(stock, avg_daily_sales)
-            target_stock = max(stock_min, int(math.ceil(avg_daily_sales * safe_target_days)))
-            suggested_qty = max(target_stock - stock, 0)
-            if suggested_qty <= 0:
-                continue
-
-            rows.append(
-                ReplenishmentSuggestionReport(
-                    product_id=product.id,
-                    sku=product.sku,
-                    name=product.name,
-                    author=product.author or "",
-                    publisher=product.publisher or "",
-                    isbn=product.isbn or "",
-                    stock=stock,
-                    stock_min=stock_min,
-                    qty_sold=qty_sold,
-                    sales_total=sales_total,
-                    avg_daily_sales=avg_daily_sales,
-                    stock_coverage_days=coverage_days,
-                    target_stock=target_stock,
-                    suggested_qty=suggested_qty,
-                    urgency=self._replenishment_urgency(stock, stock_min, coverage_days),
-                )
-            )
-
-        rows.sort(
-            key=lambda row: (
-                urgency_rank.get(row.urgency, 99),
-                -row.suggested_qty,
-                -row.qty_sold,
-                row.name.lower(),
-            )
-        )
-        return rows[:safe_limit]
+        stmt = self._replenishment_statement(from_date, to, target_days).limit(self._safe_limit(limit))
+        result = await self.db.execute(stmt)
+        return [self._replenishment_report(row, period_days) for row in result.all()]
 
     async def operational_alerts(
         self,
         from_date: str,
         to: str,
         *,
-        expiry_days: int = 14,
-        stagnant_days: int = 30,
+        expiry_days: int = DEFAULT_ALERT_EXPIRY_DAYS,
+        stagnant_days: int = DEFAULT_ALERT_STAGNANT_DAYS,
         limit: int = 200,
+        use_snapshot: bool = False,
     ) -> list[OperationalAlert]:
         safe_limit = self._safe_limit(limit, default=200)
+        if (
+            use_snapshot
+            and expiry_days == DEFAULT_ALERT_EXPIRY_DAYS
+            and stagnant_days == DEFAULT_ALERT_STAGNANT_DAYS
+        ):
+            cached = alerts_snapshot.get(safe_limit)
+            if cached is not None:
+                return cached
         alerts: list[OperationalAlert] = []
 
-        low_stock = await self.low_stock()
-        for item in low_stock:
+        # Solo las columnas y filas que caben en el límite: sin cargar el catálogo como ORM.
+        low_stock_stmt = self._low_stock_statement().with_only_columns(
+            Product.id, Product.sku, Product.name, Product.stock, Product.stock_min
+        )
+        low_stock = await self.db.execute(low_stock_stmt.limit(safe_limit))
+        for product_id, sku, name, stock, stock_min in low_stock.all():
             alerts.append(
                 OperationalAlert(
-                    code="stock_critical" if item.stock <= 0 else "stock_low",
-                    severity="error" if item.stock <= 0 else "warning",
-                    title=f"Stock bajo: {item.name}",
-                    message=f"SKU {item.sku} en {item.stock}/{item.stock_min}.",
-                    product_id=item.product_id,
+                    code="stock_critical" if stock <= 0 else "stock_low",
+                    severity="error" if stock <= 0 else "warning",
+                    title=f"Stock bajo: {name}",
+                    message=f"SKU {sku} en {stock}/{stock_min}.",
+                    product_id=product_id,
                     suggested_action="Reponer inventario o ajustar stock minimo.",
                 )
             )
 
-        stagnant_since = datetime.now().date() - timedelta(days=max(stagnant_days, 1))
-        sales_map = await self._sales_aggregate_map(stagnant_since.isoformat(), datetime.now().date().isoformat())
-        product_rows = await self._report_products()
-        for product in product_rows:
-            if len(alerts) >= safe_limit:
-                break
-            qty_sold = int(sales_map.get(product.id, {}).get("qty_sold", 0))
-            if qty_sold <= 0 and int(product.stock or 0) > int(product.stock_min or 0):
+        today = business_today()
+        stagnant_since = today - timedelta(days=max(stagnant_days, 1))
+        if len(alerts) < safe_limit:
+            stagnant = await self.db.execute(
+                self._stagnant_statement(stagnant_since.isoformat(), today.isoformat()).limit(
+                    safe_limit - len(alerts)
+                )
+            )
+            for product_id, sku, name in stagnant.all():
                 alerts.append(
                     OperationalAlert(
                         code="stagnant_stock",
                         severity="info",
-                        title=f"Sin movimiento: {product.name}",
-                        message=f"{product.sku} no registra ventas en {max(stagnant_days, 1)} dias.",
-                        product_id=product.id,
+                        title=f"Sin movimiento: {name}",
+                        message=f"{sku} no registra ventas en {max(stagnant_days, 1)} dias.",
+                        product_id=product_id,
                         suggested_action="Evaluar promocion, descuento o liquidacion.",
                     )
                 )
 
-        expiry_deadline = datetime.now().date() + timedelta(days=max(expiry_days, 1))
+        expiry_deadline = today + timedelta(days=max(expiry_days, 1))
         batches_result = await self.db.execute(
             select(StockBatch.product_id, StockBatch.lot, StockBatch.expiry_date, StockBatch.qty).where(
                 StockBatch.qty > 0,
@@ -399,160 +454,163 @@ class ReportsService:
 
         return alerts[:safe_limit]
 
-    async def export_daily(self, date: str) -> str:
+    @staticmethod
+    async def load_default_alerts(limit: int) -> list[OperationalAlert]:
+        """Alertas con los parámetros por defecto; las usa el snapshot de fondo."""
+        async with db_session.ReadSessionLocal() as session:
+            today = business_today().isoformat()
+            return await ReportsService(session).operational_alerts(today, today, limit=limit)
+
+    # Exportaciones: generadores asíncronos de filas (la primera es el encabezado)
+    # consumidos por app.core.exports, que los escribe en streaming como CSV o XLSX.
+
+    @classmethod
+    def validate_export_range(cls, from_date: str, to: str) -> None:
+        """Valida fechas antes de iniciar la respuesta en streaming."""
+        cls._period_days(from_date, to)
+
+    async def export_daily(self, date: str) -> AsyncIterator[list[Any]]:
         report = await self.daily_report(date)
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["date", "sales_count", "total"])
-        writer.writerow([report.date, report.sales_count, report.total])
-        return output.getvalue()
-
-    async def export_top(self, from_date: str, to: str) -> str:
-        rows = await self.top_products(from_date, to)
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["product_id", "name", "qty_sold", "total_sold"])
-        for r in rows:
-            writer.writerow([r.product_id, r.name, r.qty_sold, r.total_sold])
-        return output.getvalue()
-
-    async def export_low(self) -> str:
-        rows = await self.low_stock()
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["product_id", "sku", "name", "stock", "stock_min"])
-        for r in rows:
-            writer.writerow([r.product_id, r.sku, r.name, r.stock, r.stock_min])
-        return output.getvalue()
-
-    async def export_profitability(self, from_date: str, to: str) -> str:
-        summary = await self.profitability_summary(from_date, to)
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["from_date", "to_date", "sales_total", "estimated_cost_total", "gross_profit", "margin_percent"])
-        writer.writerow(
-            [
-                summary.from_date,
-                summary.to_date,
-                summary.sales_total,
-                summary.estimated_cost_total,
-                summary.gross_profit,
-                summary.margin_percent,
-            ]
+        yield ["date", "sales_count", "total"]
+        yield [report.date, report.sales_count, report.total]
+
+    async def export_top(self, from_date: str, to: str) -> AsyncIterator[list[Any]]:
+        yield ["product_id", "name", "qty_sold", "total_sold"]
+        async for row in self._stream(self._top_products_statement(from_date, to)):
+            r = self._top_product_report(row)
+            yield [r.product_id, r.name, r.qty_sold, r.total_sold]
+
+    async def export_low(self) -> AsyncIterator[list[Any]]:
+        yield ["product_id", "sku", "name", "stock", "stock_min"]
+        result = await self.db.stream_scalars(
+            self._low_stock_statement().execution_options(yield_per=EXPORT_YIELD_PER)
         )
-        return output.getvalue()
-
-    async def export_profitability_by_product(self, from_date: str, to: str, limit: int = 100) -> str:
-        rows = await self.profitability_by_product(from_date, to, limit)
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(
-            [
-                "product_id",
-                "name",
-                "qty_sold",
-                "sales_total",
-                "estimated_cost_total",
-                "gross_profit",
-                "margin_percent",
+        try:
+            async for product in result:
+                yield [product.id, product.sku, product.name, product.stock, product.stock_min]
+        finally:
+            await result.close()
+
+    async def export_profitability(self, from_date: str, to: str) -> AsyncIterator[list[Any]]:
+        summary = await self.profitability_summary(from_date, to)
+        yield ["from_date", "to_date", "sales_total", "estimated_cost_total", "gross_profit", "margin_percent"]
+        yield [
+            summary.from_date,
+            summary.to_date,
+            summary.sales_total,
+            summary.estimated_cost_total,
+            summary.gross_profit,
+            summary.margin_percent,
+        ]
+
+    async def export_profitability_by_product(
+        self, from_date: str, to: str, limit: int | None = None
+    ) -> AsyncIterator[list[Any]]:
+        stmt = self._profitability_by_product_statement(from_date, to)
+        export_limit = self._export_limit(limit)
+        if export_limit is not None:
+            stmt = stmt.limit(export_limit)
+        yield [
+            "product_id",
+            "name",
+            "qty_sold",
+            "sales_total",
+            "estimated_cost_total",
+            "gross_profit",
+            "margin_percent",
+        ]
+        async for item in self._stream(stmt):
+            row = self._profitability_product_report(item)
+            yield [
+                row.product_id,
+                row.name,
+                row.qty_sold,
+                row.sales_total,
+                row.estimated_cost_total,
+                row.gross_profit,
+                row.margin_percent,
             ]
-        )
-        for row in rows:
-            writer.writerow(
-                [
-                    row.product_id,
-                    row.name,
-                    row.qty_sold,
-                    row.sales_total,
-                    row.estimated_cost_total,
-                    row.gross_profit,
-                    row.margin_percent,
-                ]
-            )
-        return output.getvalue()
-
-    async def export_rotation(self, from_date: str, to: str, limit: int = 100) -> str:
-        rows = await self.stock_rotation(from_date, to, limit)
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(
-            [
-                "product_id",
-                "sku",
-                "name",
-                "author",
-                "publisher",
-                "isbn",
-                "stock",
-                "stock_min",
-                "qty_sold",
-                "sales_total",
-                "avg_daily_sales",
-                "stock_coverage_days",
-                "stock_status",
+
+    async def export_rotation(self, from_date: str, to: str, limit: int | None = None) -> AsyncIterator[list[Any]]:
+        period_days = self._period_days(from_date, to)
+        stmt = self._rotation_statement(from_date, to)
+        export_limit = self._export_limit(limit)
+        if export_limit is not None:
+            stmt = stmt.limit(export_limit)
+        yield [
+            "product_id",
+            "sku",
+            "name",
+            "author",
+            "publisher",
+            "isbn",
+            "stock",
+            "stock_min",
+            "qty_sold",
+            "sales_total",
+            "avg_daily_sales",
+            "stock_coverage_days",
+            "stock_status",
+        ]
+        async for item in self._stream(stmt):
+            row = self._rotation_report(item, period_days)
+            yield [
+                row.product_id,
+                row.sku,
+                row.name,
+                row.author,
+                row.publisher,
+                row.isbn,
+                row.stock,
+                row.stock_min,
+                row.qty_sold,
+                row.sales_total,
+                row.avg_daily_sales,
+                row.stock_coverage_days,
+                row.stock_status,
             ]
-        )
-        for row in rows:
-            writer.writerow(
-                [
-                    row.product_id,
-                    row.sku,
-                    row.name,
-                    row.author,
-                    row.publisher,
-                    row.isbn,
-                    row.stock,
-                    row.stock_min,
-                    row.qty_sold,
-                    row.sales_total,
-                    row.avg_daily_sales,
-                    row.stock_coverage_days,
-                    row.stock_status,
-                ]
-            )
-        return output.getvalue()
-
-    async def export_replenishment(self, from_date: str, to: str, target_days: int = 21, limit: int = 100) -> str:
-        rows = await self.replenishment_suggestions(from_date, to, target_days, limit)
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(
-            [
-                "product_id",
-                "sku",
-                "name",
-                "author",
-                "publisher",
-                "isbn",
-                "stock",
-                "stock_min",
-                "qty_sold",
-                "sales_total",
-                "avg_daily_sales",
-                "stock_coverage_days",
-                "target_stock",
-                "suggested_qty",
-                "urgency",
+
+    async def export_replenishment(
+        self, from_date: str, to: str, target_days: int = 21, limit: int | None = None
+    ) -> AsyncIterator[list[Any]]:
+        period_days = self._period_days(from_date, to)
+        stmt = self._replenishment_statement(from_date, to, target_days)
+        export_limit = self._export_limit(limit)
+        if export_limit is not None:
+            stmt = stmt.limit(export_limit)
+        yield [
+            "product_id",
+            "sku",
+            "name",
+            "author",
+            "publisher",
+            "isbn",
+            "stock",
+            "stock_min",
+            "qty_sold",
+            "sales_total",
+            "avg_daily_sales",
+            "stock_coverage_days",
+            "target_stock",
+            "suggested_qty",
+            "urgency",
+        ]
+        async for item in self._stream(stmt):
+            row = self._replenishment_report(item, period_days)
+            yield [
+                row.product_id,
+                row.sku,
+                row.name,
+                row.author,
+                row.publisher,
+                row.isbn,
+                row.stock,
+                row.stock_min,
+                row.qty_sold,
+                row.sales_total,
+                row.avg_daily_sales,
+                row.stock_coverage_days,
+                row.target_stock,
+                row.suggested_qty,
+                row.urgency,
             ]
-        )
-        for row in rows:
-            writer.writerow(
-                [
-                    row.product_id,
-                    row.sku,
-                    row.name,
-                    row.author,
-                    row.publisher,
-                    row.isbn,
-                    row.stock,
-                    row.stock_min,
-                    row.qty_sold,
-                    row.sales_total,
-                    row.avg_daily_sales,
-                    row.stock_coverage_days,
-                    row.target_stock,
-                    row.suggested_qty,
-                    row.urgency,
-                ]
-            )
-        return output.getvalue()
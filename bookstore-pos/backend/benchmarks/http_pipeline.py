@@ -0,0 +1,134 @@
+"""
+Benchmark del pipeline HTTP.
+
+Compara el costo por request de los cinco BaseHTTPMiddleware anteriores
+(CSRF, health guard, rate limit, contexto y cabeceras de seguridad) con el
+middleware ASGI único (HttpPipelineMiddleware) sobre una ruta trivial, y
+reporta el sobrecosto de cada uno frente a la aplicación sin middlewares.
+
+Uso (desde backend/):
+    python -m benchmarks.http_pipeline --requests 1000
+"""
+
+import argparse
+import asyncio
+import os
+from time import perf_counter
+
+os.environ.setdefault("JWT_SECRET", "benchmark_secret_key_with_at_least_32_characters")
+
+import httpx  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.responses import PlainTextResponse, Response  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+import app.core.security as security  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.metrics import http_request_duration_seconds, http_requests_total  # noqa: E402
+from app.core.middleware import HttpPipelineMiddleware  # noqa: E402
+from app.core.rate_limit import rate_limiter  # noqa: E402
+from app.core.security_validation import build_csp  # noqa: E402
+
+
+# Middlewares anteriores, reconstruidos para la comparación.
+class _LegacyRateLimit(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        token = request.cookies.get(settings.auth_cookie_name)
+        key = f"ip:{request.client.host if request.client else 'unknown'}"
+        if token:
+            try:
+                key = f"user:{security.decode_token(token).get('sub')}"
+            except ValueError:
+                pass
+        limited = await rate_limiter.is_limited(
+            key=key,
+            limit=settings.rate_limit_per_minute,
+            window_seconds=settings.rate_limit_window_seconds,
+        )
+        if limited:
+            return Response(status_code=429)
+        return await call_next(request)
+
+
+class _LegacyRequestContext(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start = perf_counter()
+        response = await call_next(request)
+        http_requests_total.labels(request.method, request.url.path, str(response.status_code)).inc()
+        http_request_duration_seconds.labels(request.method, request.url.path).observe(
+            perf_counter() - start
+        )
+        response.headers[settings.request_id_header_name] = "legacy"
+        return response
+
+
+class _LegacySecurityHeaders(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["Content-Security-Policy"] = build_csp()
+        return response
+
+
+class _LegacyPassThrough(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def _bench_app(middleware: list) -> Starlette:
+    async def ping(_request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/ping", ping)])
+    for middleware_class in middleware:
+        app.add_middleware(middleware_class)
+    return app
+
+
+async def _per_request_seconds(app: Starlette, cookies: dict[str, str], requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies=cookies) as client:
+        for _ in range(50):
+            await client.get("/ping")
+        started = perf_counter()
+        for _ in range(requests):
+            resp = await client.get("/ping")
+            assert resp.status_code == 200
+        return (perf_counter() - started) / requests
+
+
+async def run(requests: int) -> None:
+    settings.rate_limit_per_minute = 10**9
+    cookies = {settings.auth_cookie_name: security.create_access_token("bench", "admin")}
+    variants = {
+        "sin middlewares": [],
+        "BaseHTTPMiddleware x5": [
+            _LegacyPassThrough,  # CSRF (GET: sin trabajo)
+            _LegacyPassThrough,  # health guard
+            _LegacyRateLimit,
+            _LegacyRequestContext,
+            _LegacySecurityHeaders,
+        ],
+        "pipeline ASGI": [HttpPipelineMiddleware],
+    }
+    bare = None
+    for name, middleware in variants.items():
+        await rate_limiter.reset_for_tests()
+        seconds = await _per_request_seconds(_bench_app(middleware), cookies, requests)
+        if bare is None:
+            bare = seconds
+            print(f"{name:<22} {seconds * 1e6:>8.0f} us/request")
+            continue
+        print(f"{name:<22} {seconds * 1e6:>8.0f} us/request  sobrecosto {(seconds - bare) * 1e6:>6.0f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark de importación masiva de inventario.
+
+Ejecuta run_inventory_import_job sobre un CSV sintético con lotes de 1 fila
+(camino fila por fila) y de N filas (escritura en bloque), y reporta filas
+por segundo y sentencias SQL por fila. La segunda pasada con lotes reimporta
+los mismos SKU con otro stock para medir la rama de actualización.
+
+Uso (desde backend/):
+    python -m benchmarks.inventory_import --rows 5000 --batch-size 500
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+from time import perf_counter
+from types import SimpleNamespace
+
+os.environ.setdefault("JWT_SECRET", "benchmark_secret_key_with_at_least_32_characters")
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.db.session as db_session  # noqa: E402
+from app.db import models as db_models  # noqa: E402,F401
+from app.db.base import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.seed import seed_admin  # noqa: E402
+from app.services.inventory.import_jobs_service import (  # noqa: E402
+    InventoryImportJobService,
+    run_inventory_import_job,
+)
+
+
+def _csv_rows(prefix: str, count: int, *, stock_offset: int = 0) -> str:
+    lines = ["sku,name,category,price,cost,stock,stock_min"]
+    lines.extend(
+        f"{prefix}-{index:06d},Libro {prefix} {index},Bench,10.5,4.25,{(index % 9) + stock_offset},1"
+        for index in range(count)
+    )
+    return "\n".join(lines)
+
+
+async def _run_job(user, content: str, batch_size: int) -> None:
+    handler = tempfile.NamedTemporaryFile(prefix="inventory-bench-", suffix=".csv", delete=False, mode="w", encoding="utf-8")
+    with handler:
+        handler.write(content)
+    async with db_session.AsyncSessionLocal() as session:
+        job = await InventoryImportJobService(session, user).create_job(
+            filename="bench.csv", file_type="csv", batch_size=batch_size
+        )
+    # El job elimina el archivo al terminar.
+    await run_inventory_import_job(job.id, handler.name)
+
+
+async def run(rows: int, row_by_row_rows: int, batch_size: int) -> None:
+    db_path = os.path.join(tempfile.gettempdir(), f"bookstore_import_bench_{os.getpid()}.db")
+    db_url = f"sqlite+aiosqlite:///{db_path}"
+    engine = create_async_engine(db_url, **db_session.engine_options(db_url))
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, _connection_record) -> None:
+        db_session.apply_sqlite_pragmas(dbapi_connection)
+
+    statements = 0
+
+    def _count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        db_session.AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+        async with db_session.AsyncSessionLocal() as session:
+            await seed_admin(session)
+            user = User(username="bench", password_hash="", role="admin", is_active=True)
+            session.add(user)
+            await session.commit()
+            user = SimpleNamespace(id=user.id)
+
+        cases = (
+            ("fila a fila", _csv_rows("RB", row_by_row_rows), row_by_row_rows, 1),
+            ("en bloque", _csv_rows("BT", rows), rows, batch_size),
+            ("actualizacion", _csv_rows("BT", rows, stock_offset=3), rows, batch_size),
+        )
+        print(f"filas={rows} fila_a_fila={row_by_row_rows} batch={batch_size}")
+        print(f"{'caso':<14} {'filas/s':>9} {'sql/fila':>9}")
+        event.listen(engine.sync_engine, "before_cursor_execute", _count)
+        for name, content, count, size in cases:
+            statements = 0
+            started = perf_counter()
+            await _run_job(user, content, size)
+            elapsed = perf_counter() - started
+            print(f"{name:<14} {count / elapsed:>9.0f} {statements / count:>9.2f}")
+    finally:
+        await engine.dispose()
+        for path in (db_path, f"{db_path}-wal", f"{db_path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--row-by-row-rows", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.row_by_row_rows, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark de rotación, reposición y alertas sobre un catálogo sintético.
+
+Carga N productos y ~90 días de agregados diarios (daily_product_sales) y mide
+ReportsService.stock_rotation, replenishment_suggestions y operational_alerts.
+
+Uso (desde backend/):
+    python -m benchmarks.inventory_reports --products 50000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+from datetime import timedelta
+from time import perf_counter
+
+os.environ.setdefault("JWT_SECRET", "benchmark_secret_key_with_at_least_32_characters")
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.dates import business_today  # noqa: E402
+from app.db import models as db_models  # noqa: E402,F401
+from app.db.base import Base  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.models.sales_rollup import DailyProductSales  # noqa: E402
+from app.models.warehouse import Warehouse  # noqa: E402
+from app.services.reports.reports_service import ReportsService  # noqa: E402
+
+DAYS = 90
+
+
+def _product_rows(count: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "id": index,
+            "sku": f"SKU-{index:06d}",
+            "name": f"Producto {rng.randint(1, 10**6):07d}",
+            "author": "",
+            "publisher": "",
+            "isbn": "",
+            "price": 10,
+            "cost": 5,
+            "stock": rng.choice((0, 1, 2, 5, 10, 20, 40, 80)),
+            "stock_min": rng.choice((0, 0, 2, 5, 10)),
+        }
+        for index in range(1, count + 1)
+    ]
+
+
+def _sales_rows(count: int, rng: random.Random) -> list[dict]:
+    # ~30% del catálogo vende; cada uno en unos pocos días del período.
+    today = business_today()
+    rows: dict[tuple, dict] = {}
+    for product_id in rng.sample(range(1, count + 1), count * 3 // 10):
+        for _ in range(rng.randint(1, 6)):
+            day = today - timedelta(days=rng.randint(0, DAYS - 1))
+            qty = rng.randint(1, 5)
+            key = (day, product_id)
+            if key in rows:
+                rows[key]["qty_sold"] += qty
+                rows[key]["sales_total"] += qty * 10
+                continue
+            rows[key] = {
+                "day": day,
+                "product_id": product_id,
+                "warehouse_id": 1,
+                "qty_sold": qty,
+                "sales_total": qty * 10,
+                "estimated_cost_total": qty * 5,
+            }
+    return list(rows.values())
+
+
+def _percentile(samples: list[float], pct: int) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+async def run(products: int, rounds: int, limit: int, seed: int) -> None:
+    db_path = os.path.join(tempfile.gettempdir(), f"bookstore_inventory_bench_{os.getpid()}.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    rng = random.Random(seed)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(Warehouse), [{"id": 1, "name": "Principal", "location": ""}])
+            for rows in (_product_rows(products, rng), _sales_rows(products, rng)):
+                table = Product if "sku" in rows[0] else DailyProductSales
+                for start in range(0, len(rows), 5000):
+                    await conn.execute(insert(table), rows[start : start + 5000])
+
+        today = business_today()
+        from_date = (today - timedelta(days=DAYS - 1)).isoformat()
+        to = today.isoformat()
+        cases = {
+            "rotation": lambda service: service.stock_rotation(from_date, to, limit=limit),
+            "replenish": lambda service: service.replenishment_suggestions(from_date, to, limit=limit),
+            "alerts": lambda service: service.operational_alerts(from_date, to, limit=limit),
+        }
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        print(f"catalogo={products} rondas={rounds} limit={limit}")
+        print(f"{'reporte':<10} {'p50 ms':>9} {'p95 ms':>9} {'filas':>6}")
+        for name, call in cases.items():
+            samples: list[float] = []
+            rows = 0
+            async with session_factory() as session:
+                service = ReportsService(session)
+                for _ in range(rounds):
+                    started = perf_counter()
+                    rows = len(await call(service))
+                    samples.append((perf_counter() - started) * 1000)
+                    session.expunge_all()
+            print(f"{name:<10} {_percentile(samples, 50):>9.2f} {_percentile(samples, 95):>9.2f} {rows:>6}")
+    finally:
+        await engine.dispose()
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(run(args.products, args.rounds, args.limit, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Benchmark de búsqueda de productos sobre un catálogo sintético.
+
+Compara la búsqueda anterior (replace() anidados + LIKE sobre cada fila) con
+las columnas espejo normalizadas + índice FTS5 trigram, y mide la lectura
+exacta de códigos (escáner) por índice.
+
+Uso (desde backend/):
+    python -m benchmarks.product_search --products 50000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+from time import perf_counter
+
+os.environ.setdefault("JWT_SECRET", "benchmark_secret_key_with_at_least_32_characters")
+
+from sqlalchemy import and_, case, insert, or_, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.search import (  # noqa: E402
+    compact_column,
+    compact_search_text,
+    normalize_search_text,
+    normalized_column,
+)
+from app.db import models as db_models  # noqa: E402,F401
+from app.db.base import Base  # noqa: E402
+from app.models.product import SEARCH_CODE_COLUMNS, SEARCH_TEXT_COLUMNS, Product  # noqa: E402
+from app.routers.catalog import products as products_router  # noqa: E402
+
+QUERIES = (
+    ("cuaderno rayado", False),
+    ("matemática primaria", False),
+    ("ana perez", False),
+    ("978612", False),
+    ("A1-P2", False),
+    ("lapiz", True),
+    ("libro", True),
+    ("editorial horizonte novela", False),
+)
+
+NOUNS = ("Cuaderno", "Libro", "Lápiz", "Novela", "Diccionario", "Agenda", "Plumón", "Regla", "Folder", "Témpera")
+ADJECTIVES = ("Rayado", "Escolar", "Clásico", "Ilustrado", "Ejecutivo", "Infantil", "Avanzado", "Básico")
+TOPICS = ("Matemática", "Historia", "Ciencias", "Lenguaje", "Arte", "Geografía", "Física", "Química")
+AUTHORS = ("Ana Pérez", "José Núñez", "María López", "Luis García", "Rosa Díaz", "")
+PUBLISHERS = ("Editorial Horizonte", "Ediciones Sur", "Santillana", "Norma", "")
+CATEGORIES = ("Libros escolares", "Útiles", "Oficina", "Arte", "Novelas")
+TAGS = ("texto primaria", "rayado escolar", "oficina", "colorear", "lectura", "")
+
+# Campos tal como los usaba la búsqueda anterior (columnas originales)
+LEGACY_TEXT_FIELDS = tuple(
+    (source, getattr(Product, source), weight)
+    for (_, _, weight), source in zip(products_router.PRODUCT_TEXT_FIELDS, SEARCH_TEXT_COLUMNS.values())
+)
+LEGACY_CODE_FIELDS = tuple(
+    (source, getattr(Product, source), weight)
+    for (_, _, weight), source in zip(products_router.PRODUCT_CODE_FIELDS, SEARCH_CODE_COLUMNS.values())
+)
+
+
+def _legacy_search_clause(term: str):
+    normalized_pattern = f"%{normalize_search_text(term)}%"
+    compact_term = compact_search_text(term)
+    clauses = [
+        normalized_column(column).like(normalized_pattern)
+        for _, column, _ in (*LEGACY_TEXT_FIELDS, *LEGACY_CODE_FIELDS)
+    ]
+    if compact_term:
+        clauses.extend(compact_column(column).like(f"%{compact_term}%") for _, column, _ in LEGACY_CODE_FIELDS)
+    return or_(*clauses)
+
+
+def _legacy_score(search: str, raw_tokens: list[str], expanded_tokens: list[str]):
+    score = 0
+    for query in (search, *raw_tokens):
+        normalized_query = normalize_search_text(query)
+        compact_query = compact_search_text(query)
+        for _, column, weight in LEGACY_CODE_FIELDS:
+            if compact_query:
+                score += case((compact_column(column) == compact_query, weight * 6), else_=0)
+                score += case((compact_column(column).like(f"{compact_query}%"), weight * 5), else_=0)
+                score += case((compact_column(column).like(f"%{compact_query}%"), weight * 4), else_=0)
+        for _, column, weight in LEGACY_TEXT_FIELDS:
+            score += case((normalized_column(column) == normalized_query, weight * 5), else_=0)
+            score += case((normalized_column(column).like(f"{normalized_query}%"), weight * 4), else_=0)
+            score += case((normalized_column(column).like(f"%{normalized_query}%"), weight * 3), else_=0)
+    for token in expanded_tokens:
+        if token in raw_tokens:
+            continue
+        for _, column, weight in LEGACY_TEXT_FIELDS:
+            score += case((normalized_column(column).like(f"%{token}%"), max(int(weight * 0.7), 1)), else_=0)
+    if raw_tokens:
+        score += case((and_(*[_legacy_search_clause(t) for t in raw_tokens]), 64 + len(raw_tokens) * 16), else_=0)
+    score += case((Product.stock > 0, 4), else_=0)
+    return score
+
+
+def _build_statement(search: str, smart: bool, mode: str):
+    tokens = products_router._prepare_tokens(search)
+    expanded = products_router._expand_tokens(tokens) if smart else tokens
+    related = [token for token in expanded if token not in tokens]
+    stmt = select(Product)
+    if mode == "legacy":
+        clause = and_(*[_legacy_search_clause(token) for token in tokens])
+        if related:
+            clause = or_(clause, *[_legacy_search_clause(token) for token in related])
+        score = _legacy_score(search, tokens, expanded)
+    else:
+        clause = products_router._build_match_clause(tokens, related, use_fts=mode == "fts")
+        score = products_router._build_score_expression(search, tokens, expanded)
+    return (
+        stmt.where(clause)
+        .order_by(score.desc(), Product.stock.desc(), Product.id.desc())
+        .limit(200)
+    )
+
+
+def _synthetic_rows(count: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    for index in range(1, count + 1):
+        name = f"{rng.choice(NOUNS)} {rng.choice(ADJECTIVES)} {rng.choice(TOPICS)} {rng.randint(1, 6)}"
+        row = {
+            "id": index,
+            "sku": f"SKU-{index:06d}",
+            "name": name,
+            "author": rng.choice(AUTHORS),
+            "publisher": rng.choice(PUBLISHERS),
+            "isbn": f"978612{index:07d}" if rng.random() < 0.6 else "",
+            "barcode": f"7501{index:08d}" if rng.random() < 0.5 else "",
+            "shelf_location": f"{rng.choice('ABCDEF')}{rng.randint(1, 9)}-P{rng.randint(1, 9)}",
+            "category": rng.choice(CATEGORIES),
+            "tags": rng.choice(TAGS),
+            "price": 10,
+            "cost": 5,
+            "stock": rng.randint(0, 50),
+        }
+        for target, source in SEARCH_TEXT_COLUMNS.items():
+            row[target] = normalize_search_text(row[source])
+        for target, source in SEARCH_CODE_COLUMNS.items():
+            row[target] = compact_search_text(row[source])
+        rows.append(row)
+    return rows
+
+
+def _percentile(samples: list[float], pct: int) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def _report(mode: str, samples: list[float]) -> None:
+    print(
+        f"{mode:<8} {_percentile(samples, 50):>9.2f} "
+        f"{_percentile(samples, 95):>9.2f} {max(samples):>9.2f}"
+    )
+
+
+async def run(products: int, rounds: int, seed: int) -> None:
+    db_path = os.path.join(tempfile.gettempdir(), f"bookstore_search_bench_{os.getpid()}.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            rows = _synthetic_rows(products, seed)
+            for start in range(0, len(rows), 5000):
+                await conn.execute(insert(Product), rows[start : start + 5000])
+
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        print(f"catalogo={products} rondas={rounds} consultas={len(QUERIES)}")
+        print(f"{'modo':<8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+        for mode in ("legacy", "like", "fts"):
+            samples: list[float] = []
+            async with session_factory() as session:
+                for _ in range(rounds):
+                    for search, smart in QUERIES:
+                        stmt = _build_statement(search, smart, mode)
+                        started = perf_counter()
+                        (await session.execute(stmt)).scalars().all()
+                        samples.append((perf_counter() - started) * 1000)
+            _report(mode, samples)
+
+        rng = random.Random(seed)
+        codes = [
+            rng.choice((row["sku"], row["isbn"] or row["sku"], row["barcode"] or row["sku"]))
+            for row in rng.sample(rows, min(len(rows), 500))
+        ]
+        samples = []
+        async with session_factory() as session:
+            for _ in range(rounds):
+                for code in codes:
+                    started = perf_counter()
+                    await products_router._find_by_code(session, code)
+                    samples.append((perf_counter() - started) * 1000)
+        _report("code", samples)
+    finally:
+        await engine.dispose()
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(run(args.products, args.rounds, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Benchmark de checkout con PDFs legales en curso.
+
+Levanta la API sobre una base SQLite temporal, registra ventas de a una y mide
+su latencia en reposo, con N FACTURAS renderizándose dentro del event loop
+(comportamiento anterior) y con las mismas FACTURAS en el pool de procesos
+(render_pool). También reporta el máximo bloqueo del event loop en cada caso.
+
+Uso (desde backend/):
+    python -m benchmarks.render_pool --pdfs 12 --checkouts 6 --workers 2
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+from time import perf_counter
+
+os.environ.setdefault("JWT_SECRET", "benchmark_secret_key_with_at_least_32_characters")
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.core.deps as deps  # noqa: E402
+import app.db.session as db_session  # noqa: E402
+import app.main as main_module  # noqa: E402
+import app.routers.pos.sales as sales_router  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.render_pool import render_pool  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.db import models as db_models  # noqa: E402,F401
+from app.db.base import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.seed import seed_admin  # noqa: E402
+from app.services.printing_templates import pdf_render  # noqa: E402
+
+PASSWORD = "bench-admin-123"
+
+
+def _legal_context(items: int) -> dict:
+    return {
+        "document_type": "FACTURA",
+        "document_number": "F001-000123",
+        "issue_date": "2026-05-01T10:30:00",
+        "company_name": "Libreria Carga",
+        "customer_name": "Cliente Carga",
+        "customer_tax_id": "20111111111",
+        "subtotal": 100.0,
+        "tax": 18.0,
+        "discount": 0.0,
+        "total": 118.0,
+        "items": [
+            {"name": f"Libro {index}", "qty": 1, "unit_price": 10.0, "line_total": 10.0}
+            for index in range(items)
+        ],
+    }
+
+
+async def _checkout_latencies(client, headers, product_id: int, checkouts: int) -> list[float]:
+    latencies = []
+    for _ in range(checkouts):
+        started = perf_counter()
+        resp = await client.post(
+            "/sales",
+            json={
+                "customer_id": None,
+                "items": [{"product_id": product_id, "qty": 1}],
+                "payments": [{"method": "CASH", "amount": 10.0}],
+                "subtotal": 10.0,
+                "tax": 0.0,
+                "discount": 0.0,
+                "total": 10.0,
+                "promotion_id": None,
+                "document_type": "TICKET",
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201, resp.text
+        latencies.append(perf_counter() - started)
+    return latencies
+
+
+async def _checkouts_under_pdf_load(
+    client, headers, product_id: int, checkouts: int, pdfs: int, render_one
+) -> tuple[list[float], float]:
+    """Latencias de checkout y máximo bloqueo del event loop con PDFs en curso."""
+    stalls: list[float] = []
+    done = asyncio.Event()
+
+    async def probe() -> None:
+        while not done.is_set():
+            started = perf_counter()
+            await asyncio.sleep(0.002)
+            stalls.append(perf_counter() - started - 0.002)
+
+    prober = asyncio.create_task(probe())
+    renders = [asyncio.create_task(render_one()) for _ in range(pdfs)]
+    latencies = await _checkout_latencies(client, headers, product_id, checkouts)
+    results = await asyncio.gather(*renders)
+    done.set()
+    await prober
+    assert all(pdf.startswith(b"%PDF") for pdf in results)
+    return latencies, max(stalls)
+
+
+async def _prepare(client) -> tuple[dict[str, str], int]:
+    login = await client.post("/auth/login", json={"username": "bench", "password": PASSWORD})
+    assert login.status_code == 200, login.text
+    headers = {"X-CSRF-Token": login.cookies.get("csrf_token")}
+    product = await client.post(
+        "/products",
+        json={
+            "sku": "LOAD-001",
+            "name": "Libro carga",
+            "category": "Pruebas",
+            "price": 10.0,
+            "cost": 4.0,
+            "stock": 100000,
+            "stock_min": 0,
+        },
+        headers=headers,
+    )
+    assert product.status_code == 201, product.text
+    open_cash = await client.post("/cash/open", json={"opening_amount": 50.0}, headers=headers)
+    assert open_cash.status_code == 201, open_cash.text
+    return headers, product.json()["id"]
+
+
+async def run(pdfs: int, checkouts: int, workers: int, items: int) -> None:
+    db_path = os.path.join(tempfile.gettempdir(), f"bookstore_render_bench_{os.getpid()}.db")
+    db_url = f"sqlite+aiosqlite:///{db_path}"
+    engine = create_async_engine(db_url, **db_session.engine_options(db_url))
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, _connection_record) -> None:
+        db_session.apply_sqlite_pragmas(dbapi_connection)
+
+    settings.rate_limit_per_minute = 10**9
+    render_pool.configure(workers=workers, max_pending=pdfs, timeout_seconds=120)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        for module in (db_session, deps, main_module, sales_router):
+            module.AsyncSessionLocal = session_factory
+        for module in (db_session, deps):
+            module.ReadSessionLocal = session_factory
+        async with session_factory() as session:
+            await seed_admin(session)
+            session.add(User(username="bench", password_hash=get_password_hash(PASSWORD), role="admin", is_active=True))
+            await session.commit()
+
+        context = _legal_context(items)
+
+        async def inline_render() -> bytes:
+            # Comportamiento anterior: ReportLab dentro del handler async.
+            return pdf_render.build_legal_document_pdf(context, "FACTURA", 18.0)
+
+        async def pooled_render() -> bytes:
+            return await render_pool.run(pdf_render.build_legal_document_pdf, context, "FACTURA", 18.0)
+
+        transport = httpx.ASGITransport(app=main_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            headers, product_id = await _prepare(client)
+            # Arranque de los procesos fuera de la medición.
+            await pooled_render()
+
+            idle = await _checkout_latencies(client, headers, product_id, checkouts)
+            inline, inline_stall = await _checkouts_under_pdf_load(
+                client, headers, product_id, checkouts, pdfs, inline_render
+            )
+            pooled, pooled_stall = await _checkouts_under_pdf_load(
+                client, headers, product_id, checkouts, pdfs, pooled_render
+            )
+
+        print(f"pdfs={pdfs} items={items} checkouts={checkouts} workers={workers}")
+        print(f"{'caso':<10} {'p50 ms':>9} {'max ms':>9} {'bloqueo ms':>11}")
+        print(f"{'reposo':<10} {statistics.median(idle) * 1000:>9.1f} {max(idle) * 1000:>9.1f} {'-':>11}")
+        for name, latencies, stall in (("en loop", inline, inline_stall), ("en pool", pooled, pooled_stall)):
+            print(
+                f"{name:<10} {statistics.median(latencies) * 1000:>9.1f} "
+                f"{max(latencies) * 1000:>9.1f} {stall * 1000:>11.1f}"
+            )
+    finally:
+        render_pool.shutdown()
+        await engine.dispose()
+        for path in (db_path, f"{db_path}-wal", f"{db_path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdfs", type=int, default=12)
+    parser.add_argument("--checkouts", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--items", type=int, default=400)
+    args = parser.parse_args()
+    asyncio.run(run(args.pdfs, args.checkouts, args.workers, args.items))
+
+
+if __name__ == "__main__":
+    main()
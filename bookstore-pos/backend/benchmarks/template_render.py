@@ -0,0 +1,247 @@
+"""
+Benchmark de render de plantillas de impresión.
+
+Compara el intérprete anterior (json.loads + regex por cada render) con las
+plantillas compiladas una vez por versión (compiled_template) y reporta
+renders por segundo para tickets de distinto tamaño.
+
+Uso (desde backend/):
+    python -m benchmarks.template_render --renders 5000
+"""
+
+import argparse
+import json
+import os
+import re
+from html import escape
+from time import perf_counter
+
+os.environ.setdefault("JWT_SECRET", "benchmark_secret_key_with_at_least_32_characters")
+
+from fastapi import HTTPException  # noqa: E402
+
+from app.services.printing_templates.compiled_template import PLACEHOLDER_RE, compile_template  # noqa: E402
+from app.services.printing_templates.default_templates import default_template_schema  # noqa: E402
+from app.services.printing_templates.template_service import get_compiled_template  # noqa: E402
+
+ITEM_COUNTS = (3, 20, 100)
+
+
+def _legacy_render(schema_json: str, context: dict) -> tuple[str, str, list[str]]:
+    try:
+        schema = json.loads(schema_json or "{}")
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=422, detail=f"Schema JSON invalido: {exc.msg}")
+
+    elements = schema.get("elements") or []
+    warnings: list[str] = []
+    html_parts: list[str] = []
+    text_lines: list[str] = []
+
+    paper = schema.get("paper") or {}
+    width_mm = float(paper.get("width_mm") or 80)
+    margins = paper.get("margins_mm") or {"top": 2, "right": 2, "bottom": 2, "left": 2}
+    html_parts.append(
+        (
+            "<div class='receipt-root' style='font-family:Arial,sans-serif;"
+            f"width:{width_mm}mm;padding:{margins.get('top', 2)}mm {margins.get('right', 2)}mm "
+            f"{margins.get('bottom', 2)}mm {margins.get('left', 2)}mm;'>"
+        )
+    )
+
+    for element in elements:
+        if not element.get("visible", True):
+            continue
+        element_type = (element.get("type") or "").strip().lower()
+        if element_type == "text":
+            rendered = _legacy_placeholders(str(element.get("content", "")), context)
+            html_parts.append(f"<div>{escape(rendered).replace(chr(10), '<br/>')}</div>")
+            text_lines.extend(rendered.splitlines() or [""])
+            continue
+
+        if element_type == "line":
+            html_parts.append("<hr/>")
+            text_lines.append("-" * 32)
+            continue
+
+        if element_type == "items_table":
+            items = context.get("items") or []
+            config = element.get("config") or {}
+            show_header = bool(config.get("show_header", True))
+            html_parts.append("<table style='width:100%;border-collapse:collapse;font-size:12px;'>")
+            if show_header:
+                html_parts.append(
+                    "<thead><tr>"
+                    "<th style='text-align:left;border-bottom:1px solid #ccc;'>Producto</th>"
+                    "<th style='text-align:right;border-bottom:1px solid #ccc;'>Cant</th>"
+                    "<th style='text-align:right;border-bottom:1px solid #ccc;'>P.Unit</th>"
+                    "<th style='text-align:right;border-bottom:1px solid #ccc;'>Total</th>"
+                    "</tr></thead>"
+                )
+            html_parts.append("<tbody>")
+            text_lines.append("Items:")
+            for item in items:
+                html_parts.append(
+                    "<tr>"
+                    f"<td>{escape(str(item.get('name', '')))}</td>"
+                    f"<td style='text-align:right'>{int(item.get('qty', 0))}</td>"
+                    f"<td style='text-align:right'>{float(item.get('unit_price', 0)):.2f}</td>"
+                    f"<td style='text-align:right'>{float(item.get('line_total', 0)):.2f}</td>"
+                    "</tr>"
+                )
+                text_lines.append(
+                    f"{item.get('name', '')} | {int(item.get('qty', 0))} x {float(item.get('unit_price', 0)):.2f}"
+                    f" = {float(item.get('line_total', 0)):.2f}"
+                )
+            html_parts.append("</tbody></table>")
+            continue
+
+        if element_type == "totals_block":
+            subtotal = float(context.get("subtotal", 0))
+            tax = float(context.get("tax", 0))
+            discount = float(context.get("discount", 0))
+            total = float(context.get("total", 0))
+            html_parts.append(
+                "<div style='margin-top:6px;text-align:right'>"
+                f"<div>Subtotal: {subtotal:.2f}</div>"
+                f"<div>Impuesto: {tax:.2f}</div>"
+                f"<div>Descuento: {discount:.2f}</div>"
+                f"<div style='font-weight:700'>Total: {total:.2f}</div>"
+                "</div>"
+            )
+            text_lines.extend(
+                [
+                    f"Subtotal: {subtotal:.2f}",
+                    f"Impuesto: {tax:.2f}",
+                    f"Descuento: {discount:.2f}",
+                    f"Total: {total:.2f}",
+                ]
+            )
+            continue
+
+        if element_type in {"qr", "barcode"}:
+            rendered = _legacy_placeholders(str(element.get("content", "")), context)
+            label = "QR" if element_type == "qr" else "BAR"
+            html_parts.append(f"<div style='margin-top:4px'>{label}: {escape(rendered)}</div>")
+            text_lines.append(f"{label}: {rendered}")
+            continue
+
+        if element_type == "image":
+            src = _legacy_placeholders(str(element.get("content", "")), context)
+            if src:
+                html_parts.append(f"<img src='{escape(src)}' alt='image' style='max-width:100%;'/>")
+            else:
+                warnings.append(f"Elemento image ({element.get('id')}) sin contenido")
+            continue
+
+        if element_type == "conditional_block":
+            expr = str(element.get("content", "")).strip()
+            key = expr.replace("{{", "").replace("}}", "").strip()
+            value = str(context.get(key, "")).strip()
+            if value:
+                html_parts.append(f"<div>{escape(value)}</div>")
+                text_lines.append(value)
+            continue
+
+        warnings.append(f"Tipo de elemento no soportado: {element_type or 'vacio'}")
+
+    html_parts.append("</div>")
+    return "\n".join(html_parts), "\n".join(text_lines), warnings
+
+
+def _legacy_placeholders(value: str, context: dict) -> str:
+    def replacer(match: re.Match[str]) -> str:
+        key = match.group(1)
+        resolved = _legacy_key(context, key)
+        if resolved is None:
+            return ""
+        return str(resolved)
+
+    return PLACEHOLDER_RE.sub(replacer, value)
+
+
+def _legacy_key(context: dict, key: str):
+    if "." not in key:
+        return context.get(key)
+    current = context
+    for part in key.split("."):
+        if isinstance(current, dict):
+            current = current.get(part)
+        else:
+            return None
+    return current
+
+
+def _schema() -> str:
+    schema = json.loads(default_template_schema("BOLETA", "THERMAL_80"))
+    schema["elements"].extend(
+        [
+            {"id": "seller", "type": "text", "content": "Atendido por {{seller_name}} - {{issue_date}}"},
+            {"id": "customer", "type": "text", "content": "Cliente: {{customer_name}}\nDoc: {{customer_tax_id}}"},
+            {"id": "sep", "type": "line"},
+            {"id": "qr", "type": "qr", "content": "{{company_tax_id}}|{{document_number}}|{{total}}"},
+            {"id": "header", "type": "conditional_block", "content": "{{receipt_header}}"},
+        ]
+    )
+    return json.dumps(schema, ensure_ascii=False)
+
+
+def _context(items: int) -> dict:
+    return {
+        "sale_id": 1,
+        "document_type": "BOLETA",
+        "document_number": "B001-000123",
+        "issue_date": "2026-05-01T10:30:00",
+        "subtotal": 100.0,
+        "tax": 18.0,
+        "discount": 0.0,
+        "total": 118.0,
+        "company_name": "Libreria Belen",
+        "company_tax_id": "20111111111",
+        "receipt_header": "Precios bajos siempre",
+        "receipt_footer": "Gracias por su compra",
+        "customer_name": "Cliente Frecuente",
+        "customer_tax_id": "10445566771",
+        "seller_name": "caja1",
+        "items": [
+            {"name": f"Libro {index}", "qty": 1, "unit_price": 10.0, "line_total": 10.0}
+            for index in range(items)
+        ],
+    }
+
+
+def _renders_per_second(render, schema_json: str, context: dict, renders: int) -> float:
+    for _ in range(50):
+        render(schema_json, context)
+    started = perf_counter()
+    for _ in range(renders):
+        render(schema_json, context)
+    return renders / (perf_counter() - started)
+
+
+def run(renders: int) -> None:
+    schema_json = _schema()
+
+    def compiled_render(schema: str, context: dict):
+        return get_compiled_template(schema).render(context)
+
+    for items in ITEM_COUNTS:
+        context = _context(items)
+        assert _legacy_render(schema_json, context) == compile_template(schema_json).render(context)
+        legacy = _renders_per_second(_legacy_render, schema_json, context, renders)
+        compiled = _renders_per_second(compiled_render, schema_json, context, renders)
+        print(
+            f"{items:>4} items  legacy {legacy:>9.0f} renders/s  "
+            f"compiled {compiled:>9.0f} renders/s  x{compiled / legacy:.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.renders)
+
+
+if __name__ == "__main__":
+    main()
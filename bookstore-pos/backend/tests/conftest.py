@@ -9,6 +9,10 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 # Configurar JWT_SECRET antes de importar app (minimo 32 caracteres)
 os.environ["JWT_SECRET"] = "test_secret_key_for_unit_tests_minimum_32_characters_long_secure"
+# PDFs en un hilo: los tests que necesitan procesos configuran el pool ellos mismos.
+os.environ.setdefault("RENDER_POOL_WORKERS", "0")
+# Sin refresco de alertas en segundo plano: los tests que lo necesitan lo inician ellos mismos.
+os.environ.setdefault("ALERTS_SNAPSHOT_REFRESH_SECONDS", "0")
 
 from app.db.base import Base
 
@@ -26,13 +30,12 @@ async def test_app():
 
     db_path = os.path.join(tempfile.gettempdir(), f"bookstore_test_{uuid.uuid4().hex}.db")
 
-    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", future=True)
+    db_url = f"sqlite+aiosqlite:///{db_path}"
+    engine = create_async_engine(db_url, future=True, **db_session.engine_options(db_url))
 
     @event.listens_for(engine.sync_engine, "connect")
     def _set_sqlite_pragma(dbapi_connection, _connection_record) -> None:
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
+        db_session.apply_sqlite_pragmas(dbapi_connection)
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -48,17 +51,28 @@ async def test_app():
         )
         await session.commit()
 
+    read_engine = create_async_engine(db_url, future=True, **db_session.engine_options(db_url))
+
+    @event.listens_for(read_engine.sync_engine, "connect")
+    def _set_sqlite_read_pragma(dbapi_connection, _connection_record) -> None:
+        db_session.apply_sqlite_read_only_pragmas(dbapi_connection)
+
     TestSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    TestReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False)
     db_session.AsyncSessionLocal = TestSessionLocal
+    db_session.ReadSessionLocal = TestReadSessionLocal
     deps.AsyncSessionLocal = TestSessionLocal
+    deps.ReadSessionLocal = TestReadSessionLocal
     main.AsyncSessionLocal = TestSessionLocal
     sales.AsyncSessionLocal = TestSessionLocal
 
     yield app
 
+    await read_engine.dispose()
     await engine.dispose()
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    for path in (db_path, f"{db_path}-wal", f"{db_path}-shm"):
+        if os.path.exists(path):
+            os.remove(path)
 
 
 @pytest_asyncio.fixture(autouse=True)
@@ -79,6 +93,61 @@ async def reset_rate_limiter():
     await rate_limiter.reset_for_tests()
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def reset_catalog_cache():
+    from app.core.catalog_cache import catalog_cache
+
+    catalog_cache.clear()
+    yield
+    catalog_cache.clear()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def reset_principal_cache():
+    from app.core.principal_cache import principal_cache
+
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def reset_alerts_snapshot():
+    from app.core.alerts_snapshot import alerts_snapshot
+
+    alerts_snapshot.clear()
+    yield
+    alerts_snapshot.clear()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def reset_render_cache():
+    from app.core.render_cache import render_cache
+
+    render_cache.clear()
+    yield
+    render_cache.clear()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def reset_permission_registry():
+    from app.core.permission_registry import permission_registry
+
+    # Cada test usa una base nueva: forzar la recarga en el primer chequeo.
+    permission_registry.mark_stale()
+    yield
+    permission_registry.mark_stale()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def reset_settings_snapshot():
+    from app.core.settings_snapshot import settings_snapshot
+
+    settings_snapshot.mark_stale()
+    yield
+    settings_snapshot.mark_stale()
+
+
 @pytest_asyncio.fixture
 async def client(test_app):
     async with test_app.router.lifespan_context(test_app):
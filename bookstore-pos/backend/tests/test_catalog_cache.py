@@ -0,0 +1,157 @@
+import pytest
+from sqlalchemy import select
+
+import app.db.session as db_session
+from app.core.catalog_cache import catalog_cache, mark_catalog_changed
+from app.models.product import Product
+from app.models.sale import SaleItem
+
+
+async def _login_admin(client):
+    resp = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert resp.status_code == 200
+    csrf = resp.cookies.get("csrf_token")
+    assert csrf
+    return {"X-CSRF-Token": csrf}
+
+
+async def _create_product(client, headers, sku: str, price: float) -> dict:
+    resp = await client.post(
+        "/products",
+        json={
+            "sku": sku,
+            "name": f"Libro {sku}",
+            "category": "Libros",
+            "barcode": f"775{sku[-4:]}",
+            "price": price,
+            "cost": 1.0,
+            "stock": 10,
+            "stock_min": 0,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    return resp.json()
+
+
+async def _sell(client, headers, product_id: int, price: float):
+    payload = {
+        "customer_id": None,
+        "items": [{"product_id": product_id, "qty": 1}],
+        "payments": [{"method": "CASH", "amount": price}],
+        "subtotal": price,
+        "tax": 0,
+        "discount": 0,
+        "total": price,
+        "promotion_id": None,
+    }
+    resp = await client.post("/sales", json=payload, headers=headers)
+    assert resp.status_code == 201, resp.text
+    return resp.json()
+
+
+@pytest.mark.asyncio
+async def test_sale_reads_catalog_from_cache_and_sees_product_updates(client):
+    headers = await _login_admin(client)
+    product = await _create_product(client, headers, "CACHE-0001", 5.0)
+    open_resp = await client.post("/cash/open", json={"opening_amount": 50.0}, headers=headers)
+    assert open_resp.status_code in {201, 409}
+
+    await _sell(client, headers, product["id"], 5.0)
+    entry = catalog_cache.get(product["id"])
+    assert entry is not None
+    assert entry.price == 5.0
+    assert catalog_cache.get_by_code("7750001") == entry
+
+    resp = await client.put(
+        f"/products/{product['id']}",
+        json={**product, "price": 7.5, "sale_price": 7.5, "stock": 9},
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    assert catalog_cache.get(product["id"]) is None
+
+    sale = await _sell(client, headers, product["id"], 7.5)
+    async with db_session.AsyncSessionLocal() as session:
+        unit_price = (
+            await session.execute(select(SaleItem.unit_price).where(SaleItem.sale_id == sale["id"]))
+        ).scalar_one()
+        stock = (await session.execute(select(Product.stock).where(Product.id == product["id"]))).scalar_one()
+    assert float(unit_price) == 7.5
+    assert stock == 8
+
+
+@pytest.mark.asyncio
+async def test_catalog_invalidation_waits_for_commit(client):
+    headers = await _login_admin(client)
+    product = await _create_product(client, headers, "CACHE-0002", 3.0)
+
+    async with db_session.AsyncSessionLocal() as session:
+        await catalog_cache.get_many(session, [product["id"]])
+        assert catalog_cache.get(product["id"]) is not None
+
+        version = catalog_cache.version
+        mark_catalog_changed(session, [product["id"]])
+        await session.rollback()
+        assert catalog_cache.version == version
+        assert catalog_cache.get(product["id"]) is not None
+
+        await session.execute(select(Product.id).limit(1))
+        mark_catalog_changed(session, [product["id"]])
+        await session.commit()
+        assert catalog_cache.version == version + 1
+        assert catalog_cache.get(product["id"]) is None
+
+
+@pytest.mark.asyncio
+async def test_code_lookup_and_scan_resolve_through_catalog_cache(client):
+    from sqlalchemy import event
+
+    from app.core.metrics import catalog_cache_hits_total
+
+    headers = await _login_admin(client)
+    product = await _create_product(client, headers, "CACHE-0003", 4.0)
+    async with db_session.AsyncSessionLocal() as session:
+        await catalog_cache.get_many(session, [product["id"]])
+
+    statements: list[str] = []
+    engine = db_session.ReadSessionLocal.kw["bind"].sync_engine
+
+    def _capture(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    hits = catalog_cache_hits_total.labels("code")._value.get()
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        lookup = await client.get("/products/lookup", params={"code": "7750003"}, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    scan = await client.get("/products", params={"search": "CACHE-0003"}, headers=headers)
+    assert lookup.status_code == 200
+    assert lookup.json()["id"] == product["id"]
+    assert lookup.json()["stock"] == 10
+    assert scan.json()[0]["id"] == product["id"]
+    assert catalog_cache_hits_total.labels("code")._value.get() == hits + 2
+    # Una sola lectura por id: el código se resolvió en la caché.
+    assert len(statements) == 1
+    assert statements[0].rstrip().endswith("WHERE products.id = ?")
+
+
+def test_evicted_entry_drops_only_its_own_codes():
+    from dataclasses import fields
+
+    from app.core.catalog_cache import CatalogCache, CatalogEntry
+
+    def entry(product_id: int) -> CatalogEntry:
+        values = {item.name: "" for item in fields(CatalogEntry)}
+        values.update(id=product_id, sku=f"SKU-{product_id}", barcode=f"BAR-{product_id}")
+        return CatalogEntry(**values)
+
+    cache = CatalogCache(max_entries=2)
+    for product_id in (1, 2, 3):
+        cache.put(entry(product_id), version=cache.version)
+    assert len(cache) == 2
+    assert cache.get_by_code("SKU-1") is None
+    assert cache.get_by_code("BAR-2").id == 2
+    assert cache.get_by_code("SKU-3").id == 3
+    assert set(cache._codes.values()) == {2, 3}
@@ -0,0 +1,108 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects import sqlite
+
+import app.db.session as db_session
+from app.core.config import settings
+from app.core.dates import business_day, business_day_bounds, day_range_filter
+from app.models.sale import Sale
+
+
+async def _login_admin(client):
+    resp = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert resp.status_code == 200
+    csrf = resp.cookies.get("csrf_token")
+    assert csrf
+    return {"X-CSRF-Token": csrf}
+
+
+async def _query_plan(stmt) -> str:
+    sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    async with db_session.AsyncSessionLocal() as session:
+        plan = await session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+        return " ".join(str(row[-1]) for row in plan.all())
+
+
+def test_business_day_bounds_are_half_open_utc(monkeypatch):
+    monkeypatch.setattr(settings, "business_timezone", "America/Lima")
+    start, end = business_day_bounds(date(2026, 3, 1), date(2026, 3, 31))
+    assert start == datetime(2026, 3, 1, 5, 0, tzinfo=timezone.utc)
+    assert end == datetime(2026, 4, 1, 5, 0, tzinfo=timezone.utc)
+    # 22:00 en Lima sigue siendo el mismo día comercial aunque en UTC ya sea el siguiente.
+    assert business_day(datetime(2026, 3, 2, 3, 0)) == date(2026, 3, 1)
+
+    monkeypatch.setattr(settings, "business_timezone", "UTC")
+    assert business_day_bounds(date(2026, 3, 1), None) == (
+        datetime(2026, 3, 1, tzinfo=timezone.utc),
+        None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_sales_date_filter_uses_created_at_index(client):
+    day = date(2026, 10, 1)
+    sargable = await _query_plan(
+        select(Sale.id).where(day_range_filter(Sale.created_at, day, day)).order_by(Sale.created_at.desc())
+    )
+    assert "SCAN sales" not in sargable
+    # ix_sales_created_at o ix_sales_created_at_desc, ambos sobre created_at.
+    assert "INDEX ix_sales_created_at" in sargable
+    assert "(created_at>? AND created_at<?)" in sargable
+
+    legacy = await _query_plan(select(Sale.id).where(func.date(Sale.created_at) >= day.isoformat()))
+    assert "SCAN sales" in legacy
+
+
+@pytest.mark.asyncio
+async def test_list_sales_filters_by_business_day(client, monkeypatch):
+    headers = await _login_admin(client)
+    product = await client.post(
+        "/products",
+        json={
+            "sku": "BK-DAY-1",
+            "name": "Libro dia",
+            "category": "Libros",
+            "price": 10.0,
+            "cost": 5.0,
+            "stock": 5,
+        },
+        headers=headers,
+    )
+    assert product.status_code == 201
+    open_resp = await client.post("/cash/open", json={"opening_amount": 50.0}, headers=headers)
+    assert open_resp.status_code in {201, 409}
+    sale = await client.post(
+        "/sales",
+        json={
+            "items": [{"product_id": product.json()["id"], "qty": 1}],
+            "payments": [{"method": "CASH", "amount": 10.0}],
+            "subtotal": 10.0,
+            "total": 10.0,
+        },
+        headers=headers,
+    )
+    assert sale.status_code == 201, sale.text
+    sale_id = sale.json()["id"]
+
+    async with db_session.AsyncSessionLocal() as session:
+        await session.execute(
+            update(Sale)
+            .where(Sale.id == sale_id)
+            .values(created_at=datetime(2026, 3, 2, 3, 0, tzinfo=timezone.utc))
+        )
+        await session.commit()
+
+    async def listed(from_date: str, to_date: str) -> set[int]:
+        resp = await client.get("/sales", params={"from_date": from_date, "to_date": to_date}, headers=headers)
+        assert resp.status_code == 200
+        return {row["id"] for row in resp.json()}
+
+    assert sale_id in await listed("2026-03-02", "2026-03-02")
+    monkeypatch.setattr(settings, "business_timezone", "America/Lima")
+    assert sale_id in await listed("2026-03-01", "2026-03-01")
+    assert sale_id not in await listed("2026-03-02", "2026-03-02")
+
+    bad = await client.get("/sales", params={"from_date": "01/03/2026"}, headers=headers)
+    assert bad.status_code == 400
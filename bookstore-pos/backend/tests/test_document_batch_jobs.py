@@ -0,0 +1,200 @@
+import asyncio
+import io
+import re
+import zipfile
+
+import pytest
+from sqlalchemy import event
+
+import app.db.session as db_session
+from app.core.config import settings
+from app.services.printing_templates import DocumentRenderService
+
+PDF_PAGE_RE = re.compile(rb"/Type /Page\b(?!s)")
+
+
+async def _login_admin(client) -> dict[str, str]:
+    response = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert response.status_code == 200
+    return {"X-CSRF-Token": response.cookies.get("csrf_token")}
+
+
+async def _create_sales(client, headers) -> tuple[int, list[int]]:
+    product = await client.post(
+        "/products",
+        json={
+            "sku": "BATCH-001",
+            "name": "Libro cierre",
+            "category": "Pruebas",
+            "price": 10.0,
+            "cost": 4.0,
+            "stock": 50,
+            "stock_min": 0,
+        },
+        headers=headers,
+    )
+    assert product.status_code == 201
+    customer = await client.post(
+        "/customers",
+        json={"name": "Cliente Cierre", "phone": "999000111", "tax_id": "20123456789"},
+        headers=headers,
+    )
+    assert customer.status_code == 201
+    open_cash = await client.post("/cash/open", json={"opening_amount": 50.0}, headers=headers)
+    assert open_cash.status_code == 201
+    cash_session_id = open_cash.json()["id"]
+
+    legal_ids = []
+    for document_type in ("BOLETA", "FACTURA", "TICKET", "BOLETA"):
+        sale = await client.post(
+            "/sales",
+            json={
+                "customer_id": customer.json()["id"],
+                "items": [{"product_id": product.json()["id"], "qty": 1}],
+                "payments": [{"method": "CASH", "amount": 10.0}],
+                "subtotal": 10.0,
+                "tax": 0.0,
+                "discount": 0.0,
+                "total": 10.0,
+                "promotion_id": None,
+                "document_type": document_type,
+            },
+            headers=headers,
+        )
+        assert sale.status_code == 201, sale.text
+        if document_type != "TICKET":
+            legal_ids.append(sale.json()["id"])
+    return cash_session_id, legal_ids
+
+
+async def _wait_batch_job_done(client, job_id: int, headers: dict[str, str]) -> dict:
+    for _ in range(50):
+        response = await client.get(f"/printing/batch-jobs/{job_id}", headers=headers)
+        assert response.status_code == 200
+        payload = response.json()
+        if payload["status"] not in {"pending", "running"}:
+            return payload
+        await asyncio.sleep(0.1)
+    raise AssertionError("El job no termino en el tiempo esperado")
+
+
+@pytest.mark.asyncio
+async def test_batch_zip_and_merged_pdf_for_day_and_cash_session(client, monkeypatch, tmp_path):
+    pytest.importorskip("reportlab")
+    monkeypatch.setattr(settings, "document_batch_dir", str(tmp_path))
+    headers = await _login_admin(client)
+    cash_session_id, legal_ids = await _create_sales(client, headers)
+
+    invalid = await client.post(
+        "/printing/batch-jobs",
+        json={"date_from": "2026-01-01", "cash_session_id": cash_session_id},
+        headers=headers,
+    )
+    assert invalid.status_code == 400
+
+    created = await client.post(
+        "/printing/batch-jobs",
+        json={"date_from": "2000-01-01", "date_to": "2100-12-31", "output_format": "zip"},
+        headers=headers,
+    )
+    assert created.status_code == 201
+    job = await _wait_batch_job_done(client, created.json()["id"], headers)
+    assert job["status"] == "success"
+    assert job["total_documents"] == job["processed_documents"] == len(legal_ids)
+    assert job["error_documents"] == 0
+
+    download = await client.get(f"/printing/batch-jobs/{job['id']}/download", headers=headers)
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+        names = archive.namelist()
+        assert len(names) == len(legal_ids)
+        assert sum(name.startswith("boleta_") for name in names) == 2
+        assert all(archive.read(name).startswith(b"%PDF") for name in names)
+
+    created = await client.post(
+        "/printing/batch-jobs",
+        json={"cash_session_id": cash_session_id, "output_format": "pdf"},
+        headers=headers,
+    )
+    assert created.status_code == 201
+    job = await _wait_batch_job_done(client, created.json()["id"], headers)
+    assert job["status"] == "success"
+    download = await client.get(f"/printing/batch-jobs/{job['id']}/download", headers=headers)
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/pdf"
+    assert len(PDF_PAGE_RE.findall(download.content)) == len(legal_ids)
+
+
+@pytest.mark.asyncio
+async def test_bulk_sale_contexts_use_constant_queries(client):
+    headers = await _login_admin(client)
+    _, legal_ids = await _create_sales(client, headers)
+
+    statements: list[str] = []
+
+    def count_statement(_conn, _cursor, statement, _params, _context, _executemany):
+        statements.append(statement)
+
+    engine = db_session.AsyncSessionLocal.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        async with db_session.AsyncSessionLocal() as session:
+            service = DocumentRenderService(session)
+            single = await service.build_sale_context(legal_ids[0])
+            single_queries = len(statements)
+            statements.clear()
+            contexts = await service.build_sale_contexts(legal_ids)
+            bulk_queries = len(statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    # Ventas, clientes, usuarios e ítems; la configuración sale de settings_snapshot.
+    assert bulk_queries == single_queries == 4
+    assert set(contexts) == set(legal_ids)
+    assert contexts[legal_ids[0]] == single
+    assert contexts[legal_ids[1]]["document_type"] == "FACTURA"
+    assert contexts[legal_ids[1]]["customer_name"] == "Cliente Cierre"
+
+
+@pytest.mark.asyncio
+async def test_batch_job_over_limit_fails_without_output(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "document_batch_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "document_batch_max_documents", 1)
+    headers = await _login_admin(client)
+    cash_session_id, _ = await _create_sales(client, headers)
+
+    created = await client.post(
+        "/printing/batch-jobs", json={"cash_session_id": cash_session_id}, headers=headers
+    )
+    assert created.status_code == 201
+    job = await _wait_batch_job_done(client, created.json()["id"], headers)
+    assert job["status"] == "failed"
+    assert "máximo 1" in job["error_message"]
+    download = await client.get(f"/printing/batch-jobs/{job['id']}/download", headers=headers)
+    assert download.status_code == 409
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_batch_job_without_documents_reports_it_for_both_formats(client, monkeypatch, tmp_path):
+    from app.services.printing_templates.document_batch_service import NO_DOCUMENTS_MESSAGE
+
+    monkeypatch.setattr(settings, "document_batch_dir", str(tmp_path))
+    headers = await _login_admin(client)
+
+    for output_format in ("pdf", "zip"):
+        created = await client.post(
+            "/printing/batch-jobs",
+            json={"date_from": "2001-01-01", "date_to": "2001-01-02", "output_format": output_format},
+            headers=headers,
+        )
+        assert created.status_code == 201
+        job = await _wait_batch_job_done(client, created.json()["id"], headers)
+        assert job["status"] == "success"
+        assert job["total_documents"] == 0
+        assert job["error_message"] == NO_DOCUMENTS_MESSAGE
+        download = await client.get(f"/printing/batch-jobs/{job['id']}/download", headers=headers)
+        assert download.status_code == 404
+        assert download.json()["detail"] == NO_DOCUMENTS_MESSAGE
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+import app.db.session as db_session
+from app.core.config import settings
+from app.models.document_sequence import DocumentNumberGap, DocumentSequence
+from app.services.printing_templates import DocumentSequenceService
+from app.services.printing_templates.document_sequence_service import document_number_blocks
+
+
+async def _login_admin(client) -> dict[str, str]:
+    response = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert response.status_code == 200
+    return {"X-CSRF-Token": response.cookies.get("csrf_token")}
+
+
+async def _boleta_sequence() -> DocumentSequence:
+    async with db_session.AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(DocumentSequence).where(DocumentSequence.document_type == "BOLETA")
+        )
+        return result.scalar_one()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("block_size", [0, 3])
+async def test_parallel_sales_get_unique_contiguous_numbers(client, monkeypatch, block_size):
+    monkeypatch.setattr(settings, "document_number_block_size", block_size)
+    headers = await _login_admin(client)
+    product = await client.post(
+        "/products",
+        json={
+            "sku": "SEQ-001",
+            "name": "Libro numerado",
+            "category": "Pruebas",
+            "price": 5.0,
+            "cost": 2.0,
+            "stock": 100,
+            "stock_min": 0,
+        },
+        headers=headers,
+    )
+    assert product.status_code == 201
+    customer = await client.post("/customers", json={"name": "Cliente Serie", "phone": "999"}, headers=headers)
+    assert customer.status_code == 201
+    open_cash = await client.post("/cash/open", json={"opening_amount": 10.0}, headers=headers)
+    assert open_cash.status_code == 201
+
+    sale_payload = {
+        "customer_id": customer.json()["id"],
+        "items": [{"product_id": product.json()["id"], "qty": 1}],
+        "payments": [{"method": "CASH", "amount": 5.0}],
+        "subtotal": 5.0,
+        "tax": 0.0,
+        "discount": 0.0,
+        "total": 5.0,
+        "promotion_id": None,
+        "document_type": "BOLETA",
+    }
+    try:
+        responses = await asyncio.gather(
+            *(client.post("/sales", json=sale_payload, headers=headers) for _ in range(10))
+        )
+        assert [response.status_code for response in responses] == [201] * 10, [
+            response.text for response in responses if response.status_code != 201
+        ]
+        numbers = [response.json()["invoice_number"] for response in responses]
+        assert len(set(numbers)) == 10
+        assert all(number.startswith("B001-") for number in numbers)
+    finally:
+        released = await document_number_blocks.release()
+
+    assert released == (2 if block_size else 0)
+    async with db_session.AsyncSessionLocal() as session:
+        report = await DocumentSequenceService(session).audit_sequence(await _boleta_sequence())
+    assert report["issued"] == 10
+    assert report["duplicates"] == []
+    assert report["missing"] == []
+    assert report["recorded_gaps"] == released
+    assert report["next_number"] == 11 + released
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("block_size", [0, 4])
+async def test_rolled_back_numbers_are_reused_or_recorded(client, monkeypatch, block_size):
+    monkeypatch.setattr(settings, "document_number_block_size", block_size)
+    await _login_admin(client)
+    committed: list[str] = []
+
+    async def allocate(index: int) -> None:
+        async with db_session.AsyncSessionLocal() as session:
+            async with session.begin():
+                number = await DocumentSequenceService(session).next_number("BOLETA")
+                if index % 3 == 0:
+                    await session.rollback()
+                    return
+            committed.append(number)
+
+    # Crea la secuencia antes de la carga paralela.
+    await allocate(1)
+    try:
+        await asyncio.gather(*(allocate(index) for index in range(2, 20)))
+    finally:
+        released = await document_number_blocks.release()
+
+    assert len(committed) == len(set(committed)) == 13
+    sequence = await _boleta_sequence()
+    async with db_session.AsyncSessionLocal() as session:
+        gaps = (
+            await session.execute(
+                select(DocumentNumberGap.number).where(DocumentNumberGap.sequence_id == sequence.id)
+            )
+        ).scalars().all()
+    assert len(gaps) == released
+    issued = {int(number.split("-")[1]) for number in committed}
+    # Ningún número perdido: cada reservado se emitió o quedó registrado como hueco.
+    assert issued | set(gaps) == set(range(1, sequence.next_number))
+    assert not issued & set(gaps)
+    if not block_size:
+        assert sequence.next_number == 14
@@ -1,6 +1,11 @@
 import importlib.util
+import json
 
 import pytest
+from fastapi import HTTPException
+
+from app.services.printing_templates import DocumentRenderService, TemplateService
+from app.services.printing_templates.template_service import get_compiled_template
 
 
 async def _login_admin(client):
@@ -207,3 +212,55 @@ async def test_boleta_default_uses_legal_layout_with_dynamic_fields(client):
         assert pdf_resp.status_code == 500
         payload = pdf_resp.json()
         assert "No se pudo generar PDF legal" in payload.get("detail", "")
+
+
+def test_compiled_template_is_reused_and_renders_every_element():
+    TemplateService.clear_cache()
+    schema_json = json.dumps(
+        {
+            "paper": {"width_mm": 58, "margins_mm": {"top": 1, "right": 3}},
+            "elements": [
+                {"type": "text", "content": "Hola {{ customer_name }} {{missing}} {{customer.doc}}\nFin"},
+                {"type": "line", "visible": False},
+                {"type": "items_table", "config": {"show_header": False}},
+                {"type": "qr", "content": "{{document_number}}"},
+                {"type": "image", "id": "logo", "content": "{{company_logo}}"},
+                {"type": "conditional_block", "content": "{{ receipt_footer }}"},
+                {"type": "firma"},
+            ],
+        }
+    )
+    context = {
+        "customer_name": "Ana & Co",
+        "customer": {"doc": "10445566771"},
+        "document_number": "B001-7",
+        "company_logo": "",
+        "receipt_footer": "  Gracias  ",
+        "items": [{"name": "Libro <1>", "qty": 2, "unit_price": 3.5, "line_total": 7}],
+    }
+
+    compiled = get_compiled_template(schema_json)
+    assert get_compiled_template(schema_json) is compiled
+    html, text, warnings = DocumentRenderService(None).render(schema_json, context)
+
+    assert html.startswith(
+        "<div class='receipt-root' style='font-family:Arial,sans-serif;width:58.0mm;padding:1mm 3mm 2mm 2mm;'>"
+    )
+    assert "<div>Hola Ana &amp; Co  10445566771<br/>Fin</div>" in html
+    assert "<hr/>" not in html and "<thead>" not in html
+    assert "<td>Libro &lt;1&gt;</td>" in html
+    assert text.splitlines() == [
+        "Hola Ana & Co  10445566771",
+        "Fin",
+        "Items:",
+        "Libro <1> | 2 x 3.50 = 7.00",
+        "QR: B001-7",
+        "Gracias",
+    ]
+    assert warnings == ["Elemento image (logo) sin contenido", "Tipo de elemento no soportado: firma"]
+
+    TemplateService.clear_cache()
+    assert get_compiled_template(schema_json) is not compiled
+    with pytest.raises(HTTPException) as invalid:
+        get_compiled_template("{no es json")
+    assert invalid.value.status_code == 422
@@ -0,0 +1,60 @@
+import pytest
+
+import app.core.security as security
+from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.security_validation import build_csp
+
+
+@pytest.mark.asyncio
+async def test_pipeline_headers_on_regular_and_rejected_responses(client, monkeypatch):
+    ok = await client.get("/health", headers={"X-Request-ID": "req-pipeline"})
+    assert ok.status_code == 200
+    assert ok.headers["x-request-id"] == "req-pipeline"
+    assert ok.headers["content-security-policy"] == build_csp()
+    assert ok.headers["x-frame-options"] == "DENY"
+
+    login = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert login.status_code == 200
+    # Sesión por cookie sin cabecera CSRF: rechazo con las mismas cabeceras.
+    rejected = await client.post("/customers", json={"name": "Sin CSRF"})
+    assert rejected.status_code == 403
+    assert rejected.text == "CSRF token missing or invalid"
+    assert rejected.headers["x-content-type-options"] == "nosniff"
+    assert rejected.headers["x-request-id"]
+
+    monkeypatch.setattr(settings, "rate_limit_per_minute", 1)
+    await rate_limiter.reset_for_tests()
+    try:
+        assert (await client.get("/health")).status_code == 200
+        limited = await client.get("/health")
+        assert limited.status_code == 429
+        assert limited.headers["content-security-policy"] == build_csp()
+    finally:
+        await rate_limiter.reset_for_tests()
+
+
+@pytest.mark.asyncio
+async def test_jwt_is_decoded_once_per_request(client, monkeypatch):
+    login = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    token = login.cookies.get(settings.auth_cookie_name)
+    client.cookies.clear()
+
+    calls: list[str] = []
+    original = security.decode_token
+
+    def counting_decode(value: str):
+        calls.append(value)
+        return original(value)
+
+    monkeypatch.setattr(security, "decode_token", counting_decode)
+    for _ in range(2):
+        calls.clear()
+        resp = await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert resp.status_code == 200
+        assert calls == [token]
+
+    calls.clear()
+    bad = await client.get("/auth/me", headers={"Authorization": "Bearer no-es-un-jwt"})
+    assert bad.status_code == 401
+    assert calls == ["no-es-un-jwt"]
@@ -1,6 +1,14 @@
 import asyncio
+import tempfile
 
 import pytest
+from sqlalchemy import event, func, select
+
+from app.models.inventory import InventoryImportJob, InventoryImportJobError, StockMovement
+from app.models.product import Product
+from app.models.warehouse import StockLevel
+
+BULK_ROWS = 5000
 
 
 async def _login_admin(client) -> dict[str, str]:
@@ -105,3 +113,358 @@ async def test_kardex_cursor_pagination_and_filters(client):
     first_ids = {item["id"] for item in first_payload["items"]}
     second_ids = {item["id"] for item in second_payload["items"]}
     assert first_ids.isdisjoint(second_ids)
+
+
+@pytest.mark.asyncio
+async def test_kardex_running_balance_window_and_rebuild(client):
+    from datetime import timedelta
+
+    import app.db.session as db_session
+    from app.core.dates import business_today
+    from app.core.kardex import rebuild_movement_balances
+
+    headers = await _login_admin(client)
+    product_response = await client.post(
+        "/products",
+        json={
+            "sku": "BK-KARDEX-BAL",
+            "name": "Libro saldo",
+            "category": "Inventario",
+            "price": 5.0,
+            "cost": 2.0,
+            "stock": 5,
+            "stock_min": 0,
+        },
+        headers=headers,
+    )
+    assert product_response.status_code == 201
+    product_id = product_response.json()["id"]
+
+    for movement_type, qty in (("IN", 10), ("OUT", 3), ("ADJ", -2)):
+        movement_response = await client.post(
+            "/inventory/movement",
+            json={"product_id": product_id, "type": movement_type, "qty": qty, "ref": "SALDO"},
+            headers=headers,
+        )
+        assert movement_response.status_code == 201
+    customer = await client.post("/customers", json={"name": "Cliente Kardex", "phone": "999"}, headers=headers)
+    assert customer.status_code == 201
+    open_cash = await client.post("/cash/open", json={"opening_amount": 10.0}, headers=headers)
+    assert open_cash.status_code == 201
+    sale = await client.post(
+        "/sales",
+        json={
+            "customer_id": customer.json()["id"],
+            "items": [{"product_id": product_id, "qty": 4}],
+            "payments": [{"method": "CASH", "amount": 20.0}],
+            "subtotal": 20.0,
+            "tax": 0.0,
+            "discount": 0.0,
+            "total": 20.0,
+            "promotion_id": None,
+        },
+        headers=headers,
+    )
+    assert sale.status_code == 201, sale.text
+
+    today = business_today().isoformat()
+    kardex = await client.get(f"/inventory/kardex/{product_id}?from={today}&to={today}", headers=headers)
+    assert kardex.status_code == 200
+    payload = kardex.json()
+    chronological = list(reversed(payload["items"]))
+    assert [item["balance_after"] for item in chronological] == [5, 15, 12, 10, 6]
+    assert payload["opening_balance"] == 0
+    assert payload["closing_balance"] == 6
+
+    tomorrow = (business_today() + timedelta(days=1)).isoformat()
+    future = await client.get(f"/inventory/kardex/{product_id}?from={tomorrow}", headers=headers)
+    assert future.status_code == 200
+    assert future.json()["items"] == []
+    assert future.json()["opening_balance"] == future.json()["closing_balance"] == 6
+
+    async with db_session.AsyncSessionLocal() as session:
+        movements = (
+            await session.execute(select(StockMovement).where(StockMovement.product_id == product_id))
+        ).scalars().all()
+        for movement in movements:
+            movement.balance_after = None
+        await session.commit()
+        assert await rebuild_movement_balances(session, [product_id]) == len(movements)
+        await session.commit()
+        assert await rebuild_movement_balances(session, [product_id]) == 0
+
+    rebuilt = await client.get(f"/inventory/kardex/{product_id}", headers=headers)
+    assert [item["balance_after"] for item in reversed(rebuilt.json()["items"])] == [5, 15, 12, 10, 6]
+
+
+@pytest.mark.asyncio
+async def test_kardex_balance_includes_batches_and_counts(client):
+    import app.db.session as db_session
+    from app.core.kardex import rebuild_movement_balances
+    from app.core.stock import require_default_warehouse_id
+
+    headers = await _login_admin(client)
+    product_response = await client.post(
+        "/products",
+        json={
+            "sku": "BK-KARDEX-LOTE",
+            "name": "Libro lote",
+            "category": "Inventario",
+            "price": 5.0,
+            "cost": 2.0,
+            "stock": 5,
+            "stock_min": 0,
+        },
+        headers=headers,
+    )
+    assert product_response.status_code == 201
+    product_id = product_response.json()["id"]
+    async with db_session.AsyncSessionLocal() as session:
+        warehouse_id = await require_default_warehouse_id(session)
+
+    batch = await client.post(
+        "/warehouses/batch",
+        json={"product_id": product_id, "warehouse_id": warehouse_id, "lot": "L-001", "qty": 7},
+        headers=headers,
+    )
+    assert batch.status_code == 201, batch.text
+    count = await client.post(
+        "/warehouses/count",
+        json={"product_id": product_id, "warehouse_id": warehouse_id, "counted_qty": 10},
+        headers=headers,
+    )
+    assert count.status_code == 201, count.text
+    assert count.json()["diff"] == -2
+
+    kardex = await client.get(f"/inventory/kardex/{product_id}", headers=headers)
+    assert kardex.status_code == 200
+    items = list(reversed(kardex.json()["items"]))
+    assert [(item["type"], item["qty"], item["balance_after"]) for item in items] == [
+        ("IN", 5, 5),
+        ("IN", 7, 12),
+        ("ADJ", -2, 10),
+    ]
+    assert items[1]["ref"].startswith("BATCH:") and items[2]["ref"].startswith("COUNT:")
+    async with db_session.AsyncSessionLocal() as session:
+        stock = (await session.execute(select(Product.stock).where(Product.id == product_id))).scalar_one()
+        assert kardex.json()["closing_balance"] == stock == 10
+        # Reconstruir desde products.stock no mueve la diferencia a movimientos anteriores.
+        assert await rebuild_movement_balances(session, [product_id]) == 0
+
+
+async def _run_job_from_csv(content: str, batch_size: int) -> int:
+    from types import SimpleNamespace
+
+    import app.db.session as db_session
+    from app.models.user import User
+    from app.services.inventory.import_jobs_service import InventoryImportJobService, run_inventory_import_job
+
+    handler = tempfile.NamedTemporaryFile(prefix="inventory-job-", suffix=".csv", delete=False, mode="w", encoding="utf-8")
+    with handler:
+        handler.write(content)
+    async with db_session.AsyncSessionLocal() as session:
+        admin_id = (await session.execute(select(User.id).where(User.username == "admin"))).scalar_one()
+        job = await InventoryImportJobService(session, SimpleNamespace(id=admin_id)).create_job(
+            filename="import.csv", file_type="csv", batch_size=batch_size
+        )
+    await run_inventory_import_job(job.id, handler.name)
+    return job.id
+
+
+def _csv_rows(prefix: str, count: int, *, stock_offset: int = 0) -> str:
+    lines = ["sku,name,category,price,cost,stock,stock_min"]
+    lines.extend(f"{prefix}-{index:05d},Libro {prefix} {index},Bench,10.5,4.25,{(index % 9) + stock_offset},1" for index in range(count))
+    return "\n".join(lines)
+
+
+@pytest.mark.asyncio
+async def test_import_job_chunks_match_row_by_row_semantics(client, monkeypatch):
+    import app.db.session as db_session
+    from app.services.inventory.stock_service import StockService
+
+    headers = await _login_admin(client)
+    existing = await client.post(
+        "/products",
+        json={"sku": "CH-EXIST", "name": "Viejo", "category": "Old", "price": 1, "cost": 1, "stock": 0, "stock_min": 0},
+        headers=headers,
+    )
+    assert existing.status_code == 201
+    content = "\n".join(
+        [
+            "sku,name,category,price,cost,stock,stock_min",
+            "CH-EXIST,Renombrado,Nueva,20,8,7,2",
+            "CH-NEW,Nuevo,Nueva,15,5,4,1",
+            "CH-BAD,Malo,Nueva,xx,5,4,1",
+            ",,,,,,",
+            "CH-NEW,Nuevo corregido,Nueva,15,5,6,1",
+        ]
+    )
+    job_id = await _run_job_from_csv(content, batch_size=2)
+
+    async with db_session.AsyncSessionLocal() as session:
+        job = (await session.execute(select(InventoryImportJob).where(InventoryImportJob.id == job_id))).scalar_one()
+        assert (job.status, job.success_rows, job.error_rows) == ("partial", 3, 1)
+        products = {
+            row.sku: row
+            for row in (await session.execute(select(Product).where(Product.sku.like("CH-%")))).scalars()
+        }
+        assert products["CH-EXIST"].name == "Renombrado"
+        assert products["CH-EXIST"].search_name == "renombrado"
+        assert products["CH-EXIST"].stock == 7
+        assert products["CH-NEW"].name == "Nuevo corregido"
+        assert products["CH-NEW"].stock == 6
+        assert "CH-BAD" not in products
+        movements = (
+            await session.execute(
+                select(StockMovement.type, StockMovement.qty)
+                .where(StockMovement.product_id == products["CH-NEW"].id)
+                .order_by(StockMovement.id)
+            )
+        ).all()
+        assert [tuple(row) for row in movements] == [("IN", 4), ("ADJ", 2)]
+        levels = (
+            await session.execute(select(StockLevel.qty).where(StockLevel.product_id == products["CH-NEW"].id))
+        ).scalars().all()
+        assert levels == [6]
+
+    search = await client.get("/products", params={"search": "corregido"}, headers=headers)
+    assert [row["sku"] for row in search.json()] == ["CH-NEW"]
+
+    # Si la escritura en bloque falla, cada fila va en su propio SAVEPOINT:
+    # la fila mala no arrastra al resto del bloque.
+    async def _broken_bulk(self, rows, **kwargs):
+        raise RuntimeError("bloque roto")
+
+    original_upsert = StockService.upsert_import_row
+
+    async def _flaky_upsert(self, row, **kwargs):
+        await original_upsert(self, row, **kwargs)
+        if row["sku"] == "SP-00002":
+            raise RuntimeError("fila rota")
+
+    monkeypatch.setattr(StockService, "_bulk_upsert_import_rows", _broken_bulk)
+    monkeypatch.setattr(StockService, "upsert_import_row", _flaky_upsert)
+    job_id = await _run_job_from_csv(_csv_rows("SP", 5), batch_size=5)
+    async with db_session.AsyncSessionLocal() as session:
+        job = (await session.execute(select(InventoryImportJob).where(InventoryImportJob.id == job_id))).scalar_one()
+        assert (job.success_rows, job.error_rows) == (4, 1)
+        skus = (await session.execute(select(Product.sku).where(Product.sku.like("SP-%")))).scalars().all()
+        assert sorted(skus) == ["SP-00000", "SP-00001", "SP-00003", "SP-00004"]
+        error = (
+            await session.execute(select(InventoryImportJobError).where(InventoryImportJobError.job_id == job_id))
+        ).scalar_one()
+        assert (error.row_number, error.detail) == (4, "fila rota")
+
+
+@pytest.mark.asyncio
+async def test_import_job_chunks_write_in_bulk(client):
+    import app.db.session as db_session
+
+    engine = db_session.AsyncSessionLocal.kw["bind"].sync_engine
+    statements: list[str] = []
+
+    def _count(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    async def run(stock_offset: int = 0) -> int:
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            await _run_job_from_csv(_csv_rows("BT", BULK_ROWS, stock_offset=stock_offset), batch_size=500)
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+        return len(statements)
+
+    # Un puñado de sentencias por bloque en lugar de varias por fila.
+    chunked_statements = await run()
+    assert chunked_statements < BULK_ROWS // 20, chunked_statements
+
+    # Reimportar el mismo archivo con otro stock recorre la rama de actualización.
+    updated_statements = await run(stock_offset=3)
+    assert updated_statements < BULK_ROWS // 20, updated_statements
+    async with db_session.AsyncSessionLocal() as session:
+        count, stock = (
+            await session.execute(
+                select(func.count(), func.sum(Product.stock)).where(Product.sku.like("BT-%"))
+            )
+        ).one()
+        level_total = (
+            await session.execute(
+                select(func.sum(StockLevel.qty))
+                .join(Product, Product.id == StockLevel.product_id)
+                .where(Product.sku.like("BT-%"))
+            )
+        ).scalar_one()
+    assert count == BULK_ROWS
+    assert stock == level_total == sum((index % 9) + 3 for index in range(BULK_ROWS))
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_keeps_sale_applied_between_read_and_write(client, monkeypatch):
+    import app.db.session as db_session
+    import app.services.inventory.stock_service as stock_service_module
+    from app.core.stock import apply_stock_delta, require_default_warehouse_id
+    from app.services.inventory.stock_service import StockService
+
+    headers = await _login_admin(client)
+    product = await client.post(
+        "/products",
+        json={
+            "sku": "BK-IMP-RACE",
+            "name": "Libro carrera",
+            "category": "Importacion",
+            "price": 10.0,
+            "cost": 4.0,
+            "stock": 10,
+            "stock_min": 0,
+        },
+        headers=headers,
+    )
+    assert product.status_code == 201
+    product_id = product.json()["id"]
+
+    original_snapshot = stock_service_module.load_stock_snapshot
+
+    async def snapshot_then_sell(db, product_ids, warehouse_id):
+        snapshot = await original_snapshot(db, product_ids, warehouse_id)
+        # Venta de otra caja aplicada después de que el bloque leyó el stock. En
+        # SQLite no puede confirmarse en medio (el bloque ya tiene su snapshot),
+        # así que se aplica en la misma conexión, como la vería PostgreSQL.
+        await apply_stock_delta(db, product_id, -3, warehouse_id)
+        return snapshot
+
+    monkeypatch.setattr(stock_service_module, "load_stock_snapshot", snapshot_then_sell)
+    async with db_session.AsyncSessionLocal() as session:
+        service = StockService(session, None)
+        row = {
+            "sku": "BK-IMP-RACE",
+            "name": "Libro carrera",
+            "category": "Importacion",
+            "price": "10",
+            "cost": "4",
+            "stock": "25",
+            "stock_min": "0",
+        }
+        errors = await service.import_chunk(
+            [(2, service.parse_import_row(2, row)), (3, service.parse_import_row(3, {**row, "stock": "20"}))],
+            default_warehouse_id=await require_default_warehouse_id(session),
+            ref="IMPORT_RACE",
+        )
+        await session.commit()
+    assert errors == {}
+
+    async with db_session.AsyncSessionLocal() as session:
+        stock = (await session.execute(select(Product.stock).where(Product.id == product_id))).scalar_one()
+        level = (
+            await session.execute(select(func.sum(StockLevel.qty)).where(StockLevel.product_id == product_id))
+        ).scalar_one()
+        movements = (
+            await session.execute(
+                select(StockMovement.qty, StockMovement.balance_after)
+                .where(StockMovement.ref == "IMPORT_RACE")
+                .order_by(StockMovement.id)
+            )
+        ).all()
+    # El import lleva el stock leído (10) a 20 (+15, -5); la venta de 3 no se pierde.
+    assert stock == level == 17
+    assert [tuple(movement) for movement in movements] == [(15, 22), (-5, 17)]
@@ -0,0 +1,216 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+import app.db.session as db_session
+from app.core.pagination import SortKey, decode_cursor, encode_cursor
+from app.models.customer import Customer
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.user import User
+
+
+async def _login_admin(client):
+    resp = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert resp.status_code == 200
+    csrf = resp.cookies.get("csrf_token")
+    assert csrf
+    return {"X-CSRF-Token": csrf}
+
+
+async def _walk(client, path: str, headers, params: dict, *, on_page=None) -> list[dict]:
+    items: list[dict] = []
+    cursor = None
+    while True:
+        query = dict(params)
+        if cursor:
+            query["cursor"] = cursor
+        resp = await client.get(path, params=query, headers=headers)
+        assert resp.status_code == 200, resp.text
+        payload = resp.json()
+        assert len(payload["items"]) <= params["limit"]
+        items.extend(payload["items"])
+        if on_page is not None:
+            await on_page(len(items))
+        if not payload["has_more"]:
+            assert payload["next_cursor"] is None
+            return items
+        cursor = payload["next_cursor"]
+
+
+def test_cursor_round_trip_and_shape_checks():
+    keys = (
+        SortKey("created_at", Sale.created_at, descending=True),
+        SortKey("id", Sale.id, descending=True),
+    )
+    moment = datetime(2026, 5, 1, 10, 30, 15, 123456)
+    cursor = encode_cursor([moment, 42])
+    assert "=" not in cursor
+    assert decode_cursor(cursor, keys) == [moment, 42]
+
+    for bad in ("%%%", encode_cursor([42]), encode_cursor(["x", 1]), encode_cursor([moment, "1"])):
+        with pytest.raises(Exception) as exc_info:
+            decode_cursor(bad, keys)
+        assert getattr(exc_info.value, "status_code", None) == 400
+
+
+@pytest.mark.asyncio
+async def test_products_and_customers_pages_are_stable_under_inserts(client):
+    headers = await _login_admin(client)
+    async with db_session.AsyncSessionLocal() as session:
+        await session.execute(
+            insert(Product),
+            [
+                {
+                    "sku": f"KS-{index:03d}",
+                    # Nombres repetidos: el id desempata.
+                    "name": f"Keyset libro {index % 9:02d}",
+                    "category": "Keyset",
+                    "price": 10,
+                    "cost": 5,
+                    "stock": index % 4,
+                    "stock_min": 0,
+                }
+                for index in range(1, 41)
+            ],
+        )
+        await session.execute(
+            insert(Customer), [{"name": f"Cliente {index % 7}"} for index in range(1, 31)]
+        )
+        await session.commit()
+
+    inserted = False
+
+    async def insert_mid_walk(seen: int) -> None:
+        nonlocal inserted
+        if inserted or seen < 14:
+            return
+        inserted = True
+        async with db_session.AsyncSessionLocal() as session:
+            # Ordena antes del punto ya recorrido: no debe aparecer ni desplazar filas.
+            session.add(
+                Product(
+                    sku="KS-NEW",
+                    name="Keyset libro 00",
+                    category="Keyset",
+                    price=10,
+                    cost=5,
+                    stock=1,
+                    stock_min=0,
+                )
+            )
+            await session.commit()
+
+    walked = await _walk(
+        client,
+        "/products/page",
+        headers,
+        {"limit": 7, "category": "Keyset"},
+        on_page=insert_mid_walk,
+    )
+    ids = [row["id"] for row in walked]
+    assert inserted
+    assert len(ids) == len(set(ids)) == 40
+    assert [(row["name"], row["id"]) for row in walked] == sorted(
+        (row["name"], row["id"]) for row in walked
+    )
+
+    search_walk = await _walk(
+        client, "/products/page", headers, {"limit": 6, "search": "keyset libro"}
+    )
+    classic = await client.get(
+        "/products", params={"search": "keyset libro", "limit": 500}, headers=headers
+    )
+    # Mismo conjunto que el listado clásico; el orden por cursor no usa el bonus por stock.
+    search_ids = [row["id"] for row in search_walk]
+    assert len(search_ids) == len(set(search_ids))
+    assert set(search_ids) == {row["id"] for row in classic.json()}
+
+    customers = await _walk(client, "/customers/page", headers, {"limit": 4})
+    async with db_session.AsyncSessionLocal() as session:
+        expected = (
+            await session.execute(select(Customer.id).order_by(Customer.name, Customer.id))
+        ).scalars().all()
+    assert [row["id"] for row in customers] == list(expected)
+
+    bad = await client.get("/customers/page", params={"cursor": "no-es-un-cursor"}, headers=headers)
+    assert bad.status_code == 400
+    # Un cursor del orden por relevancia no sirve para el orden por nombre.
+    mismatched = encode_cursor([10, 1, 5])
+    bad = await client.get("/products/page", params={"cursor": mismatched}, headers=headers)
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_product_search_pages_are_stable_when_stock_changes(client):
+    headers = await _login_admin(client)
+    async with db_session.AsyncSessionLocal() as session:
+        session.add_all(
+            Product(
+                sku=f"ST-{index:03d}",
+                name=f"Mapa movil {index:02d}",
+                category="Keyset",
+                price=10,
+                cost=5,
+                stock=index % 3,
+                stock_min=0,
+            )
+            for index in range(1, 25)
+        )
+        await session.commit()
+
+    async def shuffle_stock(_seen: int) -> None:
+        # Ventas e ingresos entre páginas: el stock de todas las filas cambia
+        # (incluido cruzar a y desde cero) sin mover su posición en el cursor.
+        async with db_session.AsyncSessionLocal() as session:
+            rows = (
+                await session.execute(select(Product).where(Product.sku.like("ST-%")))
+            ).scalars().all()
+            for product in rows:
+                product.stock = 0 if product.stock else 50
+            await session.commit()
+
+    walked = await _walk(
+        client, "/products/page", headers, {"limit": 5, "search": "mapa movil"}, on_page=shuffle_stock
+    )
+    ids = [row["id"] for row in walked]
+    assert len(ids) == len(set(ids)) == 24
+
+
+@pytest.mark.asyncio
+async def test_sales_pages_walk_every_sale_once(client):
+    headers = await _login_admin(client)
+    base = datetime(2026, 4, 1, 12, 0, 0)
+    async with db_session.AsyncSessionLocal() as session:
+        admin_id = (await session.execute(select(User.id).where(User.username == "admin"))).scalar_one()
+        await session.execute(
+            insert(Sale),
+            [
+                {
+                    "user_id": admin_id,
+                    "subtotal": 10,
+                    "total": 10,
+                    "invoice_number": f"T-{index:04d}",
+                    # Varias ventas comparten instante: el id decide el orden.
+                    "created_at": base + timedelta(minutes=index // 3),
+                }
+                for index in range(25)
+            ],
+        )
+        await session.commit()
+
+    walked = await _walk(client, "/sales/page", headers, {"limit": 4})
+    keys = [(row["created_at"], row["id"]) for row in walked]
+    assert len({row["id"] for row in walked}) == 25
+    assert keys == sorted(keys, reverse=True)
+
+    searched = await _walk(client, "/sales/page", headers, {"limit": 3, "search": "T-001"})
+    classic = await client.get("/sales", params={"search": "T-001"}, headers=headers)
+    assert [row["id"] for row in searched] == [row["id"] for row in classic.json()]
+    assert searched
+
+    filtered = await _walk(
+        client, "/sales/page", headers, {"limit": 5, "from_date": "2026-04-01", "to_date": "2026-04-01"}
+    )
+    assert len(filtered) == 25
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete, event, insert
+
+import app.db.session as db_session
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.permission_registry import PERMISSIONS_TOPIC, permission_registry
+from app.models.permission import RolePermission
+
+
+async def _login(client, username: str, password: str) -> dict[str, str]:
+    resp = await client.post("/auth/login", json={"username": username, "password": password})
+    assert resp.status_code == 200, resp.text
+    token = resp.cookies.get(settings.auth_cookie_name)
+    assert token
+    client.cookies.clear()
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _capture_permission_queries():
+    engine = db_session.AsyncSessionLocal.kw["bind"].sync_engine
+    statements: list[str] = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        if "from role_permissions" in statement.lower():
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", _capture)
+
+
+async def _create_cashier(client, admin: dict[str, str], username: str) -> dict[str, str]:
+    created = await client.post(
+        "/users",
+        json={"username": username, "password": "Cajero123A!", "role": "cashier", "is_active": True},
+        headers=admin,
+    )
+    assert created.status_code == 201, created.text
+    return await _login(client, username, "Cajero123A!")
+
+
+@pytest.mark.asyncio
+async def test_permission_checks_are_in_memory_and_edits_apply_on_commit(client):
+    admin = await _login(client, "admin", "admin123")
+    cashier = await _create_cashier(client, admin, "cajero_matriz")
+    assert (await client.get("/customers", headers=cashier)).status_code == 200
+    version = permission_registry.version
+
+    statements, stop = _capture_permission_queries()
+    try:
+        for _ in range(3):
+            assert (await client.get("/customers", headers=cashier)).status_code == 200
+            assert (await client.get("/sales", headers=cashier)).status_code == 200
+    finally:
+        stop()
+    assert statements == []
+
+    perms = await client.put("/permissions/cashier", json={"permissions": ["sales.read"]}, headers=admin)
+    assert perms.status_code == 200
+    assert permission_registry.version != version
+    assert permission_registry.permissions_for(" Cashier ") == frozenset({"sales.read"})
+
+    statements, stop = _capture_permission_queries()
+    try:
+        assert (await client.get("/customers", headers=cashier)).status_code == 403
+        assert (await client.get("/sales", headers=cashier)).status_code == 200
+    finally:
+        stop()
+    assert statements == []
+
+    ready = await client.get("/health/ready")
+    assert ready.json()["permissions_version"] == permission_registry.version
+
+
+@pytest.mark.asyncio
+async def test_remote_version_change_reloads_normalized_matrix(client):
+    admin = await _login(client, "admin", "admin123")
+    cashier = await _create_cashier(client, admin, "cajero_remoto")
+    assert (await client.get("/customers", headers=cashier)).status_code == 200
+
+    # La misma versión anunciada por otro worker no obliga a recargar.
+    invalidation_bus._dispatch(PERMISSIONS_TOPIC, {"version": permission_registry.version})
+    assert not permission_registry.needs_refresh
+
+    # Otro worker escribió filas con el rol sin normalizar.
+    async with db_session.AsyncSessionLocal() as session:
+        await session.execute(delete(RolePermission))
+        await session.execute(
+            insert(RolePermission), [{"role": " CASHIER ", "permission": "sales.read"}]
+        )
+        await session.commit()
+    assert (await client.get("/customers", headers=cashier)).status_code == 200
+
+    invalidation_bus._dispatch(PERMISSIONS_TOPIC, {"version": permission_registry.version + 1})
+    assert permission_registry.needs_refresh
+    statements, stop = _capture_permission_queries()
+    try:
+        assert (await client.get("/customers", headers=cashier)).status_code == 403
+        assert (await client.get("/sales", headers=cashier)).status_code == 200
+    finally:
+        stop()
+    assert len(statements) == 1
+    assert permission_registry.permissions_for("cashier") == frozenset({"sales.read"})
+
+
+@pytest.mark.asyncio
+async def test_matrix_reloads_after_max_age_without_invalidation_bus(client, monkeypatch):
+    admin = await _login(client, "admin", "admin123")
+    cashier = await _create_cashier(client, admin, "cajero_sin_redis")
+    assert (await client.get("/customers", headers=cashier)).status_code == 200
+
+    # Otro worker editó la matriz y no hay bus que lo anuncie.
+    async with db_session.AsyncSessionLocal() as session:
+        await session.execute(delete(RolePermission).where(RolePermission.role == "cashier"))
+        await session.execute(insert(RolePermission), [{"role": "cashier", "permission": "sales.read"}])
+        await session.commit()
+    assert not permission_registry.needs_refresh
+    assert (await client.get("/customers", headers=cashier)).status_code == 200
+
+    monkeypatch.setattr(settings, "permissions_max_age_seconds", 0.01)
+    await asyncio.sleep(0.02)
+    assert permission_registry.needs_refresh
+    assert (await client.get("/customers", headers=cashier)).status_code == 403
+    assert (await client.get("/sales", headers=cashier)).status_code == 200
+    assert permission_registry.permissions_for("cashier") == frozenset({"sales.read"})
@@ -1,6 +1,10 @@
+import asyncio
+
 from sqlalchemy import delete, select
 
 import app.db.session as db_session
+from app.core.stock import find_stock_mismatches, resync_product_stock
+from app.models.product import Product
 from app.models.warehouse import StockLevel
 import pytest
 
@@ -179,7 +183,7 @@ async def test_returns_history_endpoint(client):
 
 
 @pytest.mark.asyncio
-async def test_sale_backfills_legacy_stock_level_when_product_has_aggregate_stock(client):
+async def test_sale_without_stock_level_is_rejected_and_reported_as_mismatch(client):
     headers = await _login_admin(client)
 
     product_payload = {
@@ -195,6 +199,8 @@ async def test_sale_backfills_legacy_stock_level_when_product_has_aggregate_stoc
     assert resp.status_code == 201
     product = resp.json()
 
+    # Estado heredado: stock agregado sin fila en stock_levels (la migración
+    # 0034_phase33 crea esas filas; en ejecución ya no hay backfill).
     async with db_session.AsyncSessionLocal() as session:
         await session.execute(delete(StockLevel).where(StockLevel.product_id == product["id"]))
         await session.commit()
@@ -216,9 +222,56 @@ async def test_sale_backfills_legacy_stock_level_when_product_has_aggregate_stoc
         },
         headers=headers,
     )
-    assert sale_resp.status_code == 201
+    assert sale_resp.status_code == 409
+
+    async with db_session.AsyncSessionLocal() as session:
+        mismatches = await find_stock_mismatches(session)
+        assert mismatches == [(product["id"], 10, 0)]
+        assert await resync_product_stock(session, [product["id"]]) == 1
+        await session.commit()
+        assert await find_stock_mismatches(session) == []
+        stock = await session.execute(select(Product.stock).where(Product.id == product["id"]))
+        assert stock.scalar_one() == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sales_never_oversell(client):
+    headers = await _login_admin(client)
+    resp = await client.post(
+        "/products",
+        json={
+            "sku": "BK-ATOMIC-001",
+            "name": "Ultimas unidades",
+            "category": "Ficcion",
+            "price": 4.0,
+            "cost": 1.0,
+            "stock": 3,
+            "stock_min": 0,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    product_id = resp.json()["id"]
+    open_resp = await client.post("/cash/open", json={"opening_amount": 50.0}, headers=headers)
+    assert open_resp.status_code in {201, 409}
+
+    sale_payload = {
+        "customer_id": None,
+        "items": [{"product_id": product_id, "qty": 1}],
+        "payments": [{"method": "CASH", "amount": 4.0}],
+        "subtotal": 4.0,
+        "tax": 0.0,
+        "discount": 0.0,
+        "total": 4.0,
+        "promotion_id": None,
+    }
+    responses = await asyncio.gather(
+        *(client.post("/sales", json=sale_payload, headers=headers) for _ in range(6))
+    )
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [201, 201, 201, 409, 409, 409]
 
     async with db_session.AsyncSessionLocal() as session:
-        level_result = await session.execute(select(StockLevel.qty).where(StockLevel.product_id == product["id"]))
-        qty = level_result.scalar_one_or_none()
-        assert qty == 8
+        level = await session.execute(select(StockLevel.qty).where(StockLevel.product_id == product_id))
+        assert level.scalar_one() == 0
+        assert await find_stock_mismatches(session, [product_id]) == []
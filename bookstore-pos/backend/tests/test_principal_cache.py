@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import event
+
+import app.db.session as db_session
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.principal_cache import PRINCIPAL_TOPIC, principal_cache
+
+
+async def _login(client, username: str, password: str) -> dict[str, str]:
+    resp = await client.post("/auth/login", json={"username": username, "password": password})
+    assert resp.status_code == 200, resp.text
+    token = resp.cookies.get(settings.auth_cookie_name)
+    assert token
+    client.cookies.clear()
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _capture_auth_queries():
+    engine = db_session.AsyncSessionLocal.kw["bind"].sync_engine
+    statements: list[str] = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        lowered = statement.lower()
+        if any(table in lowered for table in ("from users", "from user_sessions", "from role_permissions")):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", _capture)
+
+
+@pytest.mark.asyncio
+async def test_principal_cache_skips_auth_queries_and_honours_logout(client):
+    admin = await _login(client, "admin", "admin123")
+    assert (await client.get("/auth/me", headers=admin)).status_code == 200
+
+    statements, stop = _capture_auth_queries()
+    try:
+        for _ in range(3):
+            resp = await client.get("/products", headers=admin)
+            assert resp.status_code == 200
+    finally:
+        stop()
+    assert statements == []
+
+    logout = await client.post("/auth/logout", headers=admin)
+    assert logout.status_code == 200
+    assert (await client.get("/auth/me", headers=admin)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_principal_cache_invalidated_by_permission_and_user_edits(client):
+    admin = await _login(client, "admin", "admin123")
+    created = await client.post(
+        "/users",
+        json={"username": "cajero_cache", "password": "Cajero123A!", "role": "cashier", "is_active": True},
+        headers=admin,
+    )
+    assert created.status_code == 201, created.text
+    cashier_id = created.json()["id"]
+    cashier = await _login(client, "cajero_cache", "Cajero123A!")
+
+    assert (await client.get("/customers", headers=cashier)).status_code == 200
+    assert (await client.get("/customers", headers=cashier)).status_code == 200
+
+    # Quitar customers.read al rol surte efecto en el siguiente request.
+    perms = await client.put(
+        "/permissions/cashier", json={"permissions": ["sales.read"]}, headers=admin
+    )
+    assert perms.status_code == 200
+    assert (await client.get("/customers", headers=cashier)).status_code == 403
+    assert (await client.get("/sales", headers=cashier)).status_code == 200
+
+    status_resp = await client.patch(
+        f"/users/{cashier_id}/status", json={"is_active": False}, headers=admin
+    )
+    assert status_resp.status_code == 200
+    assert (await client.get("/sales", headers=cashier)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_principal_cache_logout_all_and_remote_invalidation(client):
+    first = await _login(client, "admin", "admin123")
+    second = await _login(client, "admin", "admin123")
+    assert (await client.get("/auth/me", headers=first)).status_code == 200
+    assert (await client.get("/auth/me", headers=second)).status_code == 200
+    assert len(principal_cache) == 2
+
+    # Un evento de otro worker descarta las entradas del usuario en este.
+    admin_id = next(iter(principal_cache._entries.values())).user_id
+    invalidation_bus._dispatch(PRINCIPAL_TOPIC, {"user_id": admin_id})
+    assert len(principal_cache) == 0
+    assert (await client.get("/auth/me", headers=first)).status_code == 200
+
+    resp = await client.post("/auth/logout-all", headers=second)
+    assert resp.status_code == 200
+    assert (await client.get("/auth/me", headers=first)).status_code == 401
+    assert (await client.get("/auth/me", headers=second)).status_code == 401
@@ -0,0 +1,159 @@
+import pytest
+from sqlalchemy import select, text
+
+import app.db.session as db_session
+from app.models.product import Product
+
+
+async def _login_admin(client):
+    resp = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert resp.status_code == 200
+    csrf = resp.cookies.get("csrf_token")
+    assert csrf
+    return {"X-CSRF-Token": csrf}
+
+
+async def _create_product(client, headers, **overrides) -> dict:
+    payload = {
+        "sku": "BK-FTS-001",
+        "name": "Cuadernos Árbol de Papel",
+        "author": "José Núñez",
+        "publisher": "Ediciones Sur",
+        "category": "Útiles",
+        "tags": "rayado escolar",
+        "shelf_location": "B2-04",
+        "price": 12.0,
+        "cost": 6.0,
+        "stock": 3,
+        "stock_min": 0,
+        **overrides,
+    }
+    resp = await client.post("/products", json=payload, headers=headers)
+    assert resp.status_code == 201, resp.text
+    return resp.json()
+
+
+async def _search_ids(client, headers, query: str, smart: bool = False) -> set[int]:
+    resp = await client.get(
+        "/products", params={"search": query, "smart": str(smart).lower()}, headers=headers
+    )
+    assert resp.status_code == 200
+    return {item["id"] for item in resp.json()}
+
+
+@pytest.mark.asyncio
+async def test_product_search_uses_normalized_shadow_columns_and_fts(client):
+    headers = await _login_admin(client)
+    product = await _create_product(client, headers)
+
+    async with db_session.AsyncSessionLocal() as session:
+        row = (
+            await session.execute(
+                select(Product.search_name, Product.search_author, Product.search_sku).where(
+                    Product.id == product["id"]
+                )
+            )
+        ).one()
+        assert tuple(row) == ("cuadernos arbol de papel", "jose nunez", "bkfts001")
+        fts_rows = await session.execute(
+            text("SELECT rowid FROM products_fts WHERE products_fts MATCH :q"),
+            {"q": '"nunez"'},
+        )
+        assert [r[0] for r in fts_rows] == [product["id"]]
+
+    assert product["id"] in await _search_ids(client, headers, "arbol NUÑEZ")
+    assert product["id"] in await _search_ids(client, headers, "uadern")
+    assert product["id"] in await _search_ids(client, headers, "bk fts 001")
+    assert product["id"] in await _search_ids(client, headers, "b2 04")
+    # Términos cortos no usan el índice trigram y recurren a LIKE.
+    assert product["id"] in await _search_ids(client, headers, "b2")
+    assert product["id"] in await _search_ids(client, headers, "libreta", smart=True)
+    assert product["id"] not in await _search_ids(client, headers, "libreta")
+
+    resp = await client.put(
+        f"/products/{product['id']}",
+        json={**product, "name": "Agenda Ejecutiva"},
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    assert product["id"] not in await _search_ids(client, headers, "arbol")
+    assert product["id"] in await _search_ids(client, headers, "ejecutiva")
+
+    resp = await client.delete(f"/products/{product['id']}", headers=headers)
+    assert resp.status_code == 200
+    assert product["id"] not in await _search_ids(client, headers, "ejecutiva")
+
+
+@pytest.mark.asyncio
+async def test_code_lookup_resolves_exact_codes_with_single_indexed_query(client):
+    headers = await _login_admin(client)
+    book = await _create_product(
+        client,
+        headers,
+        sku="BK-1",
+        name="Diccionario Escolar",
+        isbn="978-612-4000001",
+        barcode="7501234000017",
+    )
+    sibling = await _create_product(client, headers, sku="BK-10", name="Diccionario Avanzado")
+
+    for code in ("7501234000017", "978-612-4000001", "9786124000001", "BK-1", "bk1"):
+        resp = await client.get("/products/lookup", params={"code": code}, headers=headers)
+        assert resp.status_code == 200, code
+        assert resp.json()["id"] == book["id"]
+
+    missing = await client.get("/products/lookup", params={"code": "0000000000"}, headers=headers)
+    assert missing.status_code == 404
+
+    # Un código exacto encabeza los resultados sin ocultar las demás coincidencias.
+    scan = await client.get("/products", params={"search": "BK-1"}, headers=headers)
+    assert [item["id"] for item in scan.json()][:2] == [book["id"], sibling["id"]]
+    other = await client.get("/products", params={"search": "BK-10"}, headers=headers)
+    assert [item["id"] for item in other.json()][0] == sibling["id"]
+    single = await client.get("/products", params={"search": "BK-1", "limit": 1}, headers=headers)
+    assert [item["id"] for item in single.json()] == [book["id"]]
+    # Sin coincidencia exacta se mantiene la búsqueda difusa.
+    partial = await client.get("/products", params={"search": "750123"}, headers=headers)
+    assert book["id"] in {item["id"] for item in partial.json()}
+
+    async with db_session.AsyncSessionLocal() as session:
+        plan = await session.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT id FROM products "
+                "WHERE search_barcode = :c OR search_isbn = :c OR search_sku = :c"
+            ),
+            {"c": "9786124000001"},
+        )
+        details = " ".join(str(row[-1]) for row in plan.all())
+    assert "SCAN products" not in details
+    assert "ix_products_search_isbn" in details
+
+
+@pytest.mark.asyncio
+async def test_exact_code_hit_is_ranked_first_among_fuzzy_matches(client):
+    headers = await _login_admin(client)
+    coded = await _create_product(client, headers, sku="2024", name="Separador de libros")
+    agendas = [
+        await _create_product(client, headers, sku=f"AG-{index}", name=f"Agenda 2024 modelo {index}")
+        for index in range(3)
+    ]
+
+    listing = await client.get("/products", params={"search": "2024"}, headers=headers)
+    assert listing.status_code == 200
+    ids = [item["id"] for item in listing.json()]
+    assert ids[0] == coded["id"]
+    assert set(ids) == {coded["id"], *(agenda["id"] for agenda in agendas)}
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"search": "2024", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await client.get("/products/page", params=params, headers=headers)).json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            break
+    assert seen[0] == coded["id"]
+    assert sorted(seen) == sorted(ids)
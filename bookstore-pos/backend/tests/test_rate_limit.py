@@ -0,0 +1,133 @@
+import pytest
+from prometheus_client import REGISTRY
+
+import app.core.rate_limit as rate_limit
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter
+
+
+class _Clock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _checks(backend: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "bookstore_rate_limit_check_duration_seconds_count", {"backend": backend}
+        )
+        or 0.0
+    )
+
+
+@pytest.mark.asyncio
+async def test_memory_sliding_window_and_incremental_expiry(monkeypatch):
+    clock = _Clock(100.0)
+    monkeypatch.setattr(rate_limit, "monotonic", clock)
+    limiter = RateLimiter(shards=1)
+    before = _checks("memory")
+
+    results = [await limiter.is_limited("k", limit=4, window_seconds=10) for _ in range(5)]
+    assert results == [False, False, False, False, True]
+    assert _checks("memory") == before + 5
+
+    # Inicio de la ventana siguiente: la anterior aún pesa completa.
+    clock.now = 110.0
+    assert await limiter.is_limited("k", limit=4, window_seconds=10)
+    # A mitad de ventana solo cuenta la mitad (2) y los rechazos no consumen cupo.
+    clock.now = 115.0
+    results = [await limiter.is_limited("k", limit=4, window_seconds=10) for _ in range(3)]
+    assert results == [False, False, True]
+
+    for index in range(10):
+        assert not await limiter.is_limited(f"other-{index}", limit=4, window_seconds=10)
+    assert len(limiter) == 11
+
+    # Tras dos ventanas sin actividad las claves salen del heap al chequear.
+    clock.now = 200.0
+    assert not await limiter.is_limited("fresh", limit=4, window_seconds=10)
+    assert len(limiter) == 1
+
+    await limiter.reset_for_tests()
+    assert len(limiter) == 0
+
+
+class _FakeScript:
+    def __init__(self, owner: "_FakeRedis") -> None:
+        self.owner = owner
+
+    async def __call__(self, keys, args, client):
+        if self.owner.broken:
+            raise ConnectionError("redis down")
+        self.owner.calls.append((keys[0], args))
+        return 1 if len(self.owner.calls) > int(args[1]) else 0
+
+
+class _FakeRedis:
+    instances: list["_FakeRedis"] = []
+    ping_failures = 0
+
+    def __init__(self) -> None:
+        self.broken = False
+        self.closed = False
+        self.calls: list = []
+
+    @classmethod
+    def from_url(cls, url, decode_responses=True):
+        instance = cls()
+        cls.instances.append(instance)
+        return instance
+
+    async def ping(self):
+        if _FakeRedis.ping_failures:
+            _FakeRedis.ping_failures -= 1
+            raise ConnectionError("redis down")
+        return True
+
+    def register_script(self, script):
+        assert "redis.call('TIME')" in script
+        return _FakeScript(self)
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_redis_script_path_reconnects_after_failures(monkeypatch):
+    clock = _Clock(1000.0)
+    monkeypatch.setattr(rate_limit, "monotonic", clock)
+    monkeypatch.setattr(rate_limit, "Redis", _FakeRedis)
+    monkeypatch.setattr(settings, "redis_url", "redis://cache:6379/0")
+    _FakeRedis.instances = []
+    _FakeRedis.ping_failures = 1
+    limiter = RateLimiter()
+    redis_before = _checks("redis")
+
+    # Redis caído al inicio: memoria local y sin reintentos hasta REDIS_RETRY_SECONDS.
+    assert not await limiter.is_limited("k", limit=2, window_seconds=60)
+    assert not await limiter.is_limited("k", limit=2, window_seconds=60)
+    assert len(_FakeRedis.instances) == 1
+    assert _FakeRedis.instances[0].closed
+
+    clock.now += rate_limit.REDIS_RETRY_SECONDS
+    assert not await limiter.is_limited("k", limit=2, window_seconds=60)
+    client = _FakeRedis.instances[1]
+    assert client.calls == [("rl:k", [60000, 2])]
+    assert not await limiter.is_limited("k", limit=2, window_seconds=60)
+    assert await limiter.is_limited("k", limit=2, window_seconds=60)
+    assert _checks("redis") == redis_before + 3
+
+    # Error en medio de la operación: vuelve a memoria y reconecta más tarde.
+    client.broken = True
+    assert await limiter.is_limited("k", limit=2, window_seconds=60)
+    assert client.closed
+    clock.now += rate_limit.REDIS_RETRY_SECONDS
+    assert not await limiter.is_limited("k2", limit=2, window_seconds=60)
+    assert len(_FakeRedis.instances) == 3
+    assert _FakeRedis.instances[2].calls == [("rl:k2", [60000, 2])]
+
+    await limiter.close()
+    assert _FakeRedis.instances[2].closed
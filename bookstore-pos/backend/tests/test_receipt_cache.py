@@ -0,0 +1,144 @@
+import importlib.util
+
+import pytest
+
+import app.routers.pos.printing as printing
+from app.core.config import settings
+from app.core.render_cache import RenderCache, render_cache
+from app.services.printing_templates import pdf_render
+
+
+async def _login_admin(client):
+    resp = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert resp.status_code == 200
+    csrf = resp.cookies.get("csrf_token")
+    assert csrf
+    return {"X-CSRF-Token": csrf}
+
+
+async def _create_ticket_sale(client, headers) -> dict:
+    product = await client.post(
+        "/products",
+        json={
+            "sku": "RC-001",
+            "name": "Libro cacheado",
+            "category": "Pruebas",
+            "price": 10.0,
+            "cost": 4.0,
+            "stock": 30,
+            "stock_min": 1,
+        },
+        headers=headers,
+    )
+    assert product.status_code == 201
+    open_cash = await client.post("/cash/open", json={"opening_amount": 50.0}, headers=headers)
+    assert open_cash.status_code in {201, 409}
+    sale = await client.post(
+        "/sales",
+        json={
+            "customer_id": None,
+            "items": [{"product_id": product.json()["id"], "qty": 2}],
+            "payments": [{"method": "CASH", "amount": 20.0}],
+            "subtotal": 20.0,
+            "tax": 0.0,
+            "discount": 0.0,
+            "total": 20.0,
+            "promotion_id": None,
+            "document_type": "TICKET",
+        },
+        headers=headers,
+    )
+    assert sale.status_code == 201
+    return sale.json()
+
+
+@pytest.mark.asyncio
+async def test_reprints_hit_cache_and_honour_if_none_match(client, monkeypatch):
+    headers = await _login_admin(client)
+    sale = await _create_ticket_sale(client, headers)
+
+    renders: list[str] = []
+    original_escpos = printing._to_escpos
+
+    def counting_escpos(lines):
+        renders.append("escpos")
+        return original_escpos(lines)
+
+    monkeypatch.setattr(printing, "_to_escpos", counting_escpos)
+
+    first = await client.get(f"/printing/escpos/{sale['id']}", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.content.startswith(b"\x1b@")
+
+    again = await client.get(f"/printing/escpos/{sale['id']}", headers=headers)
+    assert again.content == first.content
+    assert again.headers["etag"] == etag
+
+    not_modified = await client.get(
+        f"/printing/escpos/{sale['id']}", headers={**headers, "If-None-Match": etag}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert renders == ["escpos"]
+
+    # Cambiar los datos de la tienda cambia la huella: nuevo render y nuevo ETag.
+    current = (await client.get("/settings", headers=headers)).json()
+    saved = await client.put("/settings", json={**current, "receipt_footer": "Pie renovado"}, headers=headers)
+    assert saved.status_code == 200
+    changed = await client.get(
+        f"/printing/escpos/{sale['id']}", headers={**headers, "If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert b"Pie renovado" in changed.content
+    assert renders == ["escpos", "escpos"]
+
+
+@pytest.mark.asyncio
+async def test_pdf_is_served_from_disk_tier_after_memory_loss(client, monkeypatch, tmp_path):
+    if importlib.util.find_spec("reportlab") is None:
+        pytest.skip("reportlab no disponible")
+    render_cache.configure(max_bytes=settings.receipt_cache_max_bytes, directory=str(tmp_path))
+    try:
+        headers = await _login_admin(client)
+        sale = await _create_ticket_sale(client, headers)
+
+        pdf_renders: list[str] = []
+        original_pdf = pdf_render.render_text_pdf
+
+        def counting_pdf(title, text):
+            pdf_renders.append(title)
+            return original_pdf(title, text)
+
+        monkeypatch.setattr(pdf_render, "render_text_pdf", counting_pdf)
+
+        first = await client.get(f"/printing/document/{sale['id']}/pdf", headers=headers)
+        assert first.status_code == 200
+        assert first.content.startswith(b"%PDF")
+        assert len(list(tmp_path.glob("*/*.pdf"))) == 1
+
+        # Otro worker (o un reinicio): memoria vacía, el disco sigue sirviendo.
+        render_cache.clear()
+        second = await client.get(f"/printing/document/{sale['id']}/pdf", headers=headers)
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+        assert len(pdf_renders) == 1
+    finally:
+        render_cache.configure(
+            max_bytes=settings.receipt_cache_max_bytes, directory=settings.receipt_cache_dir
+        )
+
+
+def test_memory_tier_is_bounded_in_bytes():
+    cache = RenderCache(max_bytes=10, directory=None)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    assert cache.get("a") == b"12345"
+    cache.put("c", b"123")
+    # "b" era la menos usada: sale para respetar el límite.
+    assert cache.get("b") is None
+    assert cache.size_bytes == 8
+    cache.put("huge", b"x" * 11)
+    assert cache.get("huge") is None
+    assert len(cache) == 2
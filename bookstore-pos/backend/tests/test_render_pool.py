@@ -0,0 +1,75 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.core.render_pool import RenderPool
+
+
+def _slow_render(seconds: float) -> bytes:
+    time.sleep(seconds)
+    return b"%PDF-slow"
+
+
+def _missing_dependency() -> bytes:
+    from fastapi import HTTPException
+
+    raise HTTPException(status_code=500, detail="No se pudo generar PDF legal: sin reportlab")
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_answers_503_with_retry_after():
+    pool = RenderPool(workers=0, max_pending=1, timeout_seconds=1)
+    try:
+        first = asyncio.create_task(pool.run(_slow_render, 0.15))
+        await asyncio.sleep(0)
+        with pytest.raises(Exception) as busy:
+            await pool.run(_slow_render, 0)
+        assert busy.value.status_code == 503
+        assert busy.value.headers == {"Retry-After": "1"}
+        assert await first == b"%PDF-slow"
+        assert await pool.run(_slow_render, 0) == b"%PDF-slow"
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_slow_render_answers_504_and_holds_its_slot_until_done():
+    pool = RenderPool(workers=0, max_pending=1, timeout_seconds=0.2)
+    try:
+        with pytest.raises(Exception) as timeout:
+            await pool.run(_slow_render, 0.5)
+        assert timeout.value.status_code == 504
+        # El cupo sigue ocupado hasta que el render termina de verdad.
+        assert pool.pending == 1
+        await asyncio.sleep(0.4)
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_child_http_errors_are_raised_in_the_api():
+    pool = RenderPool(workers=0, max_pending=1, timeout_seconds=1)
+    try:
+        with pytest.raises(Exception) as failure:
+            await pool.run(_missing_dependency)
+        assert failure.value.status_code == 500
+        assert "sin reportlab" in failure.value.detail
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_broken_process_pool_answers_503_and_recovers():
+    pool = RenderPool(workers=1, max_pending=2, timeout_seconds=60)
+    try:
+        # El proceso hijo muere sin responder.
+        with pytest.raises(Exception) as broken:
+            await pool.run(os._exit, 1)
+        assert broken.value.status_code == 503
+        assert pool.pending == 0
+        assert await pool.run(bytes, b"%PDF-ok") == b"%PDF-ok"
+    finally:
+        pool.shutdown()
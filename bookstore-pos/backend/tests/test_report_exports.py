@@ -0,0 +1,132 @@
+import csv
+import tracemalloc
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import insert
+
+import app.db.session as db_session
+from app.core.exports import iter_csv, iter_xlsx
+from app.core.stock import require_default_warehouse_id
+from app.models.product import Product
+from app.models.sales_rollup import DailyProductSales
+from app.services.reports.reports_service import ReportsService
+
+SYNTHETIC_PRODUCTS = 12000
+SYNTHETIC_DAYS = 2
+
+
+async def _login_admin(client):
+    resp = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert resp.status_code == 200
+    csrf = resp.cookies.get("csrf_token")
+    assert csrf
+    return {"X-CSRF-Token": csrf}
+
+
+async def _seed_rollup(products: int, days: int, start: date) -> None:
+    async with db_session.AsyncSessionLocal() as session:
+        warehouse_id = await require_default_warehouse_id(session)
+        product_rows = [
+            {
+                "sku": f"EXP-{index:06d}",
+                "name": f"Producto exportable {index}",
+                "category": "Export",
+                "price": 10,
+                "cost": 4,
+                "stock": index % 40,
+                "stock_min": 5,
+            }
+            for index in range(1, products + 1)
+        ]
+        for offset in range(0, len(product_rows), 5000):
+            await session.execute(insert(Product), product_rows[offset : offset + 5000])
+        rollup_rows = [
+            {
+                "day": start + timedelta(days=day),
+                "product_id": product_id,
+                "warehouse_id": warehouse_id,
+                "qty_sold": (product_id % 7) + 1,
+                "sales_total": float((product_id % 7) + 1) * 10,
+                "estimated_cost_total": float((product_id % 7) + 1) * 4,
+            }
+            for day in range(days)
+            for product_id in range(1, products + 1)
+        ]
+        for offset in range(0, len(rollup_rows), 5000):
+            await session.execute(insert(DailyProductSales), rollup_rows[offset : offset + 5000])
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_report_exports_stream_csv_and_xlsx(client):
+    headers = await _login_admin(client)
+    start = date(2026, 1, 1)
+    await _seed_rollup(30, 2, start)
+    params = {"from_date": start.isoformat(), "to": (start + timedelta(days=1)).isoformat()}
+
+    json_rows = (
+        await client.get("/reports/profitability/products", params={**params, "limit": 500}, headers=headers)
+    ).json()
+    resp = await client.get("/reports/profitability/products/export", params=params, headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert "attachment" in resp.headers["content-disposition"]
+    csv_rows = list(csv.reader(StringIO(resp.text)))
+    assert csv_rows[0][0] == "product_id"
+    assert [int(row[0]) for row in csv_rows[1:]] == [row["product_id"] for row in json_rows]
+
+    resp = await client.get(
+        "/reports/rotation/export", params={**params, "format": "xlsx", "limit": 10}, headers=headers
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/vnd.openxmlformats")
+    sheet = load_workbook(BytesIO(resp.content), read_only=True).active
+    xlsx_rows = list(sheet.iter_rows(values_only=True))
+    assert xlsx_rows[0][:3] == ("product_id", "sku", "name")
+    assert len(xlsx_rows) == 11
+
+    bad_format = await client.get("/reports/low-stock/export", params={"format": "pdf"}, headers=headers)
+    assert bad_format.status_code == 400
+    bad_range = await client.get(
+        "/reports/rotation/export", params={"from_date": "2026-02-01", "to": "2026-01-01"}, headers=headers
+    )
+    assert bad_range.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_streaming_export_memory_is_bounded(client):
+    start = date(2026, 1, 1)
+    await _seed_rollup(SYNTHETIC_PRODUCTS, SYNTHETIC_DAYS, start)
+    to = (start + timedelta(days=SYNTHETIC_DAYS - 1)).isoformat()
+
+    async def measure(writer, limit: int | None = None) -> tuple[int, int, int]:
+        total_bytes = 0
+        lines = 0
+        async with db_session.ReadSessionLocal() as session:
+            rows = ReportsService(session).export_profitability_by_product(start.isoformat(), to, limit)
+            tracemalloc.start()
+            try:
+                async for chunk in writer(rows):
+                    total_bytes += len(chunk)
+                    lines += chunk.count(b"\n")
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        return total_bytes, lines, peak
+
+    await measure(iter_csv, 10)  # calienta cachés de compilación e imports
+    small_bytes, _, small_peak = await measure(iter_csv, SYNTHETIC_PRODUCTS // 10)
+    csv_bytes, csv_lines, csv_peak = await measure(iter_csv)
+    assert csv_lines == SYNTHETIC_PRODUCTS + 1
+    assert csv_bytes > small_bytes * 9
+    # Diez veces más filas no multiplican la memoria: el pico depende del tamaño de lote.
+    assert csv_peak < small_peak * 1.5, (small_peak, csv_peak)
+    assert csv_peak < csv_bytes, (csv_peak, csv_bytes)
+
+    small_xlsx, _, small_xlsx_peak = await measure(iter_xlsx, SYNTHETIC_PRODUCTS // 10)
+    xlsx_bytes, _, xlsx_peak = await measure(iter_xlsx)
+    assert xlsx_bytes > small_xlsx * 5
+    assert xlsx_peak < small_xlsx_peak * 1.5, (small_xlsx_peak, xlsx_peak)
@@ -1,7 +1,13 @@
+import asyncio
 from datetime import date
 
 import pytest
 
+import app.core.alerts_snapshot as alerts_snapshot_module
+from app.core.alerts_snapshot import alerts_snapshot
+from app.core.config import settings
+from app.services.reports.reports_service import ReportsService
+
 
 async def _login_admin(client) -> dict[str, str]:
     response = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
@@ -39,3 +45,165 @@ async def test_reports_operational_alerts_include_low_stock(client):
     payload = response.json()
     assert isinstance(payload, list)
     assert any(alert.get("code") in {"stock_critical", "stock_low"} for alert in payload)
+
+
+@pytest.mark.asyncio
+async def test_reports_operational_alerts_stagnant_stock_and_limit(client):
+    headers = await _login_admin(client)
+    product_ids = {}
+    for sku, stock, stock_min in (
+        ("BK-STAG-001", 20, 2),
+        ("BK-SOLD-001", 20, 2),
+        ("BK-LOW-001", 1, 5),
+        ("BK-LOW-002", 0, 5),
+    ):
+        created = await client.post(
+            "/products",
+            json={
+                "sku": sku,
+                "name": f"Libro {sku}",
+                "category": "Alertas",
+                "price": 10.0,
+                "cost": 5.0,
+                "stock": stock,
+                "stock_min": stock_min,
+            },
+            headers=headers,
+        )
+        assert created.status_code == 201
+        product_ids[sku] = created.json()["id"]
+
+    open_cash = await client.post("/cash/open", json={"opening_amount": 10.0}, headers=headers)
+    assert open_cash.status_code == 201
+    sale = await client.post(
+        "/sales",
+        json={
+            "customer_id": None,
+            "items": [{"product_id": product_ids["BK-SOLD-001"], "qty": 1}],
+            "payments": [{"method": "CASH", "amount": 10.0}],
+            "subtotal": 10.0,
+            "tax": 0.0,
+            "discount": 0.0,
+            "total": 10.0,
+            "promotion_id": None,
+        },
+        headers=headers,
+    )
+    assert sale.status_code == 201
+
+    today = date.today().isoformat()
+    response = await client.get("/reports/alerts", params={"from_date": today, "to": today}, headers=headers)
+    assert response.status_code == 200
+    by_product = {(alert["code"], alert["product_id"]) for alert in response.json()}
+    assert ("stagnant_stock", product_ids["BK-STAG-001"]) in by_product
+    assert not any(product_id == product_ids["BK-SOLD-001"] for _, product_id in by_product)
+    assert ("stock_critical", product_ids["BK-LOW-002"]) in by_product
+    assert ("stock_low", product_ids["BK-LOW-001"]) in by_product
+
+    limited = await client.get(
+        "/reports/alerts", params={"from_date": today, "to": today, "limit": 2}, headers=headers
+    )
+    assert limited.status_code == 200
+    assert [alert["code"] for alert in limited.json()] == ["stock_critical", "stock_low"]
+
+
+async def _create_low_stock_product(client, headers, sku: str) -> int:
+    response = await client.post(
+        "/products",
+        json={
+            "sku": sku,
+            "name": f"Libro {sku}",
+            "category": "Alertas",
+            "price": 10.0,
+            "cost": 5.0,
+            "stock": 0,
+            "stock_min": 3,
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+async def _alert_product_ids(client, headers, **params) -> set[int]:
+    today = date.today().isoformat()
+    response = await client.get(
+        "/reports/alerts", params={"from_date": today, "to": today, **params}, headers=headers
+    )
+    assert response.status_code == 200
+    return {alert["product_id"] for alert in response.json()}
+
+
+@pytest.mark.asyncio
+async def test_operational_alerts_snapshot_serves_reads_until_stale(client, monkeypatch):
+    headers = await _login_admin(client)
+    first_id = await _create_low_stock_product(client, headers, "BK-SNAP-001")
+    assert alerts_snapshot.has_pending_changes
+
+    await alerts_snapshot.refresh(ReportsService.load_default_alerts)
+    assert not alerts_snapshot.has_pending_changes
+    second_id = await _create_low_stock_product(client, headers, "BK-SNAP-002")
+    assert alerts_snapshot.has_pending_changes
+
+    # El snapshot aún no incluye el segundo producto; otros parámetros calculan en línea.
+    assert await _alert_product_ids(client, headers) == {first_id}
+    assert {first_id, second_id} <= await _alert_product_ids(client, headers, expiry_days=7)
+
+    monkeypatch.setattr(settings, "alerts_snapshot_max_age_seconds", 0.01)
+    await asyncio.sleep(0.02)
+    assert {first_id, second_id} <= await _alert_product_ids(client, headers)
+
+
+@pytest.mark.asyncio
+async def test_operational_alerts_snapshot_refreshes_in_background_after_writes(client, monkeypatch):
+    monkeypatch.setattr(alerts_snapshot_module, "DEBOUNCE_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "alerts_snapshot_refresh_seconds", 60.0)
+    headers = await _login_admin(client)
+    alerts_snapshot.start(ReportsService.load_default_alerts)
+
+    async def wait_for_generation(previous):
+        for _ in range(100):
+            if alerts_snapshot.generated_at is not None and alerts_snapshot.generated_at != previous:
+                return
+            await asyncio.sleep(0.02)
+        raise AssertionError("El snapshot de alertas no se regeneró")
+
+    try:
+        await wait_for_generation(None)
+        generated_at = alerts_snapshot.generated_at
+        product_id = await _create_low_stock_product(client, headers, "BK-SNAP-BG")
+        await wait_for_generation(generated_at)
+    finally:
+        await alerts_snapshot.stop()
+    assert product_id in {alert.product_id for alert in alerts_snapshot.get(500)}
+
+
+@pytest.mark.asyncio
+async def test_bulk_inventory_import_marks_alerts_snapshot_changed(client):
+    import app.db.session as db_session
+    from app.core.stock import require_default_warehouse_id
+    from app.services.inventory.stock_service import StockService
+
+    await alerts_snapshot.refresh(ReportsService.load_default_alerts)
+    assert not alerts_snapshot.has_pending_changes
+
+    async with db_session.AsyncSessionLocal() as session:
+        service = StockService(session, None)
+        rows = [
+            (index, service.parse_import_row(index, {
+                "sku": f"BK-SNAP-IMP-{index}",
+                "name": f"Libro importado {index}",
+                "category": "Alertas",
+                "price": "10",
+                "cost": "5",
+                "stock": "0",
+                "stock_min": "3",
+            }))
+            for index in (2, 3)
+        ]
+        warehouse_id = await require_default_warehouse_id(session)
+        errors = await service.import_chunk(rows, default_warehouse_id=warehouse_id, ref="IMPORT_TEST")
+        await session.commit()
+
+    assert errors == {}
+    assert alerts_snapshot.has_pending_changes
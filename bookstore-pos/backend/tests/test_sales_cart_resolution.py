@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy import event, select
+
+import app.db.session as db_session
+from app.models.product import Product
+from app.models.warehouse import StockLevel
+
+
+async def _login_admin(client):
+    resp = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert resp.status_code == 200
+    csrf = resp.cookies.get("csrf_token")
+    assert csrf
+    return {"X-CSRF-Token": csrf}
+
+
+async def _create_products(client, headers, prefix: str, count: int) -> list[dict]:
+    products = []
+    for index in range(count):
+        resp = await client.post(
+            "/products",
+            json={
+                "sku": f"{prefix}-{index:03d}",
+                "name": f"Cuaderno {prefix} {index}",
+                "category": "Utiles",
+                "price": 2.0,
+                "cost": 1.0,
+                "stock": 20,
+                "stock_min": 0,
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+        products.append(resp.json())
+    return products
+
+
+def _sale_payload(products: list[dict], qty: int = 1) -> dict:
+    total = sum(p["price"] * qty for p in products)
+    return {
+        "customer_id": None,
+        "items": [{"product_id": p["id"], "qty": qty} for p in products],
+        "payments": [{"method": "CASH", "amount": total}],
+        "subtotal": total,
+        "tax": 0,
+        "discount": 0,
+        "total": total,
+        "promotion_id": None,
+    }
+
+
+async def _count_sale_statements(client, headers, products: list[dict]) -> int:
+    engine = db_session.AsyncSessionLocal.kw["bind"].sync_engine
+    statements: list[str] = []
+
+    def _on_execute(_conn, _cursor, statement, _params, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        resp = await client.post("/sales", json=_sale_payload(products), headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+    assert resp.status_code == 201, resp.text
+    return len(statements)
+
+
+@pytest.mark.asyncio
+async def test_create_sale_query_count_is_independent_of_cart_size(client):
+    headers = await _login_admin(client)
+    products = await _create_products(client, headers, "CART", 24)
+
+    open_resp = await client.post("/cash/open", json={"opening_amount": 50.0}, headers=headers)
+    assert open_resp.status_code in {201, 409}
+
+    # Warm-up sale so one-time work (document sequence, template cache) is excluded.
+    warmup = await client.post("/sales", json=_sale_payload(products[:1]), headers=headers)
+    assert warmup.status_code == 201
+
+    small_cart = await _count_sale_statements(client, headers, products[1:4])
+    large_cart = await _count_sale_statements(client, headers, products[4:24])
+    assert small_cart == large_cart
+
+    async with db_session.AsyncSessionLocal() as session:
+        rows = await session.execute(
+            select(Product.id, Product.stock, StockLevel.qty)
+            .join(StockLevel, StockLevel.product_id == Product.id)
+            .where(Product.id.in_([p["id"] for p in products]))
+        )
+        for _product_id, stock, level_qty in rows.all():
+            assert stock == level_qty == 19
+
+
+@pytest.mark.asyncio
+async def test_create_sale_checks_stock_against_combined_qty_of_repeated_lines(client):
+    headers = await _login_admin(client)
+    [product] = await _create_products(client, headers, "DUP", 1)
+
+    open_resp = await client.post("/cash/open", json={"opening_amount": 50.0}, headers=headers)
+    assert open_resp.status_code in {201, 409}
+
+    payload = _sale_payload([product, product], qty=15)
+    resp = await client.post("/sales", json=payload, headers=headers)
+    assert resp.status_code == 409
+
+    payload = _sale_payload([product, product], qty=10)
+    resp = await client.post("/sales", json=payload, headers=headers)
+    assert resp.status_code == 201
+
+    async with db_session.AsyncSessionLocal() as session:
+        stock = (await session.execute(select(Product.stock).where(Product.id == product["id"]))).scalar_one()
+        assert stock == 0
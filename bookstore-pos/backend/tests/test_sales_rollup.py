@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, select
+
+import app.db.session as db_session
+from app.core.sales_rollup import estimated_unit_cost, rebuild_sales_rollup
+from app.core.stock import require_default_warehouse_id
+from app.models.product import Product
+from app.models.sale import SaleItem
+from app.models.sales_rollup import DailyProductSales, DailySalesTotals
+
+
+async def _login_admin(client):
+    resp = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert resp.status_code == 200
+    csrf = resp.cookies.get("csrf_token")
+    assert csrf
+    return {"X-CSRF-Token": csrf}
+
+
+async def _create_product(client, headers, sku: str, price: float, cost: float) -> dict:
+    resp = await client.post(
+        "/products",
+        json={
+            "sku": sku,
+            "name": f"Producto {sku}",
+            "category": "Reportes",
+            "price": price,
+            "cost": cost,
+            "stock": 50,
+            "stock_min": 0,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    return resp.json()
+
+
+async def _sell(client, headers, items: list[tuple[int, int]], total: float) -> dict:
+    resp = await client.post(
+        "/sales",
+        json={
+            "customer_id": None,
+            "items": [{"product_id": product_id, "qty": qty} for product_id, qty in items],
+            "payments": [{"method": "CASH", "amount": total}],
+            "subtotal": total,
+            "tax": 0.0,
+            "discount": 0.0,
+            "total": total,
+            "promotion_id": None,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 201, resp.text
+    return resp.json()
+
+
+async def _rollup_rows() -> tuple[list[tuple], list[tuple]]:
+    async with db_session.AsyncSessionLocal() as session:
+        products = await session.execute(
+            select(
+                DailyProductSales.day,
+                DailyProductSales.product_id,
+                DailyProductSales.qty_sold,
+                DailyProductSales.sales_total,
+                DailyProductSales.estimated_cost_total,
+            ).order_by(DailyProductSales.product_id)
+        )
+        totals = await session.execute(
+            select(DailySalesTotals.day, DailySalesTotals.sales_count, DailySalesTotals.sales_total)
+        )
+        return (
+            [(r[0], r[1], r[2], float(r[3]), float(r[4])) for r in products.all()],
+            [(r[0], r[1], float(r[2])) for r in totals.all()],
+        )
+
+
+@pytest.mark.asyncio
+async def test_rollup_tracks_sales_and_returns_and_feeds_reports(client):
+    headers = await _login_admin(client)
+    book = await _create_product(client, headers, "BK-ROLL-1", price=20.0, cost=8.0)
+    pen = await _create_product(client, headers, "BK-ROLL-2", price=5.0, cost=1.0)
+    open_resp = await client.post("/cash/open", json={"opening_amount": 100.0}, headers=headers)
+    assert open_resp.status_code in {201, 409}
+
+    await _sell(client, headers, [(book["id"], 2), (pen["id"], 1)], 45.0)
+    await _sell(client, headers, [(book["id"], 1)], 20.0)
+    voided = await _sell(client, headers, [(pen["id"], 4)], 20.0)
+
+    ret = await client.post(f"/returns/{voided['id']}", json={"reason": "Anulada"}, headers=headers)
+    assert ret.status_code in {200, 201}, ret.text
+
+    today = datetime.now(timezone.utc).date()
+    products, totals = await _rollup_rows()
+    assert products == [
+        (today, book["id"], 3, pytest.approx(60.0), pytest.approx(24.0)),
+        (today, pen["id"], 1, pytest.approx(5.0), pytest.approx(1.0)),
+    ]
+    assert totals == [(today, 2, pytest.approx(65.0))]
+
+    day = today.isoformat()
+    daily = (await client.get("/reports/daily", params={"date": day}, headers=headers)).json()
+    assert daily["sales_count"] == 2
+    assert daily["total"] == pytest.approx(65.0)
+    top = (await client.get("/reports/top-products", params={"from_date": day, "to": day}, headers=headers)).json()
+    assert [(row["product_id"], row["qty_sold"]) for row in top] == [(book["id"], 3), (pen["id"], 1)]
+    summary = (await client.get("/reports/profitability", params={"from_date": day, "to": day}, headers=headers)).json()
+    assert summary["sales_total"] == pytest.approx(65.0)
+    assert summary["estimated_cost_total"] == pytest.approx(25.0)
+
+    # La reconstrucción completa coincide con el mantenimiento incremental.
+    async with db_session.AsyncSessionLocal() as session:
+        warehouse_id = await require_default_warehouse_id(session)
+        assert await rebuild_sales_rollup(session, warehouse_id) == 2
+        await session.commit()
+    assert await _rollup_rows() == (products, totals)
+
+    # Los reportes de rango leen solo el agregado, no sales/sale_items.
+    statements: list[str] = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    read_engine = db_session.ReadSessionLocal.kw["bind"].sync_engine
+    event.listen(read_engine, "before_cursor_execute", _capture)
+    try:
+        for path in ("/reports/top-products", "/reports/profitability", "/reports/profitability/products"):
+            resp = await client.get(path, params={"from_date": (today - timedelta(days=30)).isoformat(), "to": day}, headers=headers)
+            assert resp.status_code == 200
+    finally:
+        event.remove(read_engine, "before_cursor_execute", _capture)
+    report_sql = [sql for sql in statements if "daily_product_sales" in sql]
+    assert len(report_sql) == 3
+    assert not any("sale_items" in sql for sql in statements)
+
+
+def test_estimated_unit_cost_matches_rebuild_coalesce():
+    # Mismo orden que COALESCE(unit_cost_snapshot, unit_cost, cost, 0) del backfill.
+    product = Product(unit_cost=6.0, cost=8.0)
+    assert estimated_unit_cost(SaleItem(unit_cost_snapshot=5.0), product) == 5.0
+    assert estimated_unit_cost(SaleItem(unit_cost_snapshot=0), product) == 0.0
+    assert estimated_unit_cost(SaleItem(unit_cost_snapshot=None), product) == 6.0
+    assert estimated_unit_cost(SaleItem(unit_cost_snapshot=None), Product(unit_cost=None, cost=8.0)) == 8.0
+    assert estimated_unit_cost(SaleItem(unit_cost_snapshot=None), None) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_reports_reject_invalid_dates(client):
+    headers = await _login_admin(client)
+    resp = await client.get("/reports/top-products", params={"from_date": "2026-13-01", "to": "x"}, headers=headers)
+    assert resp.status_code == 400
@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy import event, update
+
+import app.db.session as db_session
+from app.core.invalidation import invalidation_bus
+from app.core.settings_snapshot import SETTINGS_TOPIC, settings_snapshot
+from app.models.settings import SystemSettings
+
+
+async def _login_admin(client) -> dict[str, str]:
+    resp = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert resp.status_code == 200
+    return {"X-CSRF-Token": resp.cookies.get("csrf_token")}
+
+
+def _capture_settings_queries():
+    engine = db_session.AsyncSessionLocal.kw["bind"].sync_engine
+    statements: list[str] = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        if "from system_settings" in statement.lower():
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", _capture)
+
+
+async def _create_sale(client, headers, *, sku: str) -> dict:
+    product = await client.post(
+        "/products",
+        json={
+            "sku": sku,
+            "name": "Libro configurado",
+            "category": "Pruebas",
+            "price": 10.0,
+            "cost": 4.0,
+            "stock": 10,
+            "stock_min": 0,
+        },
+        headers=headers,
+    )
+    assert product.status_code == 201
+    sale = await client.post(
+        "/sales",
+        json={
+            "customer_id": None,
+            "items": [{"product_id": product.json()["id"], "qty": 1}],
+            "payments": [{"method": "CASH", "amount": 10.0}],
+            "subtotal": 10.0,
+            "tax": 0.0,
+            "discount": 0.0,
+            "total": 10.0,
+            "promotion_id": None,
+        },
+        headers=headers,
+    )
+    assert sale.status_code == 201, sale.text
+    return sale.json()
+
+
+@pytest.mark.asyncio
+async def test_sales_and_receipts_read_settings_from_memory_and_updates_apply_on_commit(client):
+    headers = await _login_admin(client)
+    assert (await client.post("/cash/open", json={"opening_amount": 10.0}, headers=headers)).status_code == 201
+    await _create_sale(client, headers, sku="CFG-001")
+    version = settings_snapshot.version
+
+    statements, stop = _capture_settings_queries()
+    try:
+        sale = await _create_sale(client, headers, sku="CFG-002")
+        assert (await client.get(f"/sales/{sale['id']}/receipt", headers=headers)).status_code == 200
+        assert (await client.get("/settings/public")).status_code == 200
+    finally:
+        stop()
+    assert statements == []
+
+    current = (await client.get("/settings", headers=headers)).json()
+    saved = await client.put("/settings", json={**current, "tax_rate": 0.18}, headers=headers)
+    assert saved.status_code == 200
+    assert settings_snapshot.version != version
+    assert (await client.get("/settings/public")).json()["tax_rate"] == 0.18
+
+    ready = await client.get("/health/ready")
+    assert ready.json()["settings_version"] == settings_snapshot.version
+
+
+@pytest.mark.asyncio
+async def test_remote_version_change_reloads_settings(client):
+    await _login_admin(client)
+    assert (await client.get("/settings/public")).json()["receipt_footer"] == "Gracias por su compra"
+
+    # Otro worker guarda la configuración y anuncia su versión.
+    async with db_session.AsyncSessionLocal() as session:
+        await session.execute(update(SystemSettings).values(receipt_footer="Vuelva pronto"))
+        await session.commit()
+    assert (await client.get("/settings/public")).json()["receipt_footer"] == "Gracias por su compra"
+
+    invalidation_bus._dispatch(SETTINGS_TOPIC, {"version": settings_snapshot.version})
+    assert not settings_snapshot.needs_refresh
+    invalidation_bus._dispatch(SETTINGS_TOPIC, {"version": settings_snapshot.version + 1})
+    assert (await client.get("/settings/public")).json()["receipt_footer"] == "Vuelva pronto"
@@ -50,6 +50,9 @@ async def test_readiness_endpoint(client):
     data = resp.json()
     assert data["status"] == "ok"
     assert data["checks"]["database"] == "ok"
+    assert data["sqlite"]["journal_mode"] == "wal"
+    assert data["sqlite"]["busy_timeout"] == 5000
+    assert data["sqlite"]["foreign_keys"] == 1
 
 
 @pytest.mark.asyncio
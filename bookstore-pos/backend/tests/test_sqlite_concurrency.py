@@ -0,0 +1,88 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import OperationalError
+
+import app.db.session as db_session
+from app.models.sale import Sale
+
+
+async def _login_admin(client):
+    resp = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert resp.status_code == 200
+    csrf = resp.cookies.get("csrf_token")
+    assert csrf
+    return {"X-CSRF-Token": csrf}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sales_and_report_reads_do_not_hit_lock_errors(client):
+    headers = await _login_admin(client)
+    product_resp = await client.post(
+        "/products",
+        json={
+            "sku": "WAL-001",
+            "name": "Cuaderno Concurrencia",
+            "category": "Utiles",
+            "price": 3.0,
+            "cost": 1.0,
+            "stock": 100,
+            "stock_min": 0,
+        },
+        headers=headers,
+    )
+    assert product_resp.status_code == 201
+    product = product_resp.json()
+    open_resp = await client.post("/cash/open", json={"opening_amount": 50.0}, headers=headers)
+    assert open_resp.status_code in {201, 409}
+
+    sale_payload = {
+        "customer_id": None,
+        "items": [{"product_id": product["id"], "qty": 1}],
+        "payments": [{"method": "CASH", "amount": 3.0}],
+        "subtotal": 3.0,
+        "tax": 0,
+        "discount": 0,
+        "total": 3.0,
+        "promotion_id": None,
+    }
+    writes = [client.post("/sales", json=sale_payload, headers=headers) for _ in range(8)]
+    today = date.today().isoformat()
+    report_paths = (
+        "/reports/low-stock",
+        f"/reports/top-products?from_date={today}&to={today}",
+        f"/reports/rotation?from_date={today}&to={today}",
+        f"/reports/daily?date={today}",
+    )
+    reads = [client.get(path, headers=headers) for path in report_paths * 2]
+    responses = await asyncio.gather(*writes, *reads)
+
+    write_responses, read_responses = responses[: len(writes)], responses[len(writes) :]
+    assert [resp.status_code for resp in write_responses] == [201] * len(writes), [
+        resp.text for resp in write_responses if resp.status_code != 201
+    ]
+    assert [resp.status_code for resp in read_responses] == [200] * len(reads)
+
+    async with db_session.AsyncSessionLocal() as session:
+        sale_count = (await session.execute(select(func.count(Sale.id)))).scalar_one()
+    assert sale_count == len(writes)
+
+
+@pytest.mark.asyncio
+async def test_read_sessions_are_read_only_and_serve_reports_during_writes(client):
+    headers = await _login_admin(client)
+
+    async with db_session.ReadSessionLocal() as read_session:
+        with pytest.raises(OperationalError):
+            await read_session.execute(text("UPDATE products SET stock = stock + 1"))
+
+    # Una escritura abierta en el pool principal no bloquea reportes ni listados.
+    async with db_session.AsyncSessionLocal() as write_session:
+        await write_session.execute(text("UPDATE users SET is_active = is_active"))
+        today = date.today().isoformat()
+        for path in (f"/reports/daily?date={today}", "/reports/low-stock", "/products", "/customers"):
+            resp = await client.get(path, headers=headers)
+            assert resp.status_code == 200, path
+        await write_session.rollback()
@@ -1,11 +1,23 @@
 import { api } from "@/modules/shared/api";
-import { Customer } from "@/modules/shared/types";
+import { Customer, CursorPage } from "@/modules/shared/types";
 
 export const listCustomers = async (): Promise<Customer[]> => {
   const res = await api.get("/customers");
   return res.data;
 };
 
+export const listCustomersPage = async (options?: {
+  limit?: number;
+  cursor?: string | null;
+}): Promise<CursorPage<Customer>> => {
+  const params = {
+    limit: options?.limit ?? 100,
+    cursor: options?.cursor ?? undefined,
+  };
+  const res = await api.get("/customers/page", { params });
+  return res.data as CursorPage<Customer>;
+};
+
 export const createCustomer = async (data: Omit<Customer, "id">) => {
   const res = await api.post("/customers", data);
   return res.data as Customer;
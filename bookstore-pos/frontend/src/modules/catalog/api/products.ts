@@ -1,5 +1,5 @@
 import { api } from "@/modules/shared/api";
-import { Product } from "@/modules/shared/types";
+import { CursorPage, Product } from "@/modules/shared/types";
 
 export type PricingPreviewPayload = {
   cost_total: string;
@@ -71,6 +71,24 @@ export const listProducts = async (
   return res.data;
 };
 
+export const listProductsPage = async (options?: {
+  search?: string;
+  category?: string;
+  inStock?: boolean;
+  smart?: boolean;
+  limit?: number;
+  cursor?: string | null;
+}): Promise<CursorPage<Product>> => {
+  const params: Record<string, string | number> = { limit: options?.limit ?? 100 };
+  if (options?.search) params.search = options.search;
+  if (options?.category) params.category = options.category;
+  if (typeof options?.inStock === "boolean") params.in_stock = options.inStock ? 1 : 0;
+  if (typeof options?.smart === "boolean") params.smart = options.smart ? 1 : 0;
+  if (options?.cursor) params.cursor = options.cursor;
+  const res = await api.get("/products/page", { params });
+  return res.data as CursorPage<Product>;
+};
+
 export const listProductCategories = async (): Promise<string[]> => {
   const res = await api.get("/products/categories");
   return res.data;
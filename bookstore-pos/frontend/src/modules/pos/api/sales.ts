@@ -1,5 +1,5 @@
 import { api } from "@/modules/shared/api";
-import { SaleResponse, SaleListResponse } from "@/modules/shared/types";
+import { CursorPage, SaleResponse, SaleListResponse } from "@/modules/shared/types";
 
 export type SaleReceipt = {
   sale_id: number;
@@ -80,3 +80,17 @@ export const listSales = async (params: {
   const res = await api.get("/sales", { params });
   return res.data as SaleListResponse[];
 };
+
+export const listSalesPage = async (params: {
+  search?: string;
+  status?: string;
+  from_date?: string;
+  to_date?: string;
+  customer_id?: number;
+  user_id?: number;
+  limit?: number;
+  cursor?: string | null;
+}): Promise<CursorPage<SaleListResponse>> => {
+  const res = await api.get("/sales/page", { params: { ...params, cursor: params.cursor ?? undefined } });
+  return res.data as CursorPage<SaleListResponse>;
+};
@@ -60,13 +60,15 @@ export type StockMovement = {
   created_at: string;
 };
 
-export type KardexPage = {
-  items: StockMovement[];
+export type CursorPage<T> = {
+  items: T[];
   limit: number;
   has_more: boolean;
   next_cursor?: string | null;
 };
 
+export type KardexPage = CursorPage<StockMovement>;
+
 export type InventoryImportJob = {
   id: number;
   created_by: number;
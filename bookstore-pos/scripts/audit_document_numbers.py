@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import select  # noqa: E402
+
+import app.db.models  # noqa: E402,F401
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+from app.models.document_sequence import DocumentSequence  # noqa: E402
+from app.services.printing_templates import DocumentSequenceService  # noqa: E402
+
+
+async def audit(record: bool) -> int:
+    problems = 0
+    try:
+        async with AsyncSessionLocal() as session:
+            service = DocumentSequenceService(session)
+            result = await session.execute(select(DocumentSequence).order_by(DocumentSequence.id))
+            for sequence in result.scalars().all():
+                report = await service.audit_sequence(sequence)
+                missing = report["missing"]
+                print(
+                    f"{report['document_type']} {report['series']}: emitidos={report['issued']} "
+                    f"siguiente={report['next_number']} huecos_registrados={report['recorded_gaps']} "
+                    f"faltantes={len(missing)} duplicados={len(report['duplicates'])}"
+                )
+                if missing:
+                    print(f"  faltantes: {missing[:50]}{' ...' if len(missing) > 50 else ''}")
+                if report["duplicates"]:
+                    print(f"  duplicados: {report['duplicates'][:50]}")
+                problems += len(report["duplicates"])
+                if missing and record:
+                    await service.record_gaps(sequence, missing, reason="audit")
+                else:
+                    problems += len(missing)
+            await session.commit()
+    finally:
+        await engine.dispose()
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Audita la numeración de documentos: números reservados sin venta ni hueco registrado. "
+            "Con DOCUMENT_NUMBER_BLOCK_SIZE > 0, ejecutar con la API detenida."
+        )
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Registra los faltantes en document_number_gaps (motivo 'audit').",
+    )
+    args = parser.parse_args()
+    problems = asyncio.run(audit(args.record))
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from pathlib import Path
-import shutil
+import sqlite3
 
 
 def main() -> None:
@@ -18,7 +18,14 @@ def main() -> None:
 
     stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     dst = backups_dir / f"bookstore-{stamp}.db"
-    shutil.copy2(db_path, dst)
+    # API de backup de SQLite: incluye páginas aún en el archivo -wal (modo WAL).
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(dst)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
     print(f"[OK] Backup creado: {dst}")
 
 
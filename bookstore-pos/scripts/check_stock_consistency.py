@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from app.core.stock import find_stock_mismatches, resync_product_stock  # noqa: E402
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+
+
+async def check(fix: bool, limit: int) -> int:
+    try:
+        async with AsyncSessionLocal() as session:
+            mismatches = await find_stock_mismatches(session)
+            for product_id, stock, levels in mismatches[:limit]:
+                print(f"producto={product_id} products.stock={stock} stock_levels={levels}")
+            if len(mismatches) > limit:
+                print(f"... y {len(mismatches) - limit} mas")
+            if fix and mismatches:
+                await resync_product_stock(session, [product_id for product_id, _, _ in mismatches])
+                await session.commit()
+            return len(mismatches)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Verifica que products.stock coincida con SUM(stock_levels.qty)."
+    )
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="Reescribe products.stock con la suma de niveles (luego conviene rebuild_kardex_balances.py).",
+    )
+    parser.add_argument("--limit", type=int, default=50, help="Diferencias a listar.")
+    args = parser.parse_args()
+    mismatches = asyncio.run(check(args.fix, args.limit))
+    if not mismatches:
+        print("Stock consistente")
+        return
+    if args.fix:
+        print(f"Productos corregidos: {mismatches}")
+        return
+    print(f"Productos con diferencias: {mismatches}")
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from app.core.kardex import rebuild_movement_balances  # noqa: E402
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+
+
+async def rebuild(product_ids: list[int] | None) -> int:
+    try:
+        async with AsyncSessionLocal() as session:
+            rows = await rebuild_movement_balances(session, product_ids)
+            await session.commit()
+            return rows
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Recalcula el saldo corrido (balance_after) del kardex desde el stock actual."
+    )
+    parser.add_argument(
+        "--product-id",
+        type=int,
+        action="append",
+        help="Producto a reconstruir (repetible). Por defecto todo el catalogo.",
+    )
+    args = parser.parse_args()
+    rows = asyncio.run(rebuild(args.product_id))
+    print(f"Saldos de kardex actualizados: {rows} movimientos")
+
+
+if __name__ == "__main__":
+    main()
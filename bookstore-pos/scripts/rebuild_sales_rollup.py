@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from app.core.sales_rollup import rebuild_sales_rollup  # noqa: E402
+from app.core.stock import require_default_warehouse_id  # noqa: E402
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+
+
+def _parse_day(value: str | None) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise SystemExit(f"Fecha invalida: {value}") from exc
+
+
+async def rebuild(from_day: date | None, to_day: date | None) -> int:
+    try:
+        async with AsyncSessionLocal() as session:
+            try:
+                warehouse_id = await require_default_warehouse_id(session)
+            except ValueError as exc:
+                raise SystemExit(str(exc)) from exc
+            rows = await rebuild_sales_rollup(session, warehouse_id, from_day, to_day)
+            await session.commit()
+            return rows
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Recalcula daily_product_sales / daily_sales_totals desde las ventas."
+    )
+    parser.add_argument("--from-date", help="Dia comercial inicial (YYYY-MM-DD, BUSINESS_TIMEZONE). Por defecto todo el historico.")
+    parser.add_argument("--to-date", help="Dia comercial final inclusive (YYYY-MM-DD, BUSINESS_TIMEZONE).")
+    args = parser.parse_args()
+    from_day = _parse_day(args.from_date)
+    to_day = _parse_day(args.to_date)
+    if from_day and to_day and to_day < from_day:
+        raise SystemExit("--to-date no puede ser menor que --from-date")
+    rows = asyncio.run(rebuild(from_day, to_day))
+    print(f"Agregados reconstruidos: {rows} filas producto/dia")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,11 @@ def main() -> None:
     backend_dir = root / "backend"
     db_path = backend_dir / "bookstore.db"
     db_path.parent.mkdir(parents=True, exist_ok=True)
+    # Archivos WAL de la base anterior no deben aplicarse sobre el backup.
+    for suffix in ("-wal", "-shm"):
+        stale = db_path.with_name(db_path.name + suffix)
+        if stale.exists():
+            stale.unlink()
     shutil.copy2(backup, db_path)
     print(f"[OK] Base restaurada desde: {backup}")
 